@@ -0,0 +1,216 @@
+"""
+Módulo para la conexión asíncrona a la base de datos PostgreSQL (asyncio).
+Contraparte de DBConnector para las etapas limitadas por I/O: mientras una
+consulta o un COPY espera al servidor, el event loop atiende las demás.
+
+Expone dos puntos de acceso sobre la misma configuración del .env:
+- get_pool(): pool de asyncpg (COPY nativo con copy_to_table / copy_records_to_table)
+- get_engine(): AsyncEngine de SQLAlchemy (postgresql+asyncpg) para SQL con text()
+
+El tamaño del pool y los perfiles de sesión se leen de las mismas variables que
+DBConnector (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_STATEMENT_TIMEOUT_MS,
+DB_APPLICATION_NAME, DB_PROFILE_<PERFIL>).
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from typing import Dict, Optional
+
+import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+try:
+    from .db_connector import load_session_profiles
+except ImportError:
+    from db_connector import load_session_profiles
+
+
+class AsyncDBConnector:
+    """
+    Clase Singleton para gestionar la conexión asíncrona a PostgreSQL.
+    
+    Los pools de asyncpg pertenecen al event loop que los crea: si se usa desde
+    otro loop (ej: un segundo asyncio.run) el pool se recrea automáticamente.
+    """
+    
+    _instance: Optional['AsyncDBConnector'] = None
+    _initialized: bool = False
+    
+    def __new__(cls):
+        """
+        Método especial que controla la creación de instancias.
+        Implementa el patrón Singleton.
+        """
+        if cls._instance is None:
+            cls._instance = super(AsyncDBConnector, cls).__new__(cls)
+        return cls._instance
+    
+    def __init__(self):
+        """
+        Lee la configuración de conexión. El pool se crea en el primer uso,
+        dentro del event loop que lo va a utilizar.
+        """
+        if not AsyncDBConnector._initialized:
+            # Cargar variables de entorno desde el archivo .env
+            load_dotenv()
+            
+            self.db_host = os.getenv('DB_HOST', 'localhost')
+            self.db_port = int(os.getenv('DB_PORT', '5432'))
+            self.db_name = os.getenv('DB_NAME', 'avance_1_db')
+            self.db_user = os.getenv('DB_USER', 'usuario')
+            self.db_pass = os.getenv('DB_PASS', '')
+            
+            # Mismo límite de conexiones que el pool síncrono (pool_size + max_overflow)
+            self.max_size = int(os.getenv('DB_POOL_SIZE', '5')) + int(os.getenv('DB_MAX_OVERFLOW', '10'))
+            self.statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+            self.application_name = os.getenv('DB_APPLICATION_NAME', 'etl_pipeline')
+            self.session_profiles = load_session_profiles()
+            
+            self._pool: Optional[asyncpg.Pool] = None
+            self._engine: Optional[AsyncEngine] = None
+            self._loop: Optional[asyncio.AbstractEventLoop] = None
+            self._pid = os.getpid()
+            self._lock: Optional[asyncio.Lock] = None
+            self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+            self._engine_loop: Optional[asyncio.AbstractEventLoop] = None
+            self._engine_pid = os.getpid()
+            
+            AsyncDBConnector._initialized = True
+    
+    @classmethod
+    def get_instance(cls) -> 'AsyncDBConnector':
+        """
+        Método de clase para obtener la instancia única del Singleton.
+        
+        Returns:
+            AsyncDBConnector: La única instancia de la clase AsyncDBConnector.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    def _server_settings(self) -> Dict[str, str]:
+        """Parámetros de sesión aplicados a todas las conexiones del pool."""
+        settings = {'application_name': self.application_name}
+        if self.statement_timeout_ms > 0:
+            settings['statement_timeout'] = str(self.statement_timeout_ms)
+        return settings
+    
+    def _bound_to_current_loop(self) -> bool:
+        """Indica si el pool existente pertenece al loop y proceso actuales."""
+        return (
+            self._loop is asyncio.get_running_loop()
+            and self._pid == os.getpid()
+        )
+    
+    async def get_pool(self) -> asyncpg.Pool:
+        """
+        Retorna el pool de asyncpg del event loop actual (lo crea si no existe).
+        
+        Returns:
+            asyncpg.Pool: Pool de conexiones asíncronas
+        """
+        if self._pool is not None and self._bound_to_current_loop():
+            return self._pool
+        
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        
+        async with self._lock:
+            if self._pool is None or not self._bound_to_current_loop():
+                self._pool = await asyncpg.create_pool(
+                    host=self.db_host,
+                    port=self.db_port,
+                    database=self.db_name,
+                    user=self.db_user,
+                    password=self.db_pass,
+                    min_size=1,
+                    max_size=self.max_size,
+                    server_settings=self._server_settings()
+                )
+                self._loop = asyncio.get_running_loop()
+                self._pid = os.getpid()
+        return self._pool
+    
+    def get_engine(self) -> AsyncEngine:
+        """
+        Retorna el AsyncEngine de SQLAlchemy (driver asyncpg) del event loop actual.
+        
+        Returns:
+            AsyncEngine: Motor asíncrono de SQLAlchemy
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._engine is None or self._engine_loop is not loop or self._engine_pid != os.getpid():
+            connection_url = (
+                f"postgresql+asyncpg://{self.db_user}:{self.db_pass}"
+                f"@{self.db_host}:{self.db_port}/{self.db_name}"
+            )
+            self._engine = create_async_engine(
+                connection_url,
+                pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+                max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+                pool_pre_ping=True,
+                connect_args={'server_settings': self._server_settings()},
+                echo=False
+            )
+            self._engine_loop = loop
+            self._engine_pid = os.getpid()
+        return self._engine
+    
+    def get_session_settings(self, profile: Optional[str]) -> Dict[str, str]:
+        """
+        Retorna los parámetros de PostgreSQL de un perfil de sesión.
+        
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        profile = profile or 'default'
+        if profile not in self.session_profiles:
+            raise ValueError(
+                f"Perfil de sesión desconocido: '{profile}'. "
+                f"Disponibles: {', '.join(self.session_profiles)}"
+            )
+        return self.session_profiles[profile]
+    
+    @asynccontextmanager
+    async def transaction(self, profile: Optional[str] = None):
+        """
+        Context manager asíncrono que adquiere una conexión del pool y abre una
+        transacción con el perfil de sesión indicado (SET LOCAL).
+        
+        Args:
+            profile: Nombre del perfil (ej: 'bulk_load')
+        
+        Yields:
+            asyncpg.Connection: Conexión dentro de una transacción
+        
+        Example:
+            ```python
+            db = AsyncDBConnector.get_instance()
+            async with db.transaction(profile='bulk_load') as conn:
+                await conn.copy_to_table('usuarios_raw', source=buffer, format='csv')
+            ```
+        """
+        settings = self.get_session_settings(profile)
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for name, value in settings.items():
+                    await conn.execute("SELECT set_config($1, $2, true)", name, str(value))
+                yield conn
+    
+    async def close(self) -> None:
+        """Cierra el pool de asyncpg y el AsyncEngine del loop actual."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
@@ -1,13 +1,117 @@
 """
 Módulo para la conexión a la base de datos PostgreSQL usando SQLAlchemy.
 Implementa el patrón Singleton para asegurar una única instancia de conexión.
+
+Configuración del pool (variables de entorno, con sus valores por defecto):
+- DB_POOL_SIZE=5, DB_MAX_OVERFLOW=10: conexiones persistentes y adicionales
+- DB_POOL_TIMEOUT=30: segundos de espera máxima por una conexión libre
+- DB_POOL_RECYCLE=1800: segundos tras los que se recicla una conexión
+- DB_STATEMENT_TIMEOUT_MS=0: statement_timeout de todas las sesiones (0 = sin límite)
+- DB_APPLICATION_NAME=etl_pipeline: nombre visible en pg_stat_activity
+
+Perfiles de sesión: parámetros de PostgreSQL que se aplican con SET LOCAL al
+inicio de una transacción según su propósito (ver SESSION_PROFILES). Se pueden
+sobrescribir con DB_PROFILE_<PERFIL>, ej: DB_PROFILE_BULK_LOAD="work_mem=512MB,synchronous_commit=off".
+
+Instrumentación SQL: cada sentencia se registra (texto normalizado, duración, filas,
+etapa/tabla del pipeline) para el log de consultas lentas y el resumen por ejecución;
+ver query_log.py (DB_QUERY_LOG, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_LOG, DB_EXPLAIN_PATTERN).
+
+El conector es seguro ante fork(): en el proceso hijo el engine se descarta sin
+cerrar las conexiones del padre y se crea uno nuevo con su propio pool.
 """
 
 import os
+import time
+import threading
 from contextlib import contextmanager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Engine
-from typing import Optional
+from sqlalchemy import create_engine, Engine, event, exc
+from sqlalchemy.pool import QueuePool
+from typing import Dict, List, Optional
+
+try:
+    from .query_log import QueryLog
+except ImportError:
+    from query_log import QueryLog
+
+
+# Perfiles de sesión por propósito: {perfil: {parámetro: valor}}
+SESSION_PROFILES: Dict[str, Dict[str, str]] = {
+    'default': {},
+    # Cargas masivas a staging: más memoria para ordenar/hashear y commit asíncrono
+    # (staging se puede recargar desde los CSV si se pierde la última transacción)
+    'bulk_load': {
+        'work_mem': '256MB',
+        'maintenance_work_mem': '512MB',
+        'synchronous_commit': 'off',
+    },
+    # Consultas analíticas pesadas (agregaciones, joins sobre marts)
+    'analytics': {
+        'work_mem': '128MB',
+    },
+}
+
+
+def _parse_profile(value: str) -> Dict[str, str]:
+    """Convierte 'param=valor,param=valor' en un diccionario."""
+    settings = {}
+    for item in value.split(','):
+        if '=' in item:
+            name, setting = item.split('=', 1)
+            settings[name.strip()] = setting.strip()
+    return settings
+
+
+def load_session_profiles() -> Dict[str, Dict[str, str]]:
+    """
+    Retorna los perfiles de sesión: los predefinidos en SESSION_PROFILES más los
+    definidos o sobrescritos con variables DB_PROFILE_<PERFIL>.
+    
+    Returns:
+        Diccionario {perfil: {parámetro: valor}}
+    """
+    profiles = {name: dict(settings) for name, settings in SESSION_PROFILES.items()}
+    for key, value in os.environ.items():
+        if key.startswith('DB_PROFILE_'):
+            name = key[len('DB_PROFILE_'):].lower()
+            profiles.setdefault(name, {}).update(_parse_profile(value))
+    return profiles
+
+
+class _MeteredQueuePool(QueuePool):
+    """
+    QueuePool que mide el tiempo de espera de cada checkout.
+    
+    Las métricas se acumulan en el diccionario 'metrics' del DBConnector.
+    """
+    
+    _metrics: Dict = {}
+    _metrics_lock = threading.Lock()
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool._metrics = self._metrics
+        pool._metrics_lock = self._metrics_lock
+        return pool
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._metrics['timeouts'] = self._metrics.get('timeouts', 0) + 1
+            raise
+        waited = time.perf_counter() - start
+        with self._metrics_lock:
+            self._metrics['checkouts'] = self._metrics.get('checkouts', 0) + 1
+            self._metrics['wait_total_s'] = self._metrics.get('wait_total_s', 0.0) + waited
+            self._metrics['wait_max_s'] = max(self._metrics.get('wait_max_s', 0.0), waited)
+            self._metrics['checked_out_max'] = max(
+                self._metrics.get('checked_out_max', 0), self.checkedout()
+            )
+        return connection
 
 
 class DBConnector:
@@ -15,11 +119,12 @@ class DBConnector:
     Clase Singleton para gestionar la conexión a la base de datos PostgreSQL.
     
     Esta clase asegura que solo exista una única instancia de conexión
-    durante toda la ejecución del proyecto.
+    durante toda la ejecución del proyecto (una por proceso si se usa fork).
     """
     
     _instance: Optional['DBConnector'] = None
     _initialized: bool = False
+    _fork_hook_registered: bool = False
     
     def __new__(cls):
         """
@@ -47,17 +152,94 @@ class DBConnector:
             db_pass = os.getenv('DB_PASS', '')
             
             # Construir la URL de conexión de SQLAlchemy para PostgreSQL
-            connection_url = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+            self.connection_url = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
             
-            # Crear el Engine de SQLAlchemy
-            self.engine: Engine = create_engine(
-                connection_url,
-                pool_pre_ping=True,  # Verifica la conexión antes de usarla
-                echo=False  # Cambiar a True para ver las consultas SQL en consola
-            )
+            # Parámetros del pool
+            self.pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+            self.max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+            self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+            self.pool_recycle = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+            self.statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+            self.application_name = os.getenv('DB_APPLICATION_NAME', 'etl_pipeline')
+            
+            # Perfiles de sesión (los del entorno sobrescriben a los predefinidos)
+            self.session_profiles = load_session_profiles()
+            
+            # Métricas del pool
+            self._metrics_lock = threading.Lock()
+            self._metrics: Dict = {}
+            
+            # Registro de sentencias SQL (log de lentas y resumen por ejecución)
+            self.query_log = QueryLog.from_env()
+            
+            self._create_engine()
+            
+            # Recrear el engine en los procesos hijos creados con fork()
+            if hasattr(os, 'register_at_fork') and not DBConnector._fork_hook_registered:
+                os.register_at_fork(after_in_child=DBConnector._after_fork_in_child)
+                DBConnector._fork_hook_registered = True
             
             DBConnector._initialized = True
     
+    def _create_engine(self) -> None:
+        """Crea el Engine de SQLAlchemy con el pool configurado para el proceso actual."""
+        options = f"-c application_name={self.application_name}"
+        if self.statement_timeout_ms > 0:
+            options += f" -c statement_timeout={self.statement_timeout_ms}"
+        
+        self.engine: Engine = create_engine(
+            self.connection_url,
+            poolclass=_MeteredQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=True,  # Verifica la conexión antes de usarla
+            connect_args={'options': options},
+            echo=False  # Cambiar a True para ver las consultas SQL en consola
+        )
+        self.engine.pool._metrics = self._metrics
+        self.engine.pool._metrics_lock = self._metrics_lock
+        self.query_log.attach(self.engine)
+        self._pid = os.getpid()
+        
+        pid_key = '_etl_pid'
+        
+        @event.listens_for(self.engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            connection_record.info[pid_key] = os.getpid()
+            with self._metrics_lock:
+                self._metrics['connects'] = self._metrics.get('connects', 0) + 1
+        
+        @event.listens_for(self.engine, 'checkout')
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            # Nunca usar en un proceso una conexión abierta por otro (fork sin hook)
+            if connection_record.info.get(pid_key) != os.getpid():
+                connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+                raise exc.DisconnectionError(
+                    "Conexión creada en otro proceso; se descarta y se abre una nueva"
+                )
+    
+    @staticmethod
+    def _after_fork_in_child() -> None:
+        """Descarta en el hijo el pool heredado, sin cerrar los sockets del padre."""
+        instance = DBConnector._instance
+        if instance is not None and DBConnector._initialized:
+            instance._recreate_engine()
+    
+    def _ensure_current_process(self) -> None:
+        """Recrea el engine si el proceso cambió (fork sin register_at_fork)."""
+        if self._pid != os.getpid():
+            self._recreate_engine()
+    
+    def _recreate_engine(self) -> None:
+        """Descarta el engine heredado y crea uno nuevo con métricas propias del proceso."""
+        self.engine.dispose(close=False)
+        self._metrics_lock = threading.Lock()
+        self._metrics = {}
+        self.query_log.reset()
+        self._create_engine()
+    
     @classmethod
     def get_instance(cls) -> 'DBConnector':
         """
@@ -77,33 +259,128 @@ class DBConnector:
         Returns:
             Engine: El motor de SQLAlchemy para realizar operaciones en la BD.
         """
+        self._ensure_current_process()
         return self.engine
     
+    def get_session_settings(self, profile: Optional[str]) -> Dict[str, str]:
+        """
+        Retorna los parámetros de PostgreSQL de un perfil de sesión.
+        
+        Args:
+            profile: Nombre del perfil (ej: 'bulk_load'). None equivale a 'default'
+        
+        Returns:
+            Diccionario {parámetro: valor}
+        
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        profile = profile or 'default'
+        if profile not in self.session_profiles:
+            raise ValueError(
+                f"Perfil de sesión desconocido: '{profile}'. "
+                f"Disponibles: {', '.join(self.session_profiles)}"
+            )
+        return self.session_profiles[profile]
+    
+    @contextmanager
+    def session(self, profile: Optional[str] = None):
+        """
+        Context manager que abre una transacción de SQLAlchemy con un perfil de sesión.
+        
+        Los parámetros se aplican con SET LOCAL, por lo que solo afectan a esta
+        transacción y la conexión vuelve limpia al pool.
+        
+        Args:
+            profile: Nombre del perfil (ej: 'bulk_load', 'analytics')
+        
+        Yields:
+            Connection: Conexión de SQLAlchemy dentro de una transacción
+        """
+        settings = self.get_session_settings(profile)
+        with self.get_engine().begin() as conn:
+            for name, value in settings.items():
+                conn.exec_driver_sql("SELECT set_config(%s, %s, true)", (name, str(value)))
+            yield conn
+    
+    def get_pool_stats(self) -> Dict:
+        """
+        Retorna el estado y las métricas del pool de conexiones del proceso actual.
+        
+        Returns:
+            Diccionario con tamaño, conexiones en uso, overflow, checkouts,
+            tiempos de espera (total, medio, máximo) y timeouts
+        """
+        pool = self.get_engine().pool
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        checkouts = metrics.get('checkouts', 0)
+        return {
+            'pid': self._pid,
+            'pool_size': pool.size(),
+            'max_overflow': self.max_overflow,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'checked_out_max': metrics.get('checked_out_max', 0),
+            'checkouts': checkouts,
+            'connects': metrics.get('connects', 0),
+            'timeouts': metrics.get('timeouts', 0),
+            'wait_total_s': metrics.get('wait_total_s', 0.0),
+            'wait_avg_s': metrics.get('wait_total_s', 0.0) / checkouts if checkouts else 0.0,
+            'wait_max_s': metrics.get('wait_max_s', 0.0),
+        }
+    
+    def get_query_stats(self, top_n: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna las estadísticas de las sentencias SQL ejecutadas en el proceso actual,
+        ordenadas por tiempo total.
+        
+        Args:
+            top_n: Cantidad máxima de sentencias (None = todas)
+        
+        Returns:
+            Lista de diccionarios con stage, statement, tables, calls, total_s,
+            mean_ms, max_ms, rows y plan
+        """
+        return self.query_log.get_stats(top_n)
+    
     @contextmanager
-    def get_raw_connection(self):
+    def get_raw_connection(self, profile: Optional[str] = None):
         """
         Context manager para obtener una conexión raw de psycopg2.
         Útil para operaciones que requieren acceso directo a psycopg2 (ej: COPY).
         
         La conexión se cierra automáticamente al salir del contexto,
-        devolviéndola al pool de conexiones.
+        devolviéndola al pool de conexiones. Las sentencias de sus cursores
+        (incluidos los COPY) se registran en el query log.
+        
+        Args:
+            profile: Perfil de sesión a aplicar (ej: 'bulk_load'). Los parámetros se
+                     aplican con SET LOCAL a la primera transacción de la conexión
         
         Yields:
             Connection: Conexión raw de psycopg2
-            
+        
         Example:
             ```python
             db = DBConnector.get_instance()
-            with db.get_raw_connection() as conn:
+            with db.get_raw_connection(profile='bulk_load') as conn:
                 cursor = conn.cursor()
                 # ... operaciones con psycopg2 ...
                 conn.commit()
             ```
         """
+        settings = self.get_session_settings(profile)
         conn = None
         try:
-            conn = self.engine.raw_connection()
-            yield conn
+            conn = self.get_engine().raw_connection()
+            if settings:
+                cursor = conn.cursor()
+                for name, value in settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, true)", (name, str(value)))
+                cursor.close()
+            yield self.query_log.wrap_connection(conn)
         except Exception:
             if conn:
                 conn.rollback()
@@ -111,4 +388,3 @@ class DBConnector:
         finally:
             if conn:
                 conn.close()  # Devuelve la conexión al pool
-
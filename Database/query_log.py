@@ -0,0 +1,514 @@
+"""
+Instrumentación a nivel SQL del DBConnector mediante eventos del Engine.
+
+Cada sentencia ejecutada a través de SQLAlchemy (lecturas con read_sql, INSERT
+multi-fila de to_sql, TRUNCATE, consultas a information_schema...) se registra con:
+- texto normalizado (literales y parámetros reemplazados por '?', listas VALUES colapsadas)
+- duración, filas afectadas/retornadas
+- etapa y tabla del pipeline que la originó (ver query_context)
+
+Con esos registros se genera:
+- un log de consultas lentas (JSON Lines) por encima de un umbral
+- un resumen por ejecución con las sentencias que más tiempo acumulan
+- opcionalmente, el plan EXPLAIN (ANALYZE, BUFFERS) de los SELECT elegidos
+
+Configuración (variables de entorno, con sus valores por defecto):
+- DB_QUERY_LOG=true: activa el registro de sentencias
+- DB_SLOW_QUERY_MS=1000: umbral en milisegundos del log de consultas lentas
+- DB_SLOW_QUERY_LOG=(vacío): archivo del log; si está vacío las consultas lentas se imprimen
+- DB_EXPLAIN_PATTERN=(vacío): regex sobre el texto normalizado de los SELECT a explicar
+
+Los cursores raw de psycopg2 (COPY, TRUNCATE, SAVEPOINT...) no pasan por los eventos
+de SQLAlchemy: se registran envolviendo el cursor (ver QueryLog.wrap_connection,
+que usa DBConnector.get_raw_connection, y raw_cursor para el cursor psycopg2 de
+una conexión SQLAlchemy). Las cargas asíncronas con asyncpg (async_load.py) usan
+otro driver y no aparecen en el registro.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Engine, event
+
+
+# Etapa y tabla del pipeline en curso: (stage, table)
+_query_context: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    'etl_query_context', default=(None, None)
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_VALUES_TUPLE = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)")
+_TUPLE_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_STATEMENT_LENGTH = 2000
+
+# QueryLog de cada Engine instrumentado (para raw_cursor)
+_engine_logs: 'weakref.WeakKeyDictionary[Engine, QueryLog]' = weakref.WeakKeyDictionary()
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Normaliza una sentencia SQL para agrupar las ejecuciones equivalentes.
+    
+    Reemplaza literales, números y parámetros por '?', colapsa las tuplas de
+    VALUES / IN y los espacios en blanco.
+    
+    Args:
+        statement: Sentencia SQL tal como se envió al driver
+    
+    Returns:
+        Texto normalizado (truncado a MAX_STATEMENT_LENGTH caracteres)
+    
+    Example:
+        >>> normalize_statement("INSERT INTO t (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)")
+        'INSERT INTO t (a, b) VALUES (...), ...'
+    """
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _PARAMETER.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _VALUES_TUPLE.sub('(...)', normalized)
+    normalized = _TUPLE_LIST.sub('(...), ...', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    return normalized[:MAX_STATEMENT_LENGTH]
+
+
+@contextmanager
+def query_context(stage: Optional[str] = None, table: Optional[str] = None):
+    """
+    Context manager (o decorador) que etiqueta las sentencias ejecutadas dentro
+    con la etapa y la tabla del pipeline. Los valores omitidos se heredan del
+    contexto exterior.
+    
+    Args:
+        stage: Etapa del pipeline (ej: 'staging', 'transform', 'production')
+        table: Tabla que se está procesando
+    
+    Example:
+        ```python
+        @query_context(stage='production')
+        def run_production_load(): ...
+        
+        with query_context(table='usuarios'):
+            load_to_production(...)
+        ```
+    """
+    outer_stage, outer_table = _query_context.get()
+    token = _query_context.set((stage or outer_stage, table or outer_table))
+    try:
+        yield
+    finally:
+        _query_context.reset(token)
+
+
+def set_query_table(table: Optional[str]) -> None:
+    """
+    Cambia la tabla del contexto actual sin abrir un bloque nuevo (útil dentro
+    de bucles ya envueltos en query_context: se restaura al salir de ese bloque).
+    
+    Args:
+        table: Tabla que se está procesando
+    """
+    stage, _ = _query_context.get()
+    _query_context.set((stage, table))
+
+
+class QueryLog:
+    """
+    Registro de sentencias SQL de un Engine.
+    
+    Se conecta a los eventos before/after_cursor_execute y acumula estadísticas
+    por (etapa, sentencia normalizada). Es seguro entre hilos.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        slow_query_ms: float = 1000.0,
+        slow_log_path: Optional[str] = None,
+        explain_pattern: Optional[str] = None
+    ):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.slow_log_path = slow_log_path
+        self.explain_pattern = re.compile(explain_pattern) if explain_pattern else None
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[Optional[str], str], Dict] = {}
+        self._explained: set = set()
+        self._started_at = datetime.now()
+    
+    @classmethod
+    def from_env(cls) -> 'QueryLog':
+        """Crea el registro con la configuración de las variables DB_QUERY_LOG, DB_SLOW_QUERY_*."""
+        return cls(
+            enabled=os.getenv('DB_QUERY_LOG', 'true').lower() in ('1', 'true', 'yes'),
+            slow_query_ms=float(os.getenv('DB_SLOW_QUERY_MS', '1000')),
+            slow_log_path=os.getenv('DB_SLOW_QUERY_LOG') or None,
+            explain_pattern=os.getenv('DB_EXPLAIN_PATTERN') or None
+        )
+    
+    def configure(
+        self,
+        slow_query_ms: Optional[float] = None,
+        slow_log_path: Optional[str] = None,
+        explain_pattern: Optional[str] = None
+    ) -> None:
+        """
+        Ajusta el umbral, el archivo del log de lentas o el patrón de EXPLAIN.
+        Los argumentos None conservan el valor actual.
+        """
+        if slow_query_ms is not None:
+            self.slow_query_ms = slow_query_ms
+        if slow_log_path is not None:
+            self.slow_log_path = slow_log_path
+        if explain_pattern is not None:
+            self.explain_pattern = re.compile(explain_pattern) if explain_pattern else None
+    
+    def reset(self) -> None:
+        """Descarta las estadísticas acumuladas (inicio de una nueva ejecución)."""
+        with self._lock:
+            self._stats = {}
+            self._explained = set()
+            self._started_at = datetime.now()
+    
+    def attach(self, engine: Engine) -> None:
+        """
+        Registra los listeners de ejecución en el Engine.
+        
+        Args:
+            engine: Engine de SQLAlchemy a instrumentar
+        """
+        start_key = '_etl_query_start'
+        _engine_logs[engine] = self
+        
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if self.enabled:
+                conn.info.setdefault(start_key, []).append(time.perf_counter())
+        
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get(start_key)
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            if not self.enabled:
+                return
+            self.record(statement, elapsed, cursor.rowcount, cursor=cursor, parameters=parameters)
+        
+        @event.listens_for(engine, 'handle_error')
+        def _handle_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get(start_key):
+                conn.info[start_key].pop()
+    
+    def wrap_connection(self, connection):
+        """
+        Envuelve una conexión psycopg2 para que las sentencias de sus cursores
+        (incluidos los COPY) se registren igual que las de SQLAlchemy.
+        
+        Args:
+            connection: Conexión DBAPI (ej: la de Engine.raw_connection())
+        
+        Returns:
+            Conexión con la misma interfaz cuyos cursores quedan registrados
+        """
+        return _LoggedConnection(connection, self)
+    
+    def record(
+        self,
+        statement: str,
+        elapsed: float,
+        rowcount: int = -1,
+        cursor=None,
+        parameters=None
+    ) -> None:
+        """
+        Registra una ejecución. Lo llaman los listeners, pero también puede usarse
+        para sentencias ejecutadas fuera de SQLAlchemy (ej: COPY con psycopg2).
+        
+        Args:
+            statement: Sentencia SQL ejecutada
+            elapsed: Duración en segundos
+            rowcount: Filas afectadas o retornadas (-1 si el driver no lo informa)
+            cursor: Cursor DBAPI (necesario para capturar EXPLAIN)
+            parameters: Parámetros de la sentencia (necesarios para capturar EXPLAIN)
+        """
+        stage, table = _query_context.get()
+        normalized = normalize_statement(statement)
+        rows = rowcount if rowcount is not None and rowcount >= 0 else 0
+        
+        with self._lock:
+            stats = self._stats.get((stage, normalized))
+            if stats is None:
+                stats = self._stats[(stage, normalized)] = {
+                    'stage': stage,
+                    'statement': normalized,
+                    'tables': set(),
+                    'calls': 0,
+                    'total_s': 0.0,
+                    'max_s': 0.0,
+                    'rows': 0,
+                    'plan': None,
+                }
+            stats['calls'] += 1
+            stats['total_s'] += elapsed
+            stats['max_s'] = max(stats['max_s'], elapsed)
+            stats['rows'] += rows
+            if table:
+                stats['tables'].add(table)
+            explain = (
+                cursor is not None
+                and self.explain_pattern is not None
+                and normalized not in self._explained
+                and normalized.upper().startswith('SELECT')
+                and self.explain_pattern.search(normalized) is not None
+            )
+            if explain:
+                self._explained.add(normalized)
+        
+        plan = None
+        if explain:
+            plan = self._capture_explain(cursor, statement, parameters)
+            with self._lock:
+                stats['plan'] = plan
+        
+        if elapsed * 1000 >= self.slow_query_ms:
+            self._log_slow_query(normalized, elapsed, rows, stage, table, plan)
+    
+    def _capture_explain(self, cursor, statement: str, parameters) -> Optional[str]:
+        """
+        Ejecuta EXPLAIN (ANALYZE, BUFFERS) de un SELECT en la misma conexión.
+        
+        El SELECT se vuelve a ejecutar, por eso solo se hace una vez por sentencia
+        normalizada y solo para las que coinciden con el patrón configurado.
+        """
+        try:
+            explain_cursor = cursor.connection.cursor()
+            try:
+                explain_cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or None)
+                return '\n'.join(row[0] for row in explain_cursor.fetchall())
+            finally:
+                explain_cursor.close()
+        except Exception as e:
+            print(f"   ⚠ No se pudo capturar EXPLAIN: {str(e)}")
+            return None
+    
+    def _log_slow_query(
+        self,
+        normalized: str,
+        elapsed: float,
+        rows: int,
+        stage: Optional[str],
+        table: Optional[str],
+        plan: Optional[str]
+    ) -> None:
+        """Escribe una consulta lenta en el log (JSON Lines) o la imprime si no hay archivo."""
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'duration_ms': round(elapsed * 1000, 1),
+            'rows': rows,
+            'stage': stage,
+            'table': table,
+            'statement': normalized,
+        }
+        if plan:
+            entry['plan'] = plan
+        
+        if not self.slow_log_path:
+            print(f"   ⚠ Consulta lenta ({entry['duration_ms']:.0f} ms, "
+                  f"{stage or '-'}/{table or '-'}): {normalized[:120]}")
+            return
+        
+        try:
+            directory = os.path.dirname(self.slow_log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"   ⚠ No se pudo escribir el log de consultas lentas: {str(e)}")
+    
+    def get_stats(self, top_n: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna las estadísticas por sentencia ordenadas por tiempo total.
+        
+        Args:
+            top_n: Cantidad máxima de sentencias a retornar (None = todas)
+        
+        Returns:
+            Lista de diccionarios con stage, statement, tables, calls, total_s,
+            mean_ms, max_ms, rows y plan (si se capturó)
+        """
+        with self._lock:
+            entries = [dict(stats, tables=sorted(stats['tables'])) for stats in self._stats.values()]
+        entries.sort(key=lambda stats: stats['total_s'], reverse=True)
+        for stats in entries:
+            stats['mean_ms'] = stats['total_s'] * 1000 / stats['calls']
+            stats['max_ms'] = stats.pop('max_s') * 1000
+        return entries[:top_n] if top_n else entries
+    
+    def get_summary(self, top_n: int = 10) -> Dict:
+        """
+        Retorna el resumen de la ejecución: totales por etapa y las sentencias top.
+        
+        Args:
+            top_n: Cantidad de sentencias a incluir
+        
+        Returns:
+            Diccionario con started_at, statements, calls, total_s, by_stage y top
+        """
+        entries = self.get_stats()
+        by_stage: Dict[str, Dict] = {}
+        for stats in entries:
+            stage = by_stage.setdefault(stats['stage'] or '-', {'calls': 0, 'total_s': 0.0})
+            stage['calls'] += stats['calls']
+            stage['total_s'] += stats['total_s']
+        return {
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'statements': len(entries),
+            'calls': sum(stats['calls'] for stats in entries),
+            'total_s': sum(stats['total_s'] for stats in entries),
+            'by_stage': by_stage,
+            'top': entries[:top_n],
+        }
+    
+    def print_summary(self, top_n: int = 10) -> None:
+        """
+        Imprime las sentencias que más tiempo acumularon en la ejecución.
+        
+        Args:
+            top_n: Cantidad de sentencias a mostrar
+        """
+        summary = self.get_summary(top_n)
+        print("\n" + "="*80)
+        print(f"RESUMEN SQL: {summary['calls']} ejecuciones, "
+              f"{summary['statements']} sentencias distintas, {summary['total_s']:.2f} s")
+        print("   (incluye los COPY de psycopg2; no incluye las cargas asíncronas con asyncpg)")
+        print("="*80)
+        for stage, totals in summary['by_stage'].items():
+            print(f"   {stage:<12} {totals['calls']:>8} ejecuciones  {totals['total_s']:>9.2f} s")
+        if summary['top']:
+            print(f"\n   Top {len(summary['top'])} por tiempo total:")
+        for i, stats in enumerate(summary['top'], 1):
+            tables = ', '.join(stats['tables']) or '-'
+            print(f"   {i:>2}. {stats['total_s']:>8.2f} s  {stats['calls']:>6}x  "
+                  f"media {stats['mean_ms']:.1f} ms  máx {stats['max_ms']:.1f} ms  "
+                  f"filas {stats['rows']}  [{stats['stage'] or '-'}: {tables}]")
+            print(f"       {stats['statement'][:150]}")
+        print()
+    
+    def write_summary(self, path: str, top_n: int = 10) -> str:
+        """
+        Guarda el resumen de la ejecución en un archivo JSON.
+        
+        Args:
+            path: Ruta del archivo
+            top_n: Cantidad de sentencias a incluir
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_summary(top_n), f, ensure_ascii=False, indent=2)
+        return path
+
+
+class _LoggedCursor:
+    """
+    Cursor psycopg2 que registra execute, executemany y los COPY en un QueryLog.
+    El resto de atributos (fetchall, rowcount, close...) se delega en el cursor original.
+    """
+    
+    def __init__(self, cursor, query_log: QueryLog):
+        self._cursor = cursor
+        self._query_log = query_log
+    
+    def _run(self, statement, call, parameters=None, explain: bool = False):
+        if not self._query_log.enabled:
+            return call()
+        start = time.perf_counter()
+        result = call()
+        self._query_log.record(
+            str(statement), time.perf_counter() - start, self._cursor.rowcount,
+            cursor=self._cursor if explain else None, parameters=parameters
+        )
+        return result
+    
+    def execute(self, statement, parameters=None):
+        return self._run(
+            statement, lambda: self._cursor.execute(statement, parameters),
+            parameters=parameters, explain=True
+        )
+    
+    def executemany(self, statement, parameters):
+        return self._run(statement, lambda: self._cursor.executemany(statement, parameters))
+    
+    def copy_expert(self, sql, file, *args, **kwargs):
+        return self._run(sql, lambda: self._cursor.copy_expert(sql, file, *args, **kwargs))
+    
+    def copy_from(self, file, table, *args, **kwargs):
+        return self._run(f"COPY {table} FROM STDIN",
+                         lambda: self._cursor.copy_from(file, table, *args, **kwargs))
+    
+    def copy_to(self, file, table, *args, **kwargs):
+        return self._run(f"COPY {table} TO STDOUT",
+                         lambda: self._cursor.copy_to(file, table, *args, **kwargs))
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+
+class _LoggedConnection:
+    """Conexión psycopg2 cuyos cursores se registran en un QueryLog (ver _LoggedCursor)."""
+    
+    def __init__(self, connection, query_log: QueryLog):
+        self._connection = connection
+        self._query_log = query_log
+    
+    def cursor(self, *args, **kwargs):
+        return _LoggedCursor(self._connection.cursor(*args, **kwargs), self._query_log)
+    
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def raw_cursor(conn):
+    """
+    Cursor psycopg2 de una conexión SQLAlchemy (en su misma transacción) cuyas
+    sentencias se registran en el QueryLog del Engine, si está instrumentado.
+    
+    Args:
+        conn: Conexión SQLAlchemy (ej: la de engine.begin())
+    
+    Returns:
+        Cursor psycopg2, envuelto si el Engine tiene un QueryLog
+    """
+    cursor = conn.connection.cursor()
+    engine = getattr(conn, 'engine', None)
+    query_log = _engine_logs.get(engine) if engine is not None else None
+    return _LoggedCursor(cursor, query_log) if query_log is not None else cursor
@@ -1,6 +1,9 @@
 {{
     config(
-        materialized='view',
+        materialized=var('analytics_materialized', 'view'),
+        indexes=[
+            {'columns': ['usuario_id'], 'unique': True}
+        ],
         description='Vista analítica: Clientes activos con métricas de comportamiento'
     )
 }}
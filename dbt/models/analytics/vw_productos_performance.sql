@@ -1,6 +1,9 @@
 {{
     config(
-        materialized='view',
+        materialized=var('analytics_materialized', 'view'),
+        indexes=[
+            {'columns': ['producto_id'], 'unique': True}
+        ],
         description='Vista analítica: Performance de productos con métricas de ventas y reseñas'
     )
 }}
@@ -1,6 +1,9 @@
 {{
     config(
-        materialized='view',
+        materialized=var('analytics_materialized', 'view'),
+        indexes=[
+            {'columns': ['fecha_id', 'producto_id', 'usuario_id'], 'unique': True}
+        ],
         description='Vista analítica: Resumen de ventas optimizado para análisis rápidos'
     )
 }}
@@ -1,12 +1,17 @@
 {{
     config(
-        materialized='view',
+        materialized=var('analytics_materialized', 'view'),
+        indexes=[
+            {'columns': ['fecha_id'], 'unique': True}
+        ],
         description='Vista analítica: Análisis temporal de ventas optimizado'
     )
 }}
 
 -- Vista analítica: Análisis Temporal de Ventas
 -- Optimizada para análisis de tendencias temporales
+-- Lee los agregados diarios ya materializados en int_ventas_diarias (incremental),
+-- así que solo aplica las window functions sobre una fila por día
 SELECT
     df.fecha_id,
     df.anio,
@@ -22,42 +27,37 @@ SELECT
     df.mes_completo,
     df.trimestre_completo,
     
-    -- Métricas agregadas por día
-    COUNT(DISTINCT fv.orden_id) as total_ordenes,
-    COUNT(DISTINCT fv.usuario_id) as total_clientes_unicos,
-    COUNT(DISTINCT fv.producto_id) as total_productos_vendidos,
-    SUM(fv.cantidad) as total_unidades,
-    SUM(fv.subtotal) as total_ventas,
-    AVG(fv.subtotal) as ticket_promedio,
+    -- Métricas agregadas por día (precalculadas en int_ventas_diarias)
+    vd.total_ordenes,
+    vd.total_usuarios as total_clientes_unicos,
+    vd.total_productos_vendidos,
+    vd.total_items_vendidos as total_unidades,
+    vd.total_ventas,
+    vd.promedio_venta_por_item as ticket_promedio,
     
     -- Comparaciones
-    LAG(SUM(fv.subtotal)) OVER (ORDER BY df.fecha_id) as ventas_dia_anterior,
-    LAG(SUM(fv.subtotal)) OVER (PARTITION BY df.dia_semana ORDER BY df.fecha_id) as ventas_mismo_dia_semana_anterior,
+    LAG(vd.total_ventas) OVER (ORDER BY df.fecha_id) as ventas_dia_anterior,
+    LAG(vd.total_ventas) OVER (PARTITION BY df.dia_semana ORDER BY df.fecha_id) as ventas_mismo_dia_semana_anterior,
     
     -- Cálculos de crecimiento
     CASE 
-        WHEN LAG(SUM(fv.subtotal)) OVER (ORDER BY df.fecha_id) > 0
-        THEN ((SUM(fv.subtotal) - LAG(SUM(fv.subtotal)) OVER (ORDER BY df.fecha_id)) 
-              / LAG(SUM(fv.subtotal)) OVER (ORDER BY df.fecha_id)) * 100
+        WHEN LAG(vd.total_ventas) OVER (ORDER BY df.fecha_id) > 0
+        THEN ((vd.total_ventas - LAG(vd.total_ventas) OVER (ORDER BY df.fecha_id)) 
+              / LAG(vd.total_ventas) OVER (ORDER BY df.fecha_id)) * 100
         ELSE NULL
     END as crecimiento_dia_anterior_pct,
     
     -- Promedios móviles
-    AVG(SUM(fv.subtotal)) OVER (
+    AVG(vd.total_ventas) OVER (
         ORDER BY df.fecha_id 
         ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
     ) as promedio_movil_7_dias,
     
-    AVG(SUM(fv.subtotal)) OVER (
+    AVG(vd.total_ventas) OVER (
         ORDER BY df.fecha_id 
         ROWS BETWEEN 29 PRECEDING AND CURRENT ROW
     ) as promedio_movil_30_dias
     
-FROM {{ ref('fct_ventas') }} fv
+FROM {{ ref('int_ventas_diarias') }} vd
 INNER JOIN {{ ref('dim_fecha') }} df
-    ON fv.fecha_venta_id = df.fecha_id
-GROUP BY
-    df.fecha_id, df.anio, df.trimestre, df.mes, df.semana, df.dia,
-    df.dia_semana, df.nombre_dia_semana, df.nombre_mes, df.es_fin_semana,
-    df.estacion, df.mes_completo, df.trimestre_completo
-
+    ON vd.fecha_id = df.fecha_id
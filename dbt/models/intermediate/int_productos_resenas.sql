@@ -21,6 +21,7 @@ productos_resenas as (
         p.stock,
         p.categoria_id,
         p.estado_stock,
+        p.hash_fila,
         -- Métricas de reseñas
         count(r.resena_id) as total_resenas,
         avg(r.calificacion) as calificacion_promedio,
@@ -38,7 +39,8 @@ productos_resenas as (
         p.precio,
         p.stock,
         p.categoria_id,
-        p.estado_stock
+        p.estado_stock,
+        p.hash_fila
 )
 
 select * from productos_resenas
@@ -20,6 +20,7 @@ usuarios_ordenes as (
         u.apellido,
         u.email,
         u.fecha_registro,
+        u.hash_fila,
         -- Métricas de órdenes
         count(o.orden_id) as total_ordenes,
         sum(o.total) as total_gastado,
@@ -36,7 +37,8 @@ usuarios_ordenes as (
         u.nombre,
         u.apellido,
         u.email,
-        u.fecha_registro
+        u.fecha_registro,
+        u.hash_fila
 )
 
 select * from usuarios_ordenes
@@ -1,17 +1,36 @@
 {{
     config(
-        materialized='view'
+        materialized='incremental',
+        unique_key='fecha',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['fecha'], 'unique': True},
+            {'columns': ['fecha_id']}
+        ]
     )
 }}
 
 -- Modelo intermedio que agrega ventas por día
+-- Materialización incremental: en cada ejecución solo se recalculan los días
+-- desde el último día agregado menos la ventana de datos tardíos
+-- (var 'incremental_lookback_days'). Cada día se recalcula completo, por lo que
+-- los count(distinct ...) siguen siendo exactos.
 with ordenes_detalle as (
     select * from {{ ref('int_ordenes_detalle') }}
+    {% if is_incremental() %}
+    where fecha_orden >= (
+        select coalesce(max(fecha), '1900-01-01'::timestamp)
+               - interval '{{ var("incremental_lookback_days") }} days'
+        from {{ this }}
+    )
+    {% endif %}
 ),
 
 ventas_diarias as (
     select
         date_trunc('day', fecha_orden) as fecha,
+        date_trunc('day', fecha_orden)::date as fecha_id,
         extract(year from fecha_orden) as anio,
         extract(month from fecha_orden) as mes,
         extract(day from fecha_orden) as dia,
@@ -33,5 +52,3 @@ ventas_diarias as (
 )
 
 select * from ventas_diarias
-order by fecha desc
-
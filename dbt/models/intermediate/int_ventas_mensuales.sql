@@ -1,12 +1,39 @@
 {{
     config(
-        materialized='view'
+        materialized='incremental',
+        unique_key='fecha',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['fecha'], 'unique': True}
+        ]
     )
 }}
 
 -- Modelo intermedio que agrega ventas por mes
+-- Materialización incremental: en cada ejecución solo se recalculan los meses
+-- afectados (desde el mes del último dato cargado menos la ventana de datos
+-- tardíos, var 'incremental_lookback_days').
+{% if is_incremental() %}
+{% set mes_inicio %}
+    (
+        select date_trunc(
+            'month',
+            coalesce(max(fecha), '1900-01-01'::timestamp)
+            - interval '{{ var("incremental_lookback_days") }} days'
+        )
+        from {{ this }}
+    )
+{% endset %}
+{% endif %}
+
 with ordenes_detalle as (
     select * from {{ ref('int_ordenes_detalle') }}
+    {% if is_incremental() %}
+    -- Se incluye también el mes anterior para que el lag() del primer mes
+    -- recalculado tenga su valor de comparación
+    where mes_completo >= {{ mes_inicio }} - interval '1 month'
+    {% endif %}
 ),
 
 ventas_mensuales as (
@@ -45,5 +72,7 @@ select
         else null
     end as porcentaje_cambio_mes_anterior
 from ventas_mensuales
-order by fecha desc
-
+{% if is_incremental() %}
+-- El mes anterior solo se usó como referencia del lag(): no se reescribe
+where fecha >= {{ mes_inicio }}
+{% endif %}
@@ -0,0 +1,93 @@
+{{
+    config(
+        materialized='table',
+        indexes=[
+            {'columns': ['hecho', 'nivel_agrupacion']}
+        ]
+    )
+}}
+
+-- Cubo pre-agregado: tiempo × categoría × método de pago × estado
+-- Se reconstruye después de cada refresco de fct_ventas / fct_pagos (depende de ambos).
+-- Solo contiene medidas ADITIVAS (sumas y conteos de filas), de modo que cualquier
+-- consulta de roll-up se puede responder re-agregando un nivel más detallado
+-- (ver pipeline/analytics/cube.py).
+--
+-- Columnas:
+-- - hecho: 'ventas' (fct_ventas) o 'pagos' (fct_pagos)
+-- - nivel_agrupacion: GROUPING() de las dimensiones; bit = 1 si la dimensión está
+--   agregada (orden de bits: anio, trimestre, mes, categoria, metodo_pago, estado)
+-- - Las ventas no tienen método de pago y los pagos no tienen categoría: en esos
+--   hechos la dimensión siempre es NULL
+with ventas as (
+    select
+        'ventas' as hecho,
+        fv.fecha_venta_id as fecha_id,
+        dc.nombre as categoria,
+        cast(null as varchar) as metodo_pago,
+        fv.estado_orden as estado,
+        fv.subtotal as monto,
+        fv.cantidad as unidades
+    from {{ ref('fct_ventas') }} fv
+    left join {{ ref('dim_categorias') }} dc
+        on fv.categoria_id = dc.categoria_id
+),
+
+pagos as (
+    select
+        'pagos' as hecho,
+        fp.fecha_pago_id as fecha_id,
+        cast(null as varchar) as categoria,
+        dmp.nombre as metodo_pago,
+        fp.estado_pago as estado,
+        fp.monto_pago as monto,
+        0 as unidades
+    from {{ ref('fct_pagos') }} fp
+    left join {{ ref('dim_metodos_pago') }} dmp
+        on fp.metodo_pago_id = dmp.metodo_pago_id
+),
+
+hechos as (
+    select h.*, df.anio, df.trimestre, df.mes
+    from (
+        select * from ventas
+        union all
+        select * from pagos
+    ) h
+    left join {{ ref('dim_fecha') }} df
+        on h.fecha_id = df.fecha_id
+),
+
+cubo as (
+    select
+        hecho,
+        anio,
+        trimestre,
+        mes,
+        categoria,
+        metodo_pago,
+        estado,
+        grouping(anio, trimestre, mes, categoria, metodo_pago, estado) as nivel_agrupacion,
+        -- Medidas aditivas
+        sum(monto) as total_monto,
+        sum(unidades) as total_unidades,
+        count(*) as total_registros
+    from hechos
+    group by
+        hecho,
+        grouping sets (
+            (anio, trimestre, mes, categoria, metodo_pago, estado),
+            (anio, trimestre, mes, categoria),
+            (anio, trimestre, mes, metodo_pago),
+            (anio, trimestre, mes, estado),
+            (anio, trimestre, mes),
+            (anio, trimestre),
+            (anio),
+            (categoria),
+            (metodo_pago),
+            (estado),
+            ()
+        )
+)
+
+select * from cubo
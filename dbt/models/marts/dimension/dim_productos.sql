@@ -28,6 +28,9 @@ final as (
         c.nombre as categoria_nombre,
         c.descripcion as categoria_descripcion,
         
+        -- Hash de fila del ETL (detección de cambios para snap_productos)
+        p.hash_fila,
+        
         -- Métricas de reseñas
         coalesce(p.total_resenas, 0) as total_resenas,
         coalesce(p.calificacion_promedio, 0) as calificacion_promedio,
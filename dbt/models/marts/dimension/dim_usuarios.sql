@@ -41,9 +41,21 @@ final as (
         
         -- Campos de fecha para particionamiento
         extract(year from fecha_registro) as anio_registro,
-        extract(month from fecha_registro) as mes_registro
+        extract(month from fecha_registro) as mes_registro,
+        
+        -- Hash de fila del ETL (atributos de usuarios)
+        hash_fila
     from usuarios_ordenes
+),
+
+-- Hash de cambios para snap_usuarios: combina el hash del ETL con las
+-- métricas derivadas que también se historizan
+final_con_hash as (
+    select
+        *,
+        md5(concat_ws('|', hash_fila, segmento_cliente, total_ordenes, total_gastado)) as hash_scd
+    from final
 )
 
-select * from final
+select * from final_con_hash
 
@@ -1,11 +1,21 @@
 {{
     config(
-        materialized='table'
+        materialized='incremental',
+        unique_key='pago_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['pago_id']}
+        ]
     )
 }}
 
 -- Tabla de hechos: Pagos
 -- Modelo dimensional siguiendo el esquema estrella de Kimball
+-- Materialización incremental: cada ejecución solo procesa los pagos posteriores
+-- al último fecha_pago_id cargado, menos una ventana de datos tardíos
+-- (var 'incremental_lookback_days'). La tabla no se recrea, por lo que los índices
+-- de dbt/sql/03_create_indexes.sql se conservan entre ejecuciones.
 with ordenes_pagos as (
     select * from {{ ref('int_ordenes_pagos') }}
 ),
@@ -36,6 +46,14 @@ final as (
         date_trunc('month', fecha_pago) as mes_completo_pago
     from ordenes_pagos
     where pago_id is not null
+    {% if is_incremental() %}
+      -- Watermark: última fecha cargada menos la ventana de datos tardíos
+      and fecha_pago >= (
+          select coalesce(max(fecha_pago_id), '1900-01-01'::date)
+                 - interval '{{ var("incremental_lookback_days") }} days'
+          from {{ this }}
+      )
+    {% endif %}
 )
 
 select * from final
@@ -1,11 +1,21 @@
 {{
     config(
-        materialized='table'
+        materialized='incremental',
+        unique_key='venta_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['venta_id'], 'unique': True}
+        ]
     )
 }}
 
 -- Tabla de hechos: Ventas
 -- Modelo dimensional siguiendo el esquema estrella de Kimball
+-- Materialización incremental: cada ejecución solo procesa las órdenes posteriores
+-- al último fecha_venta_id cargado, menos una ventana de datos tardíos
+-- (var 'incremental_lookback_days'). La tabla no se recrea, por lo que los índices
+-- de dbt/sql/03_create_indexes.sql se conservan entre ejecuciones.
 with ordenes_detalle as (
     select * from {{ ref('int_ordenes_detalle') }}
 ),
@@ -35,6 +45,14 @@ final as (
         mes_orden,
         mes_completo
     from ordenes_detalle
+    {% if is_incremental() %}
+    -- Watermark: última fecha cargada menos la ventana de datos tardíos
+    where fecha_orden >= (
+        select coalesce(max(fecha_venta_id), '1900-01-01'::date)
+               - interval '{{ var("incremental_lookback_days") }} days'
+        from {{ this }}
+    )
+    {% endif %}
 )
 
 select * from final
@@ -28,7 +28,9 @@ renamed as (
             when stock < 0 then 0
             else stock
         end as stock,
-        categoria_id
+        categoria_id,
+        -- Hash de fila calculado en el ETL (detección de cambios SCD Type 2)
+        hash_fila
     from source
 ),
 
@@ -40,6 +42,7 @@ final as (
         precio,
         stock,
         categoria_id,
+        hash_fila,
         -- Campos calculados
         case 
             when stock = 0 then 'Agotado'
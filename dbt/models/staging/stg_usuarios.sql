@@ -22,7 +22,9 @@ renamed as (
         case 
             when fecha_registro is null then current_timestamp
             else fecha_registro
-        end as fecha_registro
+        end as fecha_registro,
+        -- Hash de fila calculado en el ETL (detección de cambios SCD Type 2)
+        hash_fila
     from source
 ),
 
@@ -34,6 +36,7 @@ final as (
         dni,
         email,
         fecha_registro,
+        hash_fila,
         -- Validaciones mejoradas
         case 
             when email ~* '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$' then true
@@ -5,13 +5,16 @@
       target_schema='snapshots',
       unique_key='producto_id',
       strategy='check',
-      check_cols=['precio', 'stock', 'estado_stock', 'categoria_id'],
+      check_cols=['hash_fila'],
       invalidate_hard_deletes=True,
+      post_hook="create index if not exists snap_productos_actual_idx on {{ this }} (producto_id, hash_fila) where dbt_valid_to is null",
     )
 }}
 
 -- Snapshot SCD Type 2 para productos
--- Rastrea cambios en precio, stock, estado_stock y categoria_id
+-- Detecta cambios comparando una sola columna: hash_fila, calculado en el ETL
+-- sobre nombre, descripcion, precio, stock y categoria_id (estado_stock deriva de stock).
+-- Las filas cuyo hash no cambió no se reescriben.
 select
     producto_id,
     nombre,
@@ -25,7 +28,8 @@ select
     total_resenas,
     calificacion_promedio,
     categoria_calificacion,
-    porcentaje_resenas_positivas
+    porcentaje_resenas_positivas,
+    hash_fila
 from {{ ref('dim_productos') }}
 
 {% endsnapshot %}
@@ -5,13 +5,16 @@
       target_schema='snapshots',
       unique_key='usuario_id',
       strategy='check',
-      check_cols=['segmento_cliente', 'total_ordenes', 'total_gastado', 'email'],
+      check_cols=['hash_scd'],
       invalidate_hard_deletes=True,
+      post_hook="create index if not exists snap_usuarios_actual_idx on {{ this }} (usuario_id, hash_scd) where dbt_valid_to is null",
     )
 }}
 
 -- Snapshot SCD Type 2 para usuarios
--- Rastrea cambios en segmento_cliente, métricas agregadas y email
+-- Detecta cambios comparando una sola columna: hash_scd (dim_usuarios), que combina
+-- el hash_fila del ETL (nombre, apellido, dni, email) con segmento_cliente,
+-- total_ordenes y total_gastado. Las filas cuyo hash no cambió no se reescriben.
 select
     usuario_id,
     nombre,
@@ -28,7 +31,9 @@ select
     ordenes_pendientes,
     segmento_cliente,
     anio_registro,
-    mes_registro
+    mes_registro,
+    hash_fila,
+    hash_scd
 from {{ ref('dim_usuarios') }}
 
 {% endsnapshot %}
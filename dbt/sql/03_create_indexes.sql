@@ -7,6 +7,9 @@
 -- ============================================================================
 -- ÍNDICES PARA TABLAS DE HECHOS
 -- ============================================================================
+-- fct_ventas y fct_pagos son modelos incrementales: dbt no recrea la tabla en
+-- cada ejecución, por lo que estos índices se mantienen entre ejecuciones.
+-- Solo un 'dbt run --full-refresh' los elimina y hay que volver a crearlos.
 
 -- Índices para fct_ventas
 CREATE INDEX IF NOT EXISTS idx_fct_ventas_usuario_id ON marts.fct_ventas(usuario_id);
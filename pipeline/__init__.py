@@ -4,6 +4,7 @@ Paquete pipeline - Sistema ETL para carga de datos a PostgreSQL.
 Estructura:
 - models: Modelos ORM, enumeraciones y creación de esquema
 - etl: Proceso de carga de datos desde CSV (con staging)
+- analytics: Consultas analíticas sobre los marts (cubo pre-agregado)
 - utils: Utilidades (PathManager, Config, clean_column_name)
 """
 
@@ -0,0 +1,69 @@
+"""
+Módulo de analítica.
+Contiene la API de consulta sobre el cubo pre-agregado de ventas y pagos y las
+consultas analíticas con caché en Parquet usadas por los notebooks de preguntas_negocio
+y la exportación de los marts a Parquet particionado por anio/mes.
+"""
+
+from .cube import (
+    load_cube,
+    query_cube,
+    drill_down,
+    roll_up
+)
+from .queries import (
+    cached_query,
+    clear_cache,
+    productos_mas_vendidos,
+    ticket_promedio,
+    categorias_mas_vendidas,
+    ventas_por_dia_semana,
+    ordenes_por_mes,
+    usuarios_por_mes,
+    distribucion_ordenes_por_usuario,
+    usuarios_sin_compras,
+    usuarios_mayor_gasto,
+    productos_alto_stock_bajas_ventas,
+    productos_fuera_stock,
+    productos_peor_calificados,
+    valor_economico_por_categoria,
+    uso_metodos_pago,
+    estados_pago,
+    recaudacion_mensual
+)
+from .export import (
+    export_mart,
+    export_marts,
+    load_manifest
+)
+
+__all__ = [
+    # Cubo de ventas y pagos
+    'load_cube',
+    'query_cube',
+    'drill_down',
+    'roll_up',
+    # Consultas con caché
+    'cached_query',
+    'clear_cache',
+    'productos_mas_vendidos',
+    'ticket_promedio',
+    'categorias_mas_vendidas',
+    'ventas_por_dia_semana',
+    'ordenes_por_mes',
+    'usuarios_por_mes',
+    'distribucion_ordenes_por_usuario',
+    'usuarios_sin_compras',
+    'usuarios_mayor_gasto',
+    'productos_alto_stock_bajas_ventas',
+    'productos_fuera_stock',
+    'productos_peor_calificados',
+    'valor_economico_por_categoria',
+    'uso_metodos_pago',
+    'estados_pago',
+    'recaudacion_mensual',
+    # Exportación de marts a Parquet
+    'export_mart',
+    'export_marts',
+    'load_manifest'
+]
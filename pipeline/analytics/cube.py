@@ -0,0 +1,251 @@
+"""
+API de consulta sobre el cubo pre-agregado de ventas y pagos (modelo dbt cube_ventas_pagos).
+
+El cubo contiene varios GROUPING SETS sobre tiempo (anio > trimestre > mes),
+categoría, método de pago y estado, con medidas solo aditivas. Las preguntas de
+roll-up / drill-down se responden desde el cubo sin leer fct_ventas ni fct_pagos:
+- Si existe el grouping set exacto de la consulta, se devuelve directamente
+- Si no, se toma el grouping set más pequeño que contiene las dimensiones pedidas
+  y se re-agrega con sumas (válido porque todas las medidas son aditivas)
+
+Ejemplo:
+    cube = load_cube()
+    query_cube(['anio', 'mes'], hecho='ventas', cube=cube)
+    drill_down(['anio'], 'trimestre', hecho='pagos', cube=cube)
+    roll_up(['anio', 'mes', 'categoria'], 'mes', cube=cube)
+"""
+
+import os
+import sys
+import pandas as pd
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+# Nombre del modelo dbt del cubo
+CUBE_MODEL = 'cube_ventas_pagos'
+
+# Dimensiones del cubo en el orden de los bits de nivel_agrupacion (GROUPING)
+CUBE_DIMENSIONS = ['anio', 'trimestre', 'mes', 'categoria', 'metodo_pago', 'estado']
+
+# Medidas aditivas del cubo
+CUBE_MEASURES = ['total_monto', 'total_unidades', 'total_registros']
+
+# Grouping sets materializados (deben coincidir con cube_ventas_pagos.sql)
+CUBE_GROUPING_SETS = [
+    ['anio', 'trimestre', 'mes', 'categoria', 'metodo_pago', 'estado'],
+    ['anio', 'trimestre', 'mes', 'categoria'],
+    ['anio', 'trimestre', 'mes', 'metodo_pago'],
+    ['anio', 'trimestre', 'mes', 'estado'],
+    ['anio', 'trimestre', 'mes'],
+    ['anio', 'trimestre'],
+    ['anio'],
+    ['categoria'],
+    ['metodo_pago'],
+    ['estado'],
+    [],
+]
+
+# Jerarquía temporal para drill-down / roll-up
+TIME_HIERARCHY = ['anio', 'trimestre', 'mes']
+
+
+def grouping_level(dimensions: List[str]) -> int:
+    """
+    Calcula el valor de nivel_agrupacion (GROUPING de PostgreSQL) de un grouping set.
+
+    Args:
+        dimensions: Dimensiones agrupadas en el grouping set
+
+    Returns:
+        Entero con un bit por dimensión (1 = dimensión agregada)
+    """
+    level = 0
+    for dimension in CUBE_DIMENSIONS:
+        level = (level << 1) | (0 if dimension in dimensions else 1)
+    return level
+
+
+def load_cube(engine=None) -> pd.DataFrame:
+    """
+    Lee el cubo completo desde el esquema de marts (es compacto: se lee una vez
+    y se reutiliza en varias consultas).
+
+    Args:
+        engine: SQLAlchemy engine (opcional, por defecto el del DBConnector)
+
+    Returns:
+        DataFrame con el cubo
+
+    Raises:
+        ValueError: Si el cubo aún no fue construido por dbt
+    """
+    if engine is None:
+        engine = DBConnector.get_instance().get_engine()
+
+    query_schema = """
+        SELECT table_schema
+        FROM information_schema.tables
+        WHERE table_name = :table_name AND table_schema LIKE :schema_pattern
+        LIMIT 1
+    """
+    with engine.connect() as conn:
+        schema = conn.execute(text(query_schema), {
+            'table_name': CUBE_MODEL,
+            'schema_pattern': ETLConfig.MARTS_SCHEMA_PATTERN
+        }).scalar()
+
+    if schema is None:
+        raise ValueError(f"El cubo '{CUBE_MODEL}' no existe; ejecutar dbt sobre los marts primero")
+
+    return pd.read_sql(f'SELECT * FROM "{schema}"."{CUBE_MODEL}"', engine)
+
+
+def _validate_dimensions(dimensions: List[str]) -> None:
+    """Verifica que todas las dimensiones existan en el cubo."""
+    unknown = [dimension for dimension in dimensions if dimension not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Dimensiones desconocidas: {unknown}. Disponibles: {CUBE_DIMENSIONS}")
+
+
+def _best_grouping_set(dimensions: List[str]) -> List[str]:
+    """
+    Elige el grouping set más pequeño que contiene todas las dimensiones pedidas.
+
+    Args:
+        dimensions: Dimensiones necesarias (agrupación + filtros)
+
+    Returns:
+        Grouping set elegido
+
+    Raises:
+        ValueError: Si ningún grouping set contiene esas dimensiones
+    """
+    candidates = [gs for gs in CUBE_GROUPING_SETS if set(dimensions) <= set(gs)]
+    if not candidates:
+        raise ValueError(f"El cubo no puede responder la combinación de dimensiones {dimensions}")
+    return min(candidates, key=len)
+
+
+def query_cube(
+    dimensions: List[str],
+    hecho: str = 'ventas',
+    filters: Optional[Dict[str, object]] = None,
+    cube: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Responde una consulta agregada desde el cubo.
+
+    Args:
+        dimensions: Dimensiones por las que agrupar (ej: ['anio', 'categoria'])
+        hecho: 'ventas' o 'pagos'
+        filters: Filtros {dimension: valor o lista de valores} (ej: {'anio': 2024})
+        cube: Cubo ya cargado con load_cube (si es None se lee de la base)
+
+    Returns:
+        DataFrame con las dimensiones pedidas y las medidas aditivas
+    """
+    filters = filters or {}
+    _validate_dimensions(list(dimensions) + list(filters.keys()))
+    if cube is None:
+        cube = load_cube()
+
+    needed = list(dict.fromkeys(list(dimensions) + list(filters.keys())))
+    grouping_set = _best_grouping_set(needed)
+
+    df = cube[(cube['hecho'] == hecho) & (cube['nivel_agrupacion'] == grouping_level(grouping_set))]
+
+    for dimension, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        df = df[df[dimension].isin(values)]
+
+    if not dimensions:
+        return df[CUBE_MEASURES].sum().to_frame().T
+
+    # Re-agregar (suma de medidas aditivas) si el grouping set es más detallado
+    result = (
+        df.groupby(list(dimensions), dropna=False, observed=True)[CUBE_MEASURES]
+        .sum()
+        .reset_index()
+        .sort_values(list(dimensions))
+        .reset_index(drop=True)
+    )
+    return result
+
+
+def drill_down(
+    dimensions: List[str],
+    dimension: Optional[str] = None,
+    hecho: str = 'ventas',
+    filters: Optional[Dict[str, object]] = None,
+    cube: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Baja un nivel de detalle agregando una dimensión a la consulta.
+
+    Args:
+        dimensions: Dimensiones de la consulta actual
+        dimension: Dimensión a agregar. Si es None, se baja un nivel en la jerarquía
+                   temporal (anio → trimestre → mes)
+        hecho: 'ventas' o 'pagos'
+        filters: Filtros de la consulta
+        cube: Cubo ya cargado (opcional)
+
+    Returns:
+        DataFrame con el nivel más detallado
+    """
+    if dimension is None:
+        remaining = [level for level in TIME_HIERARCHY if level not in dimensions]
+        if not remaining:
+            raise ValueError("La consulta ya está en el nivel más detallado de la jerarquía temporal")
+        dimension = remaining[0]
+    return query_cube(list(dimensions) + [dimension], hecho=hecho, filters=filters, cube=cube)
+
+
+def roll_up(
+    dimensions: List[str],
+    dimension: Optional[str] = None,
+    hecho: str = 'ventas',
+    filters: Optional[Dict[str, object]] = None,
+    cube: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Sube un nivel de agregación quitando una dimensión de la consulta.
+
+    Args:
+        dimensions: Dimensiones de la consulta actual
+        dimension: Dimensión a quitar. Si es None, se sube un nivel en la jerarquía
+                   temporal (mes → trimestre → anio)
+        hecho: 'ventas' o 'pagos'
+        filters: Filtros de la consulta
+        cube: Cubo ya cargado (opcional)
+
+    Returns:
+        DataFrame con el nivel más agregado
+    """
+    if dimension is None:
+        present = [level for level in TIME_HIERARCHY if level in dimensions]
+        if not present:
+            raise ValueError("La consulta no tiene niveles de la jerarquía temporal para agregar")
+        dimension = present[-1]
+    return query_cube([d for d in dimensions if d != dimension], hecho=hecho, filters=filters, cube=cube)
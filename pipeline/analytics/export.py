@@ -0,0 +1,544 @@
+"""
+Exportación de los marts de dbt a Parquet particionado por anio/mes.
+
+Cada mart (o un rango de fechas de un mart) se lee con COPY ... TO STDOUT y se
+convierte a Parquet en streaming, sin cargar la tabla completa en memoria:
+- Un hilo ejecuta el COPY y escribe el CSV en un pipe del sistema operativo
+- El hilo principal lee el pipe por bloques con pyarrow.csv y escribe row groups
+  de ETLConfig.EXPORT_ROW_GROUP_SIZE filas
+
+Las tablas de hechos se particionan al estilo Hive por la columna de fecha del
+hecho (<export_dir>/<mart>/anio=YYYY/mes=MM/part-0000.parquet); las dimensiones
+se exportan en un único archivo. Cada mart tiene un _manifest.json con las
+particiones exportadas, lo que permite una exportación incremental: solo se
+vuelven a exportar el último mes exportado (puede haber recibido filas nuevas)
+y los meses posteriores.
+
+Ejemplo:
+    export_mart('fct_ventas')                        # completa
+    export_mart('fct_ventas', incremental=True)      # solo particiones nuevas
+    export_mart('fct_pagos', desde='2024-01-01', hasta='2024-06-30')
+    export_marts(incremental=True)
+"""
+
+import os
+import sys
+import json
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+# Marts exportables: {modelo: columna de fecha para particionar (None = sin particionar)}
+MART_EXPORTS = {
+    'fct_ventas': 'fecha_venta_id',
+    'fct_pagos': 'fecha_pago_id',
+    'fct_resenas': 'fecha_resena_id',
+    'dim_usuarios': None,
+    'dim_productos': None,
+    'dim_categorias': None,
+    'dim_metodos_pago': None,
+    'dim_fecha': None,
+}
+
+# Columnas auxiliares de partición (se calculan en el COPY y no se escriben en el archivo)
+PARTITION_YEAR_COLUMN = '_export_anio'
+PARTITION_MONTH_COLUMN = '_export_mes'
+
+# Nombre de partición Hive para filas sin fecha
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+MANIFEST_FILE = '_manifest.json'
+
+# Tamaño de bloque de lectura del CSV (bytes)
+CSV_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Tipos de PostgreSQL (information_schema.columns.data_type) → tipos de Arrow
+PG_TO_ARROW = {
+    'smallint': pa.int16(),
+    'integer': pa.int32(),
+    'bigint': pa.int64(),
+    'real': pa.float32(),
+    'double precision': pa.float64(),
+    'boolean': pa.bool_(),
+    'date': pa.date32(),
+    'timestamp without time zone': pa.timestamp('us'),
+    'timestamp with time zone': pa.timestamp('us', tz='UTC'),
+    'text': pa.string(),
+    'character varying': pa.string(),
+    'character': pa.string(),
+    'uuid': pa.string(),
+}
+
+
+def _get_export_dir() -> str:
+    """Directorio raíz de las exportaciones."""
+    return ETLConfig.get_export_dir_path(path_manager.get_project_root())
+
+
+def _resolve_mart_schema(engine, table: str) -> str:
+    """
+    Busca el esquema de marts donde dbt generó el modelo.
+
+    Raises:
+        ValueError: Si el modelo aún no fue construido por dbt
+    """
+    query = """
+        SELECT table_schema
+        FROM information_schema.tables
+        WHERE table_name = :table_name AND table_schema LIKE :schema_pattern
+        LIMIT 1
+    """
+    with engine.connect() as conn:
+        schema = conn.execute(text(query), {
+            'table_name': table,
+            'schema_pattern': ETLConfig.MARTS_SCHEMA_PATTERN
+        }).scalar()
+
+    if schema is None:
+        raise ValueError(f"El mart '{table}' no existe; ejecutar dbt sobre los marts primero")
+    return schema
+
+
+def _get_columns(engine, schema: str, table: str) -> List[Tuple[str, str, Optional[int], Optional[int]]]:
+    """
+    Obtiene las columnas del mart en orden con su tipo.
+
+    Returns:
+        Lista de tuplas (columna, data_type, numeric_precision, numeric_scale)
+    """
+    query = """
+        SELECT column_name, data_type, numeric_precision, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = :schema AND table_name = :table_name
+        ORDER BY ordinal_position
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'schema': schema, 'table_name': table})
+        return [(row.column_name, row.data_type, row.numeric_precision, row.numeric_scale) for row in rows]
+
+
+def _arrow_type(data_type: str, precision: Optional[int], scale: Optional[int]) -> pa.DataType:
+    """
+    Traduce un tipo de PostgreSQL a Arrow.
+
+    Los numeric con precisión declarada se exportan como decimal; los numeric sin
+    precisión (resultado de agregaciones en dbt) como float64. Los tipos no
+    reconocidos se exportan como texto.
+    """
+    if data_type == 'numeric':
+        if precision is not None and precision <= 38:
+            return pa.decimal128(precision, scale or 0)
+        return pa.float64()
+    return PG_TO_ARROW.get(data_type, pa.string())
+
+
+def _select_expression(column: str, data_type: str) -> str:
+    """Expresión del SELECT del COPY para una columna (timestamptz se normaliza a UTC)."""
+    if data_type == 'timestamp with time zone':
+        return f"(\"{column}\" AT TIME ZONE 'UTC') AS \"{column}\""
+    return f'"{column}"'
+
+
+# ============================================================================
+# MANIFIESTO
+# ============================================================================
+
+def _manifest_path(table_dir: str) -> str:
+    return os.path.join(table_dir, MANIFEST_FILE)
+
+
+def load_manifest(table: str) -> Dict:
+    """
+    Lee el manifiesto de exportación de un mart.
+
+    Args:
+        table: Nombre del mart
+
+    Returns:
+        Manifiesto ({'tabla', 'columna_fecha', 'particiones', 'ultima_exportacion'})
+        o un manifiesto vacío si el mart nunca se exportó
+    """
+    path = _manifest_path(os.path.join(_get_export_dir(), table))
+    if not os.path.exists(path):
+        return {'tabla': table, 'columna_fecha': MART_EXPORTS.get(table), 'particiones': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(table_dir: str, manifest: Dict) -> None:
+    """Guarda el manifiesto de forma atómica."""
+    path = _manifest_path(table_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _last_exported_month(manifest: Dict) -> Optional[date]:
+    """Primer día del último mes exportado (ignorando la partición sin fecha)."""
+    months = []
+    for partition in manifest.get('particiones', {}):
+        anio, mes = (part.split('=', 1)[1] for part in partition.split('/'))
+        if anio != NULL_PARTITION:
+            months.append(date(int(anio), int(mes), 1))
+    return max(months) if months else None
+
+
+def _widen_to_months(desde: Optional[str], hasta: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Amplía un rango de fechas a meses completos.
+
+    Cada partición anio=/mes= se reescribe entera, por lo que exportar un rango que
+    empieza o termina a mitad de mes reemplazaría el mes con una porción parcial.
+
+    Returns:
+        Tupla (primer día del mes de desde, primer día del mes siguiente a hasta);
+        None en los extremos no indicados
+    """
+    start = date.fromisoformat(desde).replace(day=1) if desde else None
+    end = None
+    if hasta:
+        month_start = date.fromisoformat(hasta).replace(day=1)
+        if month_start.month == 12:
+            end = month_start.replace(year=month_start.year + 1, month=1)
+        else:
+            end = month_start.replace(month=month_start.month + 1)
+    return start, end
+
+
+def _partition_name(key: int) -> str:
+    """Nombre de la partición Hive a partir de la clave anio*100+mes (-1 = sin fecha)."""
+    if key < 0:
+        return f"anio={NULL_PARTITION}/mes={NULL_PARTITION}"
+    return f"anio={key // 100}/mes={key % 100:02d}"
+
+
+# ============================================================================
+# STREAMING COPY → PARQUET
+# ============================================================================
+
+class _PartitionWriter:
+    """
+    Escribe los lotes de una partición en un archivo Parquet, acumulando filas
+    hasta completar row groups de row_group_size filas.
+    """
+
+    def __init__(self, path: str, schema: pa.Schema, row_group_size: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.row_group_size = row_group_size
+        self.writer = pq.ParquetWriter(self.tmp_path, schema, compression='snappy')
+        self.pending: List[pa.RecordBatch] = []
+        self.pending_rows = 0
+        self.rows = 0
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self.pending.append(batch)
+        self.pending_rows += batch.num_rows
+        if self.pending_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self, final: bool = False) -> None:
+        """Escribe los row groups completos; el resto queda pendiente salvo al cerrar."""
+        if not self.pending_rows:
+            return
+        table = pa.Table.from_batches(self.pending)
+        rows = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_size
+        self.writer.write_table(table.slice(0, rows), row_group_size=self.row_group_size)
+        self.rows += rows
+        remainder = table.slice(rows)
+        self.pending = remainder.combine_chunks().to_batches() if remainder.num_rows else []
+        self.pending_rows = remainder.num_rows
+
+    def close(self) -> int:
+        """Cierra el archivo y lo mueve a su ruta final. Retorna las filas escritas."""
+        self._flush(final=True)
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+        return self.rows
+
+    def abort(self) -> None:
+        self.writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _run_copy(copy_sql: str, write_fd: int, errors: List[BaseException]) -> None:
+    """Ejecuta el COPY ... TO STDOUT escribiendo en el extremo de escritura del pipe."""
+    db = DBConnector.get_instance()
+    try:
+        with os.fdopen(write_fd, 'wb') as pipe_out:
+            with db.get_raw_connection() as conn:
+                cursor = conn.cursor()
+                cursor.copy_expert(copy_sql, pipe_out)
+                cursor.close()
+    except BaseException as e:
+        errors.append(e)
+
+
+def _stream_copy_to_parquet(
+    copy_sql: str,
+    column_types: Dict[str, pa.DataType],
+    table_dir: str,
+    partitioned: bool,
+    row_group_size: int
+) -> Dict[str, int]:
+    """
+    Ejecuta el COPY en un hilo y escribe los archivos Parquet a medida que llegan los datos.
+
+    El COPY viene ordenado por fecha, por lo que las filas de cada partición llegan
+    contiguas: cuando cambia la partición se cierra el archivo anterior.
+
+    Returns:
+        Diccionario {particion: filas} ('' para marts sin particionar)
+    """
+    read_fd, write_fd = os.pipe()
+    errors: List[BaseException] = []
+    copy_thread = threading.Thread(target=_run_copy, args=(copy_sql, write_fd, errors), daemon=True)
+    copy_thread.start()
+
+    output_types = {name: arrow_type for name, arrow_type in column_types.items()
+                    if name not in (PARTITION_YEAR_COLUMN, PARTITION_MONTH_COLUMN)}
+    schema = pa.schema(list(output_types.items()))
+
+    written: Dict[str, int] = {}
+    current_key = None
+    writer: Optional[_PartitionWriter] = None
+
+    def open_writer(key) -> _PartitionWriter:
+        partition = _partition_name(key) if partitioned else ''
+        path = os.path.join(table_dir, partition, 'part-0000.parquet')
+        return _PartitionWriter(path, schema, row_group_size)
+
+    def close_writer(key) -> None:
+        written[_partition_name(key) if partitioned else ''] = writer.close()
+
+    try:
+        with os.fdopen(read_fd, 'rb') as pipe_in:
+            reader = pacsv.open_csv(
+                pipe_in,
+                read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                convert_options=pacsv.ConvertOptions(
+                    column_types=column_types,
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False,
+                    true_values=['t'],
+                    false_values=['f'],
+                ),
+            )
+            for batch in reader:
+                if batch.num_rows == 0:
+                    continue
+
+                if not partitioned:
+                    if writer is None:
+                        writer = open_writer(None)
+                    writer.write(batch)
+                    continue
+
+                # Clave de partición anio*100+mes (-1 para filas sin fecha)
+                keys = pc.fill_null(
+                    pc.add(pc.multiply(batch.column(PARTITION_YEAR_COLUMN), 100),
+                           batch.column(PARTITION_MONTH_COLUMN)),
+                    -1
+                ).to_pylist()
+                data = batch.drop_columns([PARTITION_YEAR_COLUMN, PARTITION_MONTH_COLUMN])
+
+                start = 0
+                for i in range(1, len(keys) + 1):
+                    if i < len(keys) and keys[i] == keys[start]:
+                        continue
+                    key = keys[start]
+                    if key != current_key:
+                        if writer is not None:
+                            close_writer(current_key)
+                        writer = open_writer(key)
+                        current_key = key
+                    writer.write(data.slice(start, i - start))
+                    start = i
+
+        if writer is not None:
+            close_writer(current_key)
+            writer = None
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        copy_thread.join()
+
+    if errors:
+        raise errors[0]
+    return written
+
+
+# ============================================================================
+# API DE EXPORTACIÓN
+# ============================================================================
+
+def export_mart(
+    table: str,
+    incremental: bool = False,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    row_group_size: Optional[int] = None
+) -> Dict:
+    """
+    Exporta un mart a Parquet (particionado por anio/mes si es una tabla de hechos).
+
+    Args:
+        table: Nombre del mart (clave de MART_EXPORTS)
+        incremental: Si True, exporta solo desde el último mes del manifiesto
+                     (ese mes se re-exporta porque puede haber recibido filas nuevas).
+                     Las dimensiones siempre se exportan completas.
+        desde: Fecha mínima 'YYYY-MM-DD' (inclusive) del rango a exportar.
+               Se amplía al primer día de su mes
+        hasta: Fecha máxima 'YYYY-MM-DD' (inclusive) del rango a exportar.
+               Se amplía al último día de su mes
+        row_group_size: Filas por row group. Por defecto ETLConfig.EXPORT_ROW_GROUP_SIZE
+
+    Returns:
+        Resumen con 'tabla', 'particiones' exportadas {particion: filas} y 'filas'
+    """
+    if table not in MART_EXPORTS:
+        raise ValueError(f"Mart desconocido: {table}. Disponibles: {list(MART_EXPORTS)}")
+
+    date_column = MART_EXPORTS[table]
+    partitioned = date_column is not None
+    row_group_size = row_group_size or ETLConfig.EXPORT_ROW_GROUP_SIZE
+
+    if not partitioned and (desde or hasta):
+        raise ValueError(f"El mart '{table}' no tiene columna de fecha; no admite desde/hasta")
+
+    engine = DBConnector.get_instance().get_engine()
+    schema = _resolve_mart_schema(engine, table)
+    columns = _get_columns(engine, schema, table)
+
+    table_dir = os.path.join(_get_export_dir(), table)
+    os.makedirs(table_dir, exist_ok=True)
+    manifest = load_manifest(table)
+
+    print(f"\n📦 Exportando {schema}.{table}...")
+
+    # Rango de fechas
+    filters = []
+    params_desc = []
+    if partitioned and incremental and not desde:
+        last_month = _last_exported_month(manifest)
+        if last_month is not None:
+            desde = last_month.isoformat()
+            params_desc.append(f"incremental desde {desde}")
+    start, end = _widen_to_months(desde, hasta)
+    if start is not None:
+        if start.isoformat() != desde:
+            params_desc.append(f"desde ampliado a {start.isoformat()}")
+        filters.append(f"\"{date_column}\" >= DATE '{start.isoformat()}'")
+    if end is not None:
+        if (end - timedelta(days=1)).isoformat() != hasta:
+            params_desc.append(f"hasta ampliado a {(end - timedelta(days=1)).isoformat()}")
+        filters.append(f"\"{date_column}\" < DATE '{end.isoformat()}'")
+    if params_desc:
+        print(f"   {', '.join(params_desc)}")
+
+    select_list = [_select_expression(name, data_type) for name, data_type, _, _ in columns]
+    column_types = {name: _arrow_type(data_type, precision, scale)
+                    for name, data_type, precision, scale in columns}
+    order_by = ""
+    if partitioned:
+        select_list.append(f"extract(year from \"{date_column}\")::int AS {PARTITION_YEAR_COLUMN}")
+        select_list.append(f"extract(month from \"{date_column}\")::int AS {PARTITION_MONTH_COLUMN}")
+        column_types[PARTITION_YEAR_COLUMN] = pa.int32()
+        column_types[PARTITION_MONTH_COLUMN] = pa.int32()
+        order_by = f"ORDER BY \"{date_column}\" NULLS LAST"
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    copy_sql = (
+        f"COPY (SELECT {', '.join(select_list)} FROM \"{schema}\".\"{table}\" {where} {order_by}) "
+        f"TO STDOUT WITH (FORMAT CSV, HEADER true)"
+    )
+
+    written = _stream_copy_to_parquet(copy_sql, column_types, table_dir, partitioned, row_group_size)
+
+    # Actualizar manifiesto (una exportación completa reemplaza todas las particiones)
+    exported_at = datetime.now().isoformat(timespec='seconds')
+    if partitioned:
+        if not (incremental or desde or hasta):
+            for stale in set(manifest['particiones']) - set(written):
+                stale_path = os.path.join(table_dir, stale, 'part-0000.parquet')
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+            manifest['particiones'] = {}
+        for partition, rows in written.items():
+            manifest['particiones'][partition] = {'filas': rows, 'exportado': exported_at}
+    else:
+        manifest['particiones'] = {'': {'filas': written.get('', 0), 'exportado': exported_at}}
+    manifest['tabla'] = table
+    manifest['columna_fecha'] = date_column
+    manifest['ultima_exportacion'] = exported_at
+    _save_manifest(table_dir, manifest)
+
+    total_rows = sum(written.values())
+    if partitioned:
+        print(f"   ✓ {total_rows:,} filas en {len(written)} particiones → {table_dir}")
+    else:
+        print(f"   ✓ {total_rows:,} filas → {table_dir}")
+
+    return {'tabla': table, 'particiones': written, 'filas': total_rows}
+
+
+def export_marts(tables: Optional[List[str]] = None, incremental: bool = True) -> List[Dict]:
+    """
+    Exporta varios marts a Parquet.
+
+    Args:
+        tables: Marts a exportar (por defecto todos los de MART_EXPORTS)
+        incremental: Si True, las tablas de hechos exportan solo particiones nuevas
+
+    Returns:
+        Lista de resúmenes de export_mart
+    """
+    tables = tables or list(MART_EXPORTS)
+
+    print(f"\n{'='*80}")
+    print("EXPORTANDO MARTS A PARQUET")
+    print(f"{'='*80}")
+
+    results = []
+    for table in tables:
+        try:
+            results.append(export_mart(table, incremental=incremental))
+        except Exception as e:
+            print(f"   ✗ Error al exportar {table}: {str(e)}")
+            raise
+
+    total_rows = sum(result['filas'] for result in results)
+    print(f"\n   ✓ {len(results)} marts exportados ({total_rows:,} filas)")
+    return results
@@ -0,0 +1,500 @@
+"""
+Consultas analíticas con nombre y caché de resultados en Parquet.
+
+Los notebooks de preguntas_negocio/ ejecutan las mismas agregaciones pesadas sobre
+las tablas de producción cada vez que se re-ejecutan. Este módulo expone esas
+consultas como funciones con nombre y guarda cada resultado en disco
+(ETLConfig.ANALYTICS_CACHE_DIR) en formato Parquet.
+
+La clave de caché combina:
+- El nombre de la consulta, su SQL y sus parámetros
+- La versión de los datos: los contadores de modificación (pg_stat_user_tables)
+  de las tablas que lee la consulta, incluidas sus particiones
+
+Mientras los datos no cambien, la consulta se sirve desde el archivo Parquet.
+Cuando el pipeline modifica alguna de las tablas, la versión cambia y la consulta
+se vuelve a ejecutar. Los contadores de PostgreSQL se actualizan al terminar cada
+transacción (con un retraso de hasta ~1 segundo).
+
+Uso desde un notebook:
+    from pipeline.analytics.queries import productos_mas_vendidos, recaudacion_mensual
+    df = productos_mas_vendidos(limit=10)
+"""
+
+import os
+import sys
+import json
+import hashlib
+import glob
+import pandas as pd
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+# ============================================================================
+# VERSIÓN DE LOS DATOS Y CACHÉ
+# ============================================================================
+
+def get_data_version(engine, tables: List[str]) -> str:
+    """
+    Calcula la versión de los datos de un conjunto de tablas.
+
+    Se basa en el OID de cada tabla (cambia si la tabla se recrea) y en sus
+    contadores acumulados de filas insertadas, actualizadas y eliminadas. En las
+    tablas particionadas (ordenes, historial_pagos) las filas se escriben en las
+    particiones y los contadores del padre no cambian: se suman los de toda la
+    jerarquía (pg_partition_tree, que en una tabla normal devuelve solo la tabla).
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tablas que lee la consulta
+
+    Returns:
+        Cadena que identifica el estado actual de esas tablas
+    """
+    query = """
+        SELECT t.relname,
+               t.relid::oid AS relid,
+               count(*) AS n_partitions,
+               coalesce(sum(s.n_tup_ins), 0) AS n_tup_ins,
+               coalesce(sum(s.n_tup_upd), 0) AS n_tup_upd,
+               coalesce(sum(s.n_tup_del), 0) AS n_tup_del
+        FROM (
+            SELECT name AS relname, to_regclass('public.' || name) AS relid
+            FROM unnest(CAST(:tables AS text[])) AS name
+        ) AS t
+        CROSS JOIN LATERAL pg_partition_tree(t.relid) AS p
+        LEFT JOIN pg_stat_user_tables AS s ON s.relid = p.relid
+        WHERE t.relid IS NOT NULL
+        GROUP BY t.relname, t.relid
+        ORDER BY t.relname
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'tables': list(tables)}).fetchall()
+    return ';'.join(
+        f"{row.relname}:{row.relid}:{row.n_partitions}:{row.n_tup_ins}:{row.n_tup_upd}:{row.n_tup_del}"
+        for row in rows
+    )
+
+
+def _hash(payload: Dict) -> str:
+    """Hash corto y estable de un diccionario serializable."""
+    data = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+def _get_cache_dir() -> str:
+    """Directorio de la caché de consultas analíticas."""
+    return ETLConfig.get_analytics_cache_dir_path(path_manager.get_project_root())
+
+
+def cached_query(
+    name: str,
+    sql: str,
+    tables: List[str],
+    params: Optional[Dict] = None,
+    refresh: bool = False,
+    engine=None
+) -> pd.DataFrame:
+    """
+    Ejecuta una consulta o devuelve su resultado desde la caché Parquet.
+
+    Args:
+        name: Nombre de la consulta (prefijo del archivo de caché)
+        sql: Consulta SQL (con parámetros :nombre de SQLAlchemy)
+        tables: Tablas que lee la consulta (determinan la versión de los datos)
+        params: Parámetros de la consulta
+        refresh: Si True, ignora la caché y vuelve a ejecutar la consulta
+        engine: SQLAlchemy engine (opcional, por defecto el del DBConnector)
+
+    Returns:
+        DataFrame con el resultado
+    """
+    params = params or {}
+    if engine is None:
+        engine = DBConnector.get_instance().get_engine()
+
+    if not ETLConfig.ANALYTICS_CACHE_ENABLED:
+        return pd.read_sql(text(sql), engine, params=params)
+
+    cache_dir = _get_cache_dir()
+    # Archivo: <nombre>_<hash de consulta+parámetros>_<hash de versión de datos>.parquet
+    query_key = _hash({'sql': ' '.join(sql.split()), 'params': params})
+    version_key = _hash({'data_version': get_data_version(engine, tables)})
+    cache_path = os.path.join(cache_dir, f"{name}_{query_key}_{version_key}.parquet")
+
+    if not refresh and os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = pd.read_sql(text(sql), engine, params=params)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Eliminar versiones anteriores de la misma consulta con los mismos parámetros
+        for old_path in glob.glob(os.path.join(cache_dir, f"{name}_{query_key}_*.parquet")):
+            if old_path != cache_path:
+                os.remove(old_path)
+        df.to_parquet(cache_path, index=False)
+    except ImportError as e:
+        print(f"   ⚠ No se pudo guardar '{name}' en caché (falta motor Parquet: {str(e)})")
+
+    return df
+
+
+def clear_cache(name: Optional[str] = None) -> int:
+    """
+    Elimina archivos de la caché de consultas analíticas.
+
+    Args:
+        name: Nombre de la consulta a invalidar (None = toda la caché)
+
+    Returns:
+        Número de archivos eliminados
+    """
+    pattern = f"{name}_*.parquet" if name else "*.parquet"
+    paths = glob.glob(os.path.join(_get_cache_dir(), pattern))
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+# ============================================================================
+# CONSULTAS: VENTAS (preguntas_ventas.ipynb)
+# ============================================================================
+
+def productos_mas_vendidos(limit: int = 10, refresh: bool = False) -> pd.DataFrame:
+    """Productos más vendidos por volumen, con su recaudación."""
+    sql = """
+        SELECT
+            p.producto_id,
+            p.nombre AS producto_nombre,
+            p.precio,
+            c.nombre AS categoria_nombre,
+            SUM(det.cantidad) AS total_vendido,
+            SUM(det.cantidad * det.precio_unitario) AS total_recaudado
+        FROM detalle_ordenes det
+        INNER JOIN productos p ON det.producto_id = p.producto_id
+        LEFT JOIN categorias c ON p.categoria_id = c.categoria_id
+        GROUP BY p.producto_id, p.nombre, p.precio, c.nombre
+        ORDER BY total_vendido DESC
+        LIMIT :limit
+    """
+    return cached_query('productos_mas_vendidos', sql, ['detalle_ordenes', 'productos', 'categorias'],
+                        {'limit': limit}, refresh)
+
+
+def ticket_promedio(refresh: bool = False) -> pd.DataFrame:
+    """Estadísticas del ticket (total por orden): promedio, cuartiles y desviación."""
+    sql = """
+        SELECT
+            COUNT(*) AS total_ordenes,
+            AVG(total) AS ticket_promedio,
+            MIN(total) AS ticket_minimo,
+            MAX(total) AS ticket_maximo,
+            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY total) AS ticket_mediana,
+            PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY total) AS ticket_q1,
+            PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY total) AS ticket_q3,
+            STDDEV(total) AS desviacion_estandar
+        FROM ordenes
+    """
+    return cached_query('ticket_promedio', sql, ['ordenes'], refresh=refresh)
+
+
+def categorias_mas_vendidas(refresh: bool = False) -> pd.DataFrame:
+    """Unidades vendidas y recaudación por categoría."""
+    sql = """
+        SELECT
+            c.categoria_id,
+            c.nombre AS categoria_nombre,
+            COUNT(DISTINCT p.producto_id) AS productos_unicos_vendidos,
+            SUM(det.cantidad) AS total_unidades_vendidas,
+            SUM(det.cantidad * det.precio_unitario) AS total_recaudado,
+            AVG(det.cantidad * det.precio_unitario) AS ticket_promedio_categoria
+        FROM detalle_ordenes det
+        INNER JOIN productos p ON det.producto_id = p.producto_id
+        INNER JOIN categorias c ON p.categoria_id = c.categoria_id
+        GROUP BY c.categoria_id, c.nombre
+        ORDER BY total_unidades_vendidas DESC
+    """
+    return cached_query('categorias_mas_vendidas', sql, ['detalle_ordenes', 'productos', 'categorias'],
+                        refresh=refresh)
+
+
+def ventas_por_dia_semana(refresh: bool = False) -> pd.DataFrame:
+    """Órdenes y recaudación por día de la semana."""
+    sql = """
+        SELECT
+            TO_CHAR(fecha_orden, 'Day') AS dia_semana_nombre,
+            EXTRACT(DOW FROM fecha_orden) AS dia_semana_numero,
+            COUNT(*) AS total_ordenes,
+            SUM(total) AS total_recaudado,
+            AVG(total) AS ticket_promedio
+        FROM ordenes
+        GROUP BY TO_CHAR(fecha_orden, 'Day'), EXTRACT(DOW FROM fecha_orden)
+        ORDER BY dia_semana_numero
+    """
+    return cached_query('ventas_por_dia_semana', sql, ['ordenes'], refresh=refresh)
+
+
+def ordenes_por_mes(refresh: bool = False) -> pd.DataFrame:
+    """Órdenes, recaudación y ticket por mes."""
+    sql = """
+        SELECT
+            DATE_TRUNC('month', fecha_orden) AS mes,
+            TO_CHAR(fecha_orden, 'YYYY-MM') AS mes_formato,
+            COUNT(*) AS total_ordenes,
+            SUM(total) AS total_recaudado,
+            AVG(total) AS ticket_promedio,
+            MIN(total) AS ticket_minimo,
+            MAX(total) AS ticket_maximo
+        FROM ordenes
+        GROUP BY DATE_TRUNC('month', fecha_orden), TO_CHAR(fecha_orden, 'YYYY-MM')
+        ORDER BY mes
+    """
+    return cached_query('ordenes_por_mes', sql, ['ordenes'], refresh=refresh)
+
+
+# ============================================================================
+# CONSULTAS: USUARIOS (preguntas_usuarios.ipynb)
+# ============================================================================
+
+def usuarios_por_mes(refresh: bool = False) -> pd.DataFrame:
+    """Usuarios registrados por mes."""
+    sql = """
+        SELECT
+            DATE_TRUNC('month', fecha_registro) AS mes,
+            TO_CHAR(DATE_TRUNC('month', fecha_registro), 'YYYY-MM') AS mes_formato,
+            COUNT(*) AS total_usuarios
+        FROM usuarios
+        GROUP BY DATE_TRUNC('month', fecha_registro)
+        ORDER BY mes ASC
+    """
+    return cached_query('usuarios_por_mes', sql, ['usuarios'], refresh=refresh)
+
+
+def distribucion_ordenes_por_usuario(refresh: bool = False) -> pd.DataFrame:
+    """Cantidad de usuarios según su número de órdenes."""
+    sql = """
+        SELECT
+            numero_ordenes,
+            COUNT(*) AS cantidad_usuarios
+        FROM (
+            SELECT usuario_id, COUNT(*) AS numero_ordenes
+            FROM ordenes
+            GROUP BY usuario_id
+        ) AS ordenes_por_usuario
+        GROUP BY numero_ordenes
+        ORDER BY numero_ordenes
+    """
+    return cached_query('distribucion_ordenes_por_usuario', sql, ['ordenes'], refresh=refresh)
+
+
+def usuarios_sin_compras(refresh: bool = False) -> pd.DataFrame:
+    """Usuarios registrados que nunca realizaron una orden."""
+    sql = """
+        SELECT
+            u.usuario_id,
+            u.nombre,
+            u.apellido,
+            u.email,
+            u.fecha_registro
+        FROM usuarios u
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ordenes o WHERE o.usuario_id = u.usuario_id
+        )
+        ORDER BY u.fecha_registro DESC
+    """
+    return cached_query('usuarios_sin_compras', sql, ['usuarios', 'ordenes'], refresh=refresh)
+
+
+def usuarios_mayor_gasto(limit: int = 10, refresh: bool = False) -> pd.DataFrame:
+    """Usuarios con mayor gasto total."""
+    sql = """
+        SELECT
+            u.usuario_id,
+            u.nombre,
+            u.apellido,
+            u.email,
+            COUNT(DISTINCT o.orden_id) AS total_ordenes,
+            SUM(o.total) AS total_gastado,
+            AVG(o.total) AS ticket_promedio,
+            MIN(o.fecha_orden) AS primera_compra,
+            MAX(o.fecha_orden) AS ultima_compra
+        FROM usuarios u
+        INNER JOIN ordenes o ON u.usuario_id = o.usuario_id
+        GROUP BY u.usuario_id, u.nombre, u.apellido, u.email
+        ORDER BY total_gastado DESC
+        LIMIT :limit
+    """
+    return cached_query('usuarios_mayor_gasto', sql, ['usuarios', 'ordenes'], {'limit': limit}, refresh)
+
+
+# ============================================================================
+# CONSULTAS: PRODUCTOS Y STOCK (preguntas_productos_stock.ipynb)
+# ============================================================================
+
+def productos_alto_stock_bajas_ventas(limit: int = 10, refresh: bool = False) -> pd.DataFrame:
+    """Productos con stock disponible alto y pocas ventas."""
+    sql = """
+        SELECT
+            p.producto_id,
+            p.nombre AS producto_nombre,
+            p.stock,
+            p.precio,
+            c.nombre AS categoria_nombre,
+            COALESCE(SUM(detalle.cantidad), 0) AS total_vendido,
+            CASE
+                WHEN COALESCE(SUM(detalle.cantidad), 0) = 0 THEN NULL
+                ELSE ROUND((p.stock::numeric / NULLIF(SUM(detalle.cantidad), 0)), 2)
+            END AS ratio_stock_ventas
+        FROM productos p
+        LEFT JOIN detalle_ordenes detalle ON p.producto_id = detalle.producto_id
+        LEFT JOIN categorias c ON p.categoria_id = c.categoria_id
+        GROUP BY p.producto_id, p.nombre, p.stock, p.precio, c.nombre
+        HAVING p.stock > 0
+        ORDER BY p.stock DESC, total_vendido ASC
+        LIMIT :limit
+    """
+    return cached_query('productos_alto_stock_bajas_ventas', sql,
+                        ['productos', 'detalle_ordenes', 'categorias'], {'limit': limit}, refresh)
+
+
+def productos_fuera_stock(refresh: bool = False) -> pd.DataFrame:
+    """Productos sin stock con su venta histórica."""
+    sql = """
+        SELECT
+            p.producto_id,
+            p.nombre AS producto_nombre,
+            p.precio,
+            c.nombre AS categoria_nombre,
+            COALESCE(SUM(detalle.cantidad), 0) AS total_vendido_historico,
+            COALESCE(SUM(detalle.cantidad * detalle.precio_unitario), 0) AS total_recaudado_historico
+        FROM productos p
+        LEFT JOIN detalle_ordenes detalle ON p.producto_id = detalle.producto_id
+        LEFT JOIN categorias c ON p.categoria_id = c.categoria_id
+        WHERE p.stock = 0
+        GROUP BY p.producto_id, p.nombre, p.precio, c.nombre
+        ORDER BY total_recaudado_historico DESC
+    """
+    return cached_query('productos_fuera_stock', sql, ['productos', 'detalle_ordenes', 'categorias'],
+                        refresh=refresh)
+
+
+def productos_peor_calificados(min_resenas: int = 3, limit: int = 10, refresh: bool = False) -> pd.DataFrame:
+    """Productos con peor calificación promedio (con un mínimo de reseñas)."""
+    sql = """
+        SELECT
+            p.producto_id,
+            p.nombre AS producto_nombre,
+            c.nombre AS categoria_nombre,
+            COUNT(rp.resena_id) AS total_resenas,
+            ROUND(AVG(rp.calificacion)::numeric, 2) AS calificacion_promedio,
+            MIN(rp.calificacion) AS calificacion_minima,
+            MAX(rp.calificacion) AS calificacion_maxima
+        FROM productos p
+        INNER JOIN resenas_productos rp ON p.producto_id = rp.producto_id
+        LEFT JOIN categorias c ON p.categoria_id = c.categoria_id
+        GROUP BY p.producto_id, p.nombre, c.nombre
+        HAVING COUNT(rp.resena_id) >= :min_resenas
+        ORDER BY calificacion_promedio ASC, total_resenas DESC
+        LIMIT :limit
+    """
+    return cached_query('productos_peor_calificados', sql, ['productos', 'resenas_productos', 'categorias'],
+                        {'min_resenas': min_resenas, 'limit': limit}, refresh)
+
+
+def valor_economico_por_categoria(refresh: bool = False) -> pd.DataFrame:
+    """Valor económico total vendido por categoría."""
+    sql = """
+        SELECT
+            c.categoria_id,
+            c.nombre AS categoria_nombre,
+            COUNT(DISTINCT p.producto_id) AS total_productos,
+            COUNT(DISTINCT detalle.orden_id) AS total_ordenes,
+            SUM(detalle.cantidad) AS total_unidades_vendidas,
+            SUM(detalle.cantidad * detalle.precio_unitario) AS valor_economico_total
+        FROM categorias c
+        INNER JOIN productos p ON c.categoria_id = p.categoria_id
+        INNER JOIN detalle_ordenes detalle ON p.producto_id = detalle.producto_id
+        GROUP BY c.categoria_id, c.nombre
+        ORDER BY valor_economico_total DESC
+    """
+    return cached_query('valor_economico_por_categoria', sql, ['categorias', 'productos', 'detalle_ordenes'],
+                        refresh=refresh)
+
+
+# ============================================================================
+# CONSULTAS: PAGOS Y TRANSACCIONES (preguntas_pagos_transacciones.ipynb)
+# ============================================================================
+
+def uso_metodos_pago(refresh: bool = False) -> pd.DataFrame:
+    """Uso, órdenes y monto total por método de pago."""
+    sql = """
+        SELECT
+            mp.metodo_pago_id,
+            mp.nombre AS metodo_pago,
+            COUNT(omp.orden_metodo_id) AS total_uso,
+            COUNT(DISTINCT omp.orden_id) AS total_ordenes,
+            SUM(omp.monto_pagado) AS monto_total,
+            AVG(omp.monto_pagado) AS monto_promedio
+        FROM metodos_pago mp
+        LEFT JOIN ordenes_metodos_pago omp ON mp.metodo_pago_id = omp.metodo_pago_id
+        GROUP BY mp.metodo_pago_id, mp.nombre
+        ORDER BY total_uso DESC
+    """
+    return cached_query('uso_metodos_pago', sql, ['metodos_pago', 'ordenes_metodos_pago'], refresh=refresh)
+
+
+def estados_pago(refresh: bool = False) -> pd.DataFrame:
+    """Cantidad y monto de pagos por estado."""
+    sql = """
+        SELECT
+            estado_pago,
+            COUNT(*) AS cantidad_pagos,
+            SUM(monto) AS monto_total,
+            AVG(monto) AS monto_promedio,
+            MIN(fecha_pago) AS fecha_mas_antigua,
+            MAX(fecha_pago) AS fecha_mas_reciente
+        FROM historial_pagos
+        GROUP BY estado_pago
+        ORDER BY cantidad_pagos DESC
+    """
+    return cached_query('estados_pago', sql, ['historial_pagos'], refresh=refresh)
+
+
+def recaudacion_mensual(estado_pago: str = 'Pagado', refresh: bool = False) -> pd.DataFrame:
+    """Recaudación mensual de los pagos en un estado (por defecto los exitosos)."""
+    sql = """
+        SELECT
+            DATE_TRUNC('month', fecha_pago) AS mes,
+            TO_CHAR(DATE_TRUNC('month', fecha_pago), 'YYYY-MM') AS mes_formato,
+            COUNT(*) AS cantidad_pagos,
+            COUNT(DISTINCT orden_id) AS cantidad_ordenes,
+            SUM(monto) AS monto_total,
+            AVG(monto) AS monto_promedio
+        FROM historial_pagos
+        WHERE estado_pago = :estado_pago
+        GROUP BY DATE_TRUNC('month', fecha_pago)
+        ORDER BY mes ASC
+    """
+    return cached_query('recaudacion_mensual', sql, ['historial_pagos'], {'estado_pago': estado_pago}, refresh)
@@ -4,38 +4,84 @@ Contiene funciones para cargar datos desde archivos CSV a PostgreSQL, transforma
 """
 
 from .load_raw_data import load_raw_data
+from .parallel_copy import load_raw_data_parts
 from .transformations import (
     apply_transformations,
     apply_trim,
     normalize_emails,
-    remove_duplicates_by_key
+    remove_duplicates_by_key,
+    load_polars_backend
+)
+from .validation import (
+    validate_constraints,
+    quarantine_rows
 )
 from .load_to_production import (
     load_to_production,
     load_all_to_production
 )
+from .bulk_mode import restore_pending_bulk_load
+from .delta import (
+    get_staging_delta,
+    commit_staging_hashes,
+    discard_staging_deltas
+)
+from .watermarks import (
+    get_watermark,
+    commit_watermarks,
+    discard_watermarks
+)
+from .integrity import (
+    check_referential_integrity,
+    assert_referential_integrity
+)
+from .materialized_views import refresh_analytics_views
 from .pipeline import (
     run_full_pipeline,
     run_staging_load,
     run_transformations,
-    run_production_load
+    run_production_load,
+    start_query_log,
+    finish_query_log
 )
 
 __all__ = [
     # Carga de datos crudos a staging
     'load_raw_data',
+    'load_raw_data_parts',
     # Transformaciones
     'apply_transformations',
     'apply_trim',
     'normalize_emails',
     'remove_duplicates_by_key',
+    'load_polars_backend',
+    # Validación de constraints
+    'validate_constraints',
+    'quarantine_rows',
     # Carga a producción
     'load_to_production',
     'load_all_to_production',
+    'restore_pending_bulk_load',
+    # Deltas por fila entre ejecuciones
+    'get_staging_delta',
+    'commit_staging_hashes',
+    'discard_staging_deltas',
+    # Ingesta incremental por marca de agua
+    'get_watermark',
+    'commit_watermarks',
+    'discard_watermarks',
+    # Integridad referencial
+    'check_referential_integrity',
+    'assert_referential_integrity',
+    # Vistas materializadas analíticas
+    'refresh_analytics_views',
     # Pipeline modular
     'run_full_pipeline',
     'run_staging_load',
     'run_transformations',
-    'run_production_load'
+    'run_production_load',
+    # Instrumentación SQL por ejecución
+    'start_query_log',
+    'finish_query_log'
 ]
 
@@ -0,0 +1,340 @@
+"""
+Carga asíncrona (asyncio + asyncpg) de las etapas limitadas por I/O.
+
+Variantes asíncronas de la carga a staging (load_raw_data) y de la escritura
+masiva a producción, más un driver que ejecuta muchas cargas y consultas de
+catálogo a la vez desde un solo proceso:
+- El trabajo de CPU (leer el CSV, filtrar columnas, serializar) se
+  ejecuta en hilos con asyncio.to_thread
+- El COPY se envía con asyncpg (copy_to_table); mientras el servidor procesa
+  una tabla, el event loop prepara y envía las demás
+- La concurrencia se limita con un asyncio.Semaphore
+  (ETLConfig.ASYNC_MAX_CONCURRENCY), por debajo del tamaño del pool
+
+Ejemplo:
+    results = run_async(run_staging_load_async(TABLES_CONFIG))
+"""
+
+import os
+import sys
+import asyncio
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import AsyncDBConnector desde la raíz del proyecto
+from database.async_db_connector import AsyncDBConnector
+
+# Import de las funciones de carga síncrona (preparación del DataFrame y CSV para COPY)
+try:
+    from .load_raw_data import load_raw_data, filter_columns_for_staging, _dataframe_to_csv_buffer
+    from ..utils.clean_column_name import clean_column_name
+except ImportError:
+    from pipeline.etl.load_raw_data import load_raw_data, filter_columns_for_staging, _dataframe_to_csv_buffer
+    from clean_column_name import clean_column_name
+
+
+# Opciones de COPY equivalentes a las de _copy_dataframe en load_raw_data
+COPY_OPTIONS = {
+    'format': 'csv',
+    'delimiter': ',',
+    'null': '',
+    'quote': '"',
+    'escape': '\\',
+}
+
+
+def run_async(coroutine):
+    """
+    Ejecuta una corrutina del módulo desde código síncrono y cierra el pool al terminar.
+
+    Args:
+        coroutine: Corrutina a ejecutar (ej: run_staging_load_async(...))
+
+    Returns:
+        Resultado de la corrutina
+    """
+    async def _main():
+        try:
+            return await coroutine
+        finally:
+            await AsyncDBConnector.get_instance().close()
+
+    return asyncio.run(_main())
+
+
+# ============================================================================
+# CARGA ASÍNCRONA A STAGING
+# ============================================================================
+
+async def get_expected_columns_async(table_name_raw: str) -> List[str]:
+    """
+    Variante asíncrona de get_expected_columns: columnas de una tabla staging.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging
+
+    Returns:
+        Lista de columnas en orden
+
+    Raises:
+        ValueError: Si la tabla no existe o no tiene columnas
+    """
+    query = """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = $1
+        AND table_schema = 'public'
+        ORDER BY ordinal_position;
+    """
+    pool = await AsyncDBConnector.get_instance().get_pool()
+    rows = await pool.fetch(query, table_name_raw)
+    columns = [row['column_name'] for row in rows]
+    if not columns:
+        raise ValueError(
+            f"La tabla '{table_name_raw}' no existe o no tiene columnas.\n"
+            f"Asegúrate de haber ejecutado create_staging_tables() primero."
+        )
+    return columns
+
+
+def _prepare_staging_payload(csv_path: str, table_name_raw: str, expected_columns: List[str]):
+    """
+    Lee el CSV y lo prepara para COPY (trabajo de CPU, se ejecuta en un hilo).
+
+    Returns:
+        Tupla (columnas, filas, bytes CSV sin header)
+    """
+    df = pd.read_csv(csv_path, encoding=ETLConfig.CSV_ENCODING)
+    df.columns = [clean_column_name(col) for col in df.columns]
+    df = filter_columns_for_staging(df, table_name_raw, expected_columns=expected_columns)
+    payload = _dataframe_to_csv_buffer(df).getvalue().encode('utf-8')
+    return list(df.columns), len(df), payload
+
+
+async def load_raw_data_async(
+    file_name: str,
+    table_name_raw: str,
+    error_tolerant: Optional[bool] = None
+) -> int:
+    """
+    Variante asíncrona de load_raw_data: CSV → tabla staging con COPY vía asyncpg.
+
+    El COPY se ejecuta con el perfil de sesión 'bulk_load'. En modo tolerante a
+    errores se delega en load_raw_data (bisección con savepoints) dentro de un hilo.
+
+    Args:
+        file_name: Nombre del archivo CSV (ruta relativa desde la raíz del proyecto)
+        table_name_raw: Nombre de la tabla staging (debe terminar en '_raw')
+        error_tolerant: Si None, usa ETLConfig.COPY_ERROR_TOLERANT
+
+    Returns:
+        Número de filas cargadas (0 si el archivo no existe; en modo tolerante,
+        sin contar las filas rechazadas)
+    """
+    if not table_name_raw.endswith('_raw'):
+        raise ValueError(
+            f"El nombre de tabla debe terminar en '_raw'.\n"
+            f"Recibido: '{table_name_raw}'\n"
+            f"Ejemplo correcto: 'usuarios_raw'"
+        )
+
+    if error_tolerant is None:
+        error_tolerant = ETLConfig.COPY_ERROR_TOLERANT
+    if error_tolerant:
+        return await asyncio.to_thread(load_raw_data, file_name, table_name_raw, True)
+
+    csv_path = path_manager.get_csv_path(file_name)
+    if not os.path.exists(csv_path):
+        print(f"   ⚠ No se encontró el archivo {csv_path}")
+        return 0
+
+    expected_columns = await get_expected_columns_async(table_name_raw)
+    columns, rows, payload = await asyncio.to_thread(
+        _prepare_staging_payload, csv_path, table_name_raw, expected_columns
+    )
+
+    db = AsyncDBConnector.get_instance()
+    async with db.transaction(profile='bulk_load') as conn:
+        await conn.copy_to_table(table_name_raw, source=payload, columns=columns, **COPY_OPTIONS)
+        if ETLConfig.ANALYZE_STAGING_AFTER_LOAD:
+            await conn.execute(f"ANALYZE {table_name_raw}")
+
+    print(f"   ✓ {file_name} → {table_name_raw} ({rows} filas)")
+    return rows
+
+
+# ============================================================================
+# ESCRITURA MASIVA ASÍNCRONA A PRODUCCIÓN
+# ============================================================================
+
+async def bulk_write_async(
+    table_name: str,
+    df: pd.DataFrame,
+    truncate: bool = False,
+    profile: Optional[str] = None
+) -> int:
+    """
+    Variante asíncrona de la escritura masiva a producción (to_sql): COPY de un
+    DataFrame a una tabla en una transacción.
+
+    Las tablas particionadas reciben el COPY en la tabla padre y PostgreSQL enruta
+    cada fila a su partición (que debe existir).
+
+    Args:
+        table_name: Tabla destino
+        df: DataFrame con columnas de la tabla (sin la primary key serial)
+        truncate: Si True, vacía la tabla en la misma transacción antes del COPY
+        profile: Perfil de sesión (ej: 'bulk_load')
+
+    Returns:
+        Número de filas escritas
+    """
+    if len(df) == 0:
+        return 0
+
+    payload = await asyncio.to_thread(lambda: _dataframe_to_csv_buffer(df).getvalue().encode('utf-8'))
+
+    db = AsyncDBConnector.get_instance()
+    async with db.transaction(profile=profile) as conn:
+        if truncate:
+            await conn.execute(f"TRUNCATE TABLE {table_name} CASCADE")
+        await conn.copy_to_table(table_name, source=payload, columns=list(df.columns), **COPY_OPTIONS)
+    return len(df)
+
+
+async def bulk_write_many_async(
+    frames: Dict[str, pd.DataFrame],
+    max_concurrency: Optional[int] = None,
+    truncate: bool = False,
+    profile: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Escribe varias tablas independientes a la vez (sin foreign keys entre ellas).
+
+    Args:
+        frames: Diccionario {tabla: DataFrame}
+        max_concurrency: COPYs simultáneos. Por defecto ETLConfig.ASYNC_MAX_CONCURRENCY
+        truncate: Si True, vacía cada tabla antes de escribirla
+        profile: Perfil de sesión
+
+    Returns:
+        Diccionario {tabla: filas escritas}
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or ETLConfig.ASYNC_MAX_CONCURRENCY)
+
+    async def write_one(table_name: str, df: pd.DataFrame) -> int:
+        async with semaphore:
+            return await bulk_write_async(table_name, df, truncate=truncate, profile=profile)
+
+    counts = await asyncio.gather(*(write_one(table, df) for table, df in frames.items()))
+    return dict(zip(frames.keys(), counts))
+
+
+# ============================================================================
+# CONSULTAS DE CATÁLOGO
+# ============================================================================
+
+async def fetch_table_stats_async(
+    tables: List[str],
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Consulta en paralelo filas y tamaño en disco de varias tablas.
+
+    Args:
+        tables: Nombres de las tablas
+        max_concurrency: Consultas simultáneas. Por defecto ETLConfig.ASYNC_MAX_CONCURRENCY
+
+    Returns:
+        Diccionario {tabla: {'filas', 'tamano_bytes'}}
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or ETLConfig.ASYNC_MAX_CONCURRENCY)
+    pool = await AsyncDBConnector.get_instance().get_pool()
+
+    async def stats_one(table_name: str) -> Dict:
+        async with semaphore:
+            row = await pool.fetchrow(
+                f"SELECT COUNT(*) AS filas, pg_total_relation_size($1::regclass) AS tamano_bytes "
+                f"FROM {table_name}",
+                table_name
+            )
+            return {'filas': row['filas'], 'tamano_bytes': row['tamano_bytes']}
+
+    stats = await asyncio.gather(*(stats_one(table) for table in tables))
+    return dict(zip(tables, stats))
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+async def run_staging_load_async(
+    tables_config: List[Dict[str, str]],
+    max_concurrency: Optional[int] = None,
+    error_tolerant: Optional[bool] = None
+) -> Dict[str, int]:
+    """
+    Carga todas las tablas staging a la vez desde un solo proceso.
+
+    Las tablas staging no tienen foreign keys entre sí, por lo que el orden de
+    carga no importa. Si alguna carga falla, se esperan las demás y se relanza
+    el primer error.
+
+    Args:
+        tables_config: Lista de {'file': ..., 'table_raw': ...} (ej: TABLES_CONFIG)
+        max_concurrency: Cargas simultáneas. Por defecto ETLConfig.ASYNC_MAX_CONCURRENCY
+        error_tolerant: Modo tolerante a errores del COPY
+
+    Returns:
+        Diccionario {tabla_staging: filas cargadas}
+    """
+    max_concurrency = max_concurrency or ETLConfig.ASYNC_MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    print(f"\n{'='*80}")
+    print(f"CARGA ASÍNCRONA A STAGING ({len(tables_config)} tablas, {max_concurrency} simultáneas)")
+    print(f"{'='*80}")
+
+    async def load_one(config: Dict[str, str]) -> int:
+        async with semaphore:
+            try:
+                return await load_raw_data_async(
+                    config['file'], config['table_raw'], error_tolerant=error_tolerant
+                )
+            except Exception as e:
+                print(f"   ✗ Error al cargar {config['file']} a staging: {str(e)}")
+                raise
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await asyncio.gather(*(load_one(config) for config in tables_config), return_exceptions=True)
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+    counts = {config['table_raw']: rows for config, rows in zip(tables_config, results)}
+    stats = await fetch_table_stats_async(list(counts.keys()), max_concurrency)
+
+    print(f"\n   ✓ {sum(counts.values())} filas cargadas en {loop.time() - start:.2f}s")
+    for table_name, table_stats in stats.items():
+        print(f"      {table_name}: {table_stats['filas']} filas, "
+              f"{table_stats['tamano_bytes'] / 1024 / 1024:.2f} MB")
+    return counts
@@ -0,0 +1,389 @@
+"""
+Modo de carga masiva para las tablas de PRODUCCIÓN.
+
+En una carga inicial o una recarga completa, cada fila insertada paga el
+mantenimiento de todos los índices secundarios y de los UNIQUE (ej: usuarios.dni,
+usuarios.email), la búsqueda de cada foreign key y la evaluación de cada CHECK.
+Sobre tablas destino vacías es mucho más barato:
+
+1. Capturar desde el catálogo las definiciones de los índices secundarios y de las
+   constraints UNIQUE, CHECK y FOREIGN KEY (la primary key se conserva: la usan
+   el mapeo de IDs y las foreign keys de otras tablas)
+2. Guardarlas en data/state/bulk_load_objects.json y eliminarlas
+3. Cargar los datos
+4. Reconstruir en paralelo los índices (cada uno en su propia conexión) y
+   convertir los UNIQUE en constraints con ADD CONSTRAINT ... USING INDEX
+5. Agregar CHECK y FOREIGN KEY como NOT VALID (solo catálogo) y validarlas en
+   paralelo con VALIDATE CONSTRAINT, que no bloquea lecturas ni escrituras
+6. Verificar que el catálogo coincide con lo capturado y borrar el archivo de estado
+
+El estado final es el mismo que sin modo masivo: mismos índices y mismas
+constraints, validadas igual que antes de la carga. Si el proceso se interrumpe,
+el archivo de estado permite restaurarlas en la siguiente ejecución
+(restore_pending_bulk_load).
+
+Tablas particionadas: sus índices se recrean sobre la tabla padre (se propagan a
+las particiones) y como PostgreSQL no admite NOT VALID ni USING INDEX en ellas,
+sus constraints se agregan directamente validadas.
+"""
+
+import os
+import sys
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+# Archivo con los objetos eliminados durante una carga masiva en curso
+BULK_STATE_FILE = 'bulk_load_objects.json'
+
+# Tipos de constraint que se eliminan (FOREIGN KEY primero)
+_CONSTRAINT_DROP_ORDER = {'f': 0, 'u': 1, 'c': 2}
+
+
+# ============================================================================
+# CATÁLOGO
+# ============================================================================
+
+def get_empty_tables(engine, tables: List[str]) -> List[str]:
+    """
+    Retorna las tablas sin filas (una sola consulta para todas).
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Nombres de las tablas
+
+    Returns:
+        Lista de tablas vacías, en el orden recibido
+    """
+    if not tables:
+        return []
+    query = ' UNION ALL '.join(
+        f"SELECT '{table}' AS tabla, NOT EXISTS (SELECT 1 FROM {table}) AS vacia"
+        for table in tables
+    )
+    with engine.connect() as conn:
+        empty = {tabla for tabla, vacia in conn.execute(text(query)) if vacia}
+    return [table for table in tables if table in empty]
+
+
+def capture_bulk_objects(engine, tables: List[str]) -> Dict[str, List[Dict]]:
+    """
+    Lee del catálogo los índices secundarios y las constraints UNIQUE, CHECK y
+    FOREIGN KEY de las tablas.
+
+    No se capturan la primary key, los índices que respaldan constraints (se
+    recrean con su constraint) ni los UNIQUE referenciados por foreign keys de
+    otras tablas.
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tablas de producción
+
+    Returns:
+        Diccionario con 'indexes' y 'constraints' (listas de definiciones)
+    """
+    index_query = """
+        SELECT t.relname, i.relname, pg_get_indexdef(x.indexrelid), t.relkind = 'p'
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = current_schema()
+          AND t.relname = ANY(:tables)
+          AND NOT x.indisprimary
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+                AND c.contype IN ('p', 'u', 'x')
+          )
+        ORDER BY t.relname, i.relname
+    """
+    constraint_query = """
+        SELECT t.relname, c.conname, c.contype, pg_get_constraintdef(c.oid),
+               t.relkind = 'p', c.convalidated,
+               CASE WHEN c.contype = 'u' THEN pg_get_indexdef(c.conindid) END
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = current_schema()
+          AND t.relname = ANY(:tables)
+          AND c.contype IN ('f', 'u', 'c')
+          AND c.conislocal
+          AND NOT (
+              c.contype = 'u' AND EXISTS (
+                  SELECT 1 FROM pg_constraint f
+                  WHERE f.contype = 'f' AND f.conindid = c.conindid
+              )
+          )
+        ORDER BY t.relname, c.conname
+    """
+    with engine.connect() as conn:
+        indexes = [
+            {'table': table, 'name': name, 'definition': definition, 'partitioned': partitioned}
+            for table, name, definition, partitioned
+            in conn.execute(text(index_query), {'tables': list(tables)})
+        ]
+        constraints = [
+            {
+                'table': table, 'name': name, 'type': contype,
+                'definition': definition.replace(' NOT VALID', ''),
+                'partitioned': partitioned, 'validated': validated,
+                'index_definition': index_definition
+            }
+            for table, name, contype, definition, partitioned, validated, index_definition
+            in conn.execute(text(constraint_query), {'tables': list(tables)})
+        ]
+    return {'indexes': indexes, 'constraints': constraints}
+
+
+def _get_state_path() -> str:
+    """Ruta del archivo de estado de la carga masiva."""
+    return os.path.join(path_manager.get_state_dir(), BULK_STATE_FILE)
+
+
+def _write_state(state: Dict) -> None:
+    """Guarda los objetos eliminados de forma atómica (tmp + rename)."""
+    path = _get_state_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# ELIMINACIÓN Y RECONSTRUCCIÓN
+# ============================================================================
+
+def prepare_bulk_load(tables: List[str]) -> Optional[Dict]:
+    """
+    Elimina los índices secundarios y las constraints de las tablas destino vacías.
+
+    Las tablas con filas no se tocan. Las definiciones se guardan en el archivo de
+    estado antes de eliminar nada.
+
+    Args:
+        tables: Tablas destino de la carga
+
+    Returns:
+        Estado con 'tables', 'indexes' y 'constraints', o None si no hay tablas vacías
+    """
+    restore_pending_bulk_load()
+
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    empty_tables = get_empty_tables(engine, tables)
+    skipped = [table for table in tables if table not in empty_tables]
+    if skipped:
+        print(f"   ⚠ Modo masivo omitido en tablas con datos: {', '.join(skipped)}")
+    if not empty_tables:
+        return None
+
+    state = {'tables': empty_tables, **capture_bulk_objects(engine, empty_tables)}
+    _write_state(state)
+
+    constraints = sorted(state['constraints'], key=lambda c: _CONSTRAINT_DROP_ORDER[c['type']])
+    with engine.begin() as conn:
+        for constraint in constraints:
+            conn.execute(text(
+                f"ALTER TABLE {constraint['table']} DROP CONSTRAINT IF EXISTS {constraint['name']}"
+            ))
+        for index in state['indexes']:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+
+    print(f"   ✓ Modo masivo: {len(state['indexes'])} índices y {len(constraints)} constraints "
+          f"eliminados en {len(empty_tables)} tablas")
+    return state
+
+
+def _index_ddl(definition: str) -> str:
+    """Definición de índice aplicable a la tabla padre y a todas sus particiones."""
+    return definition.replace(' ON ONLY ', ' ON ', 1)
+
+
+def _run_parallel(jobs: List[List[str]], max_workers: int) -> List[str]:
+    """
+    Ejecuta grupos de sentencias en paralelo: cada grupo en su propia conexión y
+    sus sentencias en orden, cada una en su propia transacción (perfil bulk_load).
+
+    Returns:
+        Lista de errores ('sentencia: error')
+    """
+    db = DBConnector.get_instance()
+
+    def run_group(statements: List[str]) -> List[str]:
+        errors = []
+        for statement in statements:
+            try:
+                with db.session(profile='bulk_load') as conn:
+                    conn.execute(text(statement))
+            except Exception as e:
+                errors.append(f"{statement}: {str(e).splitlines()[0]}")
+        return errors
+
+    jobs = [group for group in jobs if group]
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        return [error for errors in executor.map(run_group, jobs) for error in errors]
+
+
+def restore_bulk_objects(state: Dict, max_workers: Optional[int] = None) -> None:
+    """
+    Reconstruye los índices y las constraints eliminados por prepare_bulk_load.
+
+    - Índices secundarios y de respaldo de los UNIQUE: en paralelo, uno por conexión
+    - UNIQUE: ADD CONSTRAINT ... USING INDEX (solo catálogo)
+    - CHECK y FOREIGN KEY: ADD CONSTRAINT ... NOT VALID en una transacción y
+      VALIDATE CONSTRAINT en paralelo (en serie dentro de cada tabla)
+    - Tablas particionadas: UNIQUE, CHECK y FOREIGN KEY se agregan ya validadas
+    Al final se ejecuta ANALYZE de cada tabla y se verifica el catálogo.
+
+    Args:
+        state: Estado devuelto por prepare_bulk_load
+        max_workers: Conexiones en paralelo. Si None, usa ETLConfig.BULK_REBUILD_MAX_WORKERS
+
+    Raises:
+        RuntimeError: Si algún objeto no se pudo reconstruir o validar (el archivo
+                      de estado se conserva para reintentar)
+    """
+    if max_workers is None:
+        max_workers = ETLConfig.BULK_REBUILD_MAX_WORKERS
+
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    # Omitir lo que ya existe (reintento tras una restauración parcial)
+    existing = capture_bulk_objects(engine, state['tables'])
+    existing_indexes = {index['name'] for index in existing['indexes']}
+    existing_constraints = {constraint['name'] for constraint in existing['constraints']}
+    indexes = [index for index in state['indexes'] if index['name'] not in existing_indexes]
+    constraints = [c for c in state['constraints'] if c['name'] not in existing_constraints]
+
+    # Paso 1: índices en paralelo (CREATE INDEX no bloquea otros CREATE INDEX de la misma tabla)
+    index_jobs = [[_index_ddl(index['definition'])] for index in indexes]
+    for constraint in constraints:
+        if constraint['type'] == 'u' and not constraint['partitioned']:
+            index_jobs.append([
+                f"DROP INDEX IF EXISTS {constraint['name']}",
+                _index_ddl(constraint['index_definition'])
+            ])
+    errors = _run_parallel(index_jobs, max_workers)
+    print(f"   ✓ {len(index_jobs)} índices reconstruidos en paralelo ({max_workers} conexiones)")
+
+    # Paso 2: constraints NOT VALID (solo catálogo, una transacción)
+    validations: Dict[str, List[str]] = defaultdict(list)
+    if not errors:
+        with engine.begin() as conn:
+            for constraint in constraints:
+                table, name = constraint['table'], constraint['name']
+                if constraint['partitioned']:
+                    validations[table].append(
+                        f"ALTER TABLE {table} ADD CONSTRAINT {name} {constraint['definition']}"
+                    )
+                elif constraint['type'] == 'u':
+                    conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}"))
+                else:
+                    conn.execute(text(
+                        f"ALTER TABLE {table} ADD CONSTRAINT {name} {constraint['definition']} NOT VALID"
+                    ))
+                    # Las que ya eran NOT VALID antes de la carga se dejan igual
+                    if constraint['validated']:
+                        validations[table].append(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+        # Paso 3: validación en paralelo entre tablas y estadísticas de cada tabla
+        jobs = [validations[table] + [f"ANALYZE {table}"] for table in state['tables']]
+        errors = _run_parallel(jobs, max_workers)
+        print(f"   ✓ {sum(len(v) for v in validations.values())} constraints agregadas y validadas")
+
+    if not errors:
+        errors = verify_bulk_objects(state)
+    if errors:
+        for error in errors:
+            print(f"   ✗ {error}")
+        raise RuntimeError(
+            f"No se pudieron restaurar {len(errors)} índices/constraints de la carga masiva. "
+            f"Las definiciones están en {_get_state_path()}"
+        )
+
+    os.remove(_get_state_path())
+    print(f"   ✓ Modo masivo finalizado: índices y constraints restaurados y validados")
+
+
+def verify_bulk_objects(state: Dict) -> List[str]:
+    """
+    Compara el catálogo con los objetos capturados antes de la carga.
+
+    Returns:
+        Lista de diferencias (vacía si el estado final es el original)
+    """
+    engine = DBConnector.get_instance().get_engine()
+    current = capture_bulk_objects(engine, state['tables'])
+    current_indexes = {index['name'] for index in current['indexes']}
+    current_constraints = {constraint['name'] for constraint in current['constraints']}
+
+    errors = [
+        f"Índice '{index['name']}' de '{index['table']}' no existe"
+        for index in state['indexes'] if index['name'] not in current_indexes
+    ]
+    errors += [
+        f"Constraint '{constraint['name']}' de '{constraint['table']}' no existe"
+        for constraint in state['constraints'] if constraint['name'] not in current_constraints
+    ]
+
+    query = """
+        SELECT c.conname
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = current_schema()
+          AND t.relname = ANY(:tables)
+          AND NOT c.convalidated
+    """
+    originally_validated = {c['name'] for c in state['constraints'] if c['validated']}
+    with engine.connect() as conn:
+        for (name,) in conn.execute(text(query), {'tables': state['tables']}):
+            if name in originally_validated:
+                errors.append(f"Constraint '{name}' quedó NOT VALID")
+    return errors
+
+
+def restore_pending_bulk_load() -> bool:
+    """
+    Restaura los objetos de una carga masiva interrumpida (si existe el archivo de estado).
+
+    Returns:
+        True si había una carga masiva pendiente y se restauró
+    """
+    path = _get_state_path()
+    if not os.path.exists(path):
+        return False
+    print(f"   ⚠ Carga masiva anterior sin finalizar, restaurando objetos desde {path}")
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    restore_bulk_objects(state)
+    return True
@@ -0,0 +1,525 @@
+"""
+Motor de deltas por fila entre cargas sucesivas.
+
+Staging se recarga completo desde los CSV en cada ejecución y, sin deltas, todo lo
+que sigue (transformaciones, carga a producción) se recalcula aunque casi todas las
+filas sean iguales. Este módulo guarda, por tabla, un hash de contenido de cada fila
+de la carga anterior (tabla etl_staging_hashes) y clasifica la carga nueva en:
+- inserted: claves que no existían
+- updated: claves existentes cuyo hash cambió
+- deleted: claves que ya no aparecen
+- unchanged: el resto (solo se cuentan)
+
+Identidad de cada fila (row key):
+- Tablas con identificador natural en LOAD_ORDER (usuarios, productos, categorías,
+  métodos de pago): las columnas naturales. Si una clave se repite, se numeran
+  las apariciones ('clave#2') para que sigan siendo únicas.
+- Resto de tablas: la posición de la fila (1-based), que es la misma referencia
+  que usan las foreign keys crudas de los CSV. Una fila agregada o eliminada en
+  medio del CSV desplaza la clave de todas las siguientes: detect_position_shift
+  lo detecta y la tabla se recarga completa en lugar de actualizar filas ajenas.
+
+Los hashes se calculan vectorizados (compute_row_hash) y la clasificación es un
+hash join (merge) entre las claves nuevas y las anteriores. Cada delta se registra
+en memoria para las etapas siguientes (get_staging_delta, has_changes). Los hashes
+de producción se guardan en la misma transacción que escribe la tabla
+(save_staging_hashes), así una tabla confirmada nunca se vuelve a insertar; los de
+staging se guardan al confirmar la ejecución (commit_staging_hashes). Si algo falla,
+la siguiente ejecución vuelve a detectar los cambios de lo que no se confirmó.
+
+Se usan dos espacios de nombres en etl_staging_hashes:
+- '<tabla>_raw': filas del CSV al cargar staging (decide qué tablas recargar y transformar)
+- '<tabla>': filas transformadas al cargar producción (decide qué insertar y actualizar)
+
+Las tablas identificadas por posición guardan además, al insertar, el ID de
+producción de cada posición (tabla etl_row_ids). Así las actualizaciones y las
+foreign keys no dependen del orden de los IDs en producción, que deja de coincidir
+con el de staging en cuanto hay filas en cuarentena o filas eliminadas del CSV.
+"""
+
+import io
+import os
+import sys
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import text
+
+# Import PathManager desde utils
+try:
+    from ..utils.path_manager import PathManager
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+from database.query_log import raw_cursor
+
+try:
+    from .row_hash import compute_row_hash
+except ImportError:
+    from pipeline.etl.row_hash import compute_row_hash
+
+
+# Tabla con el hash de cada fila de la última ejecución confirmada
+HASH_TABLE = 'etl_staging_hashes'
+
+# Tabla con el ID de producción de cada posición de las tablas sin identificador natural
+ROW_ID_TABLE = 'etl_row_ids'
+
+# Columna con la clave de fila en los DataFrames de un delta
+ROW_KEY_COLUMN = '_row_key'
+
+# Tablas staging cuyo resultado transformado depende de otra tabla staging
+# (el total de cada orden se recalcula desde detalle_ordenes)
+TRANSFORM_DEPENDENCIES = {
+    'ordenes_raw': ['detalle_ordenes_raw'],
+}
+
+# Deltas calculados en esta ejecución y pendientes de confirmar: {clave_hash: delta}
+_deltas: Dict[str, Dict] = {}
+
+
+# ============================================================================
+# HASHES Y CLAVES
+# ============================================================================
+
+def get_natural_keys(table_name: str) -> Optional[List[str]]:
+    """
+    Retorna las columnas del identificador natural de una tabla según LOAD_ORDER.
+
+    Args:
+        table_name: Tabla staging ('usuarios_raw') o de producción ('usuarios')
+
+    Returns:
+        Lista de columnas, o None si la tabla se identifica por posición
+    """
+    try:
+        from .load_to_production import LOAD_ORDER
+    except ImportError:
+        from pipeline.etl.load_to_production import LOAD_ORDER
+
+    for table_config in LOAD_ORDER:
+        source_table, target_table, natural_keys = table_config[:3]
+        if table_name in (source_table, target_table):
+            return natural_keys
+    return None
+
+
+def compute_row_keys(df: pd.DataFrame, key_columns: Optional[List[str]] = None) -> pd.Series:
+    """
+    Calcula la clave de cada fila: columnas naturales unidas con '|' o la posición 1-based.
+
+    Args:
+        df: DataFrame con las filas
+        key_columns: Columnas del identificador natural (None = posición)
+
+    Returns:
+        Serie de texto con la clave de cada fila (mismo índice que df)
+    """
+    if not key_columns:
+        return pd.Series([str(position) for position in range(1, len(df) + 1)], index=df.index, dtype='string')
+
+    # Mismo formato de clave natural que el mapeo de IDs de load_to_production
+    keys = df[key_columns[0]].astype(str)
+    for column in key_columns[1:]:
+        keys = keys + '|' + df[column].astype(str)
+    keys = keys.astype('string')
+
+    # Claves repetidas (duplicados aún no eliminados): numerar las apariciones
+    occurrence = keys.groupby(keys).cumcount()
+    repeated = occurrence > 0
+    if repeated.any():
+        keys = keys.where(~repeated, keys + '#' + (occurrence + 1).astype(str))
+    return keys
+
+
+def compute_content_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Hash de contenido de cada fila sobre todas sus columnas (en orden alfabético,
+    para que no dependa del orden de las columnas del CSV o de la tabla).
+
+    Args:
+        df: DataFrame con las filas
+
+    Returns:
+        Serie int64 con el hash de cada fila
+    """
+    columns = sorted(col for col in df.columns if col != ROW_KEY_COLUMN)
+    return compute_row_hash(df, columns)
+
+
+# ============================================================================
+# ALMACÉN DE HASHES
+# ============================================================================
+
+def load_previous_hashes(engine, hash_key: str) -> Optional[pd.DataFrame]:
+    """
+    Lee los hashes de la última ejecución confirmada de una tabla.
+
+    Args:
+        engine: SQLAlchemy engine
+        hash_key: Clave de la tabla en etl_staging_hashes (ej: 'usuarios_raw')
+
+    Returns:
+        DataFrame con 'row_key' y 'row_hash', o None si nunca se guardaron hashes
+    """
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': HASH_TABLE}
+        ).scalar()
+        if not exists:
+            return None
+        has_rows = conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {HASH_TABLE} WHERE table_name = :table_name)"),
+            {'table_name': hash_key}
+        ).scalar()
+        if not has_rows:
+            return None
+        previous = pd.read_sql(
+            text(f"SELECT row_key, row_hash FROM {HASH_TABLE} WHERE table_name = :table_name"),
+            conn,
+            params={'table_name': hash_key},
+            dtype={'row_key': 'string', 'row_hash': 'int64'}
+        )
+    return previous
+
+
+def _ensure_hash_table(cursor) -> None:
+    """Crea la tabla de hashes si no existe."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {HASH_TABLE} (
+            table_name VARCHAR(100) NOT NULL,
+            row_key TEXT NOT NULL,
+            row_hash BIGINT NOT NULL,
+            PRIMARY KEY (table_name, row_key)
+        )
+    """)
+
+
+def _write_hashes(cursor, hash_key: str) -> None:
+    """Reemplaza (DELETE + COPY) los hashes guardados de una tabla por los de su delta pendiente."""
+    hashes = _deltas[hash_key]['hashes']
+    cursor.execute(f"DELETE FROM {HASH_TABLE} WHERE table_name = %s", (hash_key,))
+    buffer = io.StringIO()
+    hashes.assign(table_name=hash_key)[['table_name', 'row_key', 'row_hash']].to_csv(
+        buffer, index=False, header=False
+    )
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {HASH_TABLE} (table_name, row_key, row_hash) FROM STDIN WITH (FORMAT CSV)",
+        buffer
+    )
+
+
+def save_staging_hashes(conn, hash_key: str) -> bool:
+    """
+    Guarda los hashes del delta pendiente de una tabla dentro de una transacción abierta.
+
+    Debe ejecutarse en la misma transacción que escribe la tabla en producción: si la
+    transacción se revierte, los hashes anteriores siguen vigentes; si se confirma,
+    la siguiente ejecución ya no vuelve a insertar esas filas.
+
+    Args:
+        conn: Conexión SQLAlchemy dentro de una transacción
+        hash_key: Clave de la tabla en etl_staging_hashes (ej: 'ordenes')
+
+    Returns:
+        True si había un delta pendiente para la tabla
+    """
+    if hash_key not in _deltas:
+        return False
+    cursor = raw_cursor(conn)
+    try:
+        _ensure_hash_table(cursor)
+        _write_hashes(cursor, hash_key)
+    finally:
+        cursor.close()
+    del _deltas[hash_key]
+    return True
+
+
+def delete_saved_state(conn, table_names: Iterable[str]) -> None:
+    """
+    Borra los hashes y el registro de IDs por posición de varias tablas de producción
+    (tablas vaciadas para recargarse completas: su próxima carga es una línea base).
+
+    Args:
+        conn: Conexión SQLAlchemy dentro de una transacción
+        table_names: Tablas de producción
+    """
+    table_names = list(table_names)
+    for registry in (HASH_TABLE, ROW_ID_TABLE):
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': registry}
+        ).scalar()
+        if exists:
+            conn.execute(
+                text(f"DELETE FROM {registry} WHERE table_name = ANY(:table_names)"),
+                {'table_names': table_names}
+            )
+
+
+def commit_staging_hashes(hash_keys: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Guarda los hashes de los deltas pendientes como la nueva versión de referencia.
+
+    Cada tabla se reemplaza (DELETE + COPY) y todas se escriben en una sola
+    transacción. Debe llamarse cuando las etapas que consumen los deltas terminaron
+    bien (los deltas de producción ya se guardaron con save_staging_hashes al
+    escribir cada tabla).
+
+    Args:
+        hash_keys: Claves a confirmar. Si None, todas las pendientes
+
+    Returns:
+        Lista de claves confirmadas
+    """
+    keys = [key for key in (hash_keys if hash_keys is not None else list(_deltas)) if key in _deltas]
+    if not keys:
+        return []
+
+    db = DBConnector.get_instance()
+    with db.get_raw_connection(profile='bulk_load') as conn:
+        cursor = conn.cursor()
+        try:
+            _ensure_hash_table(cursor)
+            for key in keys:
+                _write_hashes(cursor, key)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    for key in keys:
+        del _deltas[key]
+    print(f"   ✓ Hashes de {len(keys)} tablas confirmados en {HASH_TABLE}")
+    return keys
+
+
+def discard_staging_deltas() -> None:
+    """Descarta los deltas pendientes sin guardar sus hashes."""
+    _deltas.clear()
+
+
+# ============================================================================
+# IDS DE PRODUCCIÓN POR POSICIÓN
+# ============================================================================
+
+def save_row_ids(conn, table_name: str, positions: Iterable[int], production_ids: Iterable[int]) -> None:
+    """
+    Guarda el ID de producción asignado a cada posición de staging (1-based).
+
+    Debe ejecutarse en la misma transacción que el INSERT de las filas, así el
+    registro nunca apunta a filas que no se escribieron.
+
+    Args:
+        conn: Conexión SQLAlchemy dentro de una transacción
+        table_name: Tabla de producción
+        positions: Posiciones 1-based de las filas en staging (la referencia de las FKs del CSV)
+        production_ids: IDs de producción asignados, en el mismo orden
+    """
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {ROW_ID_TABLE} (
+            table_name VARCHAR(100) NOT NULL,
+            row_position BIGINT NOT NULL,
+            production_id BIGINT NOT NULL,
+            PRIMARY KEY (table_name, row_position)
+        )
+    """))
+    rows = [
+        {'table_name': table_name, 'row_position': int(position), 'production_id': int(production_id)}
+        for position, production_id in zip(positions, production_ids)
+    ]
+    if rows:
+        conn.execute(
+            text(f"""
+                INSERT INTO {ROW_ID_TABLE} (table_name, row_position, production_id)
+                VALUES (:table_name, :row_position, :production_id)
+                ON CONFLICT (table_name, row_position) DO UPDATE SET
+                    production_id = EXCLUDED.production_id
+            """),
+            rows
+        )
+
+
+def load_row_ids(engine, table_name: str) -> Optional[Dict[int, int]]:
+    """
+    Lee el ID de producción de cada posición de staging de una tabla.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Tabla de producción
+
+    Returns:
+        Diccionario {posición 1-based: ID de producción}, o None si la tabla nunca
+        registró sus IDs (producción cargada antes de existir el registro)
+    """
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': ROW_ID_TABLE}
+        ).scalar()
+        if not exists:
+            return None
+        rows = conn.execute(
+            text(f"SELECT row_position, production_id FROM {ROW_ID_TABLE} WHERE table_name = :table_name"),
+            {'table_name': table_name}
+        ).fetchall()
+    if not rows:
+        return None
+    return {int(position): int(production_id) for position, production_id in rows}
+
+
+# ============================================================================
+# CLASIFICACIÓN
+# ============================================================================
+
+def classify_rows(
+    df: pd.DataFrame,
+    previous: Optional[pd.DataFrame],
+    key_columns: Optional[List[str]] = None
+) -> Dict:
+    """
+    Clasifica las filas de una carga respecto de los hashes anteriores.
+
+    Args:
+        df: Filas de la carga nueva
+        previous: Hashes anteriores ('row_key', 'row_hash'); None = primera carga
+        key_columns: Columnas del identificador natural (None = posición)
+
+    Returns:
+        Diccionario con:
+        - inserted / updated: DataFrames con las filas de df (mismo índice) y ROW_KEY_COLUMN
+        - deleted: DataFrame con 'row_key' de las filas que ya no están
+        - unchanged: número de filas sin cambios
+        - baseline: True si no había hashes anteriores
+        - hashes: DataFrame 'row_key', 'row_hash' de la carga nueva
+    """
+    current = pd.DataFrame({
+        'row_key': compute_row_keys(df, key_columns),
+        'row_hash': compute_content_hashes(df),
+    }, index=df.index)
+
+    if previous is None:
+        previous = pd.DataFrame({'row_key': pd.Series(dtype='string'), 'row_hash': pd.Series(dtype='int64')})
+        baseline = True
+    else:
+        baseline = False
+
+    # Hash join por clave de fila
+    joined = current.merge(
+        previous.rename(columns={'row_hash': 'previous_hash'}),
+        on='row_key',
+        how='outer',
+        indicator=True
+    )
+
+    # El merge descarta el índice original: las filas se recuperan por clave
+    new_keys = joined['_merge'] == 'left_only'
+    changed = (joined['_merge'] == 'both') & (joined['row_hash'] != joined['previous_hash'])
+    inserted_keys = set(joined.loc[new_keys, 'row_key'])
+    updated_keys = set(joined.loc[changed, 'row_key'])
+
+    df_keyed = df.assign(**{ROW_KEY_COLUMN: current['row_key']})
+    return {
+        'inserted': df_keyed[current['row_key'].isin(inserted_keys)],
+        'updated': df_keyed[current['row_key'].isin(updated_keys)],
+        'deleted': joined.loc[joined['_merge'] == 'right_only', ['row_key']].reset_index(drop=True),
+        'unchanged': int(((joined['_merge'] == 'both') & ~changed).sum()),
+        'baseline': baseline,
+        'hashes': current.reset_index(drop=True),
+    }
+
+
+def detect_position_shift(delta: Dict, key_columns: Optional[List[str]] = None) -> bool:
+    """
+    Indica si las claves por posición de un delta dejaron de identificar a las mismas filas.
+
+    Con claves por posición, agregar o eliminar una fila en medio del CSV desplaza a
+    todas las siguientes: aparecen como modificadas y el número de filas cambia (o
+    desaparecen claves del final). Un agregado al final (solo insertadas) o una
+    edición en el lugar (solo modificadas, mismo número de filas) no desplazan nada.
+
+    Args:
+        delta: Delta calculado con classify_rows
+        key_columns: Columnas del identificador natural (con ellas nunca hay desplazamiento)
+
+    Returns:
+        True si la tabla se debe recargar completa en lugar de aplicar el delta
+    """
+    if key_columns or delta['baseline']:
+        return False
+    if len(delta['deleted']) > 0:
+        return True
+    return len(delta['updated']) > 0 and len(delta['inserted']) > 0
+
+
+def compute_staging_delta(
+    hash_key: str,
+    df: pd.DataFrame,
+    key_columns: Optional[List[str]] = None,
+    engine=None
+) -> Dict:
+    """
+    Calcula y registra el delta de una tabla respecto de la última ejecución confirmada.
+
+    Args:
+        hash_key: Clave de la tabla en etl_staging_hashes ('usuarios_raw', 'usuarios')
+        df: Filas de la carga nueva
+        key_columns: Columnas del identificador natural. Si None, se toman de LOAD_ORDER
+        engine: SQLAlchemy engine (opcional)
+
+    Returns:
+        Delta (ver classify_rows)
+    """
+    if engine is None:
+        engine = DBConnector.get_instance().get_engine()
+    if key_columns is None:
+        key_columns = get_natural_keys(hash_key)
+
+    delta = classify_rows(df, load_previous_hashes(engine, hash_key), key_columns)
+    _deltas[hash_key] = delta
+
+    if delta['baseline']:
+        print(f"   ✓ Delta {hash_key}: sin hashes anteriores, {len(df)} filas como línea base")
+    else:
+        print(f"   ✓ Delta {hash_key}: +{len(delta['inserted'])} insertadas, "
+              f"~{len(delta['updated'])} actualizadas, -{len(delta['deleted'])} eliminadas, "
+              f"={delta['unchanged']} sin cambios")
+    return delta
+
+
+def get_staging_delta(hash_key: str) -> Optional[Dict]:
+    """
+    Retorna el delta calculado en esta ejecución para una tabla (None si no se calculó).
+
+    Args:
+        hash_key: Clave de la tabla ('usuarios_raw', 'usuarios')
+    """
+    return _deltas.get(hash_key)
+
+
+def delta_has_changes(delta: Optional[Dict]) -> bool:
+    """Indica si un delta tiene filas insertadas, actualizadas o eliminadas."""
+    if delta is None:
+        return True
+    return bool(delta['baseline'] or len(delta['inserted']) or len(delta['updated']) or len(delta['deleted']))
+
+
+def has_changes(table_raw: str) -> bool:
+    """
+    Indica si una tabla staging (o alguna de la que depende su transformación)
+    cambió en esta ejecución. Sin delta calculado se asume que cambió.
+
+    Args:
+        table_raw: Nombre de la tabla staging
+    """
+    tables = [table_raw] + TRANSFORM_DEPENDENCIES.get(table_raw, [])
+    return any(delta_has_changes(get_staging_delta(table)) for table in tables)
@@ -0,0 +1,199 @@
+"""
+Módulo de planes de tipos (dtypes) para los DataFrames del pipeline.
+
+Por defecto pandas carga los textos como objetos Python (dtype 'object') y los
+IDs y cantidades como int64/float64. Este módulo deriva, para cada tabla, un plan
+de dtypes compactos a partir de los tipos declarados en models.py y del rango
+observado en los datos:
+- Enums y textos de la lista ETLConfig.CATEGORY_COLUMNS (pais, ciudad...) → 'category'.
+  Nunca las columnas primary key o UNIQUE (dni, email): son de alta cardinalidad y
+  se comparan entre DataFrames, algo que las categorías con distintas categorías no admiten
+- Enteros (IDs, cantidades, stock) → enteros nullable más pequeños (Int8/Int16/Int32/Int64)
+- Fechas → datetime64
+
+El plan se aplica en las lecturas de staging y producción (read_sql_with_plan). No
+se aplica a los datos que se envían con COPY: staging recibe el texto del CSV tal
+cual, sin reescribir fechas ni números.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from sqlalchemy import Integer, Numeric, DateTime, Enum, String
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import de los modelos de producción
+try:
+    from ..models.models import Base
+except ImportError:
+    from pipeline.models.models import Base
+
+
+# Enteros nullable ordenados de menor a mayor tamaño
+_NULLABLE_INT_DTYPES = ['Int8', 'Int16', 'Int32', 'Int64']
+
+
+def _model_table(table_name: str):
+    """
+    Obtiene la tabla del modelo de producción correspondiente a una tabla staging o de producción.
+
+    Args:
+        table_name: Nombre de la tabla (ej: 'ordenes_raw' u 'ordenes')
+
+    Returns:
+        Tabla de SQLAlchemy, o None si no hay modelo para esa tabla
+    """
+    base_name = table_name[:-len('_raw')] if table_name.endswith('_raw') else table_name
+    return Base.metadata.tables.get(base_name)
+
+
+def _smallest_int_dtype(series: pd.Series) -> Optional[str]:
+    """
+    Determina el entero nullable más pequeño capaz de representar una serie numérica.
+
+    Args:
+        series: Serie numérica (int o float)
+
+    Returns:
+        Nombre del dtype (ej: 'Int16'), o None si la serie tiene valores no enteros
+    """
+    values = series.dropna()
+    if len(values) == 0:
+        return 'Int32'
+    if not np.all(np.mod(values.to_numpy(dtype='float64'), 1) == 0):
+        return None
+
+    min_value, max_value = values.min(), values.max()
+    for dtype in _NULLABLE_INT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= min_value and max_value <= info.max:
+            return dtype
+    return None
+
+
+def get_dtype_plan(table_name: str, df: Optional[pd.DataFrame] = None) -> Dict[str, str]:
+    """
+    Construye el plan de dtypes de una tabla a partir de models.py, de la lista
+    ETLConfig.CATEGORY_COLUMNS y, si se proporciona un DataFrame, del rango observado.
+
+    Args:
+        table_name: Nombre de la tabla staging o de producción (ej: 'ordenes_raw')
+        df: DataFrame con los datos (opcional, para ajustar el plan a los datos reales)
+
+    Returns:
+        Diccionario {columna: dtype}. Solo incluye columnas con un dtype mejor que el de pandas
+    """
+    table = _model_table(table_name)
+    if table is None:
+        return {}
+
+    category_columns = set(ETLConfig.CATEGORY_COLUMNS.get(table.name, []))
+
+    plan = {}
+    for column in table.columns:
+        name = column.name
+        if df is not None and name not in df.columns:
+            continue
+
+        if isinstance(column.type, Enum):
+            plan[name] = 'category'
+        elif isinstance(column.type, Integer):
+            if df is not None and pd.api.types.is_numeric_dtype(df[name]):
+                dtype = _smallest_int_dtype(df[name])
+                if dtype:
+                    plan[name] = dtype
+            elif df is None:
+                plan[name] = 'Int32'
+        elif isinstance(column.type, DateTime):
+            plan[name] = 'datetime64[ns]'
+        elif isinstance(column.type, Numeric):
+            plan[name] = 'float64'
+        elif isinstance(column.type, String) and name in category_columns:
+            # Identificadores (PK, UNIQUE): nunca 'category', aunque estén en la lista
+            if not (column.primary_key or column.unique):
+                plan[name] = 'category'
+
+    return plan
+
+
+def apply_dtype_plan(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """
+    Aplica el plan de dtypes de una tabla a un DataFrame.
+
+    Las conversiones son conservadoras: si una columna no se puede convertir sin
+    perder información (ej: fechas con formatos mezclados o textos en columnas
+    numéricas) se deja con su dtype original, para que PostgreSQL reporte el error.
+
+    Args:
+        df: DataFrame a optimizar
+        table_name: Nombre de la tabla staging o de producción
+
+    Returns:
+        DataFrame con los dtypes optimizados
+    """
+    if not ETLConfig.APPLY_DTYPE_PLAN or len(df) == 0:
+        return df
+
+    plan = get_dtype_plan(table_name, df)
+    df_typed = df.copy()
+
+    for column, dtype in plan.items():
+        if str(df_typed[column].dtype) == dtype:
+            continue
+        try:
+            if dtype.startswith('datetime64'):
+                df_typed[column] = pd.to_datetime(df_typed[column])
+            else:
+                df_typed[column] = df_typed[column].astype(dtype)
+        except (ValueError, TypeError):
+            # Mantener el dtype original si la conversión no es segura
+            continue
+
+    return df_typed
+
+
+def read_sql_with_plan(query: str, engine, table_name: str) -> pd.DataFrame:
+    """
+    Ejecuta pd.read_sql y aplica el plan de dtypes de la tabla al resultado.
+
+    Args:
+        query: Consulta SQL (ej: 'SELECT * FROM ordenes_raw')
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla cuyo plan de dtypes se aplica
+
+    Returns:
+        DataFrame con dtypes optimizados
+    """
+    df = pd.read_sql(query, engine)
+    return apply_dtype_plan(df, table_name)
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    """
+    Calcula la memoria real (deep) que ocupa un DataFrame.
+
+    Args:
+        df: DataFrame a medir
+
+    Returns:
+        Memoria en MB
+    """
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
@@ -0,0 +1,303 @@
+"""
+Módulo de verificación de integridad referencial para PRODUCCIÓN y marts de dbt.
+
+Reúne en un solo lugar todas las relaciones de foreign key:
+- Producción: las ForeignKey declaradas en los modelos ORM (models.py). También
+  se verifican las que no existen físicamente en PostgreSQL (ej: las que se omiten
+  en modo particionado).
+- Marts: los tests 'relationships' declarados en dbt/models/marts/schema.yml y
+  dbt/models/marts/relationships.yml.
+
+Cada relación se comprueba con un anti-join (NOT EXISTS) que aprovecha la primary
+key de la tabla referenciada y los índices de foreign keys. Todas las consultas se
+ejecutan en paralelo. El resultado incluye, por relación, el número de filas
+huérfanas y una muestra de las claves huérfanas.
+"""
+
+import os
+import re
+import sys
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+# Import de los modelos de producción
+try:
+    from ..models.models import Base
+except ImportError:
+    from pipeline.models.models import Base
+
+
+# Archivos de dbt con tests 'relationships' de los marts
+MARTS_RELATIONSHIP_FILES = ['schema.yml', 'relationships.yml']
+
+
+# ============================================================================
+# RECOLECCIÓN DE RELACIONES
+# ============================================================================
+
+def get_production_relationships() -> List[Dict[str, str]]:
+    """
+    Obtiene las relaciones de foreign key declaradas en los modelos de producción.
+
+    Returns:
+        Lista de relaciones con las claves 'capa', 'tabla', 'columna',
+        'tabla_ref', 'columna_ref' y 'where'
+    """
+    relationships = []
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            for fk in column.foreign_keys:
+                relationships.append({
+                    'capa': 'produccion',
+                    'tabla': table.name,
+                    'columna': column.name,
+                    'tabla_ref': fk.column.table.name,
+                    'columna_ref': fk.column.name,
+                    'where': None,
+                })
+    return relationships
+
+
+def _parse_ref(expression: str) -> Optional[str]:
+    """Extrae el nombre del modelo de una expresión "ref('modelo')"."""
+    match = re.search(r"ref\(\s*['\"]([^'\"]+)['\"]\s*\)", expression or '')
+    return match.group(1) if match else None
+
+
+def get_marts_relationships() -> List[Dict[str, str]]:
+    """
+    Obtiene las relaciones declaradas como tests 'relationships' en los marts de dbt.
+
+    Returns:
+        Lista de relaciones con el mismo formato que get_production_relationships
+    """
+    marts_dir = os.path.join(path_manager.get_dbt_project_dir(), 'models', 'marts')
+    relationships = []
+
+    for file_name in MARTS_RELATIONSHIP_FILES:
+        file_path = os.path.join(marts_dir, file_name)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            definition = yaml.safe_load(f) or {}
+
+        for model in definition.get('models', []) or []:
+            for column in model.get('columns', []) or []:
+                for test in column.get('tests', []) or []:
+                    if not isinstance(test, dict) or 'relationships' not in test:
+                        continue
+                    spec = test['relationships']
+                    ref_model = _parse_ref(spec.get('to'))
+                    if not ref_model:
+                        continue
+                    relationships.append({
+                        'capa': 'marts',
+                        'tabla': model['name'],
+                        'columna': column['name'],
+                        'tabla_ref': ref_model,
+                        'columna_ref': spec.get('field', column['name']),
+                        'where': (spec.get('config') or {}).get('where'),
+                    })
+
+    return relationships
+
+
+def _resolve_marts_schemas(engine, tables: List[str]) -> Dict[str, str]:
+    """
+    Busca en qué esquema generó dbt cada modelo de marts (ej: 'public_marts').
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Nombres de los modelos
+
+    Returns:
+        Diccionario {modelo: esquema} solo para los modelos que existen
+    """
+    query = """
+        SELECT table_name, table_schema
+        FROM information_schema.tables
+        WHERE table_schema LIKE :schema_pattern
+          AND table_name = ANY(:tables)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {
+            'schema_pattern': ETLConfig.MARTS_SCHEMA_PATTERN,
+            'tables': list(tables)
+        })
+        return {row.table_name: row.table_schema for row in rows}
+
+
+# ============================================================================
+# VERIFICACIÓN
+# ============================================================================
+
+def _check_relationship(engine, relationship: Dict[str, str], sample_size: int) -> Dict:
+    """
+    Ejecuta el anti-join de una relación y cuenta las filas huérfanas.
+
+    Las claves nulas no se consideran huérfanas (igual que una foreign key).
+
+    Args:
+        engine: SQLAlchemy engine
+        relationship: Relación a verificar (con 'origen' y 'destino' ya calificados)
+        sample_size: Número máximo de claves huérfanas de muestra
+
+    Returns:
+        La relación con 'huerfanos' y 'muestra' (o 'error' si la consulta falló)
+    """
+    column = relationship['columna']
+    extra_filter = f"AND ({relationship['where']})" if relationship['where'] else ""
+    query = f"""
+        WITH huerfanos AS (
+            SELECT f.{column} AS clave
+            FROM {relationship['origen']} f
+            WHERE f.{column} IS NOT NULL
+              {extra_filter}
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM {relationship['destino']} t
+                  WHERE t.{relationship['columna_ref']} = f.{column}
+              )
+        )
+        SELECT
+            (SELECT COUNT(*) FROM huerfanos) AS total,
+            ARRAY(SELECT DISTINCT clave FROM huerfanos ORDER BY clave LIMIT :sample_size) AS muestra
+    """
+    result = dict(relationship)
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(text(query), {'sample_size': sample_size}).one()
+        result['huerfanos'] = int(row.total)
+        result['muestra'] = list(row.muestra)
+    except Exception as e:
+        result['huerfanos'] = None
+        result['muestra'] = []
+        result['error'] = str(e)
+    return result
+
+
+def check_referential_integrity(
+    include_production: bool = True,
+    include_marts: bool = True,
+    max_workers: Optional[int] = None,
+    sample_size: Optional[int] = None
+) -> List[Dict]:
+    """
+    Verifica en paralelo todas las relaciones de foreign key de producción y marts.
+
+    Args:
+        include_production: Si True, verifica las relaciones de models.py
+        include_marts: Si True, verifica los tests 'relationships' de los marts de dbt
+                       (los modelos que aún no existen en la base se omiten)
+        max_workers: Consultas simultáneas. Por defecto ETLConfig.INTEGRITY_MAX_WORKERS
+        sample_size: Claves huérfanas de muestra por relación.
+                     Por defecto ETLConfig.INTEGRITY_SAMPLE_SIZE
+
+    Returns:
+        Lista de resultados por relación con 'huerfanos', 'muestra' y, si la
+        consulta falló, 'error'
+    """
+    max_workers = max_workers or ETLConfig.INTEGRITY_MAX_WORKERS
+    sample_size = sample_size or ETLConfig.INTEGRITY_SAMPLE_SIZE
+
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    print(f"\n{'='*80}")
+    print("VERIFICANDO INTEGRIDAD REFERENCIAL")
+    print(f"{'='*80}")
+
+    relationships = []
+    if include_production:
+        for relationship in get_production_relationships():
+            relationship['origen'] = relationship['tabla']
+            relationship['destino'] = relationship['tabla_ref']
+            relationships.append(relationship)
+
+    if include_marts:
+        marts_relationships = get_marts_relationships()
+        models = {r['tabla'] for r in marts_relationships} | {r['tabla_ref'] for r in marts_relationships}
+        schemas = _resolve_marts_schemas(engine, list(models))
+        for relationship in marts_relationships:
+            if relationship['tabla'] not in schemas or relationship['tabla_ref'] not in schemas:
+                print(f"   ⚠ Modelo no encontrado en la base, se omite: "
+                      f"{relationship['tabla']}.{relationship['columna']} → {relationship['tabla_ref']}")
+                continue
+            relationship['origen'] = f"{schemas[relationship['tabla']]}.{relationship['tabla']}"
+            relationship['destino'] = f"{schemas[relationship['tabla_ref']]}.{relationship['tabla_ref']}"
+            relationships.append(relationship)
+
+    if not relationships:
+        print("   ⚠ No hay relaciones que verificar")
+        return []
+
+    print(f"   Verificando {len(relationships)} relaciones con {max_workers} consultas en paralelo...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda relationship: _check_relationship(engine, relationship, sample_size),
+            relationships
+        ))
+
+    for result in results:
+        name = (f"[{result['capa']}] {result['tabla']}.{result['columna']} → "
+                f"{result['tabla_ref']}.{result['columna_ref']}")
+        if result.get('error'):
+            print(f"   ✗ {name}: error al verificar ({result['error']})")
+        elif result['huerfanos'] > 0:
+            print(f"   ✗ {name}: {result['huerfanos']} filas huérfanas (ej: {result['muestra']})")
+        else:
+            print(f"   ✓ {name}")
+
+    total_orphans = sum(result['huerfanos'] or 0 for result in results)
+    failed = [result for result in results if result.get('error') or result['huerfanos']]
+    if failed:
+        print(f"\n   ✗ {len(failed)} relaciones con problemas ({total_orphans} filas huérfanas)")
+    else:
+        print(f"\n   ✓ Integridad referencial correcta en {len(results)} relaciones")
+
+    return results
+
+
+def assert_referential_integrity(**kwargs) -> List[Dict]:
+    """
+    Ejecuta check_referential_integrity y falla si alguna relación tiene huérfanos.
+
+    Pensada como compuerta (gate) después de la carga a producción.
+
+    Args:
+        **kwargs: Argumentos de check_referential_integrity
+
+    Returns:
+        Resultados de la verificación (si no hubo huérfanos)
+
+    Raises:
+        ValueError: Si alguna relación tiene filas huérfanas o no se pudo verificar
+    """
+    results = check_referential_integrity(**kwargs)
+    failed = [result for result in results if result.get('error') or result['huerfanos']]
+    if failed:
+        detail = ', '.join(f"{r['tabla']}.{r['columna']}" for r in failed)
+        raise ValueError(f"Integridad referencial violada en: {detail}")
+    return results
@@ -10,6 +10,13 @@ IMPORTANTE: Esta función carga datos CRUDOS (raw) a tablas staging usando SOLO
 - No aplica constraints ni validaciones (eso se hace en producción)
 
 Utiliza el comando COPY nativo de PostgreSQL vía psycopg2 para máxima eficiencia.
+Después de cada COPY se ejecuta ANALYZE sobre la tabla (ETLConfig.ANALYZE_STAGING_AFTER_LOAD).
+En modo delta (ETLConfig.DELTA_MODE) la tabla solo se recarga (TRUNCATE + COPY) si
+el CSV cambió respecto de la ejecución anterior (ver delta.py).
+En modo incremental (ETLConfig.INCREMENTAL_MODE) las tablas de hechos se reemplazan
+con las filas posteriores a su marca de agua (ver watermarks.py).
+Si la entrada es un patrón glob o una lista de archivos, cada archivo se carga como
+una parte con su propio COPY, en paralelo (ver parallel_copy.py).
 """
 
 import os
@@ -17,7 +24,8 @@ import sys
 import io
 import pandas as pd
 import psycopg2
-from typing import List, Optional
+from sqlalchemy import text
+from typing import List, Optional, Tuple, Union
 
 # Import PathManager y ETLConfig desde utils (mismo nivel: pipeline/)
 try:
@@ -47,6 +55,18 @@ except ImportError:
     # Si falla el import relativo, usar import absoluto
     from clean_column_name import clean_column_name
 
+# Import motor de deltas por fila
+try:
+    from .delta import compute_staging_delta, delta_has_changes
+except ImportError:
+    from pipeline.etl.delta import compute_staging_delta, delta_has_changes
+
+# Import lectura incremental por marca de agua
+try:
+    from .watermarks import is_incremental_table, read_incremental_csv
+except ImportError:
+    from pipeline.etl.watermarks import is_incremental_table, read_incremental_csv
+
 # Lista de columnas de ID primario que deben excluirse del CSV
 PRIMARY_KEY_COLUMNS = {
     'usuario_id',
@@ -111,7 +131,11 @@ def get_expected_columns(table_name_raw: str) -> List[str]:
         )
 
 
-def filter_columns_for_staging(df: pd.DataFrame, table_name_raw: str) -> pd.DataFrame:
+def filter_columns_for_staging(
+    df: pd.DataFrame,
+    table_name_raw: str,
+    expected_columns: Optional[List[str]] = None
+) -> pd.DataFrame:
     """
     Filtra las columnas del DataFrame para que coincidan con las esperadas en staging.
     Excluye columnas de ID primario si existen en el CSV.
@@ -119,12 +143,15 @@ def filter_columns_for_staging(df: pd.DataFrame, table_name_raw: str) -> pd.Data
     Args:
         df: DataFrame con datos del CSV
         table_name_raw: Nombre de la tabla staging destino
+        expected_columns: Columnas de la tabla staging ya consultadas (opcional;
+                          si es None se leen de PostgreSQL)
         
     Returns:
         DataFrame filtrado con solo las columnas esperadas en staging
     """
     # Obtener columnas esperadas en la tabla staging
-    expected_columns = get_expected_columns(table_name_raw)
+    if expected_columns is None:
+        expected_columns = get_expected_columns(table_name_raw)
     
     # Obtener columnas disponibles en el DataFrame
     available_columns = set(df.columns)
@@ -152,7 +179,206 @@ def filter_columns_for_staging(df: pd.DataFrame, table_name_raw: str) -> pd.Data
     return df_filtered
 
 
-def load_raw_data(file_name: str, table_name_raw: str) -> None:
+def _dataframe_to_csv_buffer(df: pd.DataFrame) -> io.StringIO:
+    """
+    Convierte un DataFrame a CSV en memoria con formato compatible con COPY CSV de PostgreSQL.
+    
+    Args:
+        df: DataFrame a convertir
+        
+    Returns:
+        Buffer StringIO posicionado al inicio
+    """
+    csv_buffer = io.StringIO()
+    df.to_csv(
+        csv_buffer,
+        index=False,  # No incluir el índice
+        header=False,  # COPY no necesita header
+        sep=',',  # Separador de columnas
+        na_rep='',  # Representación de valores nulos (vacío para COPY)
+        quoting=1,  # QUOTE_MINIMAL (solo cuando es necesario)
+        escapechar='\\',  # Carácter de escape
+        doublequote=True,  # Escapar comillas dobles con doble comilla
+        lineterminator='\n'  # Terminador de línea Unix
+    )
+    csv_buffer.seek(0)  # Volver al inicio del buffer
+    return csv_buffer
+
+
+def _copy_dataframe(cursor, df: pd.DataFrame, table_name_raw: str) -> None:
+    """
+    Ejecuta COPY FROM STDIN de un DataFrame sobre una tabla staging.
+    
+    Args:
+        cursor: Cursor de psycopg2 (dentro de una transacción abierta)
+        df: DataFrame con las columnas de la tabla staging
+        table_name_raw: Nombre de la tabla staging
+    """
+    csv_buffer = _dataframe_to_csv_buffer(df)
+    
+    # Obtener los nombres de las columnas en el orden correcto
+    columns = ', '.join(df.columns)
+    
+    # FORMAT CSV con DELIMITER ',' y NULL '' para valores nulos
+    cursor.copy_expert(
+        f"COPY {table_name_raw} ({columns}) FROM STDIN WITH (FORMAT CSV, DELIMITER ',', NULL '', QUOTE '\"', ESCAPE '\\')",
+        csv_buffer
+    )
+
+
+def analyze_staging_table(cursor, table_name_raw: str) -> None:
+    """
+    Actualiza las estadísticas del planner de una tabla staging recién cargada
+    (si ETLConfig.ANALYZE_STAGING_AFTER_LOAD está activo).
+    
+    Se ejecuta dentro de la misma transacción que el COPY: ANALYZE ve las filas
+    recién insertadas y no hace falta otra conexión ni otro commit.
+    
+    Args:
+        cursor: Cursor de psycopg2 (dentro de una transacción abierta)
+        table_name_raw: Nombre de la tabla staging
+    """
+    if ETLConfig.ANALYZE_STAGING_AFTER_LOAD:
+        cursor.execute(f"ANALYZE {table_name_raw}")
+
+
+def _check_reject_threshold(
+    rejected: List[Tuple[pd.DataFrame, str]],
+    table_name_raw: str,
+    total_rows: Optional[int] = None
+) -> None:
+    """
+    Aborta la carga si las filas rechazadas superan los umbrales de ETLConfig.
+    
+    Args:
+        rejected: Filas rechazadas hasta el momento
+        table_name_raw: Nombre de la tabla staging
+        total_rows: Filas totales del lote (si None, solo se valida COPY_MAX_REJECTS)
+    
+    Raises:
+        RuntimeError: Si se supera COPY_MAX_REJECTS o COPY_MAX_REJECT_RATIO
+    """
+    max_rejects = ETLConfig.COPY_MAX_REJECTS
+    if max_rejects is not None and len(rejected) > max_rejects:
+        raise RuntimeError(
+            f"'{table_name_raw}': más de {max_rejects} filas rechazadas por PostgreSQL "
+            f"(ETLConfig.COPY_MAX_REJECTS); se aborta la carga"
+        )
+    
+    max_ratio = ETLConfig.COPY_MAX_REJECT_RATIO
+    if max_ratio is not None and total_rows and len(rejected) / total_rows > max_ratio:
+        raise RuntimeError(
+            f"'{table_name_raw}': {len(rejected)} de {total_rows} filas rechazadas por PostgreSQL "
+            f"(más del {max_ratio:.0%}, ETLConfig.COPY_MAX_REJECT_RATIO); se aborta la carga"
+        )
+
+
+def _get_position_referenced_tables() -> set:
+    """Tablas staging cuyas posiciones de fila referencian otras tablas (ver parallel_copy.py)."""
+    try:
+        from .parallel_copy import get_position_referenced_tables
+    except ImportError:
+        from pipeline.etl.parallel_copy import get_position_referenced_tables
+    return get_position_referenced_tables()
+
+
+def _copy_with_bisection(
+    cursor,
+    df: pd.DataFrame,
+    table_name_raw: str,
+    rejected: List[Tuple[pd.DataFrame, str]],
+    keep_positions: Optional[bool] = None
+) -> int:
+    """
+    Ejecuta COPY de un lote y, si falla, lo divide en mitades y reintenta recursivamente.
+    
+    Cada intento se ejecuta dentro de un SAVEPOINT, de modo que un fallo solo revierte
+    el sub-lote actual. Con k filas inválidas en n filas se necesitan O(k log n) COPYs
+    adicionales; las filas válidas se cargan en lotes grandes. Si los rechazos superan
+    ETLConfig.COPY_MAX_REJECTS se deja de bisecar y se lanza RuntimeError (el llamador
+    revierte la transacción).
+    
+    Las foreign keys de los CSV son posiciones de fila: en las tablas referenciadas
+    por otras, cada fila rechazada se reemplaza por una fila con todas sus columnas
+    NULL, así las filas siguientes conservan su posición (la fila vacía no pasa la
+    validación de producción y va a cuarentena sin desplazar a las demás).
+    
+    Args:
+        cursor: Cursor de psycopg2 (dentro de una transacción abierta)
+        df: Lote a cargar
+        table_name_raw: Nombre de la tabla staging
+        rejected: Lista donde se acumulan tuplas (fila_rechazada, error_postgres)
+        keep_positions: Si True, reemplaza cada fila rechazada por una fila NULL.
+                        Si None, solo en las tablas referenciadas por posición
+        
+    Returns:
+        Número de filas cargadas exitosamente
+    """
+    if len(df) == 0:
+        return 0
+    if keep_positions is None:
+        keep_positions = table_name_raw in _get_position_referenced_tables()
+    
+    cursor.execute("SAVEPOINT copy_lote")
+    try:
+        _copy_dataframe(cursor, df, table_name_raw)
+        cursor.execute("RELEASE SAVEPOINT copy_lote")
+        return len(df)
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT copy_lote")
+        cursor.execute("RELEASE SAVEPOINT copy_lote")
+        
+        if len(df) == 1:
+            error = (e.pgerror or str(e)).strip().replace('\n', ' | ')
+            rejected.append((df, error))
+            _check_reject_threshold(rejected, table_name_raw)
+            if keep_positions:
+                # Fila NULL en el lugar de la rechazada (staging no tiene NOT NULL ni defaults)
+                cursor.execute(f"INSERT INTO {table_name_raw} DEFAULT VALUES")
+            return 0
+    
+    mitad = len(df) // 2
+    return (
+        _copy_with_bisection(cursor, df.iloc[:mitad], table_name_raw, rejected, keep_positions)
+        + _copy_with_bisection(cursor, df.iloc[mitad:], table_name_raw, rejected, keep_positions)
+    )
+
+
+def _write_rejects_file(rejected: List[Tuple[pd.DataFrame, str]], table_name_raw: str) -> str:
+    """
+    Escribe las filas rechazadas por PostgreSQL en un archivo CSV de rechazos.
+    
+    El archivo incluye las columnas originales, el número de línea en el CSV de origen
+    ('fila_csv', contando el header) y el mensaje de error de PostgreSQL ('error_postgres').
+    
+    Args:
+        rejected: Lista de tuplas (fila_rechazada, error_postgres)
+        table_name_raw: Nombre de la tabla staging
+        
+    Returns:
+        Ruta absoluta del archivo de rechazos generado
+    """
+    rejects_dir = path_manager.get_rejects_dir()
+    os.makedirs(rejects_dir, exist_ok=True)
+    
+    df_rejects = pd.concat(
+        [row.assign(error_postgres=error) for row, error in rejected]
+    )
+    df_rejects.insert(0, 'fila_csv', df_rejects.index + 2)
+    
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+    rejects_path = os.path.join(rejects_dir, f"{table_name_raw}_rejects_{timestamp}.csv")
+    df_rejects.to_csv(rejects_path, index=False, encoding=ETLConfig.CSV_ENCODING)
+    
+    return rejects_path
+
+
+def load_raw_data(
+    file_name: Union[str, List[str]],
+    table_name_raw: str,
+    error_tolerant: Optional[bool] = None,
+    incremental: Optional[bool] = None
+) -> int:
     """
     Lee un archivo CSV, filtra columnas (excluyendo IDs primarios) e inserta los datos
     en una tabla STAGING de PostgreSQL usando el comando COPY nativo.
@@ -165,11 +391,26 @@ def load_raw_data(file_name: str, table_name_raw: str) -> None:
     
     Utiliza COPY de PostgreSQL vía psycopg2 para máxima eficiencia en la carga de datos.
     
+    En modo tolerante a errores, si el COPY falla el lote se divide en mitades
+    recursivamente (dentro de savepoints) hasta aislar las filas inválidas, que se
+    escriben en un archivo de rechazos junto con el error de PostgreSQL.
+    
     Args:
-        file_name: Nombre del archivo CSV (ruta relativa desde la raíz del proyecto)
+        file_name: Nombre del archivo CSV (ruta relativa desde la raíz del proyecto).
+                   Un patrón glob o una lista de archivos se carga por partes con
+                   load_raw_data_parts (ver parallel_copy.py)
         table_name_raw: Nombre de la tabla STAGING en PostgreSQL (debe terminar en '_raw')
                       Ejemplo: 'usuarios_raw', 'productos_raw'
+        error_tolerant: Si True, aísla y rechaza filas inválidas en lugar de abortar la carga.
+                        Si None, usa ETLConfig.COPY_ERROR_TOLERANT
+        incremental: Si True, las tablas de hechos solo cargan las filas posteriores a su
+                     marca de agua y el resto de tablas se carga en modo delta.
+                     Si None, usa ETLConfig.INCREMENTAL_MODE
         
+    Returns:
+        Número de filas cargadas a staging (0 si el archivo no existe, si no hay filas
+        nuevas o si la tabla no cambió desde la ejecución anterior)
+    
     Raises:
         ValueError: Si la tabla no está en el mapeo o no hay columnas válidas
         Exception: Si ocurre un error al leer el CSV o insertar los datos
@@ -183,20 +424,47 @@ def load_raw_data(file_name: str, table_name_raw: str) -> None:
                 f"Ejemplo correcto: 'usuarios_raw'"
             )
         
+        # Patrón glob o lista de archivos: una parte por archivo, con COPY en paralelo
+        try:
+            from .parallel_copy import is_multi_part, load_raw_data_parts
+        except ImportError:
+            from pipeline.etl.parallel_copy import is_multi_part, load_raw_data_parts
+        if is_multi_part(file_name):
+            return load_raw_data_parts(
+                file_name, table_name_raw, error_tolerant=error_tolerant, incremental=incremental
+            )
+        
         # Obtener la ruta completa del archivo CSV usando PathManager
         csv_path = path_manager.get_csv_path(file_name)
         
         if not os.path.exists(csv_path):
             print(f"Advertencia: No se encontró el archivo {csv_path}")
-            return
+            return 0
         
         print(f"\n{'='*80}")
         print(f"CARGANDO DATOS CRUDOS A STAGING: {table_name_raw}")
         print(f"{'='*80}")
         print(f"Archivo CSV: {file_name}")
         
-        # Leer el CSV con pandas usando configuración centralizada
-        df = pd.read_csv(csv_path, encoding=ETLConfig.CSV_ENCODING)
+        if incremental is None:
+            incremental = ETLConfig.INCREMENTAL_MODE
+        incremental_table = incremental and is_incremental_table(table_name_raw)
+        
+        # Obtener la instancia única del DBConnector
+        db = DBConnector.get_instance()
+        
+        if incremental_table:
+            # Solo las filas posteriores a la marca de agua (o de las órdenes nuevas)
+            df = read_incremental_csv(table_name_raw, csv_path)
+            if len(df) == 0:
+                with db.get_engine().begin() as conn:
+                    conn.execute(text(f"TRUNCATE TABLE {table_name_raw}"))
+                print(f"   ✓ Sin filas nuevas: '{table_name_raw}' queda vacía")
+                print(f"{'='*80}\n")
+                return 0
+        else:
+            # Leer el CSV con pandas usando configuración centralizada
+            df = pd.read_csv(csv_path, encoding=ETLConfig.CSV_ENCODING)
         
         print(f"   ✓ Archivo leído. Filas: {len(df)}, Columnas originales: {len(df.columns)}")
         
@@ -209,48 +477,55 @@ def load_raw_data(file_name: str, table_name_raw: str) -> None:
         print(f"   ✓ Columnas filtradas. Columnas a cargar: {len(df_filtered.columns)}")
         print(f"   ✓ Columnas: {', '.join(df_filtered.columns)}")
         
-        # Obtener la instancia única del DBConnector
-        db = DBConnector.get_instance()
+        # Modo delta (implícito en modo incremental para las tablas sin marca de agua):
+        # comparar con los hashes de la ejecución anterior
+        delta_mode = (ETLConfig.DELTA_MODE or incremental) and not incremental_table
+        if delta_mode:
+            delta = compute_staging_delta(table_name_raw, df_filtered, engine=db.get_engine())
+            if not delta_has_changes(delta):
+                print(f"   ✓ Sin cambios desde la ejecución anterior: se conserva '{table_name_raw}'")
+                print(f"{'='*80}\n")
+                return 0
+        
+        if error_tolerant is None:
+            error_tolerant = ETLConfig.COPY_ERROR_TOLERANT
         
-        print(f"\n   Cargando datos a la tabla '{table_name_raw}' usando COPY...")
+        modo = "tolerante a errores" if error_tolerant else "estricto"
+        print(f"\n   Cargando datos a la tabla '{table_name_raw}' usando COPY (modo {modo})...")
         
         # Obtener la conexión raw de psycopg2 usando el context manager del DBConnector
-        with db.get_raw_connection() as conn:
+        # (perfil bulk_load: más work_mem y synchronous_commit=off para la carga a staging)
+        with db.get_raw_connection(profile='bulk_load') as conn:
             # Obtener el cursor de psycopg2
             cursor = conn.cursor()
             
             try:
-                # Convertir DataFrame filtrado a CSV en memoria (StringIO)
-                # Usar formato compatible con COPY CSV de PostgreSQL
-                csv_buffer = io.StringIO()
-                df_filtered.to_csv(
-                    csv_buffer,
-                    index=False,  # No incluir el índice
-                    header=False,  # COPY no necesita header
-                    sep=',',  # Separador de columnas
-                    na_rep='',  # Representación de valores nulos (vacío para COPY)
-                    quoting=1,  # QUOTE_MINIMAL (solo cuando es necesario)
-                    escapechar='\\',  # Carácter de escape
-                    doublequote=True,  # Escapar comillas dobles con doble comilla
-                    lineterminator='\n'  # Terminador de línea Unix
-                )
-                csv_buffer.seek(0)  # Volver al inicio del buffer
+                # En modo delta o incremental la tabla se reemplaza completa
+                # (misma transacción que el COPY)
+                if delta_mode or incremental_table:
+                    cursor.execute(f"TRUNCATE TABLE {table_name_raw}")
                 
-                # Obtener los nombres de las columnas en el orden correcto
-                columns = ', '.join(df_filtered.columns)
+                if error_tolerant:
+                    # Aislar filas inválidas bisecando el lote dentro de savepoints
+                    rejected = []
+                    filas_cargadas = _copy_with_bisection(cursor, df_filtered, table_name_raw, rejected)
+                    _check_reject_threshold(rejected, table_name_raw, total_rows=len(df_filtered))
+                else:
+                    # COPY es mucho más rápido que INSERT individuales
+                    _copy_dataframe(cursor, df_filtered, table_name_raw)
+                    filas_cargadas = len(df_filtered)
+                    rejected = []
                 
-                # Ejecutar COPY FROM usando psycopg2
-                # COPY es mucho más rápido que INSERT individuales
-                # FORMAT CSV con DELIMITER ',' y NULL '' para valores nulos
-                cursor.copy_expert(
-                    f"COPY {table_name_raw} ({columns}) FROM STDIN WITH (FORMAT CSV, DELIMITER ',', NULL '', QUOTE '\"', ESCAPE '\\')",
-                    csv_buffer
-                )
+                # Estadísticas para las transformaciones y las vistas staging de dbt
+                analyze_staging_table(cursor, table_name_raw)
                 
                 # Confirmar la transacción
                 conn.commit()
                 
-                print(f"   ✓ Datos cargados exitosamente a '{table_name_raw}' ({len(df_filtered)} filas)")
+                print(f"   ✓ Datos cargados exitosamente a '{table_name_raw}' ({filas_cargadas} filas)")
+                if rejected:
+                    rejects_path = _write_rejects_file(rejected, table_name_raw)
+                    print(f"   ⚠ {len(rejected)} filas rechazadas por PostgreSQL → {rejects_path}")
                 print(f"{'='*80}\n")
                 
             except Exception as e:
@@ -261,6 +536,8 @@ def load_raw_data(file_name: str, table_name_raw: str) -> None:
                 # Cerrar cursor (la conexión se cierra automáticamente por el context manager)
                 cursor.close()
         
+        return filas_cargadas
+    
     except Exception as e:
         print(f"\n{'='*80}")
         print(f"✗ ERROR al procesar {file_name}: {str(e)}")
@@ -8,6 +8,7 @@ IMPORTANTE:
 - Se respeta el orden de carga (tablas independientes primero)
 """
 
+import io
 import os
 import sys
 import pandas as pd
@@ -32,6 +33,34 @@ path_manager.setup_sys_path()
 
 # Import DBConnector desde la raíz del proyecto
 from database.db_connector import DBConnector
+from database.query_log import raw_cursor
+from database.query_log import query_context
+
+# Import validación de constraints y configuración
+try:
+    from .validation import validate_constraints, quarantine_rows
+    from .dtype_plan import read_sql_with_plan
+    from .row_hash import compute_row_hash, HASH_COLUMN
+    from ..models.partitioning import PARTITIONED_TABLES, is_partitioned_table, ensure_monthly_partitions
+    from .bulk_mode import prepare_bulk_load, restore_bulk_objects
+    from .delta import (
+        compute_staging_delta, delta_has_changes, detect_position_shift, save_staging_hashes,
+        save_row_ids, load_row_ids, delete_saved_state, ROW_KEY_COLUMN
+    )
+    from .watermarks import is_incremental_table, get_incremental_batch, save_watermark
+    from ..utils.config import ETLConfig
+except ImportError:
+    from pipeline.etl.validation import validate_constraints, quarantine_rows
+    from pipeline.etl.dtype_plan import read_sql_with_plan
+    from pipeline.etl.row_hash import compute_row_hash, HASH_COLUMN
+    from pipeline.models.partitioning import PARTITIONED_TABLES, is_partitioned_table, ensure_monthly_partitions
+    from pipeline.etl.bulk_mode import prepare_bulk_load, restore_bulk_objects
+    from pipeline.etl.delta import (
+        compute_staging_delta, delta_has_changes, detect_position_shift, save_staging_hashes,
+        save_row_ids, load_row_ids, delete_saved_state, ROW_KEY_COLUMN
+    )
+    from pipeline.etl.watermarks import is_incremental_table, get_incremental_batch, save_watermark
+    from config import ETLConfig
 
 
 # ============================================================================
@@ -58,6 +87,7 @@ def _get_primary_key_column(table_name: str, engine) -> Optional[str]:
         WHERE tc.table_name = :table_name
             AND tc.table_schema = 'public'
             AND tc.constraint_type = 'PRIMARY KEY'
+        ORDER BY ku.ordinal_position
         LIMIT 1;
     """
     
@@ -82,6 +112,43 @@ def _get_primary_key_column(table_name: str, engine) -> Optional[str]:
     return fallback
 
 
+def _prepare_partitions(df: pd.DataFrame, target_table: str, engine) -> pd.DataFrame:
+    """
+    Prepara la carga de una tabla particionada por mes.
+    
+    - Las filas sin fecha de partición se envían a cuarentena (la fecha es parte de la PK)
+    - Se crean las particiones mensuales que falten para las fechas del lote
+    
+    Args:
+        df: DataFrame a insertar
+        target_table: Nombre de la tabla particionada
+        engine: SQLAlchemy engine
+        
+    Returns:
+        DataFrame con las filas que se pueden insertar
+    """
+    partition_column = PARTITIONED_TABLES[target_table]
+    
+    if partition_column in df.columns:
+        sin_fecha = df[partition_column].isna()
+        if sin_fecha.any():
+            df_rejected = df.loc[sin_fecha].copy()
+            df_rejected['motivo_cuarentena'] = f"PARTICIÓN: {partition_column} nula"
+            quarantine_rows(df_rejected, target_table, engine)
+            print(f"   ⚠ {int(sin_fecha.sum())} filas sin {partition_column} enviadas a cuarentena")
+            df = df.loc[~sin_fecha]
+        dates = df[partition_column]
+    else:
+        # Sin columna de fecha se aplica el DEFAULT now(): basta la partición del mes actual
+        dates = pd.Series([pd.Timestamp.now()])
+    
+    created = ensure_monthly_partitions(engine, target_table, dates)
+    if created:
+        print(f"   ✓ {len(created)} particiones mensuales creadas: {', '.join(created)}")
+    
+    return df
+
+
 # ============================================================================
 # CONFIGURACIÓN DE ORDEN Y MAPEO DE TABLAS
 # ============================================================================
@@ -168,14 +235,14 @@ def create_id_mapping(
     try:
         # Leer datos de staging
         query_source = f"SELECT * FROM {source_table}"
-        df_source = pd.read_sql(query_source, engine)
+        df_source = read_sql_with_plan(query_source, engine, source_table)
         
         if len(df_source) == 0:
             return mapping
         
         # Leer datos de producción (ya cargados)
         query_target = f"SELECT * FROM {target_table}"
-        df_target = pd.read_sql(query_target, engine)
+        df_target = read_sql_with_plan(query_target, engine, target_table)
         
         if len(df_target) == 0:
             return mapping
@@ -281,7 +348,7 @@ def resolve_foreign_keys(
                 df_staging_target = staging_data[source_table_name]
             else:
                 query_staging = f"SELECT * FROM {source_table_name}"
-                df_staging_target = pd.read_sql(query_staging, engine)
+                df_staging_target = read_sql_with_plan(query_staging, engine, source_table_name)
             
             # Obtener nombre real de la columna primary key
             target_id_col = _get_primary_key_column(target_table, engine)
@@ -290,7 +357,7 @@ def resolve_foreign_keys(
             
             # Leer datos de producción de la tabla target
             query_production = f"SELECT * FROM {target_table} ORDER BY {target_id_col}"
-            df_production_target = pd.read_sql(query_production, engine)
+            df_production_target = read_sql_with_plan(query_production, engine, target_table)
             
             # Crear mapeo por posición (asumiendo mismo orden)
             position_mapping = {}
@@ -345,6 +412,259 @@ def resolve_foreign_keys(
     return df_resolved
 
 
+def build_production_id_mapping(
+    engine,
+    target_table: str,
+    target_id_column: str,
+    natural_keys: Optional[List[str]] = None
+) -> Dict[Any, int]:
+    """
+    Construye el mapeo de IDs de todas las filas de una tabla de producción.
+    
+    En modo delta solo se insertan las filas nuevas, pero las tablas dependientes
+    referencian a todas: el mapeo se arma desde producción y no desde el lote.
+    
+    Args:
+        engine: SQLAlchemy engine
+        target_table: Nombre de la tabla de producción
+        target_id_column: Columna primary key de la tabla
+        natural_keys: Columnas del identificador natural. Si None, mapeo por posición
+    
+    Returns:
+        - Con natural keys: {clave natural ('|' si es compuesta): ID de producción}
+        - Sin natural keys: {posición 1-based en staging: ID de producción}, tomado del
+          registro de IDs guardado al insertar (ver delta.save_row_ids)
+    """
+    if natural_keys:
+        columns = ', '.join([target_id_column] + natural_keys)
+        df_target = pd.read_sql(f"SELECT {columns} FROM {target_table} ORDER BY {target_id_column}", engine)
+        natural_key = df_target[natural_keys[0]].astype(str)
+        for key in natural_keys[1:]:
+            natural_key = natural_key + '|' + df_target[key].astype(str)
+        return dict(zip(natural_key, df_target[target_id_column].astype(int)))
+    
+    mapping = load_row_ids(engine, target_table)
+    if mapping is not None:
+        return mapping
+    
+    # Producción cargada antes de existir el registro: se asume el orden de los IDs
+    print(f"   ⚠ '{target_table}' no tiene registro de IDs por posición: se usa el orden de sus IDs")
+    df_target = pd.read_sql(f"SELECT {target_id_column} FROM {target_table} ORDER BY {target_id_column}", engine)
+    return {
+        position: int(production_id)
+        for position, production_id in enumerate(df_target[target_id_column], start=1)
+    }
+
+
+def _allocate_ids(conn, target_table: str, target_id_column: str, count: int) -> List[int]:
+    """
+    Reserva count IDs de la secuencia de la primary key de una tabla, para insertar
+    las filas con su ID explícito y saber qué ID recibió cada una.
+    """
+    result = conn.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table_name, :column)) FROM generate_series(1, :count)"),
+        {'table_name': target_table, 'column': target_id_column, 'count': count}
+    )
+    return sorted(int(row[0]) for row in result)
+
+
+def _get_row_positions(df: pd.DataFrame, source_table: str, incremental: bool) -> pd.Series:
+    """
+    Posición 1-based de cada fila de staging (la referencia de las FKs crudas del CSV).
+    
+    En modo incremental staging solo tiene el lote nuevo: las posiciones son las
+    del lote en el CSV (ver watermarks.get_incremental_batch).
+    """
+    positions = pd.Series(np.arange(1, len(df) + 1), index=df.index)
+    if incremental:
+        batch = get_incremental_batch(source_table)
+        if batch is not None and len(batch['positions']) == len(df):
+            positions = pd.Series(np.asarray(batch['positions'], dtype='int64'), index=df.index)
+        elif batch is not None:
+            print(f"   ⚠ El lote de '{source_table}' no coincide con staging: "
+                  f"posiciones desde la primera fila del lote")
+            offset = int(batch['positions'][0]) - 1 if len(batch['positions']) else 0
+            positions = positions + offset
+    return positions
+
+
+def _prepare_rows_for_write(
+    df: pd.DataFrame,
+    columns: List[str],
+    target_table: str,
+    engine,
+    validate: bool,
+    check_existing: bool = True
+) -> pd.DataFrame:
+    """
+    Prepara filas para escribir en producción: hash de fila, validación de constraints
+    (las filas inválidas van a cuarentena) y particiones mensuales.
+    
+    Args:
+        df: DataFrame con las foreign keys ya resueltas
+        columns: Columnas a escribir
+        target_table: Nombre de la tabla de producción
+        engine: SQLAlchemy engine
+        validate: Si True, valida las constraints del modelo
+        check_existing: Si True, la unicidad también se valida contra las filas
+                        existentes en producción (False para filas a actualizar)
+    
+    Returns:
+        DataFrame con las filas válidas (conserva el índice de staging)
+    """
+    df_to_write = df[columns].copy()
+    
+    # Hash de fila para la detección de cambios de los snapshots SCD Type 2
+    if target_table in ETLConfig.ROW_HASH_COLUMNS:
+        df_to_write[HASH_COLUMN] = compute_row_hash(
+            df_to_write, ETLConfig.ROW_HASH_COLUMNS[target_table]
+        )
+    
+    # Validar constraints antes de escribir (las filas inválidas van a cuarentena)
+    if validate:
+        df_to_write, df_rejected = validate_constraints(
+            df_to_write, target_table, engine, check_existing=check_existing
+        )
+        if len(df_rejected) > 0:
+            filas_cuarentena = quarantine_rows(df_rejected, target_table, engine)
+            print(f"   ⚠ {filas_cuarentena} filas enviadas a cuarentena "
+                  f"({target_table}{ETLConfig.QUARANTINE_SUFFIX})")
+        else:
+            print(f"   ✓ Constraints validadas: todas las filas son válidas")
+    
+    # Tablas particionadas por mes: la fecha es parte de la PK y cada mes
+    # necesita su partición antes de escribir
+    if target_table in PARTITIONED_TABLES and is_partitioned_table(engine, target_table):
+        df_to_write = _prepare_partitions(df_to_write, target_table, engine)
+    
+    return df_to_write
+
+
+def _apply_delta_updates(
+    df_updated: pd.DataFrame,
+    target_table: str,
+    target_id_column: str,
+    natural_keys: Optional[List[str]],
+    engine,
+    conn
+) -> int:
+    """
+    Aplica en producción las filas modificadas de un delta con un único UPDATE ... FROM
+    sobre una tabla temporal cargada con COPY, dentro de la transacción de la tabla.
+    
+    Las filas se identifican por su identificador natural o, en tablas sin él, por
+    el ID que recibió su posición al insertarse (registro etl_row_ids).
+    
+    Args:
+        df_updated: Filas modificadas ya preparadas (incluye ROW_KEY_COLUMN)
+        target_table: Nombre de la tabla de producción
+        target_id_column: Columna primary key de la tabla
+        natural_keys: Columnas del identificador natural (None = posición)
+        engine: SQLAlchemy engine
+        conn: Conexión SQLAlchemy dentro de la transacción que escribe la tabla
+    
+    Returns:
+        Número de filas actualizadas
+    """
+    df_updated = df_updated.copy()
+    
+    if natural_keys:
+        match_columns = natural_keys
+    else:
+        # Resolver la posición de cada fila al ID que recibió al insertarse
+        production_ids = build_production_id_mapping(engine, target_table, target_id_column)
+        positions = df_updated[ROW_KEY_COLUMN].astype(int)
+        df_updated[target_id_column] = positions.map(production_ids)
+        sin_id = df_updated[target_id_column].isna()
+        if sin_id.any():
+            print(f"   ⚠ {int(sin_id.sum())} filas modificadas sin fila en producción, se omiten")
+            df_updated = df_updated.loc[~sin_id]
+        df_updated[target_id_column] = df_updated[target_id_column].astype('int64')
+        match_columns = [target_id_column]
+    
+    df_updated = df_updated.drop(columns=[ROW_KEY_COLUMN])
+    if len(df_updated) == 0:
+        return 0
+    
+    columns = list(df_updated.columns)
+    set_columns = [col for col in columns if col not in match_columns]
+    temp_table = f"_delta_{target_table}"
+    
+    buffer = io.StringIO()
+    df_updated.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    
+    # Cursor de psycopg2 de la misma conexión (y transacción) para usar COPY
+    cursor = raw_cursor(conn)
+    try:
+        # CREATE TABLE AS copia los tipos pero no los NOT NULL ni los defaults
+        cursor.execute(
+            f"CREATE TEMP TABLE {temp_table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(columns)} FROM {target_table} WITH NO DATA"
+        )
+        cursor.copy_expert(
+            f"COPY {temp_table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV)",
+            buffer
+        )
+        cursor.execute(
+            f"UPDATE {target_table} AS t SET "
+            + ', '.join(f"{col} = s.{col}" for col in set_columns)
+            + f" FROM {temp_table} AS s WHERE "
+            + ' AND '.join(f"t.{col} = s.{col}" for col in match_columns)
+        )
+        filas_actualizadas = cursor.rowcount
+    finally:
+        cursor.close()
+    
+    return filas_actualizadas
+
+
+def _save_load_state(conn, source_table: str, target_table: str, delta: bool, incremental: bool) -> None:
+    """
+    Guarda los hashes del delta y la marca de agua del lote de una tabla en la misma
+    transacción que la escribe en producción: si la transacción se confirma, la
+    siguiente ejecución no vuelve a insertar esas filas; si falla, nada avanza.
+    """
+    if delta:
+        save_staging_hashes(conn, target_table)
+    if incremental:
+        save_watermark(conn, source_table)
+
+
+def _get_dependent_tables(target_table: str) -> List[str]:
+    """Tablas de LOAD_ORDER que referencian (directa o indirectamente) a target_table."""
+    dependents = []
+    pending = [target_table]
+    while pending:
+        parent = pending.pop(0)
+        for table_config in LOAD_ORDER:
+            foreign_keys = table_config[3] if len(table_config) >= 4 else None
+            child = table_config[1]
+            if foreign_keys and parent in foreign_keys.values() and child not in dependents:
+                dependents.append(child)
+                pending.append(child)
+    return dependents
+
+
+def _check_reloadable(tables: List[str]) -> None:
+    """
+    Verifica que las tablas a recargar tengan en staging todas sus filas (las tablas
+    con un lote incremental pendiente solo tienen las filas nuevas).
+    
+    Raises:
+        RuntimeError: Si alguna tabla solo tiene su lote incremental en staging
+    """
+    partial = [
+        table for table in tables
+        if get_incremental_batch(f"{table}_raw") is not None
+    ]
+    if partial:
+        raise RuntimeError(
+            f"No se puede recargar {', '.join(partial)}: staging solo tiene su lote incremental. "
+            f"Ejecute una carga completa (INCREMENTAL_MODE = False)"
+        )
+
+
 # ============================================================================
 # FUNCIÓN PRINCIPAL
 # ============================================================================
@@ -355,7 +675,10 @@ def load_to_production(
     natural_keys: Optional[List[str]] = None,
     foreign_keys: Optional[Dict[str, str]] = None,
     id_mappings: Optional[Dict[str, Dict[Any, int]]] = None,
-    create_position_mapping: bool = False
+    create_position_mapping: bool = False,
+    validate: Optional[bool] = None,
+    delta: bool = False,
+    incremental: bool = False
 ) -> Tuple[int, Dict[Any, int]]:
     """
     Transfiere datos desde una tabla staging a una tabla de producción.
@@ -366,6 +689,16 @@ def load_to_production(
         natural_keys: Lista de columnas que forman identificador natural (para mapeo)
         foreign_keys: Diccionario {fk_column: target_table} para resolver FKs
         id_mappings: Diccionario de mapeos de IDs ya creados {table_name: {staging_id: production_id}}
+        validate: Si True, valida las constraints del modelo antes de insertar y envía
+                  las filas inválidas a cuarentena. Si None, usa ETLConfig.VALIDATE_CONSTRAINTS
+        delta: Si True, compara staging con los hashes por fila de la ejecución anterior:
+               inserta solo las filas nuevas, actualiza las modificadas y reporta las
+               eliminadas sin borrarlas. En tablas sin identificador natural, si las
+               posiciones se desplazaron (filas agregadas o eliminadas en medio del CSV)
+               la tabla y sus dependientes se recargan completas. El mapeo de IDs cubre
+               toda la tabla. Los hashes se guardan en la transacción de la tabla
+        incremental: Si True, staging solo tiene el lote nuevo de la tabla (ver watermarks.py):
+                     se inserta completo y el mapeo de IDs cubre toda la tabla
         
     Returns:
         Tupla (filas_insertadas, mapeo_de_ids)
@@ -382,48 +715,159 @@ def load_to_production(
     try:
         # Leer datos de staging
         query = f"SELECT * FROM {source_table}"
-        df = pd.read_sql(query, engine)
+        df = read_sql_with_plan(query, engine, source_table)
+        
+        # Obtener el nombre real de la columna primary key desde PostgreSQL
+        target_id_column = _get_primary_key_column(target_table, engine)
+        needs_mapping = bool(natural_keys) or create_position_mapping
         
         if len(df) == 0:
+            if incremental:
+                # Sin lote nuevo: las tablas dependientes siguen necesitando el mapeo
+                print(f"   ✓ Sin filas nuevas en '{source_table}'")
+                with engine.begin() as conn:
+                    _save_load_state(conn, source_table, target_table, delta, incremental)
+                mapeo_ids = build_production_id_mapping(
+                    engine, target_table, target_id_column, natural_keys
+                ) if needs_mapping else {}
+                print(f"{'='*80}\n")
+                return 0, mapeo_ids
             print(f"   ⚠ Tabla staging '{source_table}' está vacía")
             return 0, {}
         
         print(f"   ✓ Datos leídos de staging: {len(df)} filas")
         
-        # Resolver foreign keys si es necesario
-        if foreign_keys and id_mappings:
-            print(f"   Resolviendo foreign keys...")
-            df = resolve_foreign_keys(df, foreign_keys, id_mappings, engine)
+        # Posición de cada fila en staging (clave de las tablas sin identificador natural)
+        row_positions = _get_row_positions(df, source_table, incremental)
         
-        # Obtener el nombre real de la columna primary key desde PostgreSQL
-        target_id_column = _get_primary_key_column(target_table, engine)
+        if validate is None:
+            validate = ETLConfig.VALIDATE_CONSTRAINTS
+        
+        # Filas modificadas a actualizar y tablas a vaciar antes de insertar (recarga completa)
+        df_updates = None
+        reload_tables = []
+        
+        # Modo delta: clasificar las filas contra la ejecución anterior
+        # (antes de resolver FKs, para comparar los valores de staging)
+        if delta:
+            delta_result = compute_staging_delta(target_table, df, natural_keys, engine=engine)
+            
+            if delta_result['baseline']:
+                with engine.connect() as conn:
+                    production_has_rows = conn.execute(
+                        text(f"SELECT EXISTS (SELECT 1 FROM {target_table})")
+                    ).scalar()
+                if production_has_rows:
+                    # Producción ya cargada sin hashes: se toma como referencia sin reinsertar
+                    print(f"   ⚠ '{target_table}' ya tiene datos y no hay hashes anteriores: "
+                          f"se registra la línea base sin insertar")
+                    with engine.begin() as conn:
+                        if not natural_keys and load_row_ids(engine, target_table) is None:
+                            # Sin registro de IDs: se registra el orden actual como referencia
+                            row_ids = build_production_id_mapping(engine, target_table, target_id_column)
+                            save_row_ids(conn, target_table, row_ids.keys(), row_ids.values())
+                        _save_load_state(conn, source_table, target_table, delta, incremental)
+                    mapeo_ids = build_production_id_mapping(
+                        engine, target_table, target_id_column, natural_keys
+                    ) if needs_mapping else {}
+                    print(f"{'='*80}\n")
+                    return 0, mapeo_ids
+            elif detect_position_shift(delta_result, natural_keys):
+                # Las posiciones ya no identifican a las mismas filas: aplicar el delta
+                # actualizaría filas ajenas. Se recarga la tabla completa (y sus dependientes,
+                # cuyas FKs apuntan a las posiciones anteriores)
+                reload_tables = [target_table] + _get_dependent_tables(target_table)
+                print(f"   ⚠ Filas agregadas o eliminadas en medio de '{source_table}' "
+                      f"(-{len(delta_result['deleted'])}, ~{len(delta_result['updated'])}): "
+                      f"se recarga completa junto con {', '.join(reload_tables[1:]) or 'ninguna dependiente'}")
+                _check_reloadable(reload_tables)
+            else:
+                if len(delta_result['deleted']) > 0:
+                    print(f"   ⚠ {len(delta_result['deleted'])} filas ya no están en staging "
+                          f"(no se eliminan de producción)")
+                
+                df_updated = delta_result['updated']
+                if len(df_updated) > 0:
+                    if foreign_keys and id_mappings:
+                        print(f"   Resolviendo foreign keys de las filas modificadas...")
+                        df_updated = resolve_foreign_keys(df_updated, foreign_keys, id_mappings, engine)
+                    columns_to_update = [
+                        col for col in df_updated.columns if col not in (target_id_column, ROW_KEY_COLUMN)
+                    ]
+                    df_updates = _prepare_rows_for_write(
+                        df_updated, columns_to_update, target_table, engine, validate, check_existing=False
+                    )
+                    df_updates[ROW_KEY_COLUMN] = df_updated.loc[df_updates.index, ROW_KEY_COLUMN]
+                
+                df = delta_result['inserted'].drop(columns=[ROW_KEY_COLUMN])
+                if len(df) == 0 and not delta_has_changes(delta_result):
+                    print(f"   ✓ Sin cambios desde la ejecución anterior")
+                elif len(df) > 0:
+                    print(f"   ✓ Filas nuevas a insertar: {len(df)}")
         
         # Filtrar columnas: solo las que existen en ambas tablas y no son IDs
         columns_to_insert = [col for col in df.columns if col != target_id_column]
+        df_to_insert = df.iloc[0:0]
         
-        if not columns_to_insert:
+        if len(df) > 0 and not columns_to_insert:
             print(f"   ⚠ No hay columnas para insertar")
-            return 0, {}
+        elif len(df) > 0:
+            # Resolver foreign keys si es necesario
+            if foreign_keys and id_mappings:
+                print(f"   Resolviendo foreign keys...")
+                df = resolve_foreign_keys(df, foreign_keys, id_mappings, engine)
         
-        # Preparar DataFrame para inserción
-        df_to_insert = df[columns_to_insert].copy()
-        
-        # Insertar datos usando pandas to_sql
-        print(f"   Insertando {len(df_to_insert)} filas en '{target_table}'...")
-        df_to_insert.to_sql(
-            target_table,
-            engine,
-            if_exists='append',
-            index=False,
-            method='multi'
-        )
+            # Preparar DataFrame para inserción (hash de fila, constraints y particiones)
+            df_to_insert = _prepare_rows_for_write(df, columns_to_insert, target_table, engine, validate)
+            if len(df_to_insert) == 0:
+                print(f"   ⚠ No quedan filas válidas para insertar en '{target_table}'")
+        
+        # Una sola transacción por tabla: recarga, actualizaciones, INSERT, registro de
+        # IDs, hashes y marca de agua se confirman juntos o no se confirma nada
+        inserted_positions = row_positions.loc[df_to_insert.index]
+        inserted_ids = []
+        with engine.begin() as conn:
+            if reload_tables:
+                conn.execute(text(f"TRUNCATE TABLE {', '.join(reload_tables)}"))
+                delete_saved_state(conn, reload_tables)
+        
+            if df_updates is not None:
+                filas_actualizadas = _apply_delta_updates(
+                    df_updates, target_table, target_id_column, natural_keys, engine, conn
+                )
+                print(f"   ✓ {filas_actualizadas} filas actualizadas")
+            
+            if len(df_to_insert) > 0:
+                # Insertar datos usando pandas to_sql
+                print(f"   Insertando {len(df_to_insert)} filas en '{target_table}'...")
+                if not natural_keys:
+                    # Tablas identificadas por posición: IDs reservados de la secuencia y
+                    # registrados junto con el INSERT (las filas en cuarentena no desplazan
+                    # a las siguientes)
+                    inserted_ids = _allocate_ids(conn, target_table, target_id_column, len(df_to_insert))
+                    df_to_insert.insert(0, target_id_column, inserted_ids)
+                    save_row_ids(conn, target_table, inserted_positions, inserted_ids)
+                df_to_insert.to_sql(
+                    target_table,
+                    conn,
+                    if_exists='append',
+                    index=False,
+                    method='multi'
+                )
+            
+            _save_load_state(conn, source_table, target_table, delta, incremental)
         
         filas_insertadas = len(df_to_insert)
-        print(f"   ✓ {filas_insertadas} filas insertadas exitosamente")
+        if filas_insertadas:
+            print(f"   ✓ {filas_insertadas} filas insertadas exitosamente")
         
         # Crear mapeo de IDs si se proporcionaron natural keys
         mapeo_ids = {}
-        if natural_keys:
+        if (delta or incremental) and needs_mapping:
+            # Las tablas dependientes referencian también a las filas de cargas anteriores
+            print(f"   Creando mapeo de IDs de toda la tabla")
+            mapeo_ids = build_production_id_mapping(engine, target_table, target_id_column, natural_keys)
+        elif natural_keys and filas_insertadas:
             print(f"   Creando mapeo de IDs usando: {natural_keys}")
             # Leer datos recién insertados para obtener los nuevos IDs
             query_target = f"SELECT * FROM {target_table} ORDER BY {target_id_column} DESC LIMIT {filas_insertadas}"
@@ -456,25 +900,15 @@ def load_to_production(
                         if pd.notna(row[target_id_column]):
                             natural_key_value = row['_natural_key']
                             mapeo_ids[natural_key_value] = int(row[target_id_column])
-        elif create_position_mapping:
+        elif create_position_mapping and filas_insertadas:
             # Si no hay natural keys pero la tabla es referenciada por otras (necesita mapeo),
-            # crear mapeo por posición: posición en staging -> ID en producción
-            # Esto es útil cuando el orden se mantiene entre staging y producción
-            print(f"   Creando mapeo de IDs por posición (índice -> ID)")
-            query_target = f"SELECT {target_id_column} FROM {target_table} ORDER BY {target_id_column} LIMIT {filas_insertadas}"
-            df_inserted = pd.read_sql(query_target, engine)
-            
-            if len(df_inserted) > 0 and target_id_column in df_inserted.columns:
-                # Crear mapeo: índice en staging (0, 1, 2, ...) -> ID en producción
-                # También mapear valores 1-based (1, 2, 3...) -> ID en producción
-                # porque en staging los valores pueden venir como 1, 2, 3... del CSV
-                for idx in range(min(len(df), len(df_inserted))):
-                    production_id = int(df_inserted.iloc[idx][target_id_column])
-                    # Usar el índice 0-based como clave (0 -> ID1, 1 -> ID2, etc.)
-                    mapeo_ids[idx] = production_id
-                    # También mapear índice 1-based (1 -> ID1, 2 -> ID2, etc.)
-                    # para cuando los valores en staging vienen como 1, 2, 3...
-                    mapeo_ids[idx + 1] = production_id
+            # crear mapeo por posición: posición 1-based en staging (la referencia de las
+            # FKs del CSV) -> ID reservado para esa fila al insertarla
+            print(f"   Creando mapeo de IDs por posición (posición -> ID)")
+            mapeo_ids = {
+                int(position): production_id
+                for position, production_id in zip(inserted_positions, inserted_ids)
+            }
         
         print(f"{'='*80}\n")
         return filas_insertadas, mapeo_ids
@@ -486,13 +920,29 @@ def load_to_production(
         raise
 
 
-def load_all_to_production(load_order: Optional[List[Tuple]] = None) -> Dict[str, Dict[Any, int]]:
+def load_all_to_production(
+    load_order: Optional[List[Tuple]] = None,
+    bulk_mode: Optional[bool] = None,
+    delta: Optional[bool] = None,
+    incremental: Optional[bool] = None
+) -> Dict[str, Dict[Any, int]]:
     """
     Carga todas las tablas staging a producción respetando el orden de dependencias.
     
+    En modo masivo, los índices secundarios y las constraints UNIQUE/CHECK/FK de las
+    tablas destino vacías se eliminan antes de cargar y se reconstruyen y validan al
+    final (ver bulk_mode.py), incluso si la carga falla.
+    
     Args:
         load_order: Lista de tuplas (source_table, target_table, natural_keys, foreign_keys)
                    Si None, usa LOAD_ORDER por defecto
+        bulk_mode: Si True, usa el modo de carga masiva. Si None, usa ETLConfig.PRODUCTION_BULK_MODE
+        delta: Si True, carga solo las filas nuevas y modificadas de cada tabla (ver delta.py).
+               Los hashes de cada tabla se guardan en la misma transacción que la escribe.
+               Si None, usa ETLConfig.DELTA_MODE
+        incremental: Si True, las tablas con marca de agua insertan su lote nuevo completo y
+                     el resto se carga en modo delta. La marca de agua de cada tabla avanza en
+                     la misma transacción que inserta su lote. Si None, usa ETLConfig.INCREMENTAL_MODE
         
     Returns:
         Diccionario con mapeos de IDs por tabla: {table_name: {natural_key: production_id}}
@@ -520,6 +970,51 @@ def load_all_to_production(load_order: Optional[List[Tuple]] = None) -> Dict[str
     id_mappings = {}  # {table_name: {natural_key: production_id}}
     all_id_mappings = {}  # Para resolver foreign keys
     
+    if incremental is None:
+        incremental = ETLConfig.INCREMENTAL_MODE
+    if delta is None:
+        delta = ETLConfig.DELTA_MODE or incremental
+    
+    if bulk_mode is None:
+        bulk_mode = ETLConfig.PRODUCTION_BULK_MODE
+    bulk_state = None
+    if bulk_mode:
+        bulk_state = prepare_bulk_load([table_config[1] for table_config in load_order])
+    
+    try:
+        _load_tables_in_order(load_order, referenced_tables, id_mappings, all_id_mappings, delta, incremental)
+    except Exception:
+        # Restaurar índices y constraints aunque la carga haya fallado
+        if bulk_state:
+            try:
+                restore_bulk_objects(bulk_state)
+            except Exception as restore_error:
+                print(f"   ✗ Error al restaurar el modo masivo: {str(restore_error)}")
+        raise
+    
+    if bulk_state:
+        print(f"\nReconstruyendo índices y constraints (modo masivo)...")
+        restore_bulk_objects(bulk_state)
+    
+    print(f"\n{'='*80}")
+    print("✓ CARGA COMPLETA A PRODUCCIÓN FINALIZADA")
+    print(f"{'='*80}\n")
+    
+    return id_mappings
+
+
+def _load_tables_in_order(
+    load_order: List[Tuple],
+    referenced_tables: set,
+    id_mappings: Dict[str, Dict[Any, int]],
+    all_id_mappings: Dict[str, Dict[Any, int]],
+    delta: bool = False,
+    incremental: bool = False
+) -> None:
+    """
+    Carga cada tabla de load_order a producción acumulando los mapeos de IDs
+    (id_mappings y all_id_mappings se modifican en el lugar).
+    """
     for i, table_config in enumerate(load_order, 1):
         if len(table_config) == 3:
             source_table, target_table, natural_keys = table_config
@@ -543,24 +1038,24 @@ def load_all_to_production(load_order: Optional[List[Tuple]] = None) -> Dict[str
                 if target_table_fk in all_id_mappings:
                     fk_mappings_for_resolution[fk_col] = target_table_fk
         
+        # En modo incremental las tablas con marca de agua solo traen su lote nuevo
+        incremental_table = incremental and is_incremental_table(source_table)
+        
         # Cargar a producción
-        filas, mapeo = load_to_production(
-            source_table=source_table,
-            target_table=target_table,
-            natural_keys=natural_keys,
-            foreign_keys=foreign_keys,
-            id_mappings=all_id_mappings if foreign_keys else None,
-            create_position_mapping=needs_position_mapping
-        )
+        with query_context(table=target_table):
+            filas, mapeo = load_to_production(
+                source_table=source_table,
+                target_table=target_table,
+                natural_keys=natural_keys,
+                foreign_keys=foreign_keys,
+                id_mappings=all_id_mappings if foreign_keys else None,
+                create_position_mapping=needs_position_mapping,
+                delta=delta and not incremental_table,
+                incremental=incremental_table
+            )
         
         # Guardar mapeo
         if mapeo:
             id_mappings[target_table] = mapeo
             all_id_mappings[target_table] = mapeo
-    
-    print(f"\n{'='*80}")
-    print("✓ CARGA COMPLETA A PRODUCCIÓN FINALIZADA")
-    print(f"{'='*80}\n")
-    
-    return id_mappings
 
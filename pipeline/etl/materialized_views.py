@@ -0,0 +1,141 @@
+"""
+Módulo para refrescar las vistas materializadas analíticas (dbt/models/analytics/vw_*).
+
+Con la variable de dbt 'analytics_materialized: materialized_view' las vistas
+analíticas se crean como vistas materializadas de PostgreSQL con un índice único.
+Las consultas de los dashboards pasan a ser lecturas por índice sobre datos
+precalculados, y después de cada ejecución exitosa del pipeline se refrescan con
+REFRESH MATERIALIZED VIEW CONCURRENTLY, que no bloquea las lecturas mientras recalcula.
+
+Si las vistas analíticas son vistas normales (valor por defecto), no hay nada que refrescar.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+def get_analytics_materialized_views(engine) -> List[Tuple[str, str, bool]]:
+    """
+    Lista las vistas materializadas de los esquemas analíticos de dbt.
+
+    dbt genera el esquema como '<esquema_target>_analytics', por eso se filtra con
+    el patrón ETLConfig.ANALYTICS_SCHEMA_PATTERN.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        Lista de tuplas (esquema, vista, poblada)
+    """
+    query = """
+        SELECT schemaname, matviewname, ispopulated
+        FROM pg_matviews
+        WHERE schemaname LIKE :schema_pattern
+        ORDER BY schemaname, matviewname
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'schema_pattern': ETLConfig.ANALYTICS_SCHEMA_PATTERN})
+        return [(row.schemaname, row.matviewname, row.ispopulated) for row in rows]
+
+
+def _has_unique_index(engine, schema: str, view: str) -> bool:
+    """
+    Indica si una vista materializada tiene un índice único válido para REFRESH CONCURRENTLY
+    (solo columnas, sin expresiones ni cláusula WHERE).
+
+    Args:
+        engine: SQLAlchemy engine
+        schema: Esquema de la vista
+        view: Nombre de la vista materializada
+
+    Returns:
+        True si existe al menos un índice único utilizable
+    """
+    query = """
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema
+          AND c.relname = :view
+          AND i.indisunique
+          AND i.indpred IS NULL
+          AND i.indexprs IS NULL
+        LIMIT 1
+    """
+    with engine.connect() as conn:
+        return conn.execute(text(query), {'schema': schema, 'view': view}).first() is not None
+
+
+def refresh_analytics_views(concurrently: bool = True) -> Dict[str, float]:
+    """
+    Refresca todas las vistas materializadas analíticas y mide cuánto tarda cada una.
+
+    Se usa CONCURRENTLY cuando la vista ya está poblada y tiene índice único; en
+    otro caso (primer refresco o sin índice) se hace un REFRESH normal.
+
+    Args:
+        concurrently: Si True, intenta REFRESH MATERIALIZED VIEW CONCURRENTLY
+
+    Returns:
+        Diccionario {'esquema.vista': segundos}
+    """
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    print(f"\n{'='*80}")
+    print("REFRESCANDO VISTAS MATERIALIZADAS ANALÍTICAS")
+    print(f"{'='*80}")
+
+    views = get_analytics_materialized_views(engine)
+    if not views:
+        print("   ⚠ No hay vistas materializadas analíticas (las vistas vw_* son vistas normales)")
+        return {}
+
+    timings = {}
+    for schema, view, is_populated in views:
+        qualified_name = f"{schema}.{view}"
+        use_concurrently = concurrently and is_populated and _has_unique_index(engine, schema, view)
+        statement = (
+            f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if use_concurrently else ''}"
+            f'"{schema}"."{view}"'
+        )
+
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(statement))
+        except Exception as e:
+            print(f"   ✗ Error al refrescar {qualified_name}: {str(e)}")
+            raise
+        elapsed = time.perf_counter() - start
+
+        timings[qualified_name] = elapsed
+        modo = "concurrente" if use_concurrently else "bloqueante"
+        print(f"   ✓ {qualified_name} refrescada ({modo}) en {elapsed:.2f}s")
+
+    print(f"\n   ✓ {len(timings)} vistas refrescadas en {sum(timings.values()):.2f}s")
+    return timings
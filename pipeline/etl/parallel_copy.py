@@ -0,0 +1,405 @@
+"""
+Carga de tablas staging desde varios archivos (partes) con COPY en paralelo.
+
+Una entrada de TABLES_CONFIG puede indicar en 'file' un archivo, un patrón glob
+('5.ordenes_*.csv') o una lista de archivos/patrones, todos relativos al directorio
+CSV. Con más de un archivo, cada parte:
+- se lee por bloques (ETLConfig.PARALLEL_COPY_CHUNK_ROWS), sin concatenar las
+  partes en un único archivo ni en un único DataFrame
+- se carga con su propio COPY, en su propia conexión y transacción, en paralelo
+  con las demás partes (ETLConfig.PARALLEL_COPY_MAX_WORKERS)
+- queda registrada en la tabla etl_staging_parts en la misma transacción que su COPY
+
+El registro hace que la carga sea reanudable e idempotente: cada registro guarda
+la "generación" de la tabla staging (pg_relation_filenode, que cambia con TRUNCATE
+o al recrear la tabla). Al volver a ejecutar, si la generación coincide solo se
+cargan las partes que faltan (por ejemplo, las que fallaron); si la tabla se vació
+o reescribió desde entonces, o alguna parte cambió o dejó de existir, se vacía y se
+cargan todas.
+
+Las tablas referenciadas por posición desde otras (las FKs de los CSV son números
+de fila) cargan sus partes en orden, una tras otra, para conservar la numeración.
+"""
+
+import glob
+import os
+import sys
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+    from ..utils.clean_column_name import clean_column_name
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+    from clean_column_name import clean_column_name
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+try:
+    from .load_raw_data import (
+        get_expected_columns,
+        filter_columns_for_staging,
+        analyze_staging_table,
+        _copy_dataframe,
+        _check_reject_threshold,
+        _copy_with_bisection,
+        _write_rejects_file,
+    )
+except ImportError:
+    from pipeline.etl.load_raw_data import (
+        get_expected_columns,
+        filter_columns_for_staging,
+        analyze_staging_table,
+        _copy_dataframe,
+        _check_reject_threshold,
+        _copy_with_bisection,
+        _write_rejects_file,
+    )
+
+
+# Registro de las partes cargadas en cada tabla staging
+PARTS_TABLE = 'etl_staging_parts'
+
+FileSpec = Union[str, List[str]]
+
+
+# ============================================================================
+# RESOLUCIÓN DE ARCHIVOS
+# ============================================================================
+
+def _is_glob(pattern: str) -> bool:
+    """Indica si un nombre de archivo contiene comodines de glob."""
+    return glob.has_magic(pattern)
+
+
+def is_multi_part(file_spec: FileSpec) -> bool:
+    """Indica si una entrada 'file' de TABLES_CONFIG es una lista o un patrón glob."""
+    return isinstance(file_spec, (list, tuple)) or _is_glob(file_spec)
+
+
+def resolve_source_files(file_spec: FileSpec) -> List[str]:
+    """
+    Resuelve una entrada 'file' de TABLES_CONFIG a rutas de archivos existentes.
+
+    Los patrones se expanden en orden alfabético; la lista conserva su orden y
+    se eliminan los archivos repetidos.
+
+    Args:
+        file_spec: Archivo, patrón glob o lista de archivos/patrones (relativos al directorio CSV)
+
+    Returns:
+        Lista de rutas absolutas
+    """
+    specs = list(file_spec) if isinstance(file_spec, (list, tuple)) else [file_spec]
+    paths = []
+    for spec in specs:
+        path = path_manager.get_csv_path(spec)
+        matches = sorted(glob.glob(path)) if _is_glob(spec) else ([path] if os.path.exists(path) else [])
+        for match in matches:
+            if match not in paths:
+                paths.append(match)
+    return paths
+
+
+def get_position_referenced_tables() -> set:
+    """
+    Retorna las tablas staging referenciadas por foreign keys de otras tablas
+    (sus partes se cargan en orden para conservar las posiciones de fila).
+    """
+    try:
+        from .load_to_production import LOAD_ORDER
+    except ImportError:
+        from pipeline.etl.load_to_production import LOAD_ORDER
+
+    referenced = set()
+    for table_config in LOAD_ORDER:
+        if len(table_config) >= 4 and table_config[3]:
+            referenced.update(f"{target}_raw" for target in table_config[3].values())
+    return referenced
+
+
+# ============================================================================
+# REGISTRO DE PARTES
+# ============================================================================
+
+def _ensure_parts_table(cursor) -> None:
+    """Crea la tabla de registro de partes si no existe."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PARTS_TABLE} (
+            table_raw VARCHAR(100) NOT NULL,
+            part_name TEXT NOT NULL,
+            file_size BIGINT NOT NULL,
+            file_mtime DOUBLE PRECISION NOT NULL,
+            generation BIGINT NOT NULL,
+            rows_loaded BIGINT NOT NULL,
+            rows_rejected BIGINT NOT NULL DEFAULT 0,
+            loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (table_raw, part_name)
+        )
+    """)
+
+
+def get_loaded_parts(table_name_raw: str, engine=None) -> Dict[str, Dict]:
+    """
+    Retorna las partes registradas para la generación actual de una tabla staging.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging
+        engine: SQLAlchemy engine (opcional)
+
+    Returns:
+        Diccionario {nombre_parte: {file_size, file_mtime, rows_loaded, rows_rejected}}
+    """
+    if engine is None:
+        engine = DBConnector.get_instance().get_engine()
+
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': PARTS_TABLE}
+        ).scalar()
+        if not exists:
+            return {}
+        rows = conn.execute(
+            text(f"""
+                SELECT part_name, file_size, file_mtime, rows_loaded, rows_rejected
+                FROM {PARTS_TABLE}
+                WHERE table_raw = :table_name
+                  AND generation = pg_relation_filenode(CAST(:table_name AS regclass))
+            """),
+            {'table_name': table_name_raw}
+        ).mappings().fetchall()
+    return {row['part_name']: dict(row) for row in rows}
+
+
+def _reset_table(table_name_raw: str) -> None:
+    """Vacía la tabla staging y su registro de partes (nueva generación)."""
+    db = DBConnector.get_instance()
+    with db.get_raw_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            _ensure_parts_table(cursor)
+            cursor.execute(f"TRUNCATE TABLE {table_name_raw}")
+            cursor.execute(f"DELETE FROM {PARTS_TABLE} WHERE table_raw = %s", (table_name_raw,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+# ============================================================================
+# CARGA DE PARTES
+# ============================================================================
+
+def _iter_part_chunks(csv_path: str, table_name_raw: str, expected_columns: List[str]):
+    """Lee una parte por bloques y los prepara para COPY (nombres y columnas)."""
+    for chunk in pd.read_csv(csv_path, encoding=ETLConfig.CSV_ENCODING, chunksize=ETLConfig.PARALLEL_COPY_CHUNK_ROWS):
+        chunk.columns = [clean_column_name(col) for col in chunk.columns]
+        yield filter_columns_for_staging(chunk, table_name_raw, expected_columns)
+
+
+def _load_part(
+    table_name_raw: str,
+    csv_path: str,
+    expected_columns: List[str],
+    error_tolerant: bool
+) -> Dict:
+    """
+    Carga una parte con COPY en su propia conexión y transacción y la registra en
+    etl_staging_parts (mismo commit: la parte queda cargada y registrada, o ninguna).
+
+    Returns:
+        Diccionario con part_name, rows_loaded y rows_rejected
+    """
+    part_name = os.path.basename(csv_path)
+    stat = os.stat(csv_path)
+    rows_loaded = 0
+    rejected = []
+
+    db = DBConnector.get_instance()
+    with db.get_raw_connection(profile='bulk_load') as conn:
+        cursor = conn.cursor()
+        try:
+            for chunk in _iter_part_chunks(csv_path, table_name_raw, expected_columns):
+                if error_tolerant:
+                    rows_loaded += _copy_with_bisection(cursor, chunk, table_name_raw, rejected)
+                else:
+                    _copy_dataframe(cursor, chunk, table_name_raw)
+                    rows_loaded += len(chunk)
+            if error_tolerant:
+                _check_reject_threshold(rejected, table_name_raw, total_rows=rows_loaded + len(rejected))
+
+            cursor.execute(
+                f"""
+                INSERT INTO {PARTS_TABLE}
+                    (table_raw, part_name, file_size, file_mtime, generation, rows_loaded, rows_rejected)
+                VALUES (%s, %s, %s, %s, pg_relation_filenode(%s::regclass), %s, %s)
+                ON CONFLICT (table_raw, part_name) DO UPDATE SET
+                    file_size = EXCLUDED.file_size,
+                    file_mtime = EXCLUDED.file_mtime,
+                    generation = EXCLUDED.generation,
+                    rows_loaded = EXCLUDED.rows_loaded,
+                    rows_rejected = EXCLUDED.rows_rejected,
+                    loaded_at = now()
+                """,
+                (table_name_raw, part_name, stat.st_size, stat.st_mtime, table_name_raw,
+                 rows_loaded, len(rejected))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    if rejected:
+        rejects_path = _write_rejects_file(rejected, table_name_raw)
+        print(f"      ⚠ {part_name}: {len(rejected)} filas rechazadas → {rejects_path}")
+    print(f"      ✓ {part_name}: {rows_loaded} filas")
+    return {'part_name': part_name, 'rows_loaded': rows_loaded, 'rows_rejected': len(rejected)}
+
+
+def load_raw_data_parts(
+    file_spec: FileSpec,
+    table_name_raw: str,
+    error_tolerant: Optional[bool] = None,
+    max_workers: Optional[int] = None,
+    incremental: Optional[bool] = None
+) -> int:
+    """
+    Carga todas las partes de una tabla staging con COPY en paralelo (ver docstring del módulo).
+
+    Args:
+        file_spec: Archivo, patrón glob o lista de archivos/patrones
+        table_name_raw: Nombre de la tabla staging
+        error_tolerant: Si True, aísla las filas inválidas de cada parte en lugar de
+                        abortarla. Si None, usa ETLConfig.COPY_ERROR_TOLERANT
+        max_workers: Partes simultáneas. Si None, usa ETLConfig.PARALLEL_COPY_MAX_WORKERS
+        incremental: Si None, usa ETLConfig.INCREMENTAL_MODE
+
+    Returns:
+        Número de filas cargadas en esta ejecución
+
+    Raises:
+        ValueError: En modo delta o incremental (esos modos comparan un archivo por
+                    tabla; las partes que llegan se cargan con ingest_service.py)
+        RuntimeError: Si alguna parte falló (las demás quedan cargadas y registradas)
+    """
+    if incremental is None:
+        incremental = ETLConfig.INCREMENTAL_MODE
+    if ETLConfig.DELTA_MODE or incremental:
+        raise ValueError(
+            f"'{table_name_raw}' tiene varias partes: en modo delta o incremental cada parte "
+            f"se procesa como un archivo nuevo con pipeline/scripts/ingest_service.py"
+        )
+    if error_tolerant is None:
+        error_tolerant = ETLConfig.COPY_ERROR_TOLERANT
+    if max_workers is None:
+        max_workers = ETLConfig.PARALLEL_COPY_MAX_WORKERS
+
+    print(f"\n{'='*80}")
+    print(f"CARGANDO PARTES A STAGING: {table_name_raw}")
+    print(f"{'='*80}")
+
+    parts = resolve_source_files(file_spec)
+    if not parts:
+        print(f"Advertencia: No se encontraron archivos para {file_spec}")
+        return 0
+
+    # Reanudar la generación actual o empezar una nueva
+    loaded = get_loaded_parts(table_name_raw)
+    names = [os.path.basename(path) for path in parts]
+    changed = [
+        name for name, path in zip(names, parts)
+        if name in loaded
+        and (loaded[name]['file_size'], loaded[name]['file_mtime']) != (os.stat(path).st_size, os.stat(path).st_mtime)
+    ]
+    if changed:
+        print(f"   ⚠ Partes modificadas desde su carga ({', '.join(changed)}): se recarga la tabla")
+
+    # Partes cargadas antes que ya no forman parte del origen: sus filas siguen en staging
+    removed = sorted(set(loaded) - set(names))
+    if removed:
+        print(f"   ⚠ Partes cargadas que ya no están en el origen ({', '.join(removed)}): se recarga la tabla")
+
+    # En las tablas referenciadas por posición, una parte nueva antes de una ya
+    # cargada desplazaría la numeración de las filas siguientes
+    sequential = table_name_raw in get_position_referenced_tables()
+    loaded_positions = [i for i, name in enumerate(names) if name in loaded]
+    out_of_order = sequential and loaded_positions and loaded_positions != list(range(len(loaded_positions)))
+    if out_of_order and not changed and not removed:
+        print("   ⚠ Partes nuevas antes de las ya cargadas: se recarga la tabla para conservar las posiciones")
+    if not loaded or changed or removed or out_of_order:
+        _reset_table(table_name_raw)
+        loaded = {}
+
+    pending = [path for name, path in zip(names, parts) if name not in loaded]
+    print(f"   ✓ {len(parts)} partes, {len(loaded)} ya cargadas, {len(pending)} por cargar")
+    if not pending:
+        print(f"{'='*80}\n")
+        return 0
+
+    expected_columns = get_expected_columns(table_name_raw)
+    workers = 1 if sequential else max(1, min(max_workers, len(pending)))
+    modo = "en orden, tabla referenciada por posición" if sequential else f"{workers} COPY en paralelo"
+    print(f"   Cargando partes ({modo})...")
+
+    def load_one(path: str) -> Dict:
+        try:
+            return _load_part(table_name_raw, path, expected_columns, error_tolerant)
+        except Exception as e:
+            print(f"      ✗ {os.path.basename(path)}: {str(e)}")
+            return {'part_name': os.path.basename(path), 'error': str(e)}
+
+    if sequential:
+        results = []
+        for path in pending:
+            results.append(load_one(path))
+            # Una parte faltante desplazaría las posiciones de las siguientes
+            if 'error' in results[-1]:
+                break
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(load_one, pending))
+
+    # Estadísticas de la tabla completa para las transformaciones
+    db = DBConnector.get_instance()
+    with db.get_raw_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            analyze_staging_table(cursor, table_name_raw)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    failed = [result for result in results if 'error' in result]
+    filas_cargadas = sum(result.get('rows_loaded', 0) for result in results)
+    if failed or len(results) < len(pending):
+        print(f"   ✗ {len(pending) - len(results) + len(failed)} partes sin cargar en '{table_name_raw}' "
+              f"(se reanudan en la próxima ejecución)")
+        print(f"{'='*80}\n")
+        raise RuntimeError(
+            f"Fallaron {len(failed)} partes de '{table_name_raw}': "
+            + '; '.join(f"{result['part_name']}: {result['error']}" for result in failed)
+        )
+
+    print(f"   ✓ Datos cargados exitosamente a '{table_name_raw}' ({filas_cargadas} filas de {len(pending)} partes)")
+    print(f"{'='*80}\n")
+    return filas_cargadas
@@ -11,22 +11,25 @@ Funciones disponibles:
 Útil para desarrollo, debugging y mantenimiento incremental.
 """
 
+import os
 import sys
 import pandas as pd
+from datetime import datetime
 from sqlalchemy import text
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-# Import PathManager desde utils
+# Import PathManager y ETLConfig desde utils
 try:
     from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
 except ImportError:
-    import os
     current_dir = os.path.dirname(os.path.abspath(__file__))
     pipeline_dir = os.path.dirname(current_dir)
     utils_dir = os.path.join(pipeline_dir, 'utils')
     if utils_dir not in sys.path:
         sys.path.insert(0, utils_dir)
     from path_manager import PathManager
+    from config import ETLConfig
 
 # Configurar sys.path usando PathManager
 path_manager = PathManager.get_instance()
@@ -34,18 +37,28 @@ path_manager.setup_sys_path()
 
 # Import funciones desde models y etl
 try:
-    from ..models.create_tables import create_staging_tables, create_production_tables
+    from ..models.create_tables import create_staging_tables, create_production_tables, create_production_indexes
     from .load_raw_data import load_raw_data
-    from .transformations import apply_transformations
+    from .transformations import apply_transformations, load_polars_backend
     from .load_to_production import load_all_to_production
+    from .dtype_plan import read_sql_with_plan
+    from .integrity import assert_referential_integrity
+    from .delta import has_changes, commit_staging_hashes, discard_staging_deltas
+    from .watermarks import get_position_offset, commit_watermarks, discard_watermarks
     from database.db_connector import DBConnector
+    from database.query_log import query_context, set_query_table
 except ImportError:
     # Si falla el import relativo, usar import absoluto
-    from pipeline.models.create_tables import create_staging_tables, create_production_tables
+    from pipeline.models.create_tables import create_staging_tables, create_production_tables, create_production_indexes
     from pipeline.etl.load_raw_data import load_raw_data
-    from pipeline.etl.transformations import apply_transformations
+    from pipeline.etl.transformations import apply_transformations, load_polars_backend
     from pipeline.etl.load_to_production import load_all_to_production
+    from pipeline.etl.dtype_plan import read_sql_with_plan
+    from pipeline.etl.integrity import assert_referential_integrity
+    from pipeline.etl.delta import has_changes, commit_staging_hashes, discard_staging_deltas
+    from pipeline.etl.watermarks import get_position_offset, commit_watermarks, discard_watermarks
     from database.db_connector import DBConnector
+    from database.query_log import query_context, set_query_table
 
 
 # ============================================================================
@@ -68,11 +81,60 @@ TABLES_CONFIG = [
 ]
 
 
+# ============================================================================
+# INSTRUMENTACIÓN SQL
+# ============================================================================
+
+def start_query_log() -> None:
+    """
+    Inicia el registro de sentencias SQL de una ejecución: descarta las estadísticas
+    anteriores y, si DB_SLOW_QUERY_LOG no está definido, escribe el log de consultas
+    lentas en data/logs/slow_queries.jsonl.
+    """
+    query_log = DBConnector.get_instance().query_log
+    query_log.reset()
+    if not query_log.slow_log_path:
+        query_log.configure(slow_log_path=os.path.join(path_manager.get_logs_dir(), 'slow_queries.jsonl'))
+
+
+def finish_query_log(top_n: Optional[int] = None) -> Optional[str]:
+    """
+    Imprime el resumen de las sentencias SQL de la ejecución (top por tiempo total)
+    y lo guarda en data/logs/query_summary_<fecha>.json.
+    
+    Args:
+        top_n: Cantidad de sentencias del resumen. Por defecto ETLConfig.QUERY_SUMMARY_TOP_N
+    
+    Returns:
+        Ruta del resumen guardado, o None si el registro está desactivado o falló
+    """
+    query_log = DBConnector.get_instance().query_log
+    if not query_log.enabled:
+        return None
+    top_n = top_n or ETLConfig.QUERY_SUMMARY_TOP_N
+    query_log.print_summary(top_n)
+    
+    file_name = f"query_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    try:
+        path = query_log.write_summary(os.path.join(path_manager.get_logs_dir(), file_name), top_n)
+        print(f"✓ Resumen SQL guardado en: {path}")
+        return path
+    except OSError as e:
+        print(f"⚠ No se pudo guardar el resumen SQL: {str(e)}")
+        return None
+
+
 # ============================================================================
 # FUNCIONES DE PIPELINE POR PASOS
 # ============================================================================
 
-def run_staging_load(create_tables: bool = True) -> None:
+@query_context(stage='staging')
+def run_staging_load(
+    create_tables: bool = True,
+    error_tolerant: Optional[bool] = None,
+    concurrent: Optional[bool] = None,
+    incremental: Optional[bool] = None
+) -> None:
     """
     Ejecuta solo la carga de datos crudos a staging.
     
@@ -83,7 +145,26 @@ def run_staging_load(create_tables: bool = True) -> None:
     Args:
         create_tables: Si True, crea las tablas staging antes de cargar.
                       Si False, asume que las tablas ya existen.
+        error_tolerant: Si True, las filas que PostgreSQL rechaza en el COPY se aíslan
+                        y se escriben en un archivo de rechazos en lugar de abortar.
+                        Si None, usa ETLConfig.COPY_ERROR_TOLERANT
+        concurrent: Si True, carga todas las tablas a la vez con el driver asíncrono
+                    (asyncpg, ver async_load.py). Si None, usa ETLConfig.ASYNC_STAGING_LOAD.
+                    Se ignora en modo incremental o delta
+        incremental: Si True, las tablas de hechos solo cargan las filas posteriores a su
+                     marca de agua (ver watermarks.py). Si None, usa ETLConfig.INCREMENTAL_MODE
     """
+    if concurrent is None:
+        concurrent = ETLConfig.ASYNC_STAGING_LOAD
+    if incremental is None:
+        incremental = ETLConfig.INCREMENTAL_MODE
+    if (incremental or ETLConfig.DELTA_MODE) and concurrent:
+        # Las tablas hijas se filtran por el lote de su padre y, en modo delta, staging se
+        # conserva entre ejecuciones: la carga asíncrona no vacía las tablas ni calcula
+        # el delta, así que la carga se hace secuencialmente con load_raw_data
+        print("   ⚠ Modo incremental/delta: la carga a staging se hace secuencialmente")
+        concurrent = False
+    
     print("\n" + "="*80)
     print("EJECUTANDO: Carga a STAGING")
     print("="*80)
@@ -101,15 +182,35 @@ def run_staging_load(create_tables: bool = True) -> None:
         
         # Paso 2: Cargar datos crudos a staging
         print("\n[2/2] Cargando datos crudos a STAGING...")
-        for config in TABLES_CONFIG:
+        if concurrent:
             try:
-                load_raw_data(
-                    file_name=config['file'],
-                    table_name_raw=config['table_raw']
-                )
-            except Exception as e:
-                print(f"\n✗ Error al cargar {config['file']} a staging: {str(e)}")
-                raise
+                from .async_load import run_async, run_staging_load_async
+            except ImportError:
+                from pipeline.etl.async_load import run_async, run_staging_load_async
+            try:
+                from .parallel_copy import is_multi_part
+            except ImportError:
+                from pipeline.etl.parallel_copy import is_multi_part
+            # Las tablas con varias partes ya cargan en paralelo con su propio COPY por parte
+            single_file = [config for config in TABLES_CONFIG if not is_multi_part(config['file'])]
+            run_async(run_staging_load_async(single_file, error_tolerant=error_tolerant))
+            for config in TABLES_CONFIG:
+                if is_multi_part(config['file']):
+                    set_query_table(config['table_raw'])
+                    load_raw_data(config['file'], config['table_raw'], error_tolerant=error_tolerant)
+        else:
+            for config in TABLES_CONFIG:
+                set_query_table(config['table_raw'])
+                try:
+                    load_raw_data(
+                        file_name=config['file'],
+                        table_name_raw=config['table_raw'],
+                        error_tolerant=error_tolerant,
+                        incremental=incremental
+                    )
+                except Exception as e:
+                    print(f"\n✗ Error al cargar {config['file']} a staging: {str(e)}")
+                    raise
         
         print("\n" + "="*80)
         print("✓ CARGA A STAGING COMPLETADA")
@@ -126,7 +227,11 @@ def run_staging_load(create_tables: bool = True) -> None:
         raise
 
 
-def run_transformations() -> Dict[str, pd.DataFrame]:
+@query_context(stage='transform')
+def run_transformations(
+    backend: Optional[str] = None,
+    tables: Optional[List[str]] = None
+) -> Dict[str, pd.DataFrame]:
     """
     Ejecuta solo las transformaciones sobre datos en staging.
     
@@ -135,11 +240,22 @@ def run_transformations() -> Dict[str, pd.DataFrame]:
     2. Aplicar transformaciones
     3. Actualizar staging con datos transformados
     
+    En modo delta (ETLConfig.DELTA_MODE) se saltan las tablas cuyo CSV no cambió
+    (ni el de las tablas de las que depende su transformación): su staging conserva
+    los datos ya transformados en la ejecución anterior.
+    
+    Args:
+        backend: 'pandas' o 'polars'. Por defecto ETLConfig.TRANSFORM_BACKEND.
+                 Con 'polars' staging se lee y se reescribe con COPY vía Arrow
+        tables: Tablas staging a transformar (por defecto todas las de TABLES_CONFIG)
+    
     Returns:
         Diccionario con DataFrames transformados: {table_raw: DataFrame}
     """
+    backend = backend or ETLConfig.TRANSFORM_BACKEND
+    
     print("\n" + "="*80)
-    print("EJECUTANDO: Transformaciones sobre STAGING")
+    print(f"EJECUTANDO: Transformaciones sobre STAGING (backend: {backend})")
     print("="*80)
     
     db = DBConnector.get_instance()
@@ -147,16 +263,48 @@ def run_transformations() -> Dict[str, pd.DataFrame]:
     
     staging_data = {}
     
+    if backend == 'polars':
+        transformations_polars = load_polars_backend()
+    
     try:
         # Leer datos de staging para transformar
         for config in TABLES_CONFIG:
             table_raw = config['table_raw']
+            if tables is not None and table_raw not in tables:
+                continue
+            set_query_table(table_raw)
             print(f"\n   Transformando: {table_raw}")
             
+            if ETLConfig.DELTA_MODE and not has_changes(table_raw):
+                print(f"      ✓ Sin cambios desde la ejecución anterior, saltando transformación")
+                continue
+            
             try:
+                if backend == 'polars':
+                    # Lectura, transformación y escritura sobre buffers Arrow
+                    df = transformations_polars.read_staging_arrow(table_raw, engine)
+                    
+                    if df.height == 0:
+                        print(f"      ⚠ Tabla {table_raw} está vacía, saltando transformación")
+                        continue
+                    
+                    kwargs = {}
+                    if table_raw == 'ordenes_raw':
+                        kwargs['df_detalle_ordenes'] = transformations_polars.read_staging_arrow(
+                            'detalle_ordenes_raw', engine
+                        )
+                        kwargs['orden_offset'] = get_position_offset(table_raw)
+                    df_polars = transformations_polars.apply_transformations_polars(table_raw, df, **kwargs)
+                    transformations_polars.write_staging_arrow(table_raw, df_polars)
+                    df_transformed = df_polars.to_pandas(use_pyarrow_extension_array=True)
+                    
+                    print(f"      ✓ {len(df_transformed)} filas transformadas y actualizadas en {table_raw}")
+                    staging_data[table_raw] = df_transformed
+                    continue
+                
                 # Leer datos de staging
                 query = f"SELECT * FROM {table_raw}"
-                df = pd.read_sql(query, engine)
+                df = read_sql_with_plan(query, engine, table_raw)
                 
                 if len(df) == 0:
                     print(f"      ⚠ Tabla {table_raw} está vacía, saltando transformación")
@@ -166,14 +314,16 @@ def run_transformations() -> Dict[str, pd.DataFrame]:
                 # Para ordenes_raw, necesitamos detalle_ordenes_raw
                 if table_raw == 'ordenes_raw':
                     query_detalle = "SELECT * FROM detalle_ordenes_raw"
-                    df_detalle = pd.read_sql(query_detalle, engine)
+                    df_detalle = read_sql_with_plan(query_detalle, engine, 'detalle_ordenes_raw')
                     df_transformed = apply_transformations(
                         table_raw,
                         df,
-                        df_detalle_ordenes=df_detalle
+                        backend=backend,
+                        df_detalle_ordenes=df_detalle,
+                        orden_offset=get_position_offset(table_raw)
                     )
                 else:
-                    df_transformed = apply_transformations(table_raw, df)
+                    df_transformed = apply_transformations(table_raw, df, backend=backend)
                 
                 # Actualizar staging con datos transformados
                 # Eliminar datos antiguos y reinsertar transformados
@@ -189,6 +339,11 @@ def run_transformations() -> Dict[str, pd.DataFrame]:
                     method='multi'
                 )
                 
+                # Estadísticas de la tabla reescrita para las consultas siguientes
+                if ETLConfig.ANALYZE_STAGING_AFTER_LOAD:
+                    with engine.begin() as conn:
+                        conn.execute(text(f"ANALYZE {table_raw}"))
+                
                 print(f"      ✓ {len(df_transformed)} filas transformadas y actualizadas en {table_raw}")
                 staging_data[table_raw] = df_transformed
                 
@@ -213,7 +368,15 @@ def run_transformations() -> Dict[str, pd.DataFrame]:
         raise
 
 
-def run_production_load(create_tables: bool = True) -> Dict[str, Dict]:
+@query_context(stage='production')
+def run_production_load(
+    create_tables: bool = True,
+    create_indexes: bool = True,
+    check_integrity: Optional[bool] = None,
+    bulk_mode: Optional[bool] = None,
+    delta: Optional[bool] = None,
+    incremental: Optional[bool] = None
+) -> Dict[str, Dict]:
     """
     Ejecuta solo la carga de datos transformados a producción.
     
@@ -221,14 +384,36 @@ def run_production_load(create_tables: bool = True) -> Dict[str, Dict]:
     1. Crear tablas de producción (opcional)
     2. Cargar datos desde staging a producción
     3. Resolver foreign keys (automático)
+    4. Crear índices de foreign keys y fechas (opcional, después de la carga)
+    5. Verificar la integridad referencial (opcional, compuerta que aborta si hay huérfanos)
     
     Args:
         create_tables: Si True, crea las tablas de producción antes de cargar.
                       Si False, asume que las tablas ya existen.
+        create_indexes: Si True, crea los índices derivados de los modelos
+                        después de la carga masiva.
+        check_integrity: Si True, verifica todas las foreign keys de models.py y lanza
+                         ValueError si hay filas huérfanas. Si None, usa
+                         ETLConfig.CHECK_INTEGRITY_AFTER_LOAD
+        bulk_mode: Si True, elimina índices y constraints de las tablas vacías durante
+                   la carga y los reconstruye al final (ver bulk_mode.py).
+                   Si None, usa ETLConfig.PRODUCTION_BULK_MODE
+        delta: Si True, inserta solo las filas nuevas y actualiza las modificadas
+               respecto de la ejecución anterior; al terminar se confirman los hashes
+               por fila (ver delta.py). Si None, usa ETLConfig.DELTA_MODE
+        incremental: Si True, las tablas con marca de agua insertan solo su lote nuevo y el
+                     resto se carga en modo delta; al terminar se avanzan las marcas de agua
+                     (ver watermarks.py). Si None, usa ETLConfig.INCREMENTAL_MODE
     
     Returns:
         Diccionario con mapeos de IDs por tabla
     """
+    if incremental is None:
+        incremental = ETLConfig.INCREMENTAL_MODE
+    if delta is None:
+        delta = ETLConfig.DELTA_MODE
+    delta = delta or incremental
+    
     print("\n" + "="*80)
     print("EJECUTANDO: Carga a PRODUCCIÓN")
     print("="*80)
@@ -237,14 +422,37 @@ def run_production_load(create_tables: bool = True) -> Dict[str, Dict]:
     try:
         # Paso 1: Crear tablas de producción (si se solicita)
         if create_tables:
-            print("\n[1/2] Creando tablas de PRODUCCIÓN...")
+            print("\n[1/4] Creando tablas de PRODUCCIÓN...")
             create_production_tables()
         else:
-            print("\n[1/2] Saltando creación de tablas (asumiendo que ya existen)")
+            print("\n[1/4] Saltando creación de tablas (asumiendo que ya existen)")
         
         # Paso 2: Cargar datos transformados a producción y resolver FKs
-        print("\n[2/2] Cargando datos a PRODUCCIÓN y resolviendo Foreign Keys...")
-        id_mappings = load_all_to_production()
+        print("\n[2/4] Cargando datos a PRODUCCIÓN y resolviendo Foreign Keys...")
+        id_mappings = load_all_to_production(bulk_mode=bulk_mode, delta=delta, incremental=incremental)
+        
+        # Paso 3: Crear índices después de la carga masiva (si se solicita)
+        if create_indexes:
+            print("\n[3/4] Creando índices de PRODUCCIÓN...")
+            create_production_indexes()
+        else:
+            print("\n[3/4] Saltando creación de índices")
+        
+        # Paso 4: Compuerta de integridad referencial (si se solicita)
+        if check_integrity is None:
+            check_integrity = ETLConfig.CHECK_INTEGRITY_AFTER_LOAD
+        if check_integrity:
+            print("\n[4/4] Verificando integridad referencial...")
+            assert_referential_integrity(include_marts=False)
+        else:
+            print("\n[4/4] Saltando verificación de integridad referencial")
+        
+        # Los hashes y marcas de agua de cada tabla de producción se guardaron junto
+        # con su carga; aquí se confirman los de staging (tablas recargadas y transformadas)
+        if delta:
+            commit_staging_hashes()
+        if incremental:
+            commit_watermarks()
         
         # Importar LOAD_ORDER para contar tablas cargadas
         try:
@@ -263,6 +471,10 @@ def run_production_load(create_tables: bool = True) -> Dict[str, Dict]:
         return id_mappings
         
     except Exception as e:
+        # Las tablas ya escritas confirmaron sus hashes y marcas de agua en su propia
+        # transacción; se descarta lo pendiente, que la próxima ejecución vuelve a detectar
+        discard_staging_deltas()
+        discard_watermarks()
         print("\n" + "="*80)
         print("✗ ERROR EN CARGA A PRODUCCIÓN")
         print("="*80)
@@ -271,7 +483,10 @@ def run_production_load(create_tables: bool = True) -> Dict[str, Dict]:
         raise
 
 
-def run_full_pipeline() -> Dict[str, Dict]:
+def run_full_pipeline(
+    transform_backend: Optional[str] = None,
+    incremental: Optional[bool] = None
+) -> Dict[str, Dict]:
     """
     Ejecuta el proceso ETL completo de principio a fin.
     
@@ -283,34 +498,35 @@ def run_full_pipeline() -> Dict[str, Dict]:
     5. Cargar datos transformados a producción (con generación de IDs)
     6. Resolver foreign keys (automático)
     
+    Args:
+        transform_backend: Backend de transformaciones ('pandas' o 'polars').
+                           Por defecto ETLConfig.TRANSFORM_BACKEND
+        incremental: Si True, las tablas de hechos solo procesan las filas posteriores a
+                     su marca de agua (ver watermarks.py). Si None, usa ETLConfig.INCREMENTAL_MODE
+    
     Returns:
         Diccionario con mapeos de IDs por tabla
     
-    Nota: Esta función es equivalente a ejecutar main.py
+    Nota: Esta función es equivalente a ejecutar main.py. Las vistas materializadas
+    analíticas leen los marts de dbt: se refrescan después de dbt (run_dbt.py), no aquí
     """
     print("\n" + "="*80)
     print("EJECUTANDO: Pipeline ETL COMPLETO")
     print("(STAGING → TRANSFORMACIÓN → PRODUCCIÓN)")
     print("="*80)
     
+    start_query_log()
+    
     try:
         # Paso 1: Crear tablas staging
         print("\n[PASO 1/6] Creando tablas STAGING")
         print("="*80)
         create_staging_tables()
         
-        # Paso 2: Cargar datos crudos a staging
+        # Paso 2: Cargar datos crudos a staging (asíncrona si ETLConfig.ASYNC_STAGING_LOAD)
         print("\n[PASO 2/6] Cargando datos crudos a STAGING")
         print("="*80)
-        for config in TABLES_CONFIG:
-            try:
-                load_raw_data(
-                    file_name=config['file'],
-                    table_name_raw=config['table_raw']
-                )
-            except Exception as e:
-                print(f"\n✗ Error al cargar {config['file']} a staging: {str(e)}")
-                raise
+        run_staging_load(create_tables=False, incremental=incremental)  # Ya creadas en paso 1
         
         # Paso 3: Crear tablas de producción
         print("\n[PASO 3/6] Creando tablas de PRODUCCIÓN")
@@ -320,12 +536,12 @@ def run_full_pipeline() -> Dict[str, Dict]:
         # Paso 4: Ejecutar transformaciones sobre staging
         print("\n[PASO 4/6] Aplicando TRANSFORMACIONES sobre staging")
         print("="*80)
-        staging_data = run_transformations()
+        staging_data = run_transformations(backend=transform_backend)
         
         # Paso 5-6: Cargar datos transformados a producción y resolver FKs
         print("\n[PASO 5-6/6] Cargando datos a PRODUCCIÓN y resolviendo Foreign Keys")
         print("="*80)
-        id_mappings = run_production_load(create_tables=False)  # Ya creadas en paso 3
+        id_mappings = run_production_load(create_tables=False, incremental=incremental)  # Ya creadas en paso 3
         
         # Importar LOAD_ORDER para contar tablas cargadas
         try:
@@ -356,4 +572,7 @@ def run_full_pipeline() -> Dict[str, Dict]:
         print(f"Error: {str(e)}")
         print()
         raise
+    
+    finally:
+        finish_query_log()
 
@@ -0,0 +1,61 @@
+"""
+Módulo de hash por fila para la detección de cambios (hash-diff).
+
+Los snapshots SCD Type 2 de dbt (snap_usuarios, snap_productos) comparaban varias
+columnas de cada fila actual contra la fuente. Durante la carga a producción se
+calcula una única columna 'hash_fila' (BIGINT indexado) con las columnas de negocio
+de cada fila, de modo que detectar un cambio es comparar un solo valor.
+
+El hash se calcula de forma vectorizada con pd.util.hash_pandas_object y es
+determinista entre ejecuciones: los mismos valores producen siempre el mismo hash.
+"""
+
+import pandas as pd
+from typing import List
+
+# Nombre de la columna de hash en las tablas de producción
+HASH_COLUMN = 'hash_fila'
+
+
+def _normalize_column(series: pd.Series) -> pd.Series:
+    """Convierte una columna a texto; los floats enteros se escriben como enteros."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    if not pd.api.types.is_float_dtype(series.dtype):
+        return series.astype('string')
+
+    text = series.astype('string')
+    integral = series.notna() & (series % 1 == 0) & (series.abs() < 2**63)
+    if integral.any():
+        text[integral] = series[integral].astype('int64').astype('string')
+    return text
+
+
+def compute_row_hash(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    Calcula un hash de 64 bits por fila sobre un conjunto de columnas.
+
+    Los valores se normalizan a texto antes de hashear para que el resultado no
+    dependa del dtype con el que se leyó la columna (ej: Int16 vs int64, category
+    vs object). Los números enteros guardados como float (una columna entera con
+    nulos leída como float64) se escriben sin decimales, de modo que 1.0 y 1 producen
+    el mismo hash. Los nulos se representan como cadena vacía.
+
+    Args:
+        df: DataFrame con los datos
+        columns: Columnas que participan en el hash (en orden fijo)
+
+    Returns:
+        Serie int64 con el hash de cada fila (mismo índice que df)
+    """
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Columnas para el hash no encontradas en el DataFrame: {missing}")
+
+    normalized = pd.DataFrame(
+        {col: _normalize_column(df[col]) for col in columns}, index=df.index
+    ).fillna('')
+    hashes = pd.util.hash_pandas_object(normalized, index=False)
+
+    # PostgreSQL no tiene enteros sin signo: reinterpretar uint64 como BIGINT con signo
+    return pd.Series(hashes.to_numpy().view('int64'), index=df.index, name=HASH_COLUMN)
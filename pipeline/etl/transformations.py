@@ -13,9 +13,10 @@ import numpy as np
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-# Import PathManager desde utils
+# Import PathManager y ETLConfig desde utils
 try:
     from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
 except ImportError:
     current_dir = os.path.dirname(os.path.abspath(__file__))
     pipeline_dir = os.path.dirname(current_dir)
@@ -23,6 +24,7 @@ except ImportError:
     if utils_dir not in sys.path:
         sys.path.insert(0, utils_dir)
     from path_manager import PathManager
+    from config import ETLConfig
 
 # Configurar sys.path usando PathManager
 path_manager = PathManager.get_instance()
@@ -51,8 +53,10 @@ def apply_trim(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     
     for col in columns:
         if col in df_transformed.columns:
-            # Aplicar trim solo a valores no nulos
-            df_transformed[col] = df_transformed[col].astype(str).str.strip()
+            # Aplicar trim solo a valores no nulos (los nulos se mantienen como NaN,
+            # tanto en columnas object como category)
+            not_null = df_transformed[col].notna()
+            df_transformed[col] = df_transformed[col].astype(str).str.strip().where(not_null, np.nan)
             # Reemplazar strings vacíos con NaN
             df_transformed[col] = df_transformed[col].replace('', np.nan)
             # Reemplazar 'nan' string con NaN
@@ -136,8 +140,9 @@ def remove_duplicates_by_key(
     df_clean = df.copy()
     
     # Ordenar si se especifica una columna de ordenamiento
+    # (orden estable: ante empates se respeta el orden de aparición)
     if sort_column and sort_column in df_clean.columns:
-        df_clean = df_clean.sort_values(by=sort_column)
+        df_clean = df_clean.sort_values(by=sort_column, kind='stable')
     
     # Eliminar duplicados
     df_clean = df_clean.drop_duplicates(subset=key_columns, keep=keep)
@@ -248,7 +253,11 @@ def transform_productos(df: pd.DataFrame) -> pd.DataFrame:
     return df_transformed
 
 
-def transform_ordenes(df: pd.DataFrame, df_detalle_ordenes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+def transform_ordenes(
+    df: pd.DataFrame,
+    df_detalle_ordenes: Optional[pd.DataFrame] = None,
+    orden_offset: int = 0
+) -> pd.DataFrame:
     """
     Transforma la tabla ordenes_raw aplicando normalizaciones y cálculos.
     
@@ -259,6 +268,8 @@ def transform_ordenes(df: pd.DataFrame, df_detalle_ordenes: Optional[pd.DataFram
     Args:
         df: DataFrame de ordenes_raw
         df_detalle_ordenes: DataFrame de detalle_ordenes_raw (opcional) para calcular totales
+        orden_offset: Posición en el CSV de la orden anterior a la primera fila de df
+                      (carga incremental: staging solo tiene las órdenes nuevas)
         
     Returns:
         DataFrame transformado
@@ -289,7 +300,7 @@ def transform_ordenes(df: pd.DataFrame, df_detalle_ordenes: Optional[pd.DataFram
             # Crear un índice temporal basado en la posición (0-indexed)
             # que corresponde al orden_id (1-indexed)
             df_transformed = df_transformed.reset_index(drop=True)
-            df_transformed['_temp_orden_index'] = df_transformed.index + 1  # +1 porque orden_id empieza en 1
+            df_transformed['_temp_orden_index'] = df_transformed.index + 1 + orden_offset  # +1 porque orden_id empieza en 1
             
             # Hacer merge usando el índice temporal
             df_transformed = df_transformed.merge(
@@ -539,22 +550,59 @@ def transform_historial_pagos(df: pd.DataFrame) -> pd.DataFrame:
 # FUNCIÓN PRINCIPAL DE TRANSFORMACIÓN
 # ============================================================================
 
-def apply_transformations(table_name_raw: str, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+def load_polars_backend():
+    """
+    Importa el backend Polars (dependencia opcional).
+    
+    Returns:
+        Módulo transformations_polars
+        
+    Raises:
+        ImportError: Si polars no está instalado
+    """
+    try:
+        try:
+            from . import transformations_polars
+        except ImportError:
+            from pipeline.etl import transformations_polars
+    except ImportError as e:
+        raise ImportError(
+            f"El backend 'polars' requiere el paquete polars (pip install polars): {str(e)}"
+        ) from e
+    return transformations_polars
+
+
+def apply_transformations(
+    table_name_raw: str,
+    df: pd.DataFrame,
+    backend: Optional[str] = None,
+    **kwargs
+) -> pd.DataFrame:
     """
     Aplica las transformaciones correspondientes a una tabla staging.
     
     Args:
         table_name_raw: Nombre de la tabla staging (ej: 'usuarios_raw')
         df: DataFrame con datos de la tabla staging
+        backend: 'pandas' o 'polars' (ver transformations_polars.py).
+                 Por defecto ETLConfig.TRANSFORM_BACKEND
         **kwargs: Argumentos adicionales para transformaciones específicas
-                  (ej: df_detalle_ordenes para transform_ordenes)
+                  (ej: df_detalle_ordenes y orden_offset para transform_ordenes)
         
     Returns:
         DataFrame transformado
         
     Raises:
         ValueError: Si la tabla no tiene función de transformación definida
+                    o el backend no existe
     """
+    backend = backend or ETLConfig.TRANSFORM_BACKEND
+    if backend == 'polars':
+        transformations_polars = load_polars_backend()
+        return transformations_polars.apply_transformations_pandas(table_name_raw, df, **kwargs)
+    if backend != 'pandas':
+        raise ValueError(f"Backend de transformaciones desconocido: '{backend}' (usar 'pandas' o 'polars')")
+    
     transform_map = {
         'usuarios_raw': transform_usuarios,
         'categorias_raw': transform_categorias,
@@ -580,7 +628,11 @@ def apply_transformations(table_name_raw: str, df: pd.DataFrame, **kwargs) -> pd
     
     # Aplicar transformación
     if table_name_raw == 'ordenes_raw' and 'df_detalle_ordenes' in kwargs:
-        return transform_func(df, df_detalle_ordenes=kwargs['df_detalle_ordenes'])
+        return transform_func(
+            df,
+            df_detalle_ordenes=kwargs['df_detalle_ordenes'],
+            orden_offset=kwargs.get('orden_offset', 0)
+        )
     else:
         return transform_func(df)
 
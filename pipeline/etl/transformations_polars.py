@@ -0,0 +1,674 @@
+"""
+Backend de transformaciones sobre Polars (motor lazy multi-hilo) y Arrow.
+
+Implementa las mismas reglas que transformations.py (backend pandas) como planes
+lazy de Polars que se ejecutan en paralelo y sin objetos Python por fila:
+- Trim de textos y normalización de emails con expresiones vectorizadas de strings
+- Totales de órdenes calculados con group_by + join
+- Deduplicación de reseñas con una ventana por (usuario_id, producto_id)
+
+Los datos de staging se leen y se escriben como buffers Arrow: COPY ... TO STDOUT
+se convierte a Arrow con pyarrow.csv y Polars lo toma sin copiar; el resultado se
+serializa desde Arrow y se vuelve a cargar con COPY ... FROM STDIN.
+
+El backend se elige con ETLConfig.TRANSFORM_BACKEND o con el parámetro 'backend'
+de apply_transformations / run_transformations. check_transform_parity compara el
+resultado de ambos backends sobre los mismos datos.
+
+Requiere polars (dependencia opcional: solo se importa si se elige este backend).
+"""
+
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from typing import Dict, List, Optional, Union
+from sqlalchemy import text
+
+# Import PathManager desde utils
+try:
+    from ..utils.path_manager import PathManager
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+try:
+    from .load_raw_data import analyze_staging_table
+except ImportError:
+    from pipeline.etl.load_raw_data import analyze_staging_table
+
+
+# Reemplazos de acentos en emails (mismos que normalize_emails)
+EMAIL_REPLACEMENTS = {
+    'á': 'a', 'à': 'a', 'ä': 'a', 'â': 'a',
+    'é': 'e', 'è': 'e', 'ë': 'e', 'ê': 'e',
+    'í': 'i', 'ì': 'i', 'ï': 'i', 'î': 'i',
+    'ó': 'o', 'ò': 'o', 'ö': 'o', 'ô': 'o',
+    'ú': 'u', 'ù': 'u', 'ü': 'u', 'û': 'u',
+    'ñ': 'n', 'ç': 'c'
+}
+
+EMAIL_PATTERN = r'^[a-z0-9._-]+@[a-z0-9.-]+\.[a-z]{2,}$'
+
+# Tipos de las columnas de staging (information_schema.columns.data_type) → Arrow
+PG_TO_ARROW = {
+    'smallint': pa.int16(),
+    'integer': pa.int32(),
+    'bigint': pa.int64(),
+    'numeric': pa.float64(),
+    'real': pa.float32(),
+    'double precision': pa.float64(),
+    'boolean': pa.bool_(),
+    'date': pa.date32(),
+    'timestamp without time zone': pa.timestamp('us'),
+    'text': pa.string(),
+    'character varying': pa.string(),
+    'character': pa.string(),
+}
+
+FrameLike = Union[pl.DataFrame, pl.LazyFrame]
+
+
+# ============================================================================
+# EXPRESIONES GENÉRICAS
+# ============================================================================
+
+def _lazy(df: Optional[FrameLike]) -> Optional[pl.LazyFrame]:
+    """Convierte un DataFrame de Polars en LazyFrame (None se mantiene)."""
+    if df is None or isinstance(df, pl.LazyFrame):
+        return df
+    return df.lazy()
+
+
+def apply_trim(lf: pl.LazyFrame, columns: List[str]) -> pl.LazyFrame:
+    """
+    Aplica trim a columnas de texto; los strings vacíos y 'nan' pasan a nulo.
+
+    Args:
+        lf: LazyFrame a transformar
+        columns: Columnas a las que aplicar trim (las inexistentes se ignoran)
+
+    Returns:
+        LazyFrame con las columnas trimadas
+    """
+    names = lf.collect_schema().names()
+    exprs = []
+    for col in columns:
+        if col in names:
+            trimmed = pl.col(col).cast(pl.String).str.strip_chars()
+            exprs.append(
+                pl.when(trimmed.is_in(['', 'nan'])).then(None).otherwise(trimmed).alias(col)
+            )
+    return lf.with_columns(exprs) if exprs else lf
+
+
+def normalize_emails_expr(col: str) -> pl.Expr:
+    """
+    Expresión equivalente a normalize_emails: minúsculas, sin espacios ni acentos,
+    solo caracteres válidos y, si no cumple el formato, dominio sin '_'.
+
+    Args:
+        col: Nombre de la columna de emails
+
+    Returns:
+        Expresión de Polars con el email normalizado
+    """
+    email = (
+        pl.col(col).cast(pl.String)
+        .str.to_lowercase()
+        .str.replace_all(' ', '', literal=True)
+        .str.replace_many(list(EMAIL_REPLACEMENTS.keys()), list(EMAIL_REPLACEMENTS.values()))
+        .str.replace_all(r'[^a-z0-9@._-]', '')
+    )
+    parts = email.str.split('@')
+    corrected = parts.list.get(0) + '@' + parts.list.get(1).str.replace_all('_', '', literal=True)
+    needs_fix = ~email.str.contains(EMAIL_PATTERN) & (email.str.count_matches('@', literal=True) == 1)
+    return pl.when(needs_fix).then(corrected).otherwise(email).alias(col)
+
+
+def _clamp_negatives(lf: pl.LazyFrame, columns: List[str]):
+    """
+    Reemplaza por 0 los valores negativos de columnas numéricas.
+
+    Args:
+        lf: LazyFrame a transformar
+        columns: Columnas a validar (las inexistentes se ignoran)
+
+    Returns:
+        Tupla (LazyFrame corregido, LazyFrame de una fila con los negativos por columna)
+    """
+    schema = lf.collect_schema()
+    present = [col for col in columns if col in schema.names()]
+    if not present:
+        return lf, None
+    counts = lf.select([(pl.col(col) < 0).sum().alias(col) for col in present])
+    clamped = lf.with_columns([
+        pl.when(pl.col(col) < 0).then(pl.lit(0)).otherwise(pl.col(col)).cast(schema[col]).alias(col)
+        for col in present
+    ])
+    return clamped, counts
+
+
+def _collect_with_warnings(
+    lf: pl.LazyFrame,
+    counts: Optional[pl.LazyFrame],
+    messages: Dict[str, str]
+) -> pl.DataFrame:
+    """
+    Ejecuta el plan y el conteo de negativos en una sola pasada paralela
+    (collect_all comparte el escaneo) e imprime las advertencias.
+    """
+    if counts is None:
+        return lf.collect()
+    df, counts_df = pl.collect_all([lf, counts])
+    for col in counts_df.columns:
+        negativos = counts_df[col][0] or 0
+        if negativos > 0:
+            print(f"      ⚠ Advertencia: {negativos} {messages[col]} encontrados")
+    return df
+
+
+# ============================================================================
+# FUNCIONES DE TRANSFORMACIÓN POR TABLA
+# ============================================================================
+
+def _transform_trim_only(df: FrameLike, table: str, columns: List[str]) -> pl.DataFrame:
+    """Transformación de tablas que solo aplican trim a campos de texto."""
+    print(f"   Aplicando transformaciones a {table}...")
+    result = apply_trim(_lazy(df), columns).collect()
+    print(f"   ✓ Transformación de {table} completada")
+    return result
+
+
+def _transform_clamp_only(df: FrameLike, table: str, messages: Dict[str, str]) -> pl.DataFrame:
+    """Transformación de tablas que solo validan que columnas numéricas no sean negativas."""
+    print(f"   Aplicando transformaciones a {table}...")
+    lf, counts = _clamp_negatives(_lazy(df), list(messages.keys()))
+    result = _collect_with_warnings(lf, counts, messages)
+    print(f"   ✓ Transformación de {table} completada")
+    return result
+
+
+def transform_usuarios(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_usuarios."""
+    print("   Aplicando transformaciones a usuarios...")
+    lf = apply_trim(_lazy(df), ['nombre', 'apellido', 'dni'])
+
+    if 'email' not in lf.collect_schema().names():
+        result = lf.collect()
+    else:
+        original = pl.col('email').cast(pl.String)
+        lf = lf.with_columns(original.alias('_email_original')).with_columns(normalize_emails_expr('email'))
+        # Mismo criterio que pandas: los nulos cuentan como distintos (NaN != NaN)
+        stats = lf.select(
+            pl.col('email').is_not_null().sum().alias('no_nulos'),
+            (pl.col('_email_original').ne_missing(pl.col('email'))
+             | pl.col('_email_original').is_null()).sum().alias('corregidos'),
+        )
+        result, stats_df = pl.collect_all([lf.drop('_email_original'), stats])
+        print(f"      Normalizando {stats_df['no_nulos'][0]} emails...")
+        if stats_df['corregidos'][0] > 0:
+            print(f"      ✓ {stats_df['corregidos'][0]} emails normalizados")
+
+    print("   ✓ Transformación de usuarios completada")
+    return result
+
+
+def transform_categorias(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_categorias."""
+    return _transform_trim_only(df, 'categorias', ['nombre', 'descripcion'])
+
+
+def transform_productos(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_productos."""
+    print("   Aplicando transformaciones a productos...")
+    lf = apply_trim(_lazy(df), ['nombre', 'descripcion'])
+    lf, counts = _clamp_negatives(lf, ['precio', 'stock'])
+    result = _collect_with_warnings(lf, counts, {
+        'precio': 'productos con precio negativo',
+        'stock': 'productos con stock negativo',
+    })
+    print("   ✓ Transformación de productos completada")
+    return result
+
+
+def transform_ordenes(
+    df: FrameLike,
+    df_detalle_ordenes: Optional[FrameLike] = None,
+    orden_offset: int = 0
+) -> pl.DataFrame:
+    """
+    Equivalente Polars de transformations.transform_ordenes.
+
+    El total de cada orden se recalcula desde detalle_ordenes con group_by + join,
+    usando la posición de la fila (1-indexed, desplazada por orden_offset) como
+    orden_id, igual que el backend pandas.
+    """
+    print("   Aplicando transformaciones a ordenes...")
+    lf = _lazy(df)
+    lf_detalle = _lazy(df_detalle_ordenes)
+    stats = None
+
+    if lf_detalle is not None and 'orden_id' in lf_detalle.collect_schema().names():
+        print("      Calculando totales desde detalle_ordenes...")
+        detalle_names = lf_detalle.collect_schema().names()
+
+        if 'cantidad' in detalle_names and 'precio_unitario' in detalle_names:
+            totales_por_orden = (
+                lf_detalle
+                .group_by(pl.col('orden_id').cast(pl.Int64))
+                .agg((pl.col('cantidad') * pl.col('precio_unitario')).sum().alias('total_calculado'))
+            )
+            lf = (
+                lf.with_row_index('_temp_orden_index', offset=1 + orden_offset)
+                .with_columns(pl.col('_temp_orden_index').cast(pl.Int64))
+                .join(totales_por_orden, left_on='_temp_orden_index', right_on='orden_id', how='left')
+                .sort('_temp_orden_index')
+            )
+
+            if 'total' in lf.collect_schema().names():
+                lf = lf.with_columns(
+                    pl.col('total').alias('_total_original'),
+                    pl.coalesce(pl.col('total_calculado'), pl.col('total')).alias('total'),
+                )
+                # Mismo criterio que pandas: los nulos cuentan como distintos (NaN != NaN)
+                stats = lf.select(
+                    (pl.col('_total_original').round(2).ne_missing(pl.col('total').round(2))
+                     | pl.col('_total_original').is_null()
+                     | pl.col('total').is_null()).sum().alias('inconsistencias')
+                )
+                lf = lf.drop(['total_calculado', '_temp_orden_index', '_total_original'])
+
+    lf, counts = _clamp_negatives(lf, ['total'])
+    if stats is None:
+        result = _collect_with_warnings(lf, counts, {'total': 'órdenes con total negativo'})
+    else:
+        if counts is None:
+            result, stats_df = pl.collect_all([lf, stats])
+        else:
+            result, stats_df, counts_df = pl.collect_all([lf, stats, counts])
+        inconsistencias = stats_df['inconsistencias'][0]
+        if inconsistencias > 0:
+            print(f"      ✓ {inconsistencias} totales de órdenes corregidos")
+        else:
+            print(f"      ✓ Total de órdenes verificado (todos coinciden con detalle_ordenes)")
+        if counts is not None and (counts_df['total'][0] or 0) > 0:
+            print(f"      ⚠ Advertencia: {counts_df['total'][0]} órdenes con total negativo encontrados")
+
+    print("   ✓ Transformación de ordenes completada")
+    return result
+
+
+def transform_detalle_ordenes(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_detalle_ordenes."""
+    return _transform_clamp_only(df, 'detalle_ordenes', {
+        'cantidad': 'detalles con cantidad negativa',
+        'precio_unitario': 'detalles con precio_unitario negativo',
+    })
+
+
+def transform_resenas_productos(df: FrameLike) -> pl.DataFrame:
+    """
+    Equivalente Polars de transformations.transform_resenas_productos.
+
+    Conserva la última reseña de cada (usuario_id, producto_id) según un orden
+    estable por fecha (nulos al final), igual que el backend pandas.
+    """
+    print("   Aplicando transformaciones a resenas_productos...")
+    lf = _lazy(df)
+    names = lf.collect_schema().names()
+    key_columns = ['usuario_id', 'producto_id']
+
+    if not all(col in names for col in key_columns):
+        result = lf.collect()
+    else:
+        if 'fecha' in names:
+            lf = lf.sort('fecha', nulls_last=True, maintain_order=True)
+        lf_dedup = (
+            lf.with_row_index('_posicion')
+            .filter(pl.col('_posicion') == pl.col('_posicion').max().over(key_columns))
+            .drop('_posicion')
+        )
+        result, total_df = pl.collect_all([lf_dedup, lf.select(pl.len().alias('registros'))])
+        duplicados_eliminados = total_df['registros'][0] - result.height
+        if duplicados_eliminados > 0:
+            print(f"      ✓ {duplicados_eliminados} reseñas duplicadas eliminadas")
+
+    print("   ✓ Transformación de resenas_productos completada")
+    return result
+
+
+def transform_direcciones_envio(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_direcciones_envio."""
+    return _transform_trim_only(df, 'direcciones_envio', [
+        'calle', 'ciudad', 'departamento', 'provincia', 'distrito', 'estado', 'codigo_postal', 'pais'
+    ])
+
+
+def transform_metodos_pago(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_metodos_pago."""
+    return _transform_trim_only(df, 'metodos_pago', ['nombre', 'descripcion'])
+
+
+def transform_carrito(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_carrito."""
+    return _transform_clamp_only(df, 'carrito', {'cantidad': 'registros con cantidad negativa'})
+
+
+def transform_ordenes_metodos_pago(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_ordenes_metodos_pago."""
+    return _transform_clamp_only(df, 'ordenes_metodos_pago', {
+        'monto_pagado': 'registros con monto_pagado negativo'
+    })
+
+
+def transform_historial_pagos(df: FrameLike) -> pl.DataFrame:
+    """Equivalente Polars de transformations.transform_historial_pagos."""
+    return _transform_clamp_only(df, 'historial_pagos', {'monto': 'registros con monto negativo'})
+
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL DE TRANSFORMACIÓN
+# ============================================================================
+
+TRANSFORM_MAP = {
+    'usuarios_raw': transform_usuarios,
+    'categorias_raw': transform_categorias,
+    'productos_raw': transform_productos,
+    'ordenes_raw': transform_ordenes,
+    'detalle_ordenes_raw': transform_detalle_ordenes,
+    'direcciones_envio_raw': transform_direcciones_envio,
+    'carrito_raw': transform_carrito,
+    'metodos_pago_raw': transform_metodos_pago,
+    'ordenes_metodos_pago_raw': transform_ordenes_metodos_pago,
+    'resenas_productos_raw': transform_resenas_productos,
+    'historial_pagos_raw': transform_historial_pagos
+}
+
+
+def apply_transformations_polars(table_name_raw: str, df: FrameLike, **kwargs) -> pl.DataFrame:
+    """
+    Aplica las transformaciones de una tabla staging con el backend Polars.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging (ej: 'usuarios_raw')
+        df: DataFrame o LazyFrame de Polars con los datos de staging
+        **kwargs: df_detalle_ordenes (Polars) y orden_offset para ordenes_raw
+
+    Returns:
+        DataFrame de Polars transformado
+
+    Raises:
+        ValueError: Si la tabla no tiene función de transformación definida
+    """
+    if table_name_raw not in TRANSFORM_MAP:
+        available_tables = ', '.join(TRANSFORM_MAP.keys())
+        raise ValueError(
+            f"No hay función de transformación definida para '{table_name_raw}'.\n"
+            f"Tablas disponibles: {available_tables}"
+        )
+
+    transform_func = TRANSFORM_MAP[table_name_raw]
+    if table_name_raw == 'ordenes_raw' and 'df_detalle_ordenes' in kwargs:
+        return transform_func(
+            df,
+            df_detalle_ordenes=kwargs['df_detalle_ordenes'],
+            orden_offset=kwargs.get('orden_offset', 0)
+        )
+    return transform_func(df)
+
+
+def _to_pandas_like(df: pl.DataFrame, reference: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte el resultado de Polars a pandas con los mismos dtypes que produce el
+    backend pandas: textos como object con NaN y el resto con el dtype de entrada.
+    """
+    result = df.to_pandas()
+    for col in result.columns:
+        if df.schema[col] == pl.String:
+            result[col] = result[col].astype(object).where(result[col].notna(), np.nan)
+        elif col in reference.columns and result[col].dtype != reference[col].dtype:
+            try:
+                result[col] = result[col].astype(reference[col].dtype)
+            except (TypeError, ValueError):
+                pass
+    return result
+
+
+def apply_transformations_pandas(table_name_raw: str, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """
+    Ejecuta el backend Polars sobre DataFrames de pandas (entrada y salida pandas).
+
+    Es la variante que usa apply_transformations(..., backend='polars'); la
+    conversión pandas ↔ Polars se hace a través de Arrow.
+    """
+    polars_kwargs = {}
+    if kwargs.get('df_detalle_ordenes') is not None:
+        polars_kwargs['df_detalle_ordenes'] = pl.from_pandas(kwargs['df_detalle_ordenes'])
+    if 'orden_offset' in kwargs:
+        polars_kwargs['orden_offset'] = kwargs['orden_offset']
+    result = apply_transformations_polars(table_name_raw, pl.from_pandas(df), **polars_kwargs)
+    return _to_pandas_like(result, df)
+
+
+# ============================================================================
+# LECTURA / ESCRITURA DE STAGING VÍA ARROW
+# ============================================================================
+
+def _staging_arrow_types(engine, table_raw: str) -> Dict[str, pa.DataType]:
+    """Tipos Arrow de las columnas de una tabla staging, según information_schema."""
+    query = """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :table_name
+        ORDER BY ordinal_position
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'table_name': table_raw})
+        return {row.column_name: PG_TO_ARROW.get(row.data_type, pa.string()) for row in rows}
+
+
+def read_staging_arrow(table_raw: str, engine=None) -> pl.DataFrame:
+    """
+    Lee una tabla staging con COPY ... TO STDOUT directamente a Arrow.
+
+    Args:
+        table_raw: Nombre de la tabla staging
+        engine: SQLAlchemy engine (opcional, por defecto el del DBConnector)
+
+    Returns:
+        DataFrame de Polars respaldado por los buffers Arrow leídos
+    """
+    db = DBConnector.get_instance()
+    engine = engine or db.get_engine()
+    column_types = _staging_arrow_types(engine, table_raw)
+    columns = ', '.join(f'"{col}"' for col in column_types)
+
+    buffer = io.BytesIO()
+    with db.get_raw_connection() as conn:
+        cursor = conn.cursor()
+        cursor.copy_expert(
+            f"COPY (SELECT {columns} FROM {table_raw}) TO STDOUT WITH (FORMAT CSV, HEADER true)",
+            buffer
+        )
+        cursor.close()
+    buffer.seek(0)
+
+    table = pacsv.read_csv(
+        buffer,
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+            true_values=['t'],
+            false_values=['f'],
+        ),
+    )
+    return pl.from_arrow(table)
+
+
+def write_staging_arrow(table_raw: str, df: pl.DataFrame) -> None:
+    """
+    Reemplaza el contenido de una tabla staging con un DataFrame de Polars
+    (TRUNCATE + COPY ... FROM STDIN en la misma transacción).
+
+    Args:
+        table_raw: Nombre de la tabla staging
+        df: DataFrame de Polars con las columnas de la tabla
+    """
+    df = df.with_columns(
+        pl.col(pl.Categorical).cast(pl.String),
+        pl.col(pl.Datetime).dt.cast_time_unit('us'),
+    )
+    buffer = io.BytesIO()
+    pacsv.write_csv(df.to_arrow(compat_level=pl.CompatLevel.oldest()), buffer)
+    buffer.seek(0)
+
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    db = DBConnector.get_instance()
+    with db.get_raw_connection(profile='bulk_load') as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"TRUNCATE TABLE {table_raw} CASCADE")
+            cursor.copy_expert(
+                f"COPY {table_raw} ({columns}) FROM STDIN WITH (FORMAT CSV, HEADER true)",
+                buffer
+            )
+            analyze_staging_table(cursor, table_raw)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+# ============================================================================
+# PARIDAD ENTRE BACKENDS
+# ============================================================================
+
+def _normalize_for_comparison(series: pd.Series) -> pd.Series:
+    """Lleva una columna a una forma comparable (nulos unificados, categorías como texto)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype('float64')
+    return series.astype(object).where(series.notna(), None)
+
+
+def compare_frames(expected: pd.DataFrame, actual: pd.DataFrame, rtol: float = 1e-9) -> List[str]:
+    """
+    Compara dos resultados de transformación fila a fila (ignorando el índice).
+
+    Los numéricos se comparan con tolerancia relativa rtol (el orden de las sumas
+    en paralelo puede diferir en el último bit); el resto por igualdad exacta.
+
+    Returns:
+        Lista de diferencias encontradas (vacía si son idénticos)
+    """
+    differences = []
+    if list(expected.columns) != list(actual.columns):
+        return [f"columnas distintas: {list(expected.columns)} vs {list(actual.columns)}"]
+    if len(expected) != len(actual):
+        return [f"número de filas distinto: {len(expected)} vs {len(actual)}"]
+
+    expected = expected.reset_index(drop=True)
+    actual = actual.reset_index(drop=True)
+    for col in expected.columns:
+        left = _normalize_for_comparison(expected[col])
+        right = _normalize_for_comparison(actual[col])
+        if left.dtype == 'float64' and right.dtype == 'float64':
+            equal = np.isclose(left.to_numpy(), right.to_numpy(), rtol=rtol, atol=0, equal_nan=True)
+        else:
+            equal = np.array([
+                (a is None and b is None) or (a is not None and b is not None and a == b)
+                for a, b in zip(left.tolist(), right.tolist())
+            ], dtype=bool)
+        mismatches = int((~equal).sum())
+        if mismatches:
+            first = int(np.argmax(~equal))
+            differences.append(
+                f"{col}: {mismatches} filas distintas (ej: fila {first}: "
+                f"{expected[col].iloc[first]!r} vs {actual[col].iloc[first]!r})"
+            )
+    return differences
+
+
+def check_transform_parity(table_name_raw: str, df: pd.DataFrame, **kwargs) -> List[str]:
+    """
+    Ejecuta la transformación de una tabla con ambos backends y compara los resultados.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging
+        df: DataFrame de pandas con los datos de entrada
+        **kwargs: Argumentos adicionales (ej: df_detalle_ordenes)
+
+    Returns:
+        Lista de diferencias (vacía si los backends producen lo mismo)
+    """
+    try:
+        from .transformations import apply_transformations
+    except ImportError:
+        from pipeline.etl.transformations import apply_transformations
+
+    expected = apply_transformations(table_name_raw, df, backend='pandas', **kwargs)
+    actual = apply_transformations(table_name_raw, df, backend='polars', **kwargs)
+    return compare_frames(expected, actual)
+
+
+def check_staging_parity(tables: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    Verifica la paridad de backends sobre los datos actuales de staging.
+
+    Args:
+        tables: Tablas staging a verificar (por defecto todas las de TRANSFORM_MAP)
+
+    Returns:
+        Diccionario {tabla: diferencias}
+    """
+    try:
+        from .dtype_plan import read_sql_with_plan
+    except ImportError:
+        from pipeline.etl.dtype_plan import read_sql_with_plan
+
+    engine = DBConnector.get_instance().get_engine()
+    tables = tables or list(TRANSFORM_MAP.keys())
+
+    print(f"\n{'='*80}")
+    print("VERIFICANDO PARIDAD DE BACKENDS (pandas vs polars)")
+    print(f"{'='*80}")
+
+    results = {}
+    for table_raw in tables:
+        df = read_sql_with_plan(f"SELECT * FROM {table_raw}", engine, table_raw)
+        kwargs = {}
+        if table_raw == 'ordenes_raw':
+            kwargs['df_detalle_ordenes'] = read_sql_with_plan(
+                "SELECT * FROM detalle_ordenes_raw", engine, 'detalle_ordenes_raw'
+            )
+        results[table_raw] = check_transform_parity(table_raw, df, **kwargs)
+
+    for table_raw, differences in results.items():
+        if differences:
+            print(f"   ✗ {table_raw}:")
+            for difference in differences:
+                print(f"      - {difference}")
+        else:
+            print(f"   ✓ {table_raw}: resultados idénticos")
+
+    return results
@@ -0,0 +1,323 @@
+"""
+Módulo de pre-validación de constraints para tablas de PRODUCCIÓN.
+
+Lee las constraints declaradas en los modelos ORM (models.py) y las evalúa sobre
+el DataFrame completo con operaciones vectorizadas ANTES de escribir en PostgreSQL:
+- CHECK constraints (ej: precio >= 0, calificacion entre 1 y 5)
+- NOT NULL
+- UNIQUE (dentro del lote y contra las filas ya existentes en producción)
+- Valores válidos de Enums y longitud máxima de VARCHAR
+- FOREIGN KEY (el ID referenciado debe existir en la tabla padre de producción)
+
+Las filas que violan alguna constraint se desvían a una tabla de cuarentena
+por tabla (ej: 'productos_quarantine') junto con el motivo, de modo que la carga
+masiva nunca se aborta a mitad de camino.
+"""
+
+import os
+import sys
+import re
+import pandas as pd
+from typing import Dict, Set, Tuple
+from sqlalchemy import CheckConstraint, UniqueConstraint, Enum, Integer, String, text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import de los modelos de producción
+try:
+    from ..models.models import Base
+except ImportError:
+    from pipeline.models.models import Base
+
+
+# ============================================================================
+# LECTURA DE CONSTRAINTS DESDE LOS MODELOS
+# ============================================================================
+
+def get_table_constraints(table_name: str) -> Dict[str, list]:
+    """
+    Extrae las constraints de una tabla de producción desde la metadata de SQLAlchemy.
+
+    Args:
+        table_name: Nombre de la tabla de producción (ej: 'productos')
+
+    Returns:
+        Diccionario con las constraints agrupadas por tipo:
+        - 'check': Lista de tuplas (nombre, expresión SQL)
+        - 'not_null': Lista de columnas NOT NULL (sin PK ni valores por defecto)
+        - 'unique': Lista de listas de columnas UNIQUE
+        - 'enum': Lista de tuplas (columna, valores válidos)
+        - 'max_length': Lista de tuplas (columna, longitud máxima)
+        - 'foreign_key': Lista de tuplas (columna, tabla padre, columna padre)
+
+    Raises:
+        ValueError: Si la tabla no está definida en los modelos
+    """
+    if table_name not in Base.metadata.tables:
+        raise ValueError(f"La tabla '{table_name}' no está definida en los modelos de producción")
+
+    table = Base.metadata.tables[table_name]
+    constraints = {
+        'check': [], 'not_null': [], 'unique': [], 'enum': [], 'max_length': [], 'foreign_key': []
+    }
+
+    for constraint in table.constraints:
+        if isinstance(constraint, CheckConstraint):
+            constraints['check'].append((constraint.name, str(constraint.sqltext)))
+        elif isinstance(constraint, UniqueConstraint):
+            constraints['unique'].append([col.name for col in constraint.columns])
+
+    for column in table.columns:
+        if column.primary_key:
+            continue
+        # Las columnas con valor por defecto en el servidor no fallan si vienen nulas
+        if not column.nullable and column.server_default is None:
+            constraints['not_null'].append(column.name)
+        if column.unique and [column.name] not in constraints['unique']:
+            constraints['unique'].append([column.name])
+        if isinstance(column.type, Enum):
+            constraints['enum'].append((column.name, list(column.type.enums)))
+        elif isinstance(column.type, String) and column.type.length:
+            constraints['max_length'].append((column.name, column.type.length))
+        for foreign_key in column.foreign_keys:
+            constraints['foreign_key'].append(
+                (column.name, foreign_key.column.table.name, foreign_key.column.name)
+            )
+
+    return constraints
+
+
+def _sql_check_to_pandas(expression: str) -> str:
+    """
+    Traduce una expresión CHECK de SQL a una expresión evaluable con DataFrame.eval.
+
+    Args:
+        expression: Expresión SQL (ej: 'calificacion >= 1 AND calificacion <= 5')
+
+    Returns:
+        Expresión equivalente para pandas (ej: 'calificacion >= 1 and calificacion <= 5')
+    """
+    expression = re.sub(r'\bAND\b', 'and', expression, flags=re.IGNORECASE)
+    expression = re.sub(r'\bOR\b', 'or', expression, flags=re.IGNORECASE)
+    expression = re.sub(r'\bNOT\b', 'not', expression, flags=re.IGNORECASE)
+    expression = re.sub(r'<>', '!=', expression)
+    # '=' de SQL es '==' en pandas (sin tocar >=, <=, != ni ==)
+    expression = re.sub(r'(?<![<>!=])=(?!=)', '==', expression)
+    return expression
+
+
+def _check_violation_mask(df: pd.DataFrame, expression: str) -> pd.Series:
+    """
+    Evalúa una CHECK constraint sobre todo el DataFrame y devuelve las filas que la violan.
+
+    Igual que en PostgreSQL, una CHECK con operandos NULL se considera satisfecha.
+    Un valor no nulo que no se puede convertir a número (ej: 'abc' en precio) es una
+    violación: PostgreSQL rechazaría la fila al convertirlo al tipo de la columna.
+    Si la expresión referencia columnas que no vienen en el DataFrame, no se evalúa.
+
+    Args:
+        df: DataFrame a validar
+        expression: Expresión SQL de la CHECK constraint
+
+    Returns:
+        Serie booleana (True = la fila viola la constraint)
+    """
+    referenced = [
+        token for token in set(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', expression))
+        if token in df.columns
+    ]
+    if not referenced:
+        return pd.Series(False, index=df.index)
+
+    # Convertir a numérico las columnas referenciadas para poder comparar
+    df_eval = df[referenced].apply(pd.to_numeric, errors='coerce')
+    result = df_eval.eval(_sql_check_to_pandas(expression))
+
+    # Valores no nulos que la conversión dejó en NaN: no son numéricos
+    not_numeric = (df_eval.isna() & df[referenced].notna()).any(axis=1)
+    has_nulls = df_eval.isna().any(axis=1)
+    satisfied = result.astype('boolean').fillna(True)
+    return (~satisfied & ~has_nulls) | not_numeric
+
+
+def _existing_values(engine, table_name: str, column: str, values: list) -> Set:
+    """
+    Consulta cuáles de los valores ya existen en una columna de producción.
+
+    Solo se envían a PostgreSQL los valores candidatos del lote (no se lee la
+    columna completa), de modo que el costo depende del lote y no de la tabla.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Tabla de producción
+        column: Columna a consultar
+        values: Valores candidatos (tipos nativos de Python)
+
+    Returns:
+        Conjunto con los valores que existen en la tabla
+    """
+    if not values:
+        return set()
+    query = text(f"SELECT DISTINCT {column} FROM {table_name} WHERE {column} = ANY(:values)")
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(query, {'values': values})}
+
+
+# ============================================================================
+# VALIDACIÓN VECTORIZADA
+# ============================================================================
+
+def validate_constraints(
+    df: pd.DataFrame,
+    target_table: str,
+    engine=None,
+    check_existing: bool = True
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Valida un DataFrame contra las constraints del modelo de producción.
+
+    Todas las reglas se evalúan como máscaras vectorizadas sobre el DataFrame completo.
+    La unicidad se evalúa al final, solo entre las filas que pasaron el resto de
+    reglas, y también contra los valores ya existentes en la tabla destino
+    (si se proporciona un engine).
+
+    Las foreign keys se validan contra la tabla padre de producción (si se
+    proporciona un engine). Las tablas padre se cargan antes que sus hijas, así
+    que producción ya tiene las filas válidas del lote padre: una fila hija cuyo
+    padre fue a cuarentena no encuentra su ID y también va a cuarentena, en vez
+    de abortar la carga con un error de FK.
+
+    Args:
+        df: DataFrame listo para insertar en producción
+        target_table: Nombre de la tabla de producción
+        engine: SQLAlchemy engine (opcional, para validar UNIQUE y FKs contra producción)
+        check_existing: Si False, la unicidad no se valida contra producción
+                        (filas que actualizan su propia fila existente)
+
+    Returns:
+        Tupla (df_validas, df_rechazadas)
+        - df_validas: Filas que cumplen todas las constraints
+        - df_rechazadas: Filas que violan alguna constraint, con la columna 'motivo_cuarentena'
+    """
+    constraints = get_table_constraints(target_table)
+    reasons = pd.Series('', index=df.index, dtype=object)
+
+    def add_reason(mask: pd.Series, reason: str) -> None:
+        nonlocal reasons
+        reasons = reasons.mask(mask, reasons + reason + '; ')
+
+    # NOT NULL
+    for column in constraints['not_null']:
+        if column in df.columns:
+            add_reason(df[column].isna(), f"NOT NULL: {column}")
+
+    # CHECK constraints
+    for name, expression in constraints['check']:
+        add_reason(_check_violation_mask(df, expression), f"CHECK {name}: {expression}")
+
+    # Valores válidos de Enums
+    for column, values in constraints['enum']:
+        if column in df.columns:
+            mask = df[column].notna() & ~df[column].astype(str).isin(values)
+            add_reason(mask, f"ENUM: {column} fuera de {values}")
+
+    # Longitud máxima de VARCHAR
+    for column, max_length in constraints['max_length']:
+        if column in df.columns:
+            mask = df[column].notna() & (df[column].astype(str).str.len() > max_length)
+            add_reason(mask, f"LONGITUD: {column} > {max_length}")
+
+    # FOREIGN KEY: el ID referenciado debe existir en la tabla padre
+    if engine is not None:
+        for column, parent_table, parent_column in constraints['foreign_key']:
+            if column not in df.columns:
+                continue
+            values = df[column]
+            if isinstance(Base.metadata.tables[parent_table].c[parent_column].type, Integer):
+                numeric = pd.to_numeric(values, errors='coerce')
+                invalid = values.notna() & (numeric.isna() | (numeric % 1 != 0))
+                add_reason(invalid, f"FK: {column} no es un ID válido")
+                values = numeric.where(~invalid).astype('Int64')
+            candidates = (reasons == '') & values.notna()
+            existing = _existing_values(
+                engine, parent_table, parent_column, values[candidates].unique().tolist()
+            )
+            mask = candidates & ~values.isin(existing)
+            add_reason(mask, f"FK: {column} no existe en {parent_table}")
+
+    # UNIQUE: solo entre las filas que hasta ahora son válidas
+    for columns in constraints['unique']:
+        if not all(col in df.columns for col in columns):
+            continue
+        candidates = (reasons == '') & df[columns].notna().all(axis=1)
+
+        duplicated = pd.Series(False, index=df.index)
+        duplicated[candidates] = df.loc[candidates].duplicated(subset=columns, keep='first')
+        add_reason(duplicated, f"UNIQUE: {', '.join(columns)} duplicado en el lote")
+
+        if engine is not None and check_existing and len(columns) == 1:
+            column = columns[0]
+            candidates = candidates & ~duplicated
+            existing = _existing_values(
+                engine, target_table, column, df.loc[candidates, column].unique().tolist()
+            )
+            if existing:
+                mask = candidates & df[column].isin(existing)
+                add_reason(mask, f"UNIQUE: {column} ya existe en {target_table}")
+
+    rejected_mask = reasons != ''
+    df_valid = df.loc[~rejected_mask]
+    df_rejected = df.loc[rejected_mask].copy()
+    df_rejected['motivo_cuarentena'] = reasons[rejected_mask].str.rstrip('; ')
+
+    return df_valid, df_rejected
+
+
+def quarantine_rows(df_rejected: pd.DataFrame, target_table: str, engine) -> int:
+    """
+    Inserta las filas rechazadas en la tabla de cuarentena de la tabla destino.
+
+    La tabla de cuarentena se crea automáticamente (todas las columnas como TEXT)
+    y se llama '<tabla><ETLConfig.QUARANTINE_SUFFIX>' (ej: 'productos_quarantine').
+
+    Args:
+        df_rejected: DataFrame con las filas rechazadas y la columna 'motivo_cuarentena'
+        target_table: Nombre de la tabla de producción de origen
+        engine: SQLAlchemy engine
+
+    Returns:
+        Número de filas enviadas a cuarentena
+    """
+    if len(df_rejected) == 0:
+        return 0
+
+    quarantine_table = f"{target_table}{ETLConfig.QUARANTINE_SUFFIX}"
+
+    # Guardar todo como texto para que cualquier valor inválido quepa en la tabla
+    df_quarantine = df_rejected.astype('string')
+    df_quarantine['fecha_cuarentena'] = pd.Timestamp.now()
+
+    df_quarantine.to_sql(
+        quarantine_table,
+        engine,
+        if_exists='append',
+        index=False,
+        method='multi'
+    )
+
+    return len(df_quarantine)
@@ -0,0 +1,404 @@
+"""
+Ingesta incremental por marca de agua (high-water mark) de las tablas de hechos.
+
+Las fuentes ordenes, historial_pagos, resenas_productos y carrito solo crecen por
+el final y cada fila tiene fecha (ETLConfig.INCREMENTAL_SOURCES). Por cada una se
+guarda en la tabla etl_watermarks la fecha máxima ya cargada, cuántas filas del CSV
+se procesaron y el tamaño/fecha de modificación del archivo. En modo incremental:
+- Si el archivo no cambió desde la última ejecución, ni siquiera se lee.
+- Si cambió, se lee por bloques y solo se conservan las filas nuevas: las que
+  siguen a las ya procesadas si es el mismo archivo de la última ejecución, o las
+  posteriores a la marca de agua si la marca se derivó de producción.
+- Las tablas hijas sin fecha (detalle_ordenes, ordenes_metodos_pago) se filtran
+  por la posición de su orden padre en el lote (ETLConfig.INCREMENTAL_CHILD_TABLES)
+  o, si el padre no trae filas nuevas, por las filas ya procesadas.
+- Un archivo distinto del de la última ejecución continúa la numeración de filas
+  de la tabla (archivos nuevos del directorio de entrada, ver ingest_service.py).
+
+Las foreign keys de los CSV son posiciones (1-based) en el archivo padre. Cada lote
+recuerda la posición de sus filas, así el total de cada orden se recalcula con el
+desplazamiento correcto y las FKs se resuelven con el mapeo de IDs de toda la
+tabla de producción (ver build_production_id_mapping).
+
+La marca de agua de cada tabla avanza en la misma transacción que inserta su lote
+en producción (save_watermark): si la transacción falla, el mismo lote se vuelve a
+procesar; si se confirma, no se vuelve a insertar. commit_watermarks confirma al
+final de la ejecución los lotes que no escribieron producción.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import text
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from ..utils.path_manager import PathManager
+    from ..utils.config import ETLConfig
+    from ..utils.clean_column_name import clean_column_name
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+    from clean_column_name import clean_column_name
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+# Import DBConnector desde la raíz del proyecto
+from database.db_connector import DBConnector
+
+
+# Tabla con la marca de agua de cada tabla fuente
+WATERMARK_TABLE = 'etl_watermarks'
+
+# Lotes leídos en esta ejecución y pendientes de confirmar: {tabla_staging: lote}
+_batches: Dict[str, Dict] = {}
+
+
+def is_incremental_table(table_name_raw: str) -> bool:
+    """Indica si una tabla staging se carga por marca de agua (propia o de su padre)."""
+    return (
+        table_name_raw in ETLConfig.INCREMENTAL_SOURCES
+        or table_name_raw in ETLConfig.INCREMENTAL_CHILD_TABLES
+    )
+
+
+# ============================================================================
+# ALMACÉN DE MARCAS DE AGUA
+# ============================================================================
+
+def _ensure_watermark_table(conn) -> None:
+    """Crea la tabla de marcas de agua si no existe."""
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            source_table VARCHAR(100) PRIMARY KEY,
+            watermark_column VARCHAR(100),
+            high_water TIMESTAMP,
+            row_count BIGINT NOT NULL,
+            source_file TEXT NOT NULL,
+            file_size BIGINT,
+            file_mtime DOUBLE PRECISION,
+            updated_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def get_watermark(table_name_raw: str, engine=None) -> Optional[Dict]:
+    """
+    Lee la marca de agua confirmada de una tabla staging.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging (ej: 'ordenes_raw')
+        engine: SQLAlchemy engine (opcional)
+
+    Returns:
+        Diccionario con high_water, row_count, source_file, file_size y file_mtime,
+        o None si la tabla nunca se cargó en modo incremental
+    """
+    if engine is None:
+        engine = DBConnector.get_instance().get_engine()
+
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': WATERMARK_TABLE}
+        ).scalar()
+        if not exists:
+            return None
+        row = conn.execute(
+            text(f"""
+                SELECT high_water, row_count, source_file, file_size, file_mtime
+                FROM {WATERMARK_TABLE}
+                WHERE source_table = :table_name
+            """),
+            {'table_name': table_name_raw}
+        ).mappings().fetchone()
+    return dict(row) if row else None
+
+
+def _bootstrap_watermark(table_name_raw: str, engine) -> Optional[Dict]:
+    """
+    Deriva la marca de agua inicial de una tabla de producción ya cargada (primera
+    ejecución incremental después de cargas completas): la fecha máxima y el número
+    de filas ya presentes.
+
+    Returns:
+        Marca de agua derivada, o None si producción está vacía o no existe
+    """
+    target_table = table_name_raw[:-len('_raw')]
+    column = ETLConfig.INCREMENTAL_SOURCES[table_name_raw]
+
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"), {'table_name': target_table}
+        ).scalar()
+        if not exists:
+            return None
+        high_water, row_count = conn.execute(
+            text(f"SELECT max({column}), count(*) FROM {target_table}")
+        ).fetchone()
+
+    if not row_count:
+        return None
+    print(f"   ⚠ Sin marca de agua para {table_name_raw}: se toma de '{target_table}' "
+          f"({column} ≤ {high_water}, {row_count} filas)")
+    return {'high_water': high_water, 'row_count': row_count, 'source_file': None,
+            'file_size': None, 'file_mtime': None}
+
+
+def _write_watermark(conn, table_name_raw: str) -> None:
+    """Guarda (INSERT ... ON CONFLICT) la marca de agua del lote pendiente de una tabla."""
+    batch = _batches[table_name_raw]
+    conn.execute(
+        text(f"""
+            INSERT INTO {WATERMARK_TABLE}
+                (source_table, watermark_column, high_water, row_count,
+                 source_file, file_size, file_mtime, updated_at)
+            VALUES (:source_table, :watermark_column, :high_water, :row_count,
+                    :source_file, :file_size, :file_mtime, now())
+            ON CONFLICT (source_table) DO UPDATE SET
+                watermark_column = EXCLUDED.watermark_column,
+                high_water = EXCLUDED.high_water,
+                row_count = EXCLUDED.row_count,
+                source_file = EXCLUDED.source_file,
+                file_size = EXCLUDED.file_size,
+                file_mtime = EXCLUDED.file_mtime,
+                updated_at = now()
+        """),
+        {
+            'source_table': table_name_raw,
+            'watermark_column': ETLConfig.INCREMENTAL_SOURCES.get(table_name_raw),
+            'high_water': batch['high_water'],
+            'row_count': batch['row_count'],
+            'source_file': batch['source_file'],
+            'file_size': batch['file_size'],
+            'file_mtime': batch['file_mtime'],
+        }
+    )
+
+
+def save_watermark(conn, table_name_raw: str) -> bool:
+    """
+    Avanza la marca de agua de una tabla dentro de una transacción abierta.
+
+    Debe ejecutarse en la misma transacción que inserta el lote en producción.
+
+    Args:
+        conn: Conexión SQLAlchemy dentro de una transacción
+        table_name_raw: Nombre de la tabla staging
+
+    Returns:
+        True si había un lote pendiente para la tabla
+    """
+    if table_name_raw not in _batches:
+        return False
+    _ensure_watermark_table(conn)
+    _write_watermark(conn, table_name_raw)
+    del _batches[table_name_raw]
+    return True
+
+
+def commit_watermarks(tables: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Guarda las marcas de agua de los lotes pendientes (una sola transacción).
+
+    Debe llamarse cuando los lotes ya se cargaron a producción (los lotes insertados
+    ya avanzaron su marca con save_watermark al escribir cada tabla).
+
+    Args:
+        tables: Tablas staging a confirmar. Si None, todas las pendientes
+
+    Returns:
+        Lista de tablas confirmadas
+    """
+    tables = [table for table in (tables if tables is not None else list(_batches)) if table in _batches]
+    if not tables:
+        return []
+
+    engine = DBConnector.get_instance().get_engine()
+    with engine.begin() as conn:
+        _ensure_watermark_table(conn)
+        for table in tables:
+            _write_watermark(conn, table)
+
+    for table in tables:
+        del _batches[table]
+    print(f"   ✓ Marcas de agua de {len(tables)} tablas confirmadas en {WATERMARK_TABLE}")
+    return tables
+
+
+def discard_watermarks() -> None:
+    """Descarta los lotes pendientes sin avanzar sus marcas de agua."""
+    _batches.clear()
+
+
+def get_incremental_batch(table_name_raw: str) -> Optional[Dict]:
+    """
+    Retorna el lote incremental leído en esta ejecución para una tabla staging.
+
+    El lote incluye 'positions' (posiciones 1-based en el CSV de las filas cargadas),
+    'high_water' y 'row_count' (la marca de agua a confirmar).
+    """
+    return _batches.get(table_name_raw)
+
+
+def get_position_offset(table_name_raw: str) -> int:
+    """
+    Posición en el CSV de la fila anterior a la primera fila del lote de una tabla
+    (0 si la tabla no se cargó en modo incremental o el lote está vacío).
+    """
+    batch = _batches.get(table_name_raw)
+    if batch is None or len(batch['positions']) == 0:
+        return 0
+    return int(batch['positions'][0]) - 1
+
+
+# ============================================================================
+# LECTURA INCREMENTAL
+# ============================================================================
+
+def _find_column(columns: Iterable[str], column: str) -> str:
+    """Busca en las columnas originales del CSV la que corresponde a una columna staging."""
+    for original in columns:
+        if clean_column_name(original) == column:
+            return original
+    raise ValueError(f"La columna '{column}' no está en el CSV")
+
+
+def read_incremental_csv(table_name_raw: str, csv_path: str) -> pd.DataFrame:
+    """
+    Lee solo las filas nuevas del CSV de una tabla incremental y registra el lote.
+
+    Las posiciones de las filas son globales: si el archivo no es el de la última
+    ejecución (un archivo nuevo que llega al directorio de entrada), su numeración
+    continúa después de las filas ya procesadas de la tabla.
+
+    Una tabla hija se filtra por el lote de su padre si el padre trae filas nuevas
+    en esta ejecución; si no, se cargan sus filas posteriores a las ya procesadas.
+
+    Args:
+        table_name_raw: Nombre de la tabla staging (ver is_incremental_table)
+        csv_path: Ruta del archivo CSV
+
+    Returns:
+        DataFrame con las filas nuevas y las columnas originales del CSV
+        (puede estar vacío)
+    """
+    engine = DBConnector.get_instance().get_engine()
+    stat = os.stat(csv_path)
+    batch = {
+        'source_file': os.path.basename(csv_path),
+        'file_size': stat.st_size,
+        'file_mtime': stat.st_mtime,
+    }
+
+    column = ETLConfig.INCREMENTAL_SOURCES.get(table_name_raw)
+    watermark = get_watermark(table_name_raw, engine)
+    if watermark is None and column is not None:
+        watermark = _bootstrap_watermark(table_name_raw, engine)
+
+    # Archivo sin cambios desde la última ejecución: no hay filas nuevas
+    if (
+        watermark is not None
+        and watermark['source_file'] == batch['source_file']
+        and watermark['file_size'] == batch['file_size']
+        and watermark['file_mtime'] == batch['file_mtime']
+    ):
+        print(f"   ✓ {batch['source_file']} sin cambios desde la última ejecución")
+        _batches[table_name_raw] = {
+            **batch,
+            'high_water': watermark['high_water'],
+            'row_count': watermark['row_count'],
+            'positions': np.array([], dtype='int64'),
+        }
+        return pd.DataFrame()
+
+    row_count = watermark['row_count'] if watermark else 0
+    same_file = watermark is None or watermark['source_file'] in (None, batch['source_file'])
+    position_base = 0 if same_file else row_count
+
+    if column is None:
+        fk_column, parent_table = ETLConfig.INCREMENTAL_CHILD_TABLES[table_name_raw]
+        parent_batch = _batches.get(parent_table)
+
+        if parent_batch is not None and len(parent_batch['positions']) > 0:
+            parent_positions = parent_batch['positions']
+
+            def selector(chunk, positions):
+                parent_ids = pd.to_numeric(chunk[_find_column(chunk.columns, fk_column)], errors='coerce')
+                return parent_ids.isin(parent_positions).to_numpy()
+        else:
+            # Padre sin lote o sin filas nuevas (ej: reintento después de cargar el padre):
+            # las filas hijas pendientes son las posteriores a las ya procesadas
+            def selector(chunk, positions):
+                return positions > row_count
+        high_water = None
+    else:
+        high_water = pd.Timestamp(watermark['high_water']) if watermark and watermark['high_water'] is not None else None
+
+        continues_file = watermark is not None and watermark['source_file'] == batch['source_file']
+
+        def selector(chunk, positions):
+            if continues_file:
+                # Mismo archivo que la última ejecución: las filas nuevas son las agregadas
+                # al final (una fila con la misma fecha que la marca también es nueva)
+                return positions > row_count
+            if high_water is None:
+                return np.ones(len(chunk), dtype=bool)
+            dates = pd.to_datetime(chunk[_find_column(chunk.columns, column)], errors='coerce')
+            if not same_file:
+                # Archivo nuevo: todas sus posiciones son nuevas; la marca solo descarta
+                # filas anteriores a lo ya cargado
+                return ((dates >= high_water) | dates.isna()).to_numpy()
+            # Marca derivada de producción (sin archivo registrado): filas con fecha
+            # posterior a la marca; las que tienen la misma fecha que la marca (o no
+            # tienen fecha) solo son nuevas después de las filas ya cargadas
+            tie = (dates == high_water) | dates.isna()
+            return ((dates > high_water) | (tie & (positions > row_count))).to_numpy()
+
+    # Leer por bloques y conservar solo las filas seleccionadas
+    selected_chunks = []
+    selected_positions = []
+    total_rows = 0
+    max_date = None
+    for chunk in pd.read_csv(csv_path, encoding=ETLConfig.CSV_ENCODING, chunksize=ETLConfig.INCREMENTAL_CHUNK_SIZE):
+        positions = np.arange(position_base + total_rows + 1, position_base + total_rows + len(chunk) + 1)
+        total_rows += len(chunk)
+        mask = selector(chunk, positions)
+        if not mask.any():
+            continue
+        selected = chunk.loc[mask]
+        selected_chunks.append(selected)
+        selected_positions.append(positions[mask])
+        if column is not None:
+            chunk_max = pd.to_datetime(selected[_find_column(selected.columns, column)], errors='coerce').max()
+            if pd.notna(chunk_max) and (max_date is None or chunk_max > max_date):
+                max_date = chunk_max
+
+    df = pd.concat(selected_chunks, ignore_index=True) if selected_chunks else pd.DataFrame()
+    positions = np.concatenate(selected_positions) if selected_positions else np.array([], dtype='int64')
+
+    # La marca de agua solo avanza
+    previous_high_water = watermark['high_water'] if watermark and column is not None else None
+    if previous_high_water is not None and (max_date is None or max_date < pd.Timestamp(previous_high_water)):
+        max_date = pd.Timestamp(previous_high_water)
+
+    _batches[table_name_raw] = {
+        **batch,
+        'high_water': max_date.to_pydatetime() if max_date is not None else None,
+        'row_count': position_base + total_rows,
+        'positions': positions,
+    }
+
+    if len(positions) > 0 and positions[-1] - positions[0] + 1 != len(positions):
+        print(f"   ⚠ Las filas nuevas de {table_name_raw} no son contiguas en el CSV "
+              f"(la fuente no es solo de agregado)")
+    print(f"   ✓ Lectura incremental: {len(df)} filas nuevas de {total_rows}")
+    return df
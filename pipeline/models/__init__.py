@@ -8,7 +8,20 @@ from .enums import EstadoOrden, EstadoPago
 from .create_tables import (
     create_all_tables,
     create_staging_tables,
-    create_production_tables
+    create_production_tables,
+    create_production_indexes
+)
+from .schema_manager import (
+    ensure_staging_schema,
+    ensure_production_schema,
+    get_applied_schema_versions,
+    set_staging_persistence
+)
+from .partitioning import (
+    PARTITIONED_TABLES,
+    ensure_monthly_partitions,
+    detach_month_partition,
+    truncate_month_partition
 )
 
 # NOTA: Modelos raw (staging) NO se importan aquí.
@@ -24,5 +37,16 @@ __all__ = [
     'create_all_tables',
     'create_staging_tables',
     'create_production_tables',
+    'create_production_indexes',
+    # Versionado del esquema (DDL solo cuando cambia)
+    'ensure_staging_schema',
+    'ensure_production_schema',
+    'get_applied_schema_versions',
+    'set_staging_persistence',
+    # Particionamiento mensual de tablas de hechos
+    'PARTITIONED_TABLES',
+    'ensure_monthly_partitions',
+    'detach_month_partition',
+    'truncate_month_partition',
 ]
 
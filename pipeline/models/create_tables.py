@@ -6,6 +6,7 @@ Módulo para crear tablas en PostgreSQL.
 
 import os
 import sys
+from typing import Optional
 from sqlalchemy import text
 
 # Import PathManager usando import relativo (models y utils están en el mismo nivel: pipeline/)
@@ -21,6 +22,12 @@ except ImportError:
         sys.path.insert(0, utils_dir)
     from path_manager import PathManager
 
+# Import configuración centralizada
+try:
+    from ..utils.config import ETLConfig
+except ImportError:
+    from config import ETLConfig
+
 # PathManager maneja toda la configuración de paths
 path_manager = PathManager.get_instance()
 path_manager.setup_sys_path()
@@ -41,6 +48,18 @@ try:
         ResenaProducto,
         HistorialPago
     )
+    from .partitioning import PARTITIONED_TABLES
+    from .indexes import get_production_index_definitions
+    from .schema_manager import (
+        PRODUCTION_MODELS,
+        read_staging_statements,
+        get_staging_tables,
+        build_staging_ddl,
+        get_production_tables,
+        apply_schema,
+        ensure_production_schema,
+        set_staging_persistence
+    )
     from database.db_connector import DBConnector
 except ImportError:
     # Si falla el import relativo, usar import absoluto
@@ -58,10 +77,22 @@ except ImportError:
         ResenaProducto,
         HistorialPago
     )
+    from partitioning import PARTITIONED_TABLES
+    from indexes import get_production_index_definitions
+    from schema_manager import (
+        PRODUCTION_MODELS,
+        read_staging_statements,
+        get_staging_tables,
+        build_staging_ddl,
+        get_production_tables,
+        apply_schema,
+        ensure_production_schema,
+        set_staging_persistence
+    )
     from database.db_connector import DBConnector
 
 
-def create_staging_tables():
+def create_staging_tables(force: bool = False):
     """
     Crea solo las tablas STAGING (raw) en PostgreSQL usando SQL directo.
     Estas tablas almacenan datos crudos del CSV sin IDs ni foreign keys.
@@ -69,73 +100,36 @@ def create_staging_tables():
     IMPORTANTE: Usa SQL directo en lugar de SQLAlchemy ORM para evitar
     el requisito de primary keys que SQLAlchemy impone.
     
-    Utiliza el DBConnector con patrón Singleton para obtener la conexión.
+    El DDL solo se aplica si create_staging_tables.sql cambió desde la última vez
+    (ver schema_manager.py); en ese caso las tablas *_raw se recrean en una sola
+    transacción. Después se ajustan a UNLOGGED o LOGGED según
+    ETLConfig.STAGING_UNLOGGED.
+    
+    Args:
+        force: Si True, recrea las tablas staging aunque el esquema no haya cambiado
     """
     print("=" * 80)
     print("CREANDO TABLAS STAGING (RAW) - Usando SQL directo")
     print("=" * 80)
     
-    # Obtener la instancia única del DBConnector
-    db = DBConnector.get_instance()
-    engine = db.get_engine()
-    
-    # Obtener la ruta del archivo SQL
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    sql_file_path = os.path.join(current_dir, 'create_staging_tables.sql')
-    
-    if not os.path.exists(sql_file_path):
-        raise FileNotFoundError(
-            f"No se encontró el archivo SQL: {sql_file_path}\n"
-            f"El archivo debe contener las definiciones de las tablas staging."
-        )
-    
     try:
-        # Leer el archivo SQL
-        with open(sql_file_path, 'r', encoding='utf-8') as f:
-            sql_content = f.read()
-        
-        # Dividir el contenido en statements individuales
-        # Separar por ';' y filtrar líneas vacías y comentarios
-        statements = []
-        current_statement = []
-        
-        for line in sql_content.split('\n'):
-            line = line.strip()
-            # Ignorar líneas vacías y comentarios completos
-            if not line or line.startswith('--'):
-                continue
-            
-            # Remover comentarios al final de la línea
-            if '--' in line:
-                line = line[:line.index('--')].strip()
-            
-            if line:
-                current_statement.append(line)
-                # Si la línea termina con ';', es el final del statement
-                if line.endswith(';'):
-                    statement = ' '.join(current_statement).rstrip(';').strip()
-                    if statement:
-                        statements.append(statement)
-                    current_statement = []
+        statements = read_staging_statements()
+        tables_count = len(get_staging_tables(statements))
         
-        # Si queda un statement sin terminar, agregarlo
-        if current_statement:
-            statement = ' '.join(current_statement).strip()
-            if statement:
-                statements.append(statement)
+        applied, ddl_hash = apply_schema('staging', build_staging_ddl(statements), force=force)
         
-        # Ejecutar cada statement SQL
-        with engine.begin() as conn:
-            for statement in statements:
-                if statement:  # Asegurar que no esté vacío
-                    conn.execute(text(statement))
-        
-        # Contar las tablas creadas (una por cada CREATE TABLE)
-        tables_created = len([s for s in statements if s.upper().startswith('CREATE TABLE')])
+        if applied:
+            print(f"   ✓ {tables_count} tablas staging creadas (versión {ddl_hash[:12]})")
+        else:
+            print(f"   ✓ Esquema staging sin cambios (versión {ddl_hash[:12]}), no se ejecuta DDL")
         
-        print(f"   ✓ {tables_created} tablas staging creadas/verificadas")
+        # UNLOGGED (sin WAL) o LOGGED según ETLConfig.STAGING_UNLOGGED
+        changed = set_staging_persistence(ETLConfig.STAGING_UNLOGGED)
+        mode = 'UNLOGGED' if ETLConfig.STAGING_UNLOGGED else 'LOGGED'
+        if changed:
+            print(f"   ✓ {len(changed)} tablas staging cambiadas a {mode}")
         print("\n" + "=" * 80)
-        print(f"✓ Todas las tablas staging creadas exitosamente ({tables_created} tablas)")
+        print(f"✓ Todas las tablas staging creadas exitosamente ({tables_count} tablas)")
         print("=" * 80)
         
     except Exception as e:
@@ -145,50 +139,94 @@ def create_staging_tables():
         raise
 
 
-def create_production_tables():
+def create_production_tables(partitioned: Optional[bool] = None, force: bool = False):
     """
     Crea solo las tablas de PRODUCCIÓN en PostgreSQL.
     Estas tablas tienen IDs autoincrementales, foreign keys y constraints.
     
-    Utiliza el DBConnector con patrón Singleton para obtener la conexión.
+    En modo particionado, 'ordenes' e 'historial_pagos' se crean como tablas
+    particionadas por rango mensual sobre su columna de fecha (ver partitioning.py).
+    Las particiones de cada mes las crea el loader al encontrar meses nuevos.
+    
+    El DDL se compila desde models.py y solo se aplica si cambió desde la última
+    vez (ver schema_manager.py); en ese caso se envía en un único script y una
+    sola transacción, sin una consulta de existencia por tabla.
+    
+    Args:
+        partitioned: Si True, crea las tablas de hechos particionadas por mes.
+                     Si None, usa ETLConfig.PARTITION_FACT_TABLES
+        force: Si True, aplica el DDL aunque el esquema no haya cambiado
     """
     print("=" * 80)
     print("CREANDO TABLAS DE PRODUCCIÓN")
     print("=" * 80)
     
+    if partitioned is None:
+        partitioned = ETLConfig.PARTITION_FACT_TABLES
+    
+    try:
+        applied, ddl_hash = ensure_production_schema(partitioned=partitioned, force=force)
+        
+        if applied:
+            for table in get_production_tables(partitioned):
+                if table.name in PARTITIONED_TABLES and partitioned:
+                    print(f"   ✓ Tabla '{table.name}' creada/verificada "
+                          f"(particionada por mes en {PARTITIONED_TABLES[table.name]})")
+                else:
+                    print(f"   ✓ Tabla '{table.name}' creada/verificada")
+            print(f"   ✓ Esquema de producción aplicado (versión {ddl_hash[:12]})")
+        else:
+            print(f"   ✓ Esquema de producción sin cambios (versión {ddl_hash[:12]}), no se ejecuta DDL")
+        
+        print("\n" + "=" * 80)
+        print(f"✓ Todas las tablas de producción creadas exitosamente ({len(PRODUCTION_MODELS)} tablas)")
+        print("=" * 80)
+        
+    except Exception as e:
+        print("\n" + "=" * 80)
+        print(f"✗ Error al crear las tablas de producción: {str(e)}")
+        print("=" * 80)
+        raise
+
+
+def create_production_indexes():
+    """
+    Crea los índices de las tablas de PRODUCCIÓN derivados de los modelos ORM:
+    B-tree sobre las foreign keys y BRIN sobre las columnas de fecha.
+    
+    Debe ejecutarse DESPUÉS de la carga masiva: construir un índice sobre una tabla
+    ya poblada es mucho más barato que mantenerlo durante cada INSERT.
+    Al terminar se ejecuta ANALYZE para que el planner use los nuevos índices.
+    
+    Utiliza el DBConnector con patrón Singleton para obtener la conexión.
+    """
+    print("=" * 80)
+    print("CREANDO ÍNDICES DE PRODUCCIÓN (FOREIGN KEYS + FECHAS)")
+    print("=" * 80)
+    
     # Obtener la instancia única del DBConnector
     db = DBConnector.get_instance()
     engine = db.get_engine()
     
-    # Lista de modelos de producción
-    production_models = [
-        Categoria,      # Primero las independientes
-        MetodoPago,     # Primero las independientes
-        Usuario,        # Independiente
-        Producto,      # Depende de Categoria
-        Orden,          # Depende de Usuario
-        DetalleOrden,   # Depende de Orden y Producto
-        Carrito,        # Depende de Usuario y Producto
-        DireccionEnvio, # Depende de Usuario
-        ResenaProducto, # Depende de Usuario y Producto
-        OrdenMetodoPago, # Depende de Orden y MetodoPago
-        HistorialPago    # Depende de Orden y MetodoPago
-    ]
+    definitions = get_production_index_definitions(Base.metadata)
     
     try:
-        # Crear solo las tablas de producción
-        # SQLAlchemy maneja automáticamente el orden de creación respetando dependencias
-        for model in production_models:
-            model.__table__.create(engine, checkfirst=True)
-            print(f"   ✓ Tabla '{model.__tablename__}' creada/verificada")
+        with engine.begin() as conn:
+            for table_name, index_name, ddl in definitions:
+                conn.execute(text(ddl))
+                print(f"   ✓ Índice '{index_name}' creado/verificado en '{table_name}'")
+            
+            # Actualizar estadísticas de las tablas indexadas
+            for table_name in sorted({table_name for table_name, _, _ in definitions}):
+                conn.execute(text(f"ANALYZE {table_name}"))
         
         print("\n" + "=" * 80)
-        print(f"✓ Todas las tablas de producción creadas exitosamente ({len(production_models)} tablas)")
+        print(f"✓ Índices de producción creados exitosamente ({len(definitions)} índices)")
         print("=" * 80)
         
     except Exception as e:
         print("\n" + "=" * 80)
-        print(f"✗ Error al crear las tablas de producción: {str(e)}")
+        print(f"✗ Error al crear los índices de producción: {str(e)}")
         print("=" * 80)
         raise
 
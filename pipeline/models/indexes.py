@@ -0,0 +1,51 @@
+"""
+Módulo para derivar los índices de las tablas de PRODUCCIÓN desde los modelos ORM.
+
+PostgreSQL no indexa automáticamente las foreign keys, por lo que los joins de los
+modelos dbt (int_*) y las consultas de los notebooks hacen sequential scans. A partir
+de la metadata de models.py se generan:
+- Índices B-tree sobre cada columna con ForeignKey (usuario_id, producto_id, orden_id...)
+- Índices BRIN sobre las columnas de fecha (DateTime), que se insertan en orden
+  cronológico y por eso se resumen muy bien por rangos de páginas
+
+Los índices se crean DESPUÉS de la carga masiva para que los INSERT no paguen
+el mantenimiento de índices fila a fila.
+"""
+
+from typing import List, Tuple
+from sqlalchemy import MetaData, DateTime
+
+
+def get_production_index_definitions(metadata: MetaData) -> List[Tuple[str, str, str]]:
+    """
+    Genera las definiciones de índices para las tablas de producción.
+
+    Args:
+        metadata: Base.metadata de los modelos de producción
+
+    Returns:
+        Lista de tuplas (nombre_tabla, nombre_indice, sentencia_ddl)
+    """
+    definitions = []
+
+    for table in metadata.sorted_tables:
+        for column in table.columns:
+            if column.primary_key:
+                continue
+
+            if column.foreign_keys:
+                index_name = f"idx_{table.name}_{column.name}"
+                definitions.append((
+                    table.name,
+                    index_name,
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table.name} USING btree ({column.name})"
+                ))
+            elif isinstance(column.type, DateTime):
+                index_name = f"brin_{table.name}_{column.name}"
+                definitions.append((
+                    table.name,
+                    index_name,
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table.name} USING brin ({column.name})"
+                ))
+
+    return definitions
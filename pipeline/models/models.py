@@ -13,7 +13,7 @@ Para modelos de STAGING (datos crudos), ver: models_raw.py
 
 import os
 import sys
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, DateTime, ForeignKey, CheckConstraint, Enum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func, text
 
@@ -35,6 +35,7 @@ class Usuario(Base):
     - ID autoincremental (usuario_id)
     - Constraints UNIQUE en dni y email
     - Valores por defecto en fecha_registro
+    - Columna hash_fila (indexada) para la detección de cambios SCD Type 2
     """
     __tablename__ = 'usuarios'
     
@@ -45,6 +46,8 @@ class Usuario(Base):
     email = Column(String(255), unique=True, nullable=False)
     contraseña = Column(String(255), nullable=False)
     fecha_registro = Column(DateTime, server_default=func.now())
+    # Hash de las columnas de negocio (detección de cambios para SCD Type 2)
+    hash_fila = Column(BigInteger, index=True)
 
 
 class Categoria(Base):
@@ -70,6 +73,7 @@ class Producto(Base):
     - ID autoincremental (producto_id)
     - Foreign key a categorias
     - CHECK constraints para precio >= 0 y stock >= 0
+    - Columna hash_fila (indexada) para la detección de cambios SCD Type 2
     """
     __tablename__ = 'productos'
     __table_args__ = (
@@ -83,6 +87,8 @@ class Producto(Base):
     precio = Column(Numeric(10, 2), nullable=False)
     stock = Column(Integer, nullable=False)
     categoria_id = Column(Integer, ForeignKey('categorias.categoria_id'))
+    # Hash de las columnas de negocio (detección de cambios para SCD Type 2)
+    hash_fila = Column(BigInteger, index=True)
 
 
 class Orden(Base):
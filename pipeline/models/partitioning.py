@@ -0,0 +1,222 @@
+"""
+Módulo de particionamiento por rango mensual para las tablas de hechos de PRODUCCIÓN.
+
+Las tablas 'ordenes' (fecha_orden) e 'historial_pagos' (fecha_pago) crecen sin
+límite. En modo particionado se crean como tablas particionadas por RANGE sobre
+su columna de fecha, con una partición por mes:
+- Las consultas mensuales solo leen las particiones del rango (partition pruning)
+- Un mes se puede separar (DETACH) o recargar (TRUNCATE) de forma independiente
+- Las particiones se crean automáticamente cuando el loader encuentra meses nuevos
+
+Restricciones de PostgreSQL que este modo implica:
+- La primary key de una tabla particionada debe incluir la columna de partición,
+  por eso es (id, fecha) y la columna de fecha pasa a ser NOT NULL
+- Una foreign key solo puede apuntar a una clave única completa, por eso las
+  tablas que referencian a 'ordenes' (detalle_ordenes, ordenes_metodos_pago,
+  historial_pagos) se crean sin esa foreign key. Las tablas de detalle no tienen
+  columna de fecha propia, así que no se particionan.
+"""
+
+import pandas as pd
+from typing import Dict, List
+from sqlalchemy import MetaData, Table, Column, ForeignKey, CheckConstraint, text
+
+
+# Tablas particionadas por mes: {tabla: columna_de_particion}
+PARTITIONED_TABLES: Dict[str, str] = {
+    'ordenes': 'fecha_orden',
+    'historial_pagos': 'fecha_pago',
+}
+
+
+# ============================================================================
+# CONSTRUCCIÓN DEL ESQUEMA PARTICIONADO
+# ============================================================================
+
+def _copy_table(table: Table, metadata: MetaData) -> Table:
+    """
+    Copia una tabla de los modelos a una nueva metadata adaptándola al modo particionado.
+
+    - Si la tabla está en PARTITIONED_TABLES, la PK incluye la columna de partición
+      y la tabla se declara con PARTITION BY RANGE.
+    - Las foreign keys que apuntan a tablas particionadas se omiten.
+
+    Args:
+        table: Tabla original de Base.metadata
+        metadata: MetaData destino
+
+    Returns:
+        Nueva tabla registrada en la metadata destino
+    """
+    partition_column = PARTITIONED_TABLES.get(table.name)
+
+    columns = []
+    for column in table.columns:
+        foreign_keys = [
+            ForeignKey(fk.target_fullname)
+            for fk in column.foreign_keys
+            if fk.column.table.name not in PARTITIONED_TABLES
+        ]
+        is_primary_key = column.primary_key or column.name == partition_column
+        columns.append(Column(
+            column.name,
+            column.type.copy(),
+            *foreign_keys,
+            primary_key=is_primary_key,
+            nullable=False if is_primary_key else column.nullable,
+            unique=column.unique,
+            index=column.index,
+            autoincrement=True if column.primary_key else False,
+            server_default=column.server_default.arg if column.server_default is not None else None
+        ))
+
+    checks = [
+        CheckConstraint(str(constraint.sqltext), name=constraint.name)
+        for constraint in table.constraints
+        if isinstance(constraint, CheckConstraint)
+    ]
+
+    kwargs = {}
+    if partition_column:
+        kwargs['postgresql_partition_by'] = f'RANGE ({partition_column})'
+
+    return Table(table.name, metadata, *columns, *checks, **kwargs)
+
+
+def build_partitioned_metadata(base_metadata: MetaData) -> MetaData:
+    """
+    Construye una MetaData equivalente a la de los modelos pero con las tablas de
+    hechos particionadas por mes.
+
+    Args:
+        base_metadata: Base.metadata de los modelos de producción
+
+    Returns:
+        Nueva MetaData con todas las tablas de producción
+    """
+    metadata = MetaData()
+    for table in base_metadata.sorted_tables:
+        _copy_table(table, metadata)
+    return metadata
+
+
+# ============================================================================
+# GESTIÓN DE PARTICIONES
+# ============================================================================
+
+def _partition_name(table_name: str, month: pd.Period) -> str:
+    """Nombre de la partición mensual (ej: 'ordenes_p2024_03')."""
+    return f"{table_name}_p{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned_table(engine, table_name: str) -> bool:
+    """
+    Indica si una tabla existe en PostgreSQL como tabla particionada.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla
+
+    Returns:
+        True si la tabla está particionada
+    """
+    query = """
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = :table_name
+    """
+    with engine.connect() as conn:
+        return conn.execute(text(query), {'table_name': table_name}).first() is not None
+
+
+def get_existing_partitions(engine, table_name: str) -> List[str]:
+    """
+    Lista las particiones adjuntas a una tabla particionada.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla particionada
+
+    Returns:
+        Lista de nombres de particiones
+    """
+    query = """
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table_name
+        ORDER BY child.relname
+    """
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text(query), {'table_name': table_name})]
+
+
+def ensure_monthly_partitions(engine, table_name: str, dates: pd.Series) -> List[str]:
+    """
+    Crea las particiones mensuales que falten para cubrir un conjunto de fechas.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla particionada
+        dates: Serie con los valores de la columna de partición
+
+    Returns:
+        Lista de particiones creadas
+    """
+    months = pd.to_datetime(dates.dropna()).dt.to_period('M').unique()
+    existing = set(get_existing_partitions(engine, table_name))
+
+    created = []
+    with engine.begin() as conn:
+        for month in sorted(months):
+            partition = _partition_name(table_name, month)
+            if partition in existing:
+                continue
+            start = month.start_time.date()
+            end = (month + 1).start_time.date()
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+            created.append(partition)
+
+    return created
+
+
+def detach_month_partition(engine, table_name: str, month: str) -> str:
+    """
+    Separa la partición de un mes de su tabla particionada.
+    La partición queda como tabla independiente (ej: para archivarla o recargarla).
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla particionada
+        month: Mes en formato 'YYYY-MM'
+
+    Returns:
+        Nombre de la partición separada
+    """
+    partition = _partition_name(table_name, pd.Period(month, freq='M'))
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table_name} DETACH PARTITION {partition}"))
+    return partition
+
+
+def truncate_month_partition(engine, table_name: str, month: str) -> str:
+    """
+    Vacía la partición de un mes para poder recargarlo sin tocar el resto del histórico.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Nombre de la tabla particionada
+        month: Mes en formato 'YYYY-MM'
+
+    Returns:
+        Nombre de la partición vaciada
+    """
+    partition = _partition_name(table_name, pd.Period(month, freq='M'))
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {partition}"))
+    return partition
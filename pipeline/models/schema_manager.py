@@ -0,0 +1,517 @@
+"""
+Gestor de versiones del esquema (DDL) de STAGING y PRODUCCIÓN.
+
+El DDL deseado de cada componente se genera desde su fuente de verdad:
+- staging: create_staging_tables.sql
+- production: la metadata de models.py (o su variante particionada)
+
+Se calcula un hash SHA-256 del DDL generado y se compara con el último aplicado,
+guardado en la tabla etl_schema_version (una fila por componente):
+- Si coincide, no se ejecuta ningún DDL (el arranque solo paga una consulta)
+- Si difiere, todo el DDL se envía en un único script y una única transacción,
+  junto con la actualización de la versión
+
+Cómo se aplican los cambios:
+- staging: las tablas *_raw son desechables (se recargan desde los CSV), así que
+  se eliminan y se vuelven a crear con la definición nueva. Su persistencia
+  (UNLOGGED/LOGGED, ETLConfig.STAGING_UNLOGGED) se ajusta aparte con
+  set_staging_persistence, sin cambiar el hash
+- production: los cambios son aditivos (tipos ENUM y valores nuevos, tablas nuevas,
+  columnas nuevas, índices de los modelos). Las tablas existentes no se alteran
+  en tipos ni constraints: eso requiere una migración explícita. Tampoco se
+  convierten entre tabla normal y particionada: si ETLConfig.PARTITION_FACT_TABLES
+  no coincide con las tablas existentes, el DDL no se aplica y se lanza un error
+"""
+
+import os
+import re
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import Enum, MetaData, Table, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import CreateEnumType
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+try:
+    from .models import (
+        Base,
+        Usuario,
+        Categoria,
+        Producto,
+        Orden,
+        DetalleOrden,
+        DireccionEnvio,
+        Carrito,
+        MetodoPago,
+        OrdenMetodoPago,
+        ResenaProducto,
+        HistorialPago
+    )
+    from .partitioning import PARTITIONED_TABLES, build_partitioned_metadata
+    from ..utils.config import ETLConfig
+    from database.db_connector import DBConnector
+except ImportError:
+    from models import (
+        Base,
+        Usuario,
+        Categoria,
+        Producto,
+        Orden,
+        DetalleOrden,
+        DireccionEnvio,
+        Carrito,
+        MetodoPago,
+        OrdenMetodoPago,
+        ResenaProducto,
+        HistorialPago
+    )
+    from partitioning import PARTITIONED_TABLES, build_partitioned_metadata
+    from config import ETLConfig
+    from database.db_connector import DBConnector
+
+
+# Tabla con la versión aplicada de cada componente del esquema
+SCHEMA_VERSION_TABLE = 'etl_schema_version'
+
+# Se incluye en el hash: cambiarlo fuerza a reaplicar el DDL si cambia la forma de generarlo
+SCHEMA_MANAGER_REVISION = '1'
+
+STAGING_SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'create_staging_tables.sql')
+
+# Modelos de producción en orden de creación (tablas independientes primero)
+PRODUCTION_MODELS = [
+    Categoria,       # Primero las independientes
+    MetodoPago,      # Primero las independientes
+    Usuario,         # Independiente
+    Producto,        # Depende de Categoria
+    Orden,           # Depende de Usuario
+    DetalleOrden,    # Depende de Orden y Producto
+    Carrito,         # Depende de Usuario y Producto
+    DireccionEnvio,  # Depende de Usuario
+    ResenaProducto,  # Depende de Usuario y Producto
+    OrdenMetodoPago, # Depende de Orden y MetodoPago
+    HistorialPago    # Depende de Orden y MetodoPago
+]
+
+_CREATE_TABLE = re.compile(r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', re.IGNORECASE)
+
+
+# ============================================================================
+# GENERACIÓN DEL DDL DESEADO
+# ============================================================================
+
+def read_staging_statements(sql_file_path: str = STAGING_SQL_FILE) -> List[str]:
+    """
+    Lee create_staging_tables.sql y lo divide en statements individuales
+    (sin comentarios ni ';' final).
+
+    Args:
+        sql_file_path: Ruta del archivo SQL de staging
+
+    Returns:
+        Lista de sentencias SQL
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+    """
+    if not os.path.exists(sql_file_path):
+        raise FileNotFoundError(
+            f"No se encontró el archivo SQL: {sql_file_path}\n"
+            f"El archivo debe contener las definiciones de las tablas staging."
+        )
+
+    with open(sql_file_path, 'r', encoding='utf-8') as f:
+        sql_content = f.read()
+
+    statements = []
+    current_statement = []
+
+    for line in sql_content.split('\n'):
+        line = line.strip()
+        # Ignorar líneas vacías y comentarios completos
+        if not line or line.startswith('--'):
+            continue
+
+        # Remover comentarios al final de la línea
+        if '--' in line:
+            line = line[:line.index('--')].strip()
+
+        if line:
+            current_statement.append(line)
+            # Si la línea termina con ';', es el final del statement
+            if line.endswith(';'):
+                statement = ' '.join(current_statement).rstrip(';').strip()
+                if statement:
+                    statements.append(statement)
+                current_statement = []
+
+    # Si queda un statement sin terminar, agregarlo
+    if current_statement:
+        statement = ' '.join(current_statement).strip()
+        if statement:
+            statements.append(statement)
+
+    return statements
+
+
+def get_staging_tables(statements: List[str]) -> List[str]:
+    """Nombres de las tablas creadas por los statements de staging."""
+    tables = []
+    for statement in statements:
+        match = _CREATE_TABLE.match(statement)
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def build_staging_ddl(statements: Optional[List[str]] = None) -> List[str]:
+    """
+    Genera el DDL que recrea las tablas staging con la definición del archivo SQL.
+
+    Args:
+        statements: Statements del archivo SQL (se leen si es None)
+
+    Returns:
+        Lista de sentencias: DROP de cada tabla *_raw seguido de los statements del archivo
+    """
+    if statements is None:
+        statements = read_staging_statements()
+    drops = [f"DROP TABLE IF EXISTS {table} CASCADE" for table in get_staging_tables(statements)]
+    return drops + statements
+
+
+def get_production_tables(partitioned: Optional[bool] = None) -> List[Table]:
+    """
+    Retorna las tablas de producción en orden de creación.
+
+    Args:
+        partitioned: Si True, usa la metadata con las tablas de hechos particionadas.
+                     Si None, usa ETLConfig.PARTITION_FACT_TABLES
+
+    Returns:
+        Lista de Table de SQLAlchemy
+    """
+    if partitioned is None:
+        partitioned = ETLConfig.PARTITION_FACT_TABLES
+
+    # En modo particionado se usa una copia de la metadata con las tablas de hechos
+    # particionadas (PK compuesta con la fecha y sin FKs hacia tablas particionadas)
+    if partitioned:
+        metadata: MetaData = build_partitioned_metadata(Base.metadata)
+        return [metadata.tables[model.__tablename__] for model in PRODUCTION_MODELS]
+    return [model.__table__ for model in PRODUCTION_MODELS]
+
+
+def build_production_ddl(partitioned: Optional[bool] = None) -> List[str]:
+    """
+    Compila el DDL aditivo e idempotente de las tablas de producción.
+
+    Genera, en este orden:
+    - CREATE TYPE de cada ENUM nativo (ignorando los que ya existen) y
+      ALTER TYPE ... ADD VALUE IF NOT EXISTS para sus valores
+    - CREATE TABLE IF NOT EXISTS de cada tabla
+    - ALTER TABLE ... ADD COLUMN IF NOT EXISTS de cada columna no PK
+    - CREATE INDEX IF NOT EXISTS de los índices declarados en los modelos
+
+    Args:
+        partitioned: Ver get_production_tables
+
+    Returns:
+        Lista de sentencias SQL
+    """
+    dialect = postgresql.dialect()
+    tables = get_production_tables(partitioned)
+
+    enums: Dict[str, Enum] = {}
+    for table in tables:
+        for column in table.columns:
+            if isinstance(column.type, Enum) and column.type.native_enum and column.type.name:
+                enums.setdefault(column.type.name, column.type)
+
+    statements = []
+    for name, enum_type in enums.items():
+        create_type = str(CreateEnumType(enum_type).compile(dialect=dialect)).strip()
+        statements.append(
+            f"DO $$ BEGIN {create_type}; "
+            f"EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+        )
+        for value in enum_type.enums:
+            literal = value.replace("'", "''")
+            statements.append(f"ALTER TYPE {name} ADD VALUE IF NOT EXISTS '{literal}'")
+
+    for table in tables:
+        statements.append(str(CreateTable(table, if_not_exists=True).compile(dialect=dialect)).strip())
+
+    for table in tables:
+        for column in table.columns:
+            if column.primary_key:
+                continue
+            column_type = column.type.compile(dialect=dialect)
+            default = ''
+            if column.server_default is not None:
+                default_arg = column.server_default.arg
+                default = f" DEFAULT {getattr(default_arg, 'text', default_arg)}"
+            statements.append(
+                f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}{default}"
+            )
+
+    for table in tables:
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            statements.append(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)).strip())
+
+    return statements
+
+
+def compute_ddl_hash(statements: List[str]) -> str:
+    """
+    Calcula el hash del DDL deseado (insensible a espacios en blanco).
+
+    Args:
+        statements: Sentencias SQL
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    digest = hashlib.sha256(SCHEMA_MANAGER_REVISION.encode('utf-8'))
+    for statement in statements:
+        digest.update(b'\x00')
+        digest.update(' '.join(statement.split()).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# ============================================================================
+# VERSIONES APLICADAS
+# ============================================================================
+
+def get_applied_schema_versions(engine) -> Dict[str, str]:
+    """
+    Retorna el hash aplicado de cada componente del esquema.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        Diccionario {componente: hash}. Vacío si la tabla de versiones no existe
+    """
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name) IS NOT NULL"),
+            {'table_name': SCHEMA_VERSION_TABLE}
+        ).scalar()
+        if not exists:
+            return {}
+        rows = conn.execute(text(f"SELECT component, ddl_hash FROM {SCHEMA_VERSION_TABLE}"))
+        return {component: ddl_hash for component, ddl_hash in rows}
+
+
+def _version_statements(component: str, ddl_hash: str) -> List[str]:
+    """Sentencias que crean la tabla de versiones y registran el hash aplicado."""
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            component VARCHAR(50) PRIMARY KEY,
+            ddl_hash CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )""",
+        f"""INSERT INTO {SCHEMA_VERSION_TABLE} (component, ddl_hash, applied_at)
+        VALUES ('{component}', '{ddl_hash}', now())
+        ON CONFLICT (component) DO UPDATE
+        SET ddl_hash = EXCLUDED.ddl_hash, applied_at = EXCLUDED.applied_at""",
+    ]
+
+
+def apply_schema(
+    component: str,
+    statements: List[str],
+    force: bool = False,
+    before_apply: Optional[Callable[[object], None]] = None
+) -> Tuple[bool, str]:
+    """
+    Aplica el DDL de un componente solo si su hash difiere del último aplicado.
+
+    Todas las sentencias y la actualización de la versión se envían como un único
+    script en una sola transacción: o se aplica todo o nada.
+
+    Args:
+        component: Nombre del componente ('staging' o 'production')
+        statements: DDL deseado del componente
+        force: Si True, aplica el DDL aunque el hash coincida
+        before_apply: Verificación opcional que recibe el engine y se ejecuta solo si
+                      el DDL se va a aplicar (lanza una excepción para impedirlo)
+
+    Returns:
+        Tupla (aplicado, hash)
+    """
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    ddl_hash = compute_ddl_hash(statements)
+    if not force and get_applied_schema_versions(engine).get(component) == ddl_hash:
+        return False, ddl_hash
+
+    if before_apply is not None:
+        before_apply(engine)
+
+    script = ';\n'.join(statements + _version_statements(component, ddl_hash)) + ';'
+
+    with db.get_raw_connection() as conn:
+        cursor = conn.cursor()
+        # Sin parámetros: psycopg2 envía el script tal cual (un solo round trip)
+        cursor.execute(script)
+        cursor.close()
+        conn.commit()
+
+    return True, ddl_hash
+
+
+def ensure_staging_schema(force: bool = False) -> Tuple[bool, str]:
+    """
+    Aplica el esquema de staging si create_staging_tables.sql cambió.
+
+    Args:
+        force: Si True, recrea las tablas staging aunque el hash coincida
+
+    Returns:
+        Tupla (aplicado, hash)
+    """
+    return apply_schema('staging', build_staging_ddl(), force=force)
+
+
+def get_staging_persistence(engine, tables: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Indica qué tablas staging son UNLOGGED (una sola consulta a pg_class).
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tablas a consultar. Por defecto las de create_staging_tables.sql
+
+    Returns:
+        Diccionario {tabla: True si es UNLOGGED} con las tablas que existen
+    """
+    if tables is None:
+        tables = get_staging_tables(read_staging_statements())
+    query = """
+        SELECT c.relname, c.relpersistence = 'u'
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+          AND c.relkind IN ('r', 'p')
+          AND c.relname = ANY(:tables)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'tables': list(tables)})
+        return {table: unlogged for table, unlogged in rows}
+
+
+def set_staging_persistence(unlogged: Optional[bool] = None, tables: Optional[List[str]] = None) -> List[str]:
+    """
+    Cambia las tablas staging a UNLOGGED o LOGGED, solo las que no lo estén ya.
+
+    Las tablas UNLOGGED no escriben WAL (la carga masiva es más barata), pero se
+    vacían tras una caída del servidor y no existen en las réplicas. Pasar a
+    LOGGED reescribe la tabla y la registra en el WAL, por eso solo se hace
+    cuando hace falta.
+
+    Args:
+        unlogged: Modo deseado. Si None, usa ETLConfig.STAGING_UNLOGGED
+        tables: Tablas a cambiar. Por defecto las de create_staging_tables.sql
+
+    Returns:
+        Lista de tablas modificadas
+    """
+    if unlogged is None:
+        unlogged = ETLConfig.STAGING_UNLOGGED
+
+    engine = DBConnector.get_instance().get_engine()
+    current = get_staging_persistence(engine, tables)
+    to_change = [table for table, is_unlogged in current.items() if is_unlogged != unlogged]
+    if not to_change:
+        return []
+
+    mode = 'UNLOGGED' if unlogged else 'LOGGED'
+    with engine.begin() as conn:
+        for table in to_change:
+            conn.execute(text(f"ALTER TABLE {table} SET {mode}"))
+    return to_change
+
+
+def get_partition_layout(engine) -> Dict[str, bool]:
+    """
+    Indica qué tablas de PARTITIONED_TABLES existen como tablas particionadas
+    (una sola consulta a pg_class).
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        Diccionario {tabla: True si está particionada} con las tablas que existen
+    """
+    query = """
+        SELECT c.relname, c.relkind = 'p'
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+          AND c.relkind IN ('r', 'p')
+          AND c.relname = ANY(:tables)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), {'tables': list(PARTITIONED_TABLES)})
+        return {table: partitioned for table, partitioned in rows}
+
+
+def check_partition_layout(engine, partitioned: bool) -> None:
+    """
+    Verifica que las tablas de hechos existentes tengan el modo de particionamiento pedido.
+
+    CREATE TABLE IF NOT EXISTS no convierte una tabla existente: sin esta verificación,
+    cambiar ETLConfig.PARTITION_FACT_TABLES registraría el esquema como aplicado
+    con las tablas en el modo anterior.
+
+    Args:
+        engine: SQLAlchemy engine
+        partitioned: Modo deseado
+
+    Raises:
+        RuntimeError: Si alguna tabla existente está en el otro modo
+    """
+    mismatched = [
+        table for table, is_partitioned in get_partition_layout(engine).items()
+        if is_partitioned != partitioned
+    ]
+    if mismatched:
+        current = 'sin particionar' if partitioned else 'particionadas'
+        raise RuntimeError(
+            f"Las tablas {', '.join(sorted(mismatched))} existen {current} y "
+            f"PARTITION_FACT_TABLES={partitioned}.\n"
+            f"El cambio de modo no se aplica sobre tablas existentes: eliminarlas "
+            f"(DROP TABLE ... CASCADE) y recargar producción, o restaurar "
+            f"PARTITION_FACT_TABLES={not partitioned}."
+        )
+
+
+def ensure_production_schema(partitioned: Optional[bool] = None, force: bool = False) -> Tuple[bool, str]:
+    """
+    Aplica el esquema de producción si la metadata de models.py cambió.
+
+    El modo particionado forma parte del DDL, por lo que cambiar
+    ETLConfig.PARTITION_FACT_TABLES también cambia el hash. Antes de aplicar se
+    verifica que las tablas de hechos existentes estén en ese modo (ver
+    check_partition_layout).
+
+    Args:
+        partitioned: Ver get_production_tables
+        force: Si True, aplica el DDL aunque el hash coincida
+
+    Returns:
+        Tupla (aplicado, hash)
+
+    Raises:
+        RuntimeError: Si el modo de particionamiento no coincide con las tablas existentes
+    """
+    if partitioned is None:
+        partitioned = ETLConfig.PARTITION_FACT_TABLES
+    return apply_schema(
+        'production',
+        build_production_ddl(partitioned),
+        force=force,
+        before_apply=lambda engine: check_partition_layout(engine, partitioned)
+    )
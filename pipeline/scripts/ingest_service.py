@@ -0,0 +1,475 @@
+"""
+Servicio de ingesta continua por micro-lotes.
+
+main.py carga una lista fija de archivos en una sola pasada. Este servicio queda
+en ejecución, vigila el directorio de entrada (PathManager.get_csv_dir()) y:
+1. Asigna cada archivo nuevo a su tabla staging por patrón (ETLConfig.INGEST_TABLE_PATTERNS,
+   por defecto derivados de TABLES_CONFIG: '5.ordenes.csv' → '5.ordenes*.csv').
+   Un archivo se admite cuando lleva INGEST_SETTLE_SECONDS sin cambiar.
+2. Agrupa los archivos pendientes en micro-lotes: el lote se procesa cuando el
+   archivo más antiguo lleva INGEST_WINDOW_SECONDS esperando o se alcanza
+   INGEST_MAX_BATCH_FILES / INGEST_MAX_BATCH_BYTES. Cada lote lleva como máximo un
+   archivo por tabla (staging tiene un archivo por tabla); el resto espera al siguiente.
+3. Ejecuta staging → transformación → producción en modo incremental solo para
+   las tablas del lote (ver watermarks.py y delta.py). Los archivos de hechos se
+   tratan como partes que agregan filas; los de dimensiones como una foto completa.
+
+Contrapresión: los lotes se procesan de a uno y, con INGEST_MAX_PENDING_FILES
+archivos pendientes, el servicio deja de admitir archivos hasta vaciar la cola.
+
+Registro de ingesta (tabla etl_ingest_ledger, semántica at-least-once): cada archivo
+(nombre, tamaño, fecha de modificación) se registra como 'processing' antes de cargarlo
+y como 'done' solo después de confirmar la carga a producción. Si el lote falla o el
+proceso se cae en medio, el archivo se vuelve a procesar. Cada tabla de producción
+guarda su marca de agua (tablas de hechos) o sus hashes por fila (dimensiones) en la
+misma transacción que escribe sus filas, así la repetición solo carga las tablas
+que no llegaron a confirmarse y no duplica las ya confirmadas. Las tablas de
+cuarentena sí pueden recibir otra vez las filas rechazadas de un reintento. Tras
+INGEST_MAX_ATTEMPTS fallos el archivo queda 'failed' hasta que cambie.
+
+Uso:
+    python pipeline/scripts/ingest_service.py                    # servicio continuo
+    python pipeline/scripts/ingest_service.py --once             # procesar lo pendiente y salir
+    python pipeline/scripts/ingest_service.py --window 30 --max-batch-files 5
+"""
+
+import sys
+import os
+import time
+import signal
+import glob
+import fnmatch
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Agregar la raíz del proyecto al sys.path si se ejecuta como script
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(os.path.dirname(current_dir))  # Sube dos niveles: scripts -> pipeline -> raíz
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from pipeline.utils.path_manager import PathManager
+    from pipeline.utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+from database.db_connector import DBConnector
+
+try:
+    from pipeline.models.create_tables import create_staging_tables, create_production_tables
+    from pipeline.etl.pipeline import TABLES_CONFIG, run_transformations, run_production_load
+    from pipeline.etl.load_raw_data import load_raw_data
+    from pipeline.etl.watermarks import is_incremental_table
+except ImportError:
+    from ..models.create_tables import create_staging_tables, create_production_tables
+    from ..etl.pipeline import TABLES_CONFIG, run_transformations, run_production_load
+    from ..etl.load_raw_data import load_raw_data
+    from ..etl.watermarks import is_incremental_table
+
+
+# Registro de archivos ingeridos
+LEDGER_TABLE = 'etl_ingest_ledger'
+
+
+# ============================================================================
+# ASIGNACIÓN DE ARCHIVOS A TABLAS
+# ============================================================================
+
+def get_table_patterns() -> Dict[str, List[str]]:
+    """
+    Retorna los patrones de archivo por tabla staging. Las entradas de TABLES_CONFIG
+    con patrón glob se usan tal cual; a los archivos sueltos (o a cada archivo de
+    una lista) se les agrega '*' antes de la extensión.
+
+    Returns:
+        Diccionario {table_raw: [patrones fnmatch]}
+    """
+    if ETLConfig.INGEST_TABLE_PATTERNS:
+        return {
+            table_raw: [pattern] if isinstance(pattern, str) else list(pattern)
+            for table_raw, pattern in ETLConfig.INGEST_TABLE_PATTERNS.items()
+        }
+    patterns = {}
+    for config in TABLES_CONFIG:
+        files = [config['file']] if isinstance(config['file'], str) else config['file']
+        table_patterns = []
+        for file_name in files:
+            if glob.has_magic(file_name):
+                table_patterns.append(file_name)
+            else:
+                stem, extension = os.path.splitext(file_name)
+                table_patterns.append(f"{stem}*{extension}")
+        patterns[config['table_raw']] = table_patterns
+    return patterns
+
+
+def match_table(file_name: str, patterns: Dict[str, List[str]]) -> Optional[str]:
+    """
+    Asigna un archivo a su tabla staging. Si varios patrones coinciden gana el más
+    largo (el más específico).
+
+    Returns:
+        Nombre de la tabla staging, o None si ningún patrón coincide
+    """
+    matches = [(len(pattern), table_raw) for table_raw, table_patterns in patterns.items()
+               for pattern in table_patterns if fnmatch.fnmatchcase(file_name, pattern)]
+    return max(matches)[1] if matches else None
+
+
+# ============================================================================
+# REGISTRO DE INGESTA
+# ============================================================================
+
+def ensure_ledger_table(engine) -> None:
+    """Crea la tabla del registro de ingesta si no existe."""
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+                file_name TEXT NOT NULL,
+                file_size BIGINT NOT NULL,
+                file_mtime DOUBLE PRECISION NOT NULL,
+                table_raw VARCHAR(100) NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                batch_id VARCHAR(40),
+                last_error TEXT,
+                first_seen TIMESTAMP NOT NULL DEFAULT now(),
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                PRIMARY KEY (file_name, file_size, file_mtime)
+            )
+        """))
+
+
+def get_finished_files(engine) -> set:
+    """
+    Retorna las claves (nombre, tamaño, fecha) de los archivos ya terminados
+    ('done') o descartados ('failed').
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            f"SELECT file_name, file_size, file_mtime FROM {LEDGER_TABLE} WHERE status IN ('done', 'failed')"
+        )).fetchall()
+    return {(row[0], row[1], row[2]) for row in rows}
+
+
+def mark_processing(engine, files: List[Dict], batch_id: str) -> None:
+    """
+    Registra los archivos de un lote como 'processing' (antes de cargarlos) e
+    incrementa sus intentos. Actualiza 'attempts' en cada archivo.
+    """
+    with engine.begin() as conn:
+        for file in files:
+            file['attempts'] = conn.execute(
+                text(f"""
+                    INSERT INTO {LEDGER_TABLE}
+                        (file_name, file_size, file_mtime, table_raw, status, attempts, batch_id)
+                    VALUES (:file_name, :file_size, :file_mtime, :table_raw, 'processing', 1, :batch_id)
+                    ON CONFLICT (file_name, file_size, file_mtime) DO UPDATE SET
+                        status = 'processing',
+                        attempts = {LEDGER_TABLE}.attempts + 1,
+                        batch_id = EXCLUDED.batch_id,
+                        updated_at = now()
+                    RETURNING attempts
+                """),
+                {'file_name': file['file_name'], 'file_size': file['size'], 'file_mtime': file['mtime'],
+                 'table_raw': file['table_raw'], 'batch_id': batch_id}
+            ).scalar()
+
+
+def mark_files(engine, files: List[Dict], status: str, error: Optional[str] = None) -> None:
+    """Actualiza el estado de los archivos de un lote en el registro de ingesta."""
+    with engine.begin() as conn:
+        for file in files:
+            conn.execute(
+                text(f"""
+                    UPDATE {LEDGER_TABLE}
+                    SET status = :status, last_error = :error, updated_at = now()
+                    WHERE file_name = :file_name AND file_size = :file_size AND file_mtime = :file_mtime
+                """),
+                {'status': status, 'error': error, 'file_name': file['file_name'],
+                 'file_size': file['size'], 'file_mtime': file['mtime']}
+            )
+
+
+# ============================================================================
+# SERVICIO DE MICRO-LOTES
+# ============================================================================
+
+class MicroBatchIngestor:
+    """
+    Vigila el directorio de entrada y carga los archivos nuevos en micro-lotes.
+
+    Los parámetros no informados se toman de ETLConfig (INGEST_*).
+    """
+
+    def __init__(
+        self,
+        landing_dir: Optional[str] = None,
+        window_seconds: Optional[float] = None,
+        max_batch_files: Optional[int] = None,
+        max_batch_bytes: Optional[int] = None,
+        max_pending_files: Optional[int] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        self.landing_dir = landing_dir or path_manager.get_csv_dir()
+        self.window_seconds = ETLConfig.INGEST_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.max_batch_files = max_batch_files or ETLConfig.INGEST_MAX_BATCH_FILES
+        self.max_batch_bytes = max_batch_bytes or ETLConfig.INGEST_MAX_BATCH_BYTES
+        self.max_pending_files = max_pending_files or ETLConfig.INGEST_MAX_PENDING_FILES
+        self.poll_seconds = ETLConfig.INGEST_POLL_SECONDS if poll_seconds is None else poll_seconds
+
+        self.patterns = get_table_patterns()
+        self.engine = DBConnector.get_instance().get_engine()
+        self.pending: List[Dict] = []
+        self.finished: set = set()
+        self.batches_ok = 0
+        self.batches_failed = 0
+        self._unmatched: set = set()
+        self._throttled = False
+        self._stop = False
+
+    def stop(self, *_args) -> None:
+        """Pide detener el servicio al terminar el lote en curso."""
+        if not self._stop:
+            print("\n   ⚠ Deteniendo el servicio al terminar el lote en curso...")
+        self._stop = True
+
+    def scan(self) -> int:
+        """
+        Revisa el directorio de entrada y admite los archivos nuevos y completos.
+
+        Returns:
+            Número de archivos admitidos en esta revisión
+        """
+        now = time.time()
+        known = {(file['file_name'], file['size'], file['mtime']) for file in self.pending}
+        entries = sorted(
+            (entry for entry in os.scandir(self.landing_dir) if entry.is_file() and entry.name.endswith('.csv')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+
+        admitted = 0
+        for entry in entries:
+            table_raw = match_table(entry.name, self.patterns)
+            if table_raw is None:
+                if entry.name not in self._unmatched:
+                    print(f"   ⚠ {entry.name} no coincide con ningún patrón de tabla, se ignora")
+                    self._unmatched.add(entry.name)
+                continue
+
+            stat = entry.stat()
+            key = (entry.name, stat.st_size, stat.st_mtime)
+            if key in self.finished or key in known:
+                continue
+
+            # Archivo todavía en escritura
+            if now - stat.st_mtime < ETLConfig.INGEST_SETTLE_SECONDS:
+                continue
+
+            # Contrapresión: el resto espera en el directorio hasta vaciar la cola
+            if len(self.pending) >= self.max_pending_files:
+                if not self._throttled:
+                    print(f"   ⚠ {len(self.pending)} archivos pendientes: se pausa la admisión")
+                    self._throttled = True
+                break
+
+            self.pending.append({
+                'file_name': entry.name,
+                'path': entry.path,
+                'table_raw': table_raw,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'seen_at': now,
+                'attempts': 0,
+            })
+            admitted += 1
+
+        if self._throttled and len(self.pending) < self.max_pending_files:
+            self._throttled = False
+        return admitted
+
+    def ready(self) -> bool:
+        """Indica si la ventana del micro-lote se cumplió (por tiempo o por tamaño)."""
+        if not self.pending:
+            return False
+        oldest = min(file['seen_at'] for file in self.pending)
+        return (
+            time.time() - oldest >= self.window_seconds
+            or len(self.pending) >= self.max_batch_files
+            or sum(file['size'] for file in self.pending) >= self.max_batch_bytes
+        )
+
+    def take_batch(self) -> List[Dict]:
+        """
+        Saca de la cola el siguiente micro-lote: en orden de llegada, un archivo por
+        tabla y dentro de los límites de archivos y bytes (el primero siempre entra).
+        """
+        batch, tables, total_bytes = [], set(), 0
+        for file in list(self.pending):
+            if len(batch) >= self.max_batch_files:
+                break
+            if file['table_raw'] in tables:
+                continue
+            if batch and total_bytes + file['size'] > self.max_batch_bytes:
+                continue
+            batch.append(file)
+            tables.add(file['table_raw'])
+            total_bytes += file['size']
+            self.pending.remove(file)
+        return batch
+
+    def process_batch(self, files: List[Dict]) -> bool:
+        """
+        Ejecuta staging → transformación → producción (modo incremental) para un micro-lote.
+
+        Returns:
+            True si el lote se cargó y quedó registrado como 'done'
+        """
+        batch_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        tables = [file['table_raw'] for file in files]
+        by_table = {file['table_raw']: file for file in files}
+
+        print(f"\n{'='*80}")
+        print(f"MICRO-LOTE {batch_id}: {len(files)} archivos "
+              f"({sum(file['size'] for file in files) / 1024 / 1024:.2f} MB)")
+        print(f"{'='*80}")
+        for file in files:
+            print(f"   - {file['file_name']} → {file['table_raw']}")
+
+        # At-least-once: registrado antes de cargar, 'done' solo después de confirmar
+        mark_processing(self.engine, files, batch_id)
+        start_time = time.perf_counter()
+
+        try:
+            # Tablas incrementales fuera del lote: staging vacía para no repetir su lote anterior
+            with self.engine.begin() as conn:
+                for config in TABLES_CONFIG:
+                    if is_incremental_table(config['table_raw']) and config['table_raw'] not in by_table:
+                        conn.execute(text(f"TRUNCATE TABLE {config['table_raw']}"))
+
+            # Staging en el orden de TABLES_CONFIG (las tablas padre antes que las hijas)
+            for config in TABLES_CONFIG:
+                file = by_table.get(config['table_raw'])
+                if file is not None:
+                    # Ruta absoluta: el directorio de entrada puede no ser el directorio CSV
+                    load_raw_data(file_name=file['path'], table_name_raw=file['table_raw'], incremental=True)
+
+            run_transformations(tables=tables)
+            run_production_load(create_tables=False, create_indexes=False, incremental=True)
+
+        except Exception as e:
+            self.batches_failed += 1
+            retry = [file for file in files if file['attempts'] < ETLConfig.INGEST_MAX_ATTEMPTS]
+            exhausted = [file for file in files if file['attempts'] >= ETLConfig.INGEST_MAX_ATTEMPTS]
+            mark_files(self.engine, retry, 'pending', error=str(e))
+            mark_files(self.engine, exhausted, 'failed', error=str(e))
+            self.finished.update((file['file_name'], file['size'], file['mtime']) for file in exhausted)
+            # Reintentar en el próximo lote, antes que los archivos más nuevos
+            self.pending[:0] = retry
+            print(f"\n   ✗ Micro-lote {batch_id} falló: {str(e)}")
+            if exhausted:
+                print(f"   ✗ {len(exhausted)} archivos sin más reintentos: "
+                      f"{', '.join(file['file_name'] for file in exhausted)}")
+            return False
+
+        mark_files(self.engine, files, 'done')
+        self.finished.update((file['file_name'], file['size'], file['mtime']) for file in files)
+        self.batches_ok += 1
+
+        elapsed = time.perf_counter() - start_time
+        latency = time.time() - min(file['seen_at'] for file in files)
+        print(f"\n   ✓ Micro-lote {batch_id} cargado en {elapsed:.2f}s "
+              f"(latencia desde la llegada: {latency:.2f}s, pendientes: {len(self.pending)})")
+        return True
+
+    def run(self, once: bool = False, max_batches: Optional[int] = None) -> int:
+        """
+        Bucle principal del servicio.
+
+        Args:
+            once: Si True, procesa todo lo pendiente sin esperar la ventana y termina
+            max_batches: Termina después de este número de lotes (opcional)
+
+        Returns:
+            Número de lotes procesados
+        """
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        print(f"\n{'='*80}")
+        print("SERVICIO DE INGESTA CONTINUA (MICRO-LOTES)")
+        print(f"{'='*80}")
+        print(f"   Directorio de entrada: {self.landing_dir}")
+        print(f"   Ventana: {self.window_seconds}s / {self.max_batch_files} archivos / "
+              f"{self.max_batch_bytes / 1024 / 1024:.0f} MB")
+
+        create_staging_tables()
+        create_production_tables()
+        ensure_ledger_table(self.engine)
+        self.finished = get_finished_files(self.engine)
+
+        processed = 0
+        while not self._stop:
+            self.scan()
+
+            if self.pending and (once or self.ready()):
+                self.process_batch(self.take_batch())
+                processed += 1
+                if max_batches is not None and processed >= max_batches:
+                    break
+                # Sin esperar: puede haber otro lote listo (drenar la cola)
+                continue
+
+            if once and not self.pending:
+                break
+            time.sleep(self.poll_seconds)
+
+        print(f"\n{'='*80}")
+        print(f"✓ SERVICIO DE INGESTA DETENIDO: {self.batches_ok} lotes cargados, "
+              f"{self.batches_failed} fallidos, {len(self.pending)} archivos pendientes")
+        print(f"{'='*80}\n")
+        return processed
+
+
+def main():
+    """Punto de entrada por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Ingesta continua de CSV por micro-lotes")
+    parser.add_argument('--landing-dir', default=None, help="Directorio de entrada (por defecto el directorio CSV)")
+    parser.add_argument('--window', type=float, default=None, help="Segundos de la ventana de micro-lote")
+    parser.add_argument('--max-batch-files', type=int, default=None, help="Archivos máximos por micro-lote")
+    parser.add_argument('--max-batch-mb', type=float, default=None, help="MB máximos por micro-lote")
+    parser.add_argument('--max-pending', type=int, default=None, help="Archivos pendientes antes de pausar la admisión")
+    parser.add_argument('--poll', type=float, default=None, help="Segundos entre revisiones del directorio")
+    parser.add_argument('--once', action='store_true', help="Procesar lo pendiente y salir")
+    parser.add_argument('--max-batches', type=int, default=None, help="Terminar después de N micro-lotes")
+    args = parser.parse_args()
+
+    ingestor = MicroBatchIngestor(
+        landing_dir=args.landing_dir,
+        window_seconds=args.window,
+        max_batch_files=args.max_batch_files,
+        max_batch_bytes=int(args.max_batch_mb * 1024 * 1024) if args.max_batch_mb else None,
+        max_pending_files=args.max_pending,
+        poll_seconds=args.poll
+    )
+    ingestor.run(once=args.once, max_batches=args.max_batches)
+    sys.exit(1 if ingestor.batches_failed else 0)
+
+
+if __name__ == "__main__":
+    main()
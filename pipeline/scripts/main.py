@@ -47,18 +47,24 @@ path_manager.setup_sys_path()
 
 # Import funciones desde models y etl
 try:
-    from pipeline.models.create_tables import create_staging_tables, create_production_tables
+    from pipeline.models.create_tables import create_staging_tables, create_production_tables, create_production_indexes
     from pipeline.etl.load_raw_data import load_raw_data
     from pipeline.etl.transformations import apply_transformations
     from pipeline.etl.load_to_production import load_all_to_production
+    from pipeline.etl.dtype_plan import read_sql_with_plan
+    from pipeline.etl.delta import commit_staging_hashes
+    from pipeline.etl.watermarks import get_position_offset, commit_watermarks
     from database.db_connector import DBConnector
 except ImportError:
     # Si falla el import absoluto, intentar relativo
     try:
-        from ..models.create_tables import create_staging_tables, create_production_tables
+        from ..models.create_tables import create_staging_tables, create_production_tables, create_production_indexes
         from ..etl.load_raw_data import load_raw_data
         from ..etl.transformations import apply_transformations
         from ..etl.load_to_production import load_all_to_production
+        from ..etl.dtype_plan import read_sql_with_plan
+        from ..etl.delta import commit_staging_hashes
+        from ..etl.watermarks import get_position_offset, commit_watermarks
         from database.db_connector import DBConnector
     except ImportError:
         # Último recurso: imports directos
@@ -67,10 +73,13 @@ except ImportError:
         pipeline_dir = os.path.dirname(current_dir)
         if pipeline_dir not in sys.path:
             sys.path.insert(0, pipeline_dir)
-        from models.create_tables import create_staging_tables, create_production_tables
+        from models.create_tables import create_staging_tables, create_production_tables, create_production_indexes
         from etl.load_raw_data import load_raw_data
         from etl.transformations import apply_transformations
         from etl.load_to_production import load_all_to_production
+        from etl.dtype_plan import read_sql_with_plan
+        from etl.delta import commit_staging_hashes
+        from etl.watermarks import get_position_offset, commit_watermarks
         from database.db_connector import DBConnector
 
 
@@ -106,6 +115,9 @@ def main():
     db = DBConnector.get_instance()
     engine = db.get_engine()
     
+    # Estadísticas SQL solo de esta ejecución
+    db.query_log.reset()
+    
     try:
         # ========================================================================
         # PASO 1: Crear tablas staging
@@ -154,7 +166,7 @@ def main():
             try:
                 # Leer datos de staging
                 query = f"SELECT * FROM {table_raw}"
-                df = pd.read_sql(query, engine)
+                df = read_sql_with_plan(query, engine, table_raw)
                 
                 if len(df) == 0:
                     print(f"      ⚠ Tabla {table_raw} está vacía, saltando transformación")
@@ -164,11 +176,12 @@ def main():
                 # Para ordenes_raw, necesitamos detalle_ordenes_raw
                 if table_raw == 'ordenes_raw':
                     query_detalle = "SELECT * FROM detalle_ordenes_raw"
-                    df_detalle = pd.read_sql(query_detalle, engine)
+                    df_detalle = read_sql_with_plan(query_detalle, engine, 'detalle_ordenes_raw')
                     df_transformed = apply_transformations(
                         table_raw,
                         df,
-                        df_detalle_ordenes=df_detalle
+                        df_detalle_ordenes=df_detalle,
+                        orden_offset=get_position_offset(table_raw)
                     )
                 else:
                     df_transformed = apply_transformations(table_raw, df)
@@ -204,6 +217,14 @@ def main():
         
         id_mappings = load_all_to_production()
         
+        # Crear índices de foreign keys y fechas después de la carga masiva
+        create_production_indexes()
+        
+        # Modos delta/incremental: cada tabla de producción guardó sus hashes y su marca
+        # de agua al escribirse; confirmar los pendientes (hashes de staging)
+        commit_staging_hashes()
+        commit_watermarks()
+        
         # Importar LOAD_ORDER para contar tablas cargadas
         from pipeline.etl.load_to_production import LOAD_ORDER
         
@@ -223,6 +244,9 @@ def main():
         print(f"   - Foreign keys resueltas: Automático")
         print()
         
+        # Sentencias SQL que más tiempo acumularon
+        db.query_log.print_summary()
+        
     except Exception as e:
         print("\n" + "="*80)
         print("✗ ERROR EN EL PROCESO ETL")
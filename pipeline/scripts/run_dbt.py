@@ -0,0 +1,344 @@
+"""
+Script de orquestación de dbt posterior al ETL.
+
+En lugar de ejecutar 'dbt run' sobre todos los modelos después de cada carga,
+este script:
+1. Detecta qué tablas de producción cambiaron desde la última ejecución de dbt
+   (contadores de pg_stat_user_tables + conteo de filas, guardados en data/state)
+2. Mapea esas tablas a las sources de dbt declaradas en dbt/models/staging/_sources.yml
+3. Ejecuta dbt solo sobre el grafo afectado ('source:raw.<tabla>+') con varios hilos
+
+Así la latencia ETL → marts depende de lo que cambió y no del total de modelos.
+
+Uso:
+    python pipeline/scripts/run_dbt.py                       # detectar cambios automáticamente
+    python pipeline/scripts/run_dbt.py --tables usuarios ordenes
+    python pipeline/scripts/run_dbt.py --all --threads 8     # todos los modelos
+    python pipeline/scripts/run_dbt.py --command build       # incluye tests y snapshots afectados
+
+Si las vistas analíticas están materializadas (var 'analytics_materialized'), dbt no
+las recalcula en las ejecuciones parciales: al terminar dbt se refrescan con
+REFRESH MATERIALIZED VIEW CONCURRENTLY y se mide el tiempo de cada una.
+"""
+
+import sys
+import os
+import json
+import argparse
+import subprocess
+import yaml
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# Agregar la raíz del proyecto al sys.path si se ejecuta como script
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(os.path.dirname(current_dir))  # Sube dos niveles: scripts -> pipeline -> raíz
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+# Import PathManager y ETLConfig desde utils
+try:
+    from pipeline.utils.path_manager import PathManager
+    from pipeline.utils.config import ETLConfig
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    pipeline_dir = os.path.dirname(current_dir)
+    utils_dir = os.path.join(pipeline_dir, 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from path_manager import PathManager
+    from config import ETLConfig
+
+# Configurar sys.path usando PathManager
+path_manager = PathManager.get_instance()
+path_manager.setup_sys_path()
+
+from database.db_connector import DBConnector
+
+try:
+    from pipeline.etl.materialized_views import refresh_analytics_views, get_analytics_materialized_views
+except ImportError:
+    from ..etl.materialized_views import refresh_analytics_views, get_analytics_materialized_views
+
+
+# ============================================================================
+# DETECCIÓN DE TABLAS MODIFICADAS
+# ============================================================================
+
+def get_table_change_counters(engine, tables: List[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Obtiene una firma de cambios por tabla de producción.
+
+    La firma combina el OID de la tabla (cambia si se recrea), los contadores
+    acumulados de filas insertadas/actualizadas/eliminadas de pg_stat_user_tables
+    y el número de filas actual.
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tablas de producción a consultar
+
+    Returns:
+        Diccionario {tabla: {'relid', 'n_tup_ins', 'n_tup_upd', 'n_tup_del', 'filas'}}.
+        Las tablas que no existen no se incluyen.
+    """
+    query = """
+        SELECT relname, relid, n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_user_tables
+        WHERE schemaname = 'public' AND relname = ANY(:tables)
+    """
+    counters = {}
+    with engine.connect() as conn:
+        for row in conn.execute(text(query), {'tables': list(tables)}):
+            counters[row.relname] = {
+                'relid': int(row.relid),
+                'n_tup_ins': int(row.n_tup_ins),
+                'n_tup_upd': int(row.n_tup_upd),
+                'n_tup_del': int(row.n_tup_del),
+            }
+        for table in counters:
+            counters[table]['filas'] = int(conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar())
+    return counters
+
+
+def _get_state_path() -> str:
+    """Ruta del archivo de estado con los contadores de la última ejecución de dbt."""
+    return os.path.join(path_manager.get_state_dir(), ETLConfig.DBT_SOURCES_STATE_FILE)
+
+
+def load_sources_state() -> Dict[str, Dict[str, int]]:
+    """
+    Lee los contadores guardados en la última ejecución exitosa de dbt.
+
+    Returns:
+        Diccionario {tabla: firma}, vacío si no hay estado previo
+    """
+    state_path = _get_state_path()
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_sources_state(counters: Dict[str, Dict[str, int]]) -> str:
+    """
+    Guarda los contadores actuales como referencia para la próxima ejecución.
+
+    Args:
+        counters: Diccionario {tabla: firma} devuelto por get_table_change_counters
+
+    Returns:
+        Ruta del archivo de estado
+    """
+    state_path = _get_state_path()
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(counters, f, indent=2)
+    return state_path
+
+
+def detect_changed_tables(
+    engine,
+    tables: List[str],
+    previous_state: Optional[Dict[str, Dict[str, int]]] = None
+) -> List[str]:
+    """
+    Compara la firma actual de cada tabla con la guardada en la ejecución anterior.
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tablas de producción a revisar
+        previous_state: Estado anterior (si es None, se lee de data/state)
+
+    Returns:
+        Lista de tablas nuevas o modificadas desde la última ejecución de dbt
+    """
+    if previous_state is None:
+        previous_state = load_sources_state()
+    current = get_table_change_counters(engine, tables)
+    return [table for table in tables if table in current and current[table] != previous_state.get(table)]
+
+
+# ============================================================================
+# MAPEO A SOURCES DE DBT
+# ============================================================================
+
+def load_dbt_sources(sources_file: Optional[str] = None) -> Dict[str, str]:
+    """
+    Lee las sources declaradas en dbt y devuelve a qué source pertenece cada tabla.
+
+    Args:
+        sources_file: Ruta a _sources.yml (por defecto dbt/models/staging/_sources.yml)
+
+    Returns:
+        Diccionario {tabla: nombre_source} (ej: {'usuarios': 'raw'})
+    """
+    if sources_file is None:
+        sources_file = os.path.join(path_manager.get_dbt_project_dir(), 'models', 'staging', '_sources.yml')
+
+    with open(sources_file, 'r', encoding='utf-8') as f:
+        definition = yaml.safe_load(f) or {}
+
+    source_map = {}
+    for source in definition.get('sources', []):
+        for table in source.get('tables', []):
+            source_map[table['name']] = source['name']
+    return source_map
+
+
+def build_dbt_selectors(changed_tables: List[str], source_map: Dict[str, str]) -> List[str]:
+    """
+    Construye los selectores de dbt para el grafo aguas abajo de las tablas modificadas.
+
+    Args:
+        changed_tables: Tablas de producción modificadas
+        source_map: Diccionario {tabla: nombre_source} de load_dbt_sources
+
+    Returns:
+        Lista de selectores (ej: ['source:raw.usuarios+', 'source:raw.ordenes+'])
+    """
+    selectors = []
+    for table in changed_tables:
+        if table not in source_map:
+            print(f"   ⚠ La tabla '{table}' no está declarada como source de dbt, se ignora")
+            continue
+        selectors.append(f"source:{source_map[table]}.{table}+")
+    return selectors
+
+
+# ============================================================================
+# EJECUCIÓN DE DBT
+# ============================================================================
+
+def run_dbt(
+    command: Optional[str] = None,
+    selectors: Optional[List[str]] = None,
+    threads: Optional[int] = None,
+    full_refresh: bool = False,
+    exclude: Optional[List[str]] = None
+) -> int:
+    """
+    Invoca dbt como subproceso sobre el proyecto del repositorio.
+
+    El directorio del proyecto se toma de DBT_PROJECT_DIR (docker-compose) o, si no
+    está definido, de ETLConfig.DBT_PROJECT_DIR. dbt lee DBT_PROFILES_DIR por sí mismo.
+
+    Args:
+        command: Comando de dbt ('run', 'build', ...). Por defecto ETLConfig.DBT_COMMAND
+        selectors: Selectores para --select (None = todos los modelos)
+        threads: Hilos de dbt. Por defecto ETLConfig.DBT_THREADS
+        full_refresh: Si True, reconstruye los modelos incrementales desde cero
+        exclude: Selectores para --exclude (opcional)
+
+    Returns:
+        Código de salida de dbt
+    """
+    command = command or ETLConfig.DBT_COMMAND
+    threads = threads or ETLConfig.DBT_THREADS
+    project_dir = os.environ.get('DBT_PROJECT_DIR', path_manager.get_dbt_project_dir())
+
+    args = ['dbt', command, '--project-dir', project_dir, '--threads', str(threads)]
+    if selectors:
+        args += ['--select', *selectors]
+    if exclude:
+        args += ['--exclude', *exclude]
+    if full_refresh:
+        args.append('--full-refresh')
+
+    print(f"   Ejecutando: {' '.join(args)}")
+    result = subprocess.run(args, cwd=project_dir)
+    return result.returncode
+
+
+def run_changed_models(
+    changed_tables: Optional[List[str]] = None,
+    command: Optional[str] = None,
+    threads: Optional[int] = None,
+    run_all: bool = False,
+    full_refresh: bool = False
+) -> int:
+    """
+    Ejecuta dbt solo sobre los modelos afectados por las tablas que cambió el ETL.
+
+    Si la ejecución de dbt es exitosa se guardan los contadores actuales como
+    referencia, de modo que la próxima ejecución solo vea los cambios nuevos.
+
+    Args:
+        changed_tables: Tablas de producción modificadas. Si es None se detectan
+                        comparando con el estado guardado
+        command: Comando de dbt ('run' o 'build')
+        threads: Hilos de dbt
+        run_all: Si True, ejecuta todos los modelos sin detectar cambios
+        full_refresh: Si True, reconstruye los modelos incrementales desde cero
+
+    Returns:
+        Código de salida de dbt (0 si no había nada que ejecutar)
+    """
+    print("\n" + "="*80)
+    print("ORQUESTACIÓN DE DBT (modelos afectados por el ETL)")
+    print("="*80)
+
+    db = DBConnector.get_instance()
+    engine = db.get_engine()
+
+    source_map = load_dbt_sources()
+    source_tables = list(source_map.keys())
+
+    selectors = None
+    exclude = None
+    if not run_all:
+        if changed_tables is None:
+            changed_tables = detect_changed_tables(engine, source_tables)
+        if not changed_tables:
+            print("   ✓ Ninguna tabla fuente cambió desde la última ejecución de dbt")
+            return 0
+        print(f"   Tablas modificadas: {', '.join(changed_tables)}")
+        selectors = build_dbt_selectors(changed_tables, source_map)
+        if not selectors:
+            print("   ⚠ Ninguna de las tablas modificadas es source de dbt")
+            return 0
+        # Las vistas materializadas ya creadas se refrescan de forma concurrente al final
+        if ETLConfig.REFRESH_ANALYTICS_VIEWS and get_analytics_materialized_views(engine):
+            exclude = ['config.materialized:materialized_view']
+
+    returncode = run_dbt(
+        command=command,
+        selectors=selectors,
+        threads=threads,
+        full_refresh=full_refresh,
+        exclude=exclude
+    )
+
+    if returncode == 0:
+        state_path = save_sources_state(get_table_change_counters(engine, source_tables))
+        print(f"   ✓ dbt finalizó correctamente (estado guardado en {state_path})")
+        if ETLConfig.REFRESH_ANALYTICS_VIEWS:
+            refresh_analytics_views()
+    else:
+        print(f"   ✗ dbt terminó con código {returncode}; el estado no se actualiza")
+
+    return returncode
+
+
+def main():
+    """Punto de entrada por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Ejecuta dbt sobre los modelos afectados por el ETL")
+    parser.add_argument('--tables', nargs='+', help="Tablas de producción modificadas (por defecto se detectan)")
+    parser.add_argument('--command', default=None, help="Comando de dbt: run o build")
+    parser.add_argument('--threads', type=int, default=None, help="Hilos de dbt")
+    parser.add_argument('--all', action='store_true', help="Ejecutar todos los modelos")
+    parser.add_argument('--full-refresh', action='store_true', help="Reconstruir modelos incrementales")
+    args = parser.parse_args()
+
+    returncode = run_changed_models(
+        changed_tables=args.tables,
+        command=args.command,
+        threads=args.threads,
+        run_all=args.all,
+        full_refresh=args.full_refresh
+    )
+    sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,16 +16,191 @@ class ETLConfig:
     # Directorios relativos desde la raíz del proyecto
     CSV_DIR = 'data/CSV'
     SQL_DIR = 'data/sql'
+    REJECTS_DIR = 'data/rejects'
+    STATE_DIR = 'data/state'
+    ANALYTICS_CACHE_DIR = 'data/cache/analytics'
+    EXPORT_DIR = 'data/export'
+    LOGS_DIR = 'data/logs'
+    DBT_PROJECT_DIR = 'dbt'
     
     # ==================== PARÁMETROS DE CARGA DE DATOS ====================
     # Encoding para archivos CSV
     CSV_ENCODING = 'utf-8'
     
+    # Modo tolerante a errores del COPY: aísla filas inválidas bisecando el lote
+    # (dentro de savepoints) y las escribe en REJECTS_DIR en lugar de abortar la carga
+    COPY_ERROR_TOLERANT = False
+    
+    # Umbral de filas rechazadas en modo tolerante: si un COPY rechaza más filas que
+    # COPY_MAX_REJECTS o más de COPY_MAX_REJECT_RATIO del lote, la carga se aborta y
+    # se revierte (un archivo mayormente inválido no debe quedar cargado a medias).
+    # None desactiva el límite correspondiente
+    COPY_MAX_REJECTS = 1000
+    COPY_MAX_REJECT_RATIO = 0.05
+    
+    # Tablas staging UNLOGGED: se recargan desde los CSV en cada ejecución, así que
+    # no necesitan WAL (se vacían tras una caída del servidor y no se replican).
+    # Con False se vuelven a LOGGED (ej: si se necesitan en una réplica)
+    STAGING_UNLOGGED = True
+    
+    # Ejecutar ANALYZE sobre cada tabla staging después de su COPY o de reescribirla
+    # con los datos transformados, para que el planner tenga estadísticas desde la
+    # primera consulta (transformaciones, vistas staging de dbt)
+    ANALYZE_STAGING_AFTER_LOAD = True
+    
+    # Carga a staging con el driver asíncrono (asyncpg): todas las tablas a la vez
+    # desde un solo proceso, con como máximo ASYNC_MAX_CONCURRENCY COPYs simultáneos
+    ASYNC_STAGING_LOAD = False
+    ASYNC_MAX_CONCURRENCY = 4
+    
+    # Tablas con varias partes ('file' con patrón glob o lista de archivos): COPYs
+    # simultáneos por tabla (uno por parte) y filas por bloque al leer cada parte
+    PARALLEL_COPY_MAX_WORKERS = 4
+    PARALLEL_COPY_CHUNK_ROWS = 200_000
+    
+    # ==================== PLAN DE DTYPES ====================
+    # Aplicar dtypes compactos (category, enteros nullable pequeños) al leer datos
+    APPLY_DTYPE_PLAN = True
+    
+    # Columnas de texto que se leen como 'category' (además de los enums). Solo
+    # textos de pocos valores repetidos: nunca identificadores ni columnas UNIQUE
+    CATEGORY_COLUMNS = {
+        'direcciones_envio': ['ciudad', 'departamento', 'provincia', 'distrito', 'estado', 'pais'],
+    }
+    
     # Nota: Los siguientes parámetros ya no se usan con COPY de PostgreSQL:
     # - CHUNK_SIZE: COPY procesa todos los datos de una vez (más eficiente)
     # - DB_INSERT_METHOD: COPY es el método nativo más rápido
     # - DB_IF_EXISTS: COPY siempre agrega datos (append implícito)
     
+    # ==================== PARÁMETROS DE CARGA A PRODUCCIÓN ====================
+    # Validar constraints (CHECK, NOT NULL, UNIQUE) antes de escribir en producción
+    VALIDATE_CONSTRAINTS = True
+
+    # Sufijo de las tablas de cuarentena para filas que violan constraints
+    QUARANTINE_SUFFIX = '_quarantine'
+    
+    # Crear 'ordenes' e 'historial_pagos' como tablas particionadas por mes
+    # (las particiones se crean automáticamente durante la carga)
+    PARTITION_FACT_TABLES = False
+    
+    # Verificar la integridad referencial después de la carga y abortar si hay huérfanos
+    CHECK_INTEGRITY_AFTER_LOAD = False
+    
+    # Consultas simultáneas y claves de muestra del verificador de integridad
+    INTEGRITY_MAX_WORKERS = 4
+    INTEGRITY_SAMPLE_SIZE = 5
+    
+    # Modo masivo de load_all_to_production: sobre tablas destino vacías elimina
+    # índices secundarios y constraints UNIQUE/CHECK/FK antes de cargar y los
+    # reconstruye después (índices en paralelo, constraints NOT VALID + VALIDATE)
+    PRODUCTION_BULK_MODE = False
+    
+    # Conexiones simultáneas para reconstruir índices y validar constraints
+    BULK_REBUILD_MAX_WORKERS = 4
+    
+    # Modo delta: compara cada carga con los hashes por fila de la ejecución anterior
+    # (tabla etl_staging_hashes). Staging solo se recarga si su CSV cambió, solo se
+    # transforman las tablas con cambios y a producción se insertan las filas nuevas
+    # y se actualizan las modificadas (las eliminadas solo se reportan)
+    DELTA_MODE = False
+    
+    # Modo incremental: las tablas de hechos con fecha solo cargan las filas posteriores
+    # a su marca de agua (tabla etl_watermarks) y sus tablas hijas solo las filas de
+    # las órdenes nuevas. El resto de tablas se carga en modo delta
+    INCREMENTAL_MODE = False
+    
+    # Tablas staging con marca de agua y su columna de fecha
+    INCREMENTAL_SOURCES = {
+        'ordenes_raw': 'fecha_orden',
+        'historial_pagos_raw': 'fecha_pago',
+        'resenas_productos_raw': 'fecha',
+        'carrito_raw': 'fecha_agregado',
+    }
+    
+    # Tablas hijas sin fecha: se cargan las filas cuya FK apunta al lote de su padre
+    # {tabla_hija: (columna_fk, tabla_padre)}
+    INCREMENTAL_CHILD_TABLES = {
+        'detalle_ordenes_raw': ('orden_id', 'ordenes_raw'),
+        'ordenes_metodos_pago_raw': ('orden_id', 'ordenes_raw'),
+    }
+    
+    # Filas por bloque al leer los CSV en modo incremental
+    INCREMENTAL_CHUNK_SIZE = 100_000
+    
+    # ==================== INGESTA CONTINUA (MICRO-LOTES) ====================
+    # Servicio pipeline/scripts/ingest_service.py: vigila el directorio CSV y carga los
+    # archivos nuevos en micro-lotes con el modo incremental
+    
+    # Segundos entre revisiones del directorio de entrada
+    INGEST_POLL_SECONDS = 5
+    
+    # Ventana del micro-lote: se procesa cuando el archivo pendiente más antiguo
+    # lleva este tiempo esperando o se alcanza alguno de los límites de tamaño
+    INGEST_WINDOW_SECONDS = 60
+    INGEST_MAX_BATCH_FILES = 20
+    INGEST_MAX_BATCH_BYTES = 512 * 1024 * 1024
+    
+    # Contrapresión: archivos pendientes máximos; los demás esperan en el directorio
+    INGEST_MAX_PENDING_FILES = 200
+    
+    # Segundos sin cambios de tamaño/fecha para considerar un archivo completo
+    INGEST_SETTLE_SECONDS = 2
+    
+    # Intentos por archivo antes de marcarlo como fallido en el registro de ingesta
+    INGEST_MAX_ATTEMPTS = 3
+    
+    # Patrones (fnmatch, uno o una lista) de archivo por tabla staging. Si está vacío
+    # se derivan de TABLES_CONFIG: '5.ordenes.csv' → '5.ordenes*.csv' (los patrones
+    # glob de TABLES_CONFIG se usan tal cual)
+    INGEST_TABLE_PATTERNS = {}
+    
+    # Columnas de negocio que forman la columna 'hash_fila' de cada tabla
+    # (detección de cambios de los snapshots SCD Type 2 en dbt)
+    ROW_HASH_COLUMNS = {
+        'usuarios': ['nombre', 'apellido', 'dni', 'email'],
+        'productos': ['nombre', 'descripcion', 'precio', 'stock', 'categoria_id'],
+    }
+
+    # ==================== ORQUESTACIÓN DE DBT ====================
+    # Comando de dbt a ejecutar sobre los modelos afectados ('run' o 'build')
+    DBT_COMMAND = 'run'
+    
+    # Hilos de dbt para ejecutar en paralelo los modelos independientes
+    DBT_THREADS = 4
+    
+    # Archivo (dentro de STATE_DIR) con los contadores de cambios por tabla fuente
+    DBT_SOURCES_STATE_FILE = 'dbt_sources_state.json'
+    
+    # Refrescar (REFRESH ... CONCURRENTLY) las vistas materializadas analíticas
+    # después de cada ejecución exitosa de dbt
+    REFRESH_ANALYTICS_VIEWS = True
+    
+    # Patrón (LIKE) de los esquemas analíticos que genera dbt (ej: 'public_analytics')
+    ANALYTICS_SCHEMA_PATTERN = '%analytics'
+    
+    # Patrón (LIKE) de los esquemas de marts que genera dbt (ej: 'public_marts')
+    MARTS_SCHEMA_PATTERN = '%marts'
+    
+    # ==================== CAPA ANALÍTICA ====================
+    # Guardar en Parquet los resultados de las consultas analíticas
+    # (se invalidan cuando cambian las tablas que leen)
+    ANALYTICS_CACHE_ENABLED = True
+    
+    # Filas por row group en la exportación de marts a Parquet
+    EXPORT_ROW_GROUP_SIZE = 100_000
+    
+    # ==================== TRANSFORMACIONES ====================
+    # Backend de apply_transformations: 'pandas' o 'polars' (Polars lazy multi-hilo
+    # con lectura/escritura de staging vía Arrow; requiere el paquete polars)
+    TRANSFORM_BACKEND = 'pandas'
+    
+    # ==================== INSTRUMENTACIÓN SQL ====================
+    # Sentencias incluidas en el resumen por ejecución (top por tiempo total).
+    # El umbral del log de consultas lentas y el EXPLAIN se configuran en el .env
+    # (DB_SLOW_QUERY_MS, DB_SLOW_QUERY_LOG, DB_EXPLAIN_PATTERN)
+    QUERY_SUMMARY_TOP_N = 10
+    
     # ==================== CONFIGURACIÓN DE BASE DE DATOS ====================
     # (Estos valores se pueden leer del .env si es necesario)
     # Por ahora se usan los del DBConnector
@@ -56,3 +231,81 @@ class ETLConfig:
             str: Ruta completa al directorio SQL
         """
         return os.path.join(project_root, cls.SQL_DIR)
+    
+    @classmethod
+    def get_rejects_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del directorio de rechazos del COPY.
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio de rechazos
+        """
+        return os.path.join(project_root, cls.REJECTS_DIR)
+    
+    @classmethod
+    def get_state_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del directorio de estado del pipeline.
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio de estado
+        """
+        return os.path.join(project_root, cls.STATE_DIR)
+    
+    @classmethod
+    def get_analytics_cache_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del directorio de caché de consultas analíticas.
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio de caché
+        """
+        return os.path.join(project_root, cls.ANALYTICS_CACHE_DIR)
+    
+    @classmethod
+    def get_export_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del directorio de exportación de marts a Parquet.
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio de exportación
+        """
+        return os.path.join(project_root, cls.EXPORT_DIR)
+    
+    @classmethod
+    def get_logs_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del directorio de logs (consultas lentas, resúmenes SQL).
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio de logs
+        """
+        return os.path.join(project_root, cls.LOGS_DIR)
+    
+    @classmethod
+    def get_dbt_project_dir_path(cls, project_root: str) -> str:
+        """
+        Retorna la ruta completa del proyecto dbt.
+        
+        Args:
+            project_root: Ruta raíz del proyecto
+            
+        Returns:
+            str: Ruta completa al directorio del proyecto dbt
+        """
+        return os.path.join(project_root, cls.DBT_PROJECT_DIR)
@@ -97,6 +97,46 @@ class PathManager:
         """
         return os.path.join(PathManager._csv_dir, file_name)
     
+    def get_rejects_dir(self) -> str:
+        """
+        Retorna el directorio donde se escriben las filas rechazadas por el COPY.
+        
+        Returns:
+            str: Ruta absoluta al directorio data/rejects
+        """
+        from .config import ETLConfig
+        return ETLConfig.get_rejects_dir_path(PathManager._project_root)
+    
+    def get_state_dir(self) -> str:
+        """
+        Retorna el directorio donde se guarda el estado entre ejecuciones del pipeline.
+        
+        Returns:
+            str: Ruta absoluta al directorio data/state
+        """
+        from .config import ETLConfig
+        return ETLConfig.get_state_dir_path(PathManager._project_root)
+    
+    def get_logs_dir(self) -> str:
+        """
+        Retorna el directorio de logs del pipeline (consultas lentas, resúmenes SQL).
+        
+        Returns:
+            str: Ruta absoluta al directorio data/logs
+        """
+        from .config import ETLConfig
+        return ETLConfig.get_logs_dir_path(PathManager._project_root)
+    
+    def get_dbt_project_dir(self) -> str:
+        """
+        Retorna el directorio del proyecto dbt.
+        
+        Returns:
+            str: Ruta absoluta al directorio dbt
+        """
+        from .config import ETLConfig
+        return ETLConfig.get_dbt_project_dir_path(PathManager._project_root)
+    
     def setup_sys_path(self) -> None:
         """
         Configura sys.path con project_root y current_dir.
@@ -0,0 +1,51 @@
+"""
+Tests de la clasificación de filas del motor de deltas (delta.py).
+"""
+
+import pandas as pd
+
+from pipeline.etl.delta import classify_rows, detect_position_shift
+
+
+def _previous(df, key_columns=None):
+    return classify_rows(df, None, key_columns)['hashes']
+
+
+def test_append_at_the_end_is_not_a_shift():
+    before = pd.DataFrame({'cantidad': [1, 2, 3]})
+    after = pd.DataFrame({'cantidad': [1, 2, 3, 4]})
+
+    delta = classify_rows(after, _previous(before))
+
+    assert len(delta['inserted']) == 1 and len(delta['updated']) == 0
+    assert not detect_position_shift(delta)
+
+
+def test_in_place_edit_is_not_a_shift():
+    before = pd.DataFrame({'cantidad': [1, 2, 3]})
+    after = pd.DataFrame({'cantidad': [1, 9, 3]})
+
+    assert not detect_position_shift(classify_rows(after, _previous(before)))
+
+
+def test_row_inserted_in_the_middle_is_a_shift():
+    before = pd.DataFrame({'cantidad': [1, 2, 3]})
+    after = pd.DataFrame({'cantidad': [1, 5, 2, 3]})
+
+    assert detect_position_shift(classify_rows(after, _previous(before)))
+
+
+def test_row_deleted_is_a_shift():
+    before = pd.DataFrame({'cantidad': [1, 2, 3]})
+    after = pd.DataFrame({'cantidad': [1, 3]})
+
+    assert detect_position_shift(classify_rows(after, _previous(before)))
+
+
+def test_natural_keys_never_shift():
+    before = pd.DataFrame({'nombre': ['a', 'b', 'c']})
+    after = pd.DataFrame({'nombre': ['a', 'c']})
+
+    delta = classify_rows(after, _previous(before, ['nombre']), ['nombre'])
+
+    assert not detect_position_shift(delta, ['nombre'])
@@ -0,0 +1,39 @@
+"""
+Tests del plan de dtypes (dtype_plan.py).
+"""
+
+import pandas as pd
+
+from pipeline.etl.dtype_plan import apply_dtype_plan, get_dtype_plan
+from pipeline.etl.transformations import transform_usuarios
+
+
+def _usuarios_raw() -> pd.DataFrame:
+    # Emails y DNIs repetidos: baja cardinalidad, pero siguen siendo identificadores
+    return pd.DataFrame({
+        'nombre': ['Ana'] * 3 + ['Luis'] * 3,
+        'apellido': ['Paz'] * 3 + ['Gil'] * 3,
+        'dni': ['1'] * 3 + ['2'] * 3,
+        'email': [' ana@x.com', 'ana@x.com', 'ana@x.com'] + ['luis@x.com'] * 3,
+        'contraseña': ['a'] * 3 + ['b'] * 3,
+    })
+
+
+def test_unique_text_columns_are_never_categorical():
+    plan = get_dtype_plan('usuarios_raw', _usuarios_raw())
+
+    assert 'category' not in plan.values()
+
+
+def test_transform_usuarios_runs_on_planned_frame():
+    df = apply_dtype_plan(_usuarios_raw(), 'usuarios_raw')
+
+    df_transformed = transform_usuarios(df)
+
+    assert df_transformed['email'].tolist()[0] == 'ana@x.com'
+
+
+def test_category_only_for_enums_and_allowlist():
+    assert get_dtype_plan('ordenes')['estado'] == 'category'
+    assert get_dtype_plan('direcciones_envio')['pais'] == 'category'
+    assert 'calle' not in get_dtype_plan('direcciones_envio')
@@ -0,0 +1,22 @@
+"""
+Tests del rango de fechas de la exportación de marts (export.py).
+"""
+
+from datetime import date
+
+from pipeline.analytics.export import _widen_to_months
+
+
+def test_range_is_widened_to_full_months():
+    start, end = _widen_to_months('2024-01-15', '2024-06-10')
+
+    assert start == date(2024, 1, 1)
+    assert end == date(2024, 7, 1)
+
+
+def test_december_ends_at_next_year():
+    assert _widen_to_months(None, '2024-12-31') == (None, date(2025, 1, 1))
+
+
+def test_open_range_is_kept_open():
+    assert _widen_to_months(None, None) == (None, None)
@@ -0,0 +1,72 @@
+"""
+Tests de la carga tolerante a errores del COPY (load_raw_data.py).
+"""
+
+import importlib
+
+import pandas as pd
+import psycopg2
+import pytest
+
+from pipeline.utils.config import ETLConfig
+
+lrd = importlib.import_module('pipeline.etl.load_raw_data')
+
+
+class FakeCursor:
+    """Cursor que rechaza cualquier lote que contenga la cantidad -1."""
+
+    def __init__(self):
+        self.copied = []
+
+    def execute(self, sql, params=None):
+        if sql.startswith('INSERT'):
+            self.copied.append('NULL')
+
+    def copy_expert(self, sql, buffer):
+        rows = buffer.getvalue().splitlines()
+        if any(row.endswith('"-1"') for row in rows):
+            raise psycopg2.DataError('valor inválido')
+        self.copied.extend(rows)
+
+
+def _lote(cantidades):
+    return pd.DataFrame({'producto_id': range(len(cantidades)), 'cantidad': cantidades})
+
+
+def test_bisection_isolates_invalid_rows(monkeypatch):
+    monkeypatch.setattr(ETLConfig, 'COPY_MAX_REJECTS', 10)
+    cursor, rejected = FakeCursor(), []
+
+    loaded = lrd._copy_with_bisection(cursor, _lote([1, -1, 2, 3]), 'carrito_raw', rejected)
+
+    assert loaded == 3
+    assert [row.index[0] for row, _ in rejected] == [1]
+
+
+def test_rejected_rows_keep_positions_in_referenced_tables(monkeypatch):
+    monkeypatch.setattr(ETLConfig, 'COPY_MAX_REJECTS', 10)
+    cursor = FakeCursor()
+
+    loaded = lrd._copy_with_bisection(cursor, _lote([1, -1, 2, 3]), 'ordenes_raw', [])
+
+    assert loaded == 3
+    # La fila rechazada se reemplaza por una fila NULL en su misma posición
+    assert [row.split(',')[-1] for row in cursor.copied] == ['"1"', 'NULL', '"2"', '"3"']
+
+
+def test_bisection_aborts_over_max_rejects(monkeypatch):
+    monkeypatch.setattr(ETLConfig, 'COPY_MAX_REJECTS', 2)
+
+    with pytest.raises(RuntimeError, match='COPY_MAX_REJECTS'):
+        lrd._copy_with_bisection(FakeCursor(), _lote([-1, 1, -1, -1, 2]), 'carrito_raw', [])
+
+
+def test_reject_ratio_threshold(monkeypatch):
+    monkeypatch.setattr(ETLConfig, 'COPY_MAX_REJECTS', None)
+    monkeypatch.setattr(ETLConfig, 'COPY_MAX_REJECT_RATIO', 0.25)
+    rejected = [(_lote([-1]), 'error')]
+
+    lrd._check_reject_threshold(rejected, 'carrito_raw', total_rows=4)
+    with pytest.raises(RuntimeError, match='COPY_MAX_REJECT_RATIO'):
+        lrd._check_reject_threshold(rejected * 2, 'carrito_raw', total_rows=4)
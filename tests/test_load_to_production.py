@@ -0,0 +1,179 @@
+"""
+Tests del mapeo de IDs por posición de load_to_production (modo delta).
+"""
+
+import contextlib
+import importlib
+
+import pandas as pd
+import pytest
+
+from pipeline.etl.delta import ROW_KEY_COLUMN
+
+# pipeline.etl exporta la función load_to_production con el mismo nombre que el módulo
+ltp = importlib.import_module('pipeline.etl.load_to_production')
+
+
+class FakeCursor:
+    """Cursor psycopg2 mínimo que registra el COPY y las sentencias ejecutadas."""
+
+    def __init__(self):
+        self.copied = None
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        if sql.startswith('UPDATE'):
+            self.rowcount = len(self.copied.splitlines())
+
+    def copy_expert(self, sql, buffer):
+        self.copied = buffer.read()
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeSAConnection:
+    """Conexión SQLAlchemy mínima: expone la conexión psycopg2 en .connection."""
+
+    def __init__(self, cursor=None):
+        self.cursor = cursor or FakeCursor()
+        self.connection = FakeConnection(self.cursor)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+@pytest.fixture
+def fake_db():
+    return FakeSAConnection()
+
+
+def test_update_uses_recorded_production_id(fake_db, monkeypatch):
+    # La fila 2 de staging quedó en cuarentena: la posición 3 recibió el ID 11
+    monkeypatch.setattr(ltp, 'load_row_ids', lambda engine, table: {1: 10, 3: 11, 4: 12})
+    df_updated = pd.DataFrame({'cantidad': [5], ROW_KEY_COLUMN: ['3']}, index=[2])
+
+    filas = ltp._apply_delta_updates(df_updated, 'carrito', 'carrito_id', None, None, fake_db)
+
+    assert filas == 1
+    assert fake_db.cursor.copied.strip() == '5,11'
+    update = next(sql for sql in fake_db.cursor.statements if sql.startswith('UPDATE'))
+    assert 't.carrito_id = s.carrito_id' in update
+
+
+def test_update_skips_positions_without_production_row(fake_db, monkeypatch):
+    monkeypatch.setattr(ltp, 'load_row_ids', lambda engine, table: {1: 10})
+    df_updated = pd.DataFrame({'cantidad': [5, 7], ROW_KEY_COLUMN: ['1', '2']})
+
+    ltp._apply_delta_updates(df_updated, 'carrito', 'carrito_id', None, None, fake_db)
+
+    assert fake_db.cursor.copied.strip() == '5,10'
+
+
+def test_position_mapping_without_registry_is_one_based(monkeypatch):
+    monkeypatch.setattr(ltp, 'load_row_ids', lambda engine, table: None)
+    monkeypatch.setattr(ltp.pd, 'read_sql', lambda sql, engine: pd.DataFrame({'orden_id': [10, 11, 12]}))
+
+    mapping = ltp.build_production_id_mapping(None, 'ordenes', 'orden_id')
+
+    assert mapping == {1: 10, 2: 11, 3: 12}
+
+
+def test_row_positions_follow_incremental_batch(monkeypatch):
+    monkeypatch.setattr(ltp, 'get_incremental_batch', lambda table: {'positions': [41, 42, 43]})
+    df = pd.DataFrame({'total': [1.0, 2.0, 3.0]})
+
+    positions = ltp._get_row_positions(df, 'ordenes_raw', incremental=True)
+
+    assert positions.tolist() == [41, 42, 43]
+    assert ltp._get_row_positions(df, 'ordenes_raw', incremental=False).tolist() == [1, 2, 3]
+
+
+class FakeEngine:
+    """Engine que registra cada transacción abierta con begin()."""
+
+    def __init__(self):
+        self.transactions = []
+
+    @contextlib.contextmanager
+    def begin(self):
+        conn = FakeSAConnection()
+        self.transactions.append(conn)
+        yield conn
+
+
+def test_hashes_are_saved_with_the_insert(monkeypatch):
+    engine = FakeEngine()
+    saved = []
+    df = pd.DataFrame({'usuario_id': [1, 2], 'cantidad': [3, 4]})
+
+    monkeypatch.setattr(ltp.DBConnector, 'get_instance',
+                        staticmethod(lambda: type('DB', (), {'get_engine': lambda self: engine})()))
+    monkeypatch.setattr(ltp, 'read_sql_with_plan', lambda query, engine, table: df.copy())
+    monkeypatch.setattr(ltp, '_get_primary_key_column', lambda table, engine: 'carrito_id')
+    monkeypatch.setattr(ltp, '_prepare_rows_for_write', lambda df, columns, *args, **kwargs: df[columns].copy())
+    monkeypatch.setattr(ltp, '_allocate_ids', lambda conn, table, column, count: [100, 101])
+    monkeypatch.setattr(ltp, 'save_row_ids', lambda conn, table, positions, ids: saved.append(('ids', conn)))
+    monkeypatch.setattr(ltp, 'compute_staging_delta', lambda table, df, keys, engine: {
+        'baseline': False, 'deleted': pd.DataFrame(), 'updated': df.iloc[0:0],
+        'inserted': df.assign(**{ROW_KEY_COLUMN: ['1', '2']}), 'unchanged': 0,
+    })
+    monkeypatch.setattr(ltp, 'save_staging_hashes', lambda conn, table: saved.append(('hashes', conn)))
+    monkeypatch.setattr(ltp, 'build_production_id_mapping', lambda *args: {})
+    monkeypatch.setattr(pd.DataFrame, 'to_sql', lambda self, table, conn, **kwargs: saved.append(('insert', conn)))
+
+    filas, _ = ltp.load_to_production('carrito_raw', 'carrito', delta=True, validate=False)
+
+    assert filas == 2
+    assert [event for event, _ in saved] == ['ids', 'insert', 'hashes']
+    assert len(engine.transactions) == 1
+    assert all(conn is engine.transactions[0] for _, conn in saved)
+
+
+def test_watermark_is_saved_with_the_insert(monkeypatch):
+    engine = FakeEngine()
+    saved = []
+    df = pd.DataFrame({'usuario_id': [1, 2], 'cantidad': [3, 4]})
+
+    monkeypatch.setattr(ltp.DBConnector, 'get_instance',
+                        staticmethod(lambda: type('DB', (), {'get_engine': lambda self: engine})()))
+    monkeypatch.setattr(ltp, 'read_sql_with_plan', lambda query, engine, table: df.copy())
+    monkeypatch.setattr(ltp, '_get_primary_key_column', lambda table, engine: 'carrito_id')
+    monkeypatch.setattr(ltp, '_prepare_rows_for_write', lambda df, columns, *args, **kwargs: df[columns].copy())
+    monkeypatch.setattr(ltp, '_allocate_ids', lambda conn, table, column, count: [100, 101])
+    monkeypatch.setattr(ltp, 'save_row_ids', lambda conn, table, positions, ids: saved.append(('ids', conn)))
+    monkeypatch.setattr(ltp, 'get_incremental_batch', lambda table: {'positions': [7, 8]})
+    monkeypatch.setattr(ltp, 'save_watermark', lambda conn, table: saved.append(('watermark', conn)))
+    monkeypatch.setattr(ltp, 'build_production_id_mapping', lambda *args: {})
+    monkeypatch.setattr(pd.DataFrame, 'to_sql', lambda self, table, conn, **kwargs: saved.append(('insert', conn)))
+
+    filas, _ = ltp.load_to_production('carrito_raw', 'carrito', incremental=True, validate=False)
+
+    assert filas == 2
+    assert [event for event, _ in saved] == ['ids', 'insert', 'watermark']
+    assert len(engine.transactions) == 1
+    assert all(conn is engine.transactions[0] for _, conn in saved)
+
+
+def test_dependent_tables_are_transitive():
+    assert ltp._get_dependent_tables('ordenes') == [
+        'detalle_ordenes', 'ordenes_metodos_pago', 'historial_pagos'
+    ]
+    assert ltp._get_dependent_tables('direcciones_envio') == []
@@ -0,0 +1,75 @@
+"""
+Tests de la reanudación de cargas por partes (parallel_copy.py).
+"""
+
+import importlib
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from pipeline.utils.config import ETLConfig
+
+pc = importlib.import_module('pipeline.etl.parallel_copy')
+
+
+class FakeDB:
+    @contextmanager
+    def get_raw_connection(self, profile=None):
+        class Conn:
+            def cursor(self):
+                return type('Cursor', (), {'execute': lambda *a: None, 'close': lambda self: None})()
+
+            def commit(self):
+                pass
+        yield Conn()
+
+
+@pytest.fixture
+def parts(tmp_path, monkeypatch):
+    paths = []
+    for name in ['ordenes_1.csv', 'ordenes_2.csv']:
+        path = tmp_path / name
+        path.write_text('usuario_id\n1\n')
+        paths.append(str(path))
+
+    resets, loads = [], []
+    monkeypatch.setattr(ETLConfig, 'DELTA_MODE', False)
+    monkeypatch.setattr(pc, 'resolve_source_files', lambda spec: paths)
+    monkeypatch.setattr(pc, 'get_position_referenced_tables', lambda: set())
+    monkeypatch.setattr(pc, 'get_expected_columns', lambda table: ['usuario_id'])
+    monkeypatch.setattr(pc, '_reset_table', resets.append)
+    monkeypatch.setattr(pc, '_load_part', lambda table, path, columns, tolerant: loads.append(
+        os.path.basename(path)) or {'part_name': os.path.basename(path), 'rows_loaded': 1})
+    monkeypatch.setattr(pc.DBConnector, 'get_instance', staticmethod(lambda: FakeDB()))
+    return paths, resets, loads
+
+
+def _registered(paths, extra=()):
+    loaded = {}
+    for path in paths:
+        stat = os.stat(path)
+        loaded[os.path.basename(path)] = {'file_size': stat.st_size, 'file_mtime': stat.st_mtime}
+    for name in extra:
+        loaded[name] = {'file_size': 1, 'file_mtime': 0.0}
+    return loaded
+
+
+def test_resumes_without_reset_when_parts_match(parts, monkeypatch):
+    paths, resets, loads = parts
+    monkeypatch.setattr(pc, 'get_loaded_parts', lambda table: _registered(paths[:1]))
+
+    pc.load_raw_data_parts('ordenes_*.csv', 'ordenes_raw', incremental=False)
+
+    assert resets == []
+    assert loads == ['ordenes_2.csv']
+
+
+def test_removed_part_resets_table(parts, monkeypatch):
+    paths, resets, loads = parts
+    monkeypatch.setattr(pc, 'get_loaded_parts', lambda table: _registered(paths, extra=['ordenes_0.csv']))
+
+    pc.load_raw_data_parts('ordenes_*.csv', 'ordenes_raw', incremental=False)
+
+    assert resets == ['ordenes_raw']
+    assert loads == ['ordenes_1.csv', 'ordenes_2.csv']
@@ -0,0 +1,47 @@
+"""
+Tests del registro de sentencias de los cursores raw de psycopg2 (query_log.py).
+"""
+
+from database.query_log import QueryLog, query_context
+
+
+class FakeCursor:
+    rowcount = 3
+
+    def copy_expert(self, sql, buffer):
+        pass
+
+    def execute(self, sql, params=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+
+def test_raw_copy_and_truncate_are_recorded():
+    query_log = QueryLog(slow_query_ms=float('inf'))
+    conn = query_log.wrap_connection(FakeConnection())
+
+    with query_context(stage='staging', table='usuarios_raw'):
+        cursor = conn.cursor()
+        cursor.execute("TRUNCATE TABLE usuarios_raw")
+        cursor.copy_expert("COPY usuarios_raw (nombre) FROM STDIN WITH (FORMAT CSV)", None)
+        cursor.close()
+
+    stats = {entry['statement']: entry for entry in query_log.get_stats()}
+    copy = stats['COPY usuarios_raw (nombre) FROM STDIN WITH (FORMAT CSV)']
+    assert copy['stage'] == 'staging' and copy['tables'] == ['usuarios_raw']
+    assert copy['rows'] == 3
+    assert 'TRUNCATE TABLE usuarios_raw' in stats
+
+
+def test_disabled_log_records_nothing():
+    query_log = QueryLog(enabled=False)
+    query_log.wrap_connection(FakeConnection()).cursor().execute("SELECT 1")
+
+    assert query_log.get_stats() == []
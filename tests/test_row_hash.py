@@ -0,0 +1,27 @@
+"""
+Tests del hash por fila (row_hash.py).
+"""
+
+import pandas as pd
+
+from pipeline.etl.row_hash import compute_row_hash
+
+
+def test_hash_does_not_depend_on_numeric_dtype():
+    as_int = pd.DataFrame({'stock': pd.array([1, None, 3], dtype='Int64'), 'nombre': ['a', 'b', 'c']})
+    as_float = pd.DataFrame({'stock': [1.0, None, 3.0], 'nombre': ['a', 'b', 'c']})
+    as_category = as_int.astype({'stock': 'Int16', 'nombre': 'category'})
+
+    expected = compute_row_hash(as_int, ['stock', 'nombre']).tolist()
+
+    assert compute_row_hash(as_float, ['stock', 'nombre']).tolist() == expected
+    assert compute_row_hash(as_category, ['stock', 'nombre']).tolist() == expected
+
+
+def test_fractional_values_still_change_the_hash():
+    df = pd.DataFrame({'precio': [1.0, 1.5]})
+
+    hashes = compute_row_hash(df, ['precio'])
+
+    assert hashes.iloc[0] == compute_row_hash(pd.DataFrame({'precio': [1]}), ['precio']).iloc[0]
+    assert hashes.iloc[0] != hashes.iloc[1]
@@ -0,0 +1,21 @@
+"""
+Tests de la verificación del modo de particionamiento (schema_manager.py).
+"""
+
+import pytest
+
+from pipeline.models import schema_manager
+
+
+def test_existing_plain_tables_block_partitioned_schema(monkeypatch):
+    monkeypatch.setattr(schema_manager, 'get_partition_layout',
+                        lambda engine: {'ordenes': False, 'historial_pagos': False})
+
+    with pytest.raises(RuntimeError, match='historial_pagos, ordenes'):
+        schema_manager.check_partition_layout(None, partitioned=True)
+
+
+def test_matching_or_missing_tables_pass(monkeypatch):
+    monkeypatch.setattr(schema_manager, 'get_partition_layout', lambda engine: {'ordenes': True})
+
+    schema_manager.check_partition_layout(None, partitioned=True)
@@ -0,0 +1,108 @@
+"""
+Tests de paridad entre los backends de transformaciones (pandas vs polars).
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('polars')
+
+from pipeline.etl.transformations_polars import TRANSFORM_MAP, check_transform_parity
+
+
+def _fixtures():
+    # Incluyen espacios, nulos, negativos y duplicados para ejercitar cada regla
+    return {
+        'usuarios_raw': pd.DataFrame({
+            'nombre': [' Ana ', 'Luis', None],
+            'apellido': ['Paz ', ' Gil', 'Ruiz'],
+            'dni': [' 123', '456 ', '789'],
+            'email': [' Ána@X.com ', 'luis@x.com', None],
+            'contraseña': ['a', 'b', 'c'],
+        }),
+        'categorias_raw': pd.DataFrame({
+            'nombre': [' Libros ', 'Juegos'],
+            'descripcion': ['  ', ' Mesa '],
+        }),
+        'productos_raw': pd.DataFrame({
+            'nombre': [' Mesa', 'Silla '],
+            'descripcion': ['Roble', None],
+            'precio': [10.5, -2.0],
+            'stock': [3, -1],
+            'categoria_id': [1, 2],
+        }),
+        'ordenes_raw': pd.DataFrame({
+            'usuario_id': [1, 2, 3],
+            'fecha_orden': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+            'total': [0.0, 99.0, -5.0],
+            'estado': ['Pendiente', 'Enviado', 'Pendiente'],
+        }),
+        'detalle_ordenes_raw': pd.DataFrame({
+            'orden_id': [1, 1, 2],
+            'producto_id': [1, 2, 1],
+            'cantidad': [2, -1, 3],
+            'precio_unitario': [10.0, 5.5, -1.0],
+        }),
+        'resenas_productos_raw': pd.DataFrame({
+            'usuario_id': [1, 1, 2, 1],
+            'producto_id': [1, 1, 1, 2],
+            'calificacion': [3, 5, 4, 1],
+            'comentario': ['a', 'b', 'c', 'd'],
+            'fecha': pd.to_datetime(['2024-01-02', '2024-01-01', '2024-01-03', None]),
+        }),
+        'direcciones_envio_raw': pd.DataFrame({
+            'usuario_id': [1, 2],
+            'calle': [' Av. Sol 1 ', 'Jr. Luna'],
+            'ciudad': ['Lima ', ' Cusco'],
+            'departamento': ['Lima', None],
+            'provincia': [' Lima', 'Cusco'],
+            'distrito': ['Miraflores', ' Wanchaq '],
+            'estado': [None, ''],
+            'codigo_postal': [' 15074', '08000'],
+            'pais': ['Perú ', 'Perú'],
+        }),
+        'carrito_raw': pd.DataFrame({
+            'usuario_id': [1, 2],
+            'producto_id': [1, 2],
+            'cantidad': [2, -4],
+        }),
+        'metodos_pago_raw': pd.DataFrame({
+            'nombre': [' Tarjeta ', 'Yape'],
+            'descripcion': ['Crédito', ' '],
+        }),
+        'ordenes_metodos_pago_raw': pd.DataFrame({
+            'orden_id': [1, 2],
+            'metodo_pago_id': [1, 2],
+            'monto_pagado': [20.0, -3.5],
+        }),
+        'historial_pagos_raw': pd.DataFrame({
+            'orden_id': [1, 2],
+            'metodo_pago_id': [1, 1],
+            'monto': [-1.0, 15.0],
+            'estado_pago': ['Procesando', 'Completado'],
+        }),
+    }
+
+
+FIXTURES = _fixtures()
+
+
+def test_fixtures_cover_every_table():
+    assert set(FIXTURES) == set(TRANSFORM_MAP)
+
+
+@pytest.mark.parametrize('table_raw', sorted(FIXTURES))
+def test_backends_produce_same_result(table_raw):
+    assert check_transform_parity(table_raw, FIXTURES[table_raw].copy()) == []
+
+
+@pytest.mark.parametrize('orden_offset', [0, 1])
+def test_ordenes_totals_match_with_detalle(orden_offset):
+    differences = check_transform_parity(
+        'ordenes_raw',
+        FIXTURES['ordenes_raw'].copy(),
+        df_detalle_ordenes=FIXTURES['detalle_ordenes_raw'].copy(),
+        orden_offset=orden_offset,
+    )
+
+    assert differences == []
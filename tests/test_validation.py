@@ -0,0 +1,116 @@
+"""
+Tests de la pre-validación de constraints (validation.py).
+"""
+
+import re
+
+import pandas as pd
+
+from pipeline.etl.validation import _check_violation_mask, validate_constraints
+
+
+class FakeEngine:
+    """Engine mínimo: responde las consultas '= ANY(:values)' con los valores de existing."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.queries = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.queries.append((sql, params['values']))
+        table, column = re.search(r'FROM (\w+) WHERE (\w+)', sql).groups()
+        found = self.existing.get((table, column), set())
+        return [(value,) for value in params['values'] if value in found]
+
+
+def _usuarios(**overrides):
+    data = {
+        'nombre': ['Ana', 'Luis', 'Eva'],
+        'apellido': ['Paz', 'Gil', 'Sol'],
+        'dni': ['1', '2', '3'],
+        'email': ['a@x.com', 'l@x.com', 'e@x.com'],
+        'contraseña': ['x', 'y', 'z'],
+    }
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+def test_non_numeric_values_violate_check():
+    df = pd.DataFrame({'precio': [10, 'abc', None, -1, '5.5']}, dtype=object)
+
+    mask = _check_violation_mask(df, 'precio >= 0')
+
+    assert mask.tolist() == [False, True, False, True, False]
+
+
+def test_range_check_with_nulls_is_satisfied():
+    df = pd.DataFrame({'calificacion': [1, 6, None, 'x']}, dtype=object)
+
+    mask = _check_violation_mask(df, 'calificacion >= 1 AND calificacion <= 5')
+
+    assert mask.tolist() == [False, True, False, True]
+
+
+def test_not_null_and_length_violations_are_rejected():
+    df = _usuarios(nombre=['Ana', None, 'Eva'], dni=['1', '2', '9' * 21])
+
+    df_valid, df_rejected = validate_constraints(df, 'usuarios')
+
+    assert df_valid.index.tolist() == [0]
+    reasons = df_rejected['motivo_cuarentena'].tolist()
+    assert reasons == ['NOT NULL: nombre', 'LONGITUD: dni > 20']
+
+
+def test_enum_values_outside_the_type_are_rejected():
+    df = pd.DataFrame({'total': [10, 20], 'estado': ['Pendiente', 'Perdida']})
+
+    df_valid, df_rejected = validate_constraints(df, 'ordenes')
+
+    assert df_valid.index.tolist() == [0]
+    assert df_rejected['motivo_cuarentena'].iloc[0].startswith('ENUM: estado')
+
+
+def test_unique_keeps_the_first_row_of_the_batch():
+    df = _usuarios(email=['a@x.com', 'a@x.com', 'e@x.com'])
+
+    df_valid, df_rejected = validate_constraints(df, 'usuarios')
+
+    assert df_valid.index.tolist() == [0, 2]
+    assert df_rejected['motivo_cuarentena'].tolist() == ['UNIQUE: email duplicado en el lote']
+
+
+def test_unique_against_production_queries_only_the_batch_values():
+    engine = FakeEngine({('usuarios', 'dni'): {'3'}})
+
+    df_valid, df_rejected = validate_constraints(_usuarios(), 'usuarios', engine)
+
+    assert df_valid.index.tolist() == [0, 1]
+    assert df_rejected['motivo_cuarentena'].tolist() == ['UNIQUE: dni ya existe en usuarios']
+    dni_query = next(values for sql, values in engine.queries if 'usuarios WHERE dni' in sql)
+    assert sorted(dni_query) == ['1', '2', '3']
+
+
+def test_children_of_missing_parents_are_rejected():
+    # La orden 7 quedó en cuarentena al cargar ordenes: no existe en producción
+    engine = FakeEngine({('ordenes', 'orden_id'): {5, 6}, ('productos', 'producto_id'): {1}})
+    df = pd.DataFrame({
+        'orden_id': [5, 7, None],
+        'producto_id': [1, 1, 1],
+        'cantidad': [1, 2, 3],
+        'precio_unitario': [10, 10, 10],
+    })
+
+    df_valid, df_rejected = validate_constraints(df, 'detalle_ordenes', engine)
+
+    assert df_valid.index.tolist() == [0, 2]
+    assert df_rejected['motivo_cuarentena'].tolist() == ['FK: orden_id no existe en ordenes']
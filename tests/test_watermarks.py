@@ -0,0 +1,105 @@
+"""
+Tests de la lectura incremental por marca de agua (watermarks.py).
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from pipeline.etl import watermarks
+
+
+class FakeDB:
+    def get_engine(self):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def fake_db(monkeypatch):
+    monkeypatch.setattr(watermarks.DBConnector, 'get_instance', staticmethod(lambda: FakeDB()))
+    yield
+    watermarks.discard_watermarks()
+
+
+def _write_ordenes(path, fechas):
+    pd.DataFrame({
+        'usuario_id': list(range(1, len(fechas) + 1)),
+        'fecha_orden': fechas,
+        'total': [10.0] * len(fechas),
+    }).to_csv(path, index=False)
+
+
+def test_row_appended_with_same_timestamp_is_loaded(tmp_path, monkeypatch):
+    csv_path = tmp_path / '5.ordenes.csv'
+    _write_ordenes(csv_path, ['2024-01-01 10:00:00', '2024-01-02 10:00:00', '2024-01-02 10:00:00'])
+    # La ejecución anterior procesó las 2 primeras filas del mismo archivo
+    monkeypatch.setattr(watermarks, 'get_watermark', lambda table, engine: {
+        'high_water': pd.Timestamp('2024-01-02 10:00:00'),
+        'row_count': 2,
+        'source_file': '5.ordenes.csv',
+        'file_size': 0,
+        'file_mtime': 0,
+    })
+
+    df = watermarks.read_incremental_csv('ordenes_raw', str(csv_path))
+
+    assert len(df) == 1
+    batch = watermarks.get_incremental_batch('ordenes_raw')
+    assert batch['positions'].tolist() == [3]
+    assert batch['row_count'] == 3
+
+
+def test_new_file_keeps_rows_at_the_watermark(tmp_path, monkeypatch):
+    csv_path = tmp_path / '5.ordenes_2.csv'
+    _write_ordenes(csv_path, ['2024-01-02 10:00:00', '2024-01-03 10:00:00'])
+    monkeypatch.setattr(watermarks, 'get_watermark', lambda table, engine: {
+        'high_water': pd.Timestamp('2024-01-02 10:00:00'),
+        'row_count': 2,
+        'source_file': '5.ordenes.csv',
+        'file_size': os.path.getsize(csv_path),
+        'file_mtime': 0,
+    })
+
+    df = watermarks.read_incremental_csv('ordenes_raw', str(csv_path))
+
+    assert len(df) == 2
+    assert watermarks.get_incremental_batch('ordenes_raw')['positions'].tolist() == [3, 4]
+
+
+def test_bootstrapped_watermark_keeps_new_rows_at_the_high_water(tmp_path, monkeypatch):
+    csv_path = tmp_path / '5.ordenes.csv'
+    _write_ordenes(csv_path, ['2024-01-01 10:00:00', '2024-01-02 10:00:00', '2024-01-02 10:00:00'])
+    # Producción tiene las 2 primeras filas y no hay archivo registrado
+    monkeypatch.setattr(watermarks, 'get_watermark', lambda table, engine: None)
+    monkeypatch.setattr(watermarks, '_bootstrap_watermark', lambda table, engine: {
+        'high_water': pd.Timestamp('2024-01-02 10:00:00'),
+        'row_count': 2,
+        'source_file': None,
+        'file_size': None,
+        'file_mtime': None,
+    })
+
+    df = watermarks.read_incremental_csv('ordenes_raw', str(csv_path))
+
+    assert len(df) == 1
+    assert watermarks.get_incremental_batch('ordenes_raw')['positions'].tolist() == [3]
+
+
+def test_child_rows_pending_after_parent_load_are_read(tmp_path, monkeypatch):
+    csv_path = tmp_path / '6.detalle_ordenes.csv'
+    pd.DataFrame({'orden_id': [1, 2, 3], 'producto_id': [1, 1, 2], 'cantidad': [1, 2, 3]}).to_csv(
+        csv_path, index=False
+    )
+    # Reintento: el padre ya confirmó su lote (sin filas nuevas) y la hija procesó 1 fila
+    previous = {'high_water': None, 'row_count': 1, 'source_file': '6.detalle_ordenes.csv',
+                'file_size': 1, 'file_mtime': 1.0}
+    monkeypatch.setattr(watermarks, 'get_watermark', lambda table, engine: previous)
+    watermarks._batches['ordenes_raw'] = {'positions': pd.Series([], dtype='int64').to_numpy()}
+
+    df = watermarks.read_incremental_csv('detalle_ordenes_raw', str(csv_path))
+
+    assert df['orden_id'].tolist() == [2, 3]
+    batch = watermarks.get_incremental_batch('detalle_ordenes_raw')
+    assert batch['positions'].tolist() == [2, 3]
+    assert batch['row_count'] == 3